@@ -25,9 +25,37 @@ class PluginAccessRequestEncryptor:
         self.shield_server_key_id = encryption_keys_info["shield_server_key_id"]
         self.shield_plugin_key_id = encryption_keys_info["shield_plugin_key_id"]
 
+    def negotiate_encryption_mode(self, shield_server_encryption_modes):
+        """
+        Use the envelope encryption mode for the messages sent to the shield server if the shield server supports it.
+        The shield server encrypts its responses in the encryption mode of the request messages.
+
+        Args:
+            shield_server_encryption_modes (str): Comma separated encryption modes supported by the shield server.
+        """
+        supported_modes = [mode.strip() for mode in (shield_server_encryption_modes or "").split(",")]
+        if DataEncryptor.ENCRYPTION_MODE_ENVELOPE in supported_modes:
+            self.shield_data_encryptor.encryption_mode = DataEncryptor.ENCRYPTION_MODE_ENVELOPE
+        else:
+            self.shield_data_encryptor.encryption_mode = DataEncryptor.ENCRYPTION_MODE_LEGACY
+        logger.debug(f"Using {self.shield_data_encryptor.encryption_mode} encryption mode for shield server requests")
+
     def encrypt_message(self, message):
         return self.shield_data_encryptor.encrypt(message)
 
+    def encrypt_message_stream(self, message_parts):
+        """
+        Encrypts a message given as text or as an iterable of text parts, in pieces of bounded size and without
+        joining the parts first. The encrypted message is returned as one text, as it is sent in a JSON payload.
+
+        Args:
+            message_parts (str or iterable of str): The message or the parts of the message.
+
+        Returns:
+            str: The encrypted message.
+        """
+        return "".join(self.shield_data_encryptor.encrypt_stream(message_parts))
+
     def encrypt_request(self, request):
         messages = request.request_text
         encrypted_messages = []
@@ -17,6 +17,9 @@ _logger = logging.getLogger(__name__)
 
 sequence_number = AtomicCounter()
 
+# response header of the shield server init listing the encryption modes the shield server supports
+ENCRYPTION_MODES_HEADER = "x-paig-encryption-modes"
+
 
 class ShieldAccessRequest:
     def __init__(self, **kwargs):
@@ -575,6 +578,9 @@ class ShieldRestHttpClient:
 
             if response_status == 200:
                 init_success = True
+                encryption_modes = response.headers.get(ENCRYPTION_MODES_HEADER)
+                self.plugin_access_request_encryptor.negotiate_encryption_mode(
+                    encryption_modes if isinstance(encryption_modes, str) else None)
                 _logger.info(f"Shield server initialized for tenant: tenant_id={self.tenant_id}")
             else:
                 if response_status == 400 or response_status == 404:
@@ -661,4 +667,35 @@ class ShieldRestHttpClient:
         else:
             error_message = f"Stream access audit request failed with status code {response.status}: {response.data}"
             _logger.error(error_message)
-            raise Exception(error_message)
\ No newline at end of file
+            raise Exception(error_message)
+
+    def log_stream_access_audits(self, requests: list) -> bool:
+        """
+        Logs a batch of stream access audit requests in one call.
+
+        Args:
+            requests (list): The StreamAccessAuditRequest objects containing the audit details.
+
+        Returns:
+            bool: False if the shield server has no batch audit endpoint, the audits are then not logged.
+        """
+
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug(f"Stream access audit batch of {len(requests)} requests")
+
+        response = HttpTransport.get_http().request(method="POST",
+                                                    url=self.base_url + "/shield/audit/batch",
+                                                    headers=self.get_default_headers(),
+                                                    json=[request.to_payload_dict() for request in requests],
+                                                    **self.request_kwargs)
+
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug(f"Stream access audit batch response status : {response.status}, body: {response.data}")
+
+        if response.status == 200:
+            return True
+        if response.status == 404:
+            return False
+        error_message = f"Stream access audit batch request failed with status code {response.status}: {response.data}"
+        _logger.error(error_message)
+        raise Exception(error_message)
\ No newline at end of file
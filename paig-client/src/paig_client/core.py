@@ -7,6 +7,7 @@ import uuid
 import base64
 from queue import Queue
 import contextvars
+from typing import List
 
 from . import interceptor_setup, util
 from paig_common.audit_spooler import AuditLogger
@@ -514,6 +515,8 @@ class PAIGApplication:
         self.shield_plugin_key_id = plugin_app_config_dict.get("shieldPluginKeyId")
         self.shield_plugin_private_key = plugin_app_config_dict.get("shieldPluginPrivateKey")
         self.audit_spool_dir = plugin_app_config_dict.get("auditSpoolDir", "spool/audits/")
+        self.audit_spool_max_size_mb = plugin_app_config_dict.get("auditSpoolMaxSizeMB", 1024)
+        self.audit_spool_eviction_policy = plugin_app_config_dict.get("auditSpoolEvictionPolicy", "drop_oldest")
 
         # Allow override from kwargs
         for key, value in kwargs.items():
@@ -766,7 +769,9 @@ class PAIGApplication:
         """
         if self.llm_stream_audit_logger is None:
             # Create an instance of StreamAuditLogger with shieldRestHttpClient as input
-            self.llm_stream_audit_logger = StreamAuditLogger(self.shield_client, self.audit_spool_dir)
+            self.llm_stream_audit_logger = StreamAuditLogger(self.shield_client, self.audit_spool_dir,
+                                                             int(self.audit_spool_max_size_mb) * 1024 * 1024,
+                                                             self.audit_spool_eviction_policy)
 
             # Start the StreamAuditLogger thread
             self.llm_stream_audit_logger.start()
@@ -791,9 +796,10 @@ class PAIGApplication:
         messages = audit_log_request.messages
         encrypted_messages = []
         for message in messages:
-            message["originalMessage"] = plugin_access_request_encryptor.encrypt_message(
+            # the messages hold the parts of the full replies, encrypted in bounded pieces without joining them
+            message["originalMessage"] = plugin_access_request_encryptor.encrypt_message_stream(
                 message["originalMessage"])
-            message["maskedMessage"] = plugin_access_request_encryptor.encrypt_message(
+            message["maskedMessage"] = plugin_access_request_encryptor.encrypt_message_stream(
                 message["maskedMessage"])
             encrypted_messages.append(message)
 
@@ -838,12 +844,29 @@ class LLMStreamAccessChecker:
         # Storing all the responses received from shield server
         self.shield_access_response_list = []
 
-        self.llm_original_full_reply = ""
-        self.llm_masked_full_reply = ""
+        # The sentences of the full original and masked replies, joined only when the audit record is created
+        self.llm_original_reply_parts = []
+        self.llm_masked_reply_parts = []
 
         if _logger.isEnabledFor(logging.DEBUG):
             _logger.debug(f"LLMStreamAccessChecker initialized")
 
+    @property
+    def llm_original_full_reply(self):
+        return "".join(self.llm_original_reply_parts)
+
+    @llm_original_full_reply.setter
+    def llm_original_full_reply(self, value):
+        self.llm_original_reply_parts = [value]
+
+    @property
+    def llm_masked_full_reply(self):
+        return "".join(self.llm_masked_reply_parts)
+
+    @llm_masked_full_reply.setter
+    def llm_masked_full_reply(self, value):
+        self.llm_masked_reply_parts = [value]
+
     def check_access_for_sentence(self, text):
         """
         Check access for a given sentence.
@@ -878,7 +901,7 @@ class LLMStreamAccessChecker:
         self.shield_access_response_list.append(access_result)
 
         # Keeping track of full original reply to create final audit record
-        self.llm_original_full_reply += text
+        self.llm_original_reply_parts.append(text)
 
         shield_response_text = access_result.get_response_messages()[0].get_response_text()
         if not access_result.get_is_allowed():
@@ -886,7 +909,7 @@ class LLMStreamAccessChecker:
             raise AccessControlException(shield_response_text)
         else:
             # Keeping track of full masked reply to create final audit record
-            self.llm_masked_full_reply += shield_response_text
+            self.llm_masked_reply_parts.append(shield_response_text)
 
         if _logger.isEnabledFor(logging.DEBUG):
             _logger.debug(f"LLMStreamAccessChecker::check_access shield response text={shield_response_text}")
@@ -1010,8 +1033,9 @@ class LLMStreamAccessChecker:
 
         messages = [
             {
-                "originalMessage": self.llm_original_full_reply,
-                "maskedMessage": self.llm_masked_full_reply,
+                # the reply parts are encrypted one after the other, the full replies are not joined as plaintext
+                "originalMessage": self.llm_original_reply_parts,
+                "maskedMessage": self.llm_masked_reply_parts,
                 "analyzerResult": json.dumps(analyzer_result_list)
             }
         ]
@@ -1061,22 +1085,40 @@ class StreamAuditLogger(AuditLogger):
     """
     A class to log audit data and push it to a server.
 
+    The batches of audits are pushed to the batch audit endpoint in one request. With a shield server which has no
+    batch audit endpoint, the audits are pushed one request per audit.
+
     Attributes:
         shield_rest_http_client (object): An object representing the REST HTTP client.
         audit_log_request_queue (Queue): A queue to store audit log data.
+        batch_endpoint_supported (bool): Whether the shield server has the batch audit endpoint.
     """
 
-    def __init__(self, shield_rest_http_client: ShieldRestHttpClient, audit_spool_dir: str):
+    def __init__(self, shield_rest_http_client: ShieldRestHttpClient, audit_spool_dir: str,
+                 audit_spool_max_size_bytes: int = 0, audit_spool_eviction_policy: str = "drop_oldest"):
         """
         Initializes the StreamAuditLogger.
 
         Args:
             shield_rest_http_client (object): An object representing the REST HTTP client.
             audit_spool_dir (str): Audit spool directory
+            audit_spool_max_size_bytes (int): Maximum size of the audit spool on disk, 0 means unlimited
+            audit_spool_eviction_policy (str): What to do when the audit spool is full, drop_oldest or reject_new
         """
-        super().__init__(audit_spool_dir=audit_spool_dir, audit_event_cls=StreamAccessAuditRequest)
+        super().__init__(audit_spool_dir=audit_spool_dir, audit_event_cls=StreamAccessAuditRequest,
+                         spool_max_size_bytes=audit_spool_max_size_bytes,
+                         spool_eviction_policy=audit_spool_eviction_policy)
 
         self.shield_rest_http_client = shield_rest_http_client
+        self.batch_endpoint_supported = True
+
+    def push_audit_events_to_server(self, audit_events: List[StreamAccessAuditRequest]):
+        if self.batch_endpoint_supported is True:
+            if self.shield_rest_http_client.log_stream_access_audits(audit_events):
+                return
+            _logger.info("Shield server has no batch audit endpoint, pushing the stream audits one by one")
+            self.batch_endpoint_supported = False
+        super().push_audit_events_to_server(audit_events)
 
     def push_audit_event_to_server(self, audit_event: StreamAccessAuditRequest):
         self.shield_rest_http_client.log_stream_access_audit(audit_event)
\ No newline at end of file
@@ -1,9 +1,17 @@
 import base64
+import codecs
+import hashlib
+import itertools
 import logging
+import os
+from collections import OrderedDict
+from threading import Lock
 
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 _logger = logging.getLogger(__name__)
 
@@ -72,6 +80,71 @@ class RSAKeyUtil:
             return None
 
 
+class RSAKeyHandleCache:
+    """
+    Process wide cache of the parsed RSA keys, so each public or private key is parsed once and its key object is shared
+    by all the DataEncryptor instances and threads using it. The key objects are immutable and safe to use from several
+    threads.
+
+    The keys are looked up by the SHA-256 fingerprint of their encoded string, the encoded strings are not kept. When
+    the cache is full the least recently used key is evicted. Keys which cannot be parsed are not cached.
+
+    Args:
+        capacity (int): The maximum number of parsed keys the cache can hold, 0 disables the cache.
+    """
+
+    DEFAULT_CAPACITY = 256
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(key_type: str, key_str: str) -> bytes:
+        return hashlib.sha256(f"{key_type}:{key_str}".encode("utf-8")).digest()
+
+    def get_public_key(self, public_key_str):
+        """Returns the parsed public key of the given encoded string, or None if it cannot be parsed."""
+        return self._get_key("public", public_key_str, RSAKeyUtil.str_to_public_key)
+
+    def get_private_key(self, private_key_str):
+        """Returns the parsed private key of the given encoded string, or None if it cannot be parsed."""
+        return self._get_key("private", private_key_str, RSAKeyUtil.str_to_private_key)
+
+    def _get_key(self, key_type, key_str, parse_key):
+        fingerprint = RSAKeyHandleCache.fingerprint(key_type, key_str)
+        with self.lock:
+            key = self.cache.get(fingerprint)
+            if key is not None:
+                self.cache.move_to_end(fingerprint)
+                self.hits += 1
+                return key
+            self.misses += 1
+
+        # parsed outside the lock, concurrent misses of the same key keep the first parsed key object
+        key = parse_key(key_str)
+        if key is None or self.capacity <= 0:
+            return key
+        with self.lock:
+            key = self.cache.setdefault(fingerprint, key)
+            self.cache.move_to_end(fingerprint)
+            while len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+        return key
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+rsa_key_handle_cache = RSAKeyHandleCache()
+
+
 class RSAKeyInfo:
     def __init__(self, private_key_encoded_str, public_key_encoded_str):
         self.private_key_encoded_str = private_key_encoded_str
@@ -82,49 +155,218 @@ class RSAKeyInfo:
 
 
 class DataEncryptor:
-
-    def __init__(self, public_key: str, private_key: str):
+    """
+    Encrypts data with an RSA public key and decrypts it with the RSA private key.
+
+    Two encryption modes are supported:
+    - legacy: the UTF-8 bytes are split into 100 byte chunks, each chunk is encrypted with RSA PKCS1v15 and the
+      base64 encoded chunks are concatenated.
+    - envelope: a random AES-256 data key encrypts the whole data with AES-GCM and is itself encrypted with RSA OAEP.
+      The result is "paig:v1:<wrapped data key>:<nonce>:<ciphertext>" with base64 encoded parts, so one RSA
+      operation is needed whatever the size of the data.
+    Decryption detects the format from the header, a legacy ciphertext being plain base64 text, so data encrypted in
+    either mode can always be decrypted.
+
+    encrypt_stream and decrypt_stream work on iterables of text or bytes and produce the output incrementally, so large
+    payloads are processed in bounded pieces rather than as several full size copies. Their output joined together is
+    the same as the output of encrypt and decrypt.
+    """
+
+    ENCRYPTION_MODE_LEGACY = "legacy"
+    ENCRYPTION_MODE_ENVELOPE = "envelope"
+    SUPPORTED_ENCRYPTION_MODES = (ENCRYPTION_MODE_LEGACY, ENCRYPTION_MODE_ENVELOPE)
+
+    ENVELOPE_VERSION = "v1"
+    ENVELOPE_HEADER = f"paig:{ENVELOPE_VERSION}:"
+    ENVELOPE_DATA_KEY_SIZE_BITS = 256
+    ENVELOPE_NONCE_SIZE = 12
+    ENVELOPE_KEY_WRAP_PADDING = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(),
+                                             label=None)
+    ENVELOPE_TAG_SIZE = 16
+
+    # the legacy mode encrypts 100 byte chunks, each encrypted chunk being 172 base64 characters with a 1024 bit key
+    LEGACY_CHUNK_SIZE = 100
+    LEGACY_ENCRYPTED_CHUNK_SIZE = 172
+    # the streams process the data in pieces of at most this many characters or bytes
+    STREAM_PIECE_SIZE = 64 * 1024
+
+    def __init__(self, public_key: str, private_key: str, encryption_mode: str = ENCRYPTION_MODE_LEGACY):
         _logger.debug("==> DataEncryptor()")
 
-        # Load public key
+        # Load public key, parsed once per process
         self.public_key = None
         if public_key is not None:
-            self.public_key = RSAKeyUtil.str_to_public_key(public_key)
+            self.public_key = rsa_key_handle_cache.get_public_key(public_key)
 
-        # Load private key
+        # Load private key, parsed once per process
         self.private_key = None
         if private_key is not None:
-            self.private_key = RSAKeyUtil.str_to_private_key(private_key)
+            self.private_key = rsa_key_handle_cache.get_private_key(private_key)
+
+        self.encryption_mode = DataEncryptor.validate_encryption_mode(encryption_mode)
 
         _logger.debug("<== DataEncryptor()")
 
-    def encrypt_data(self, data):
-        # first convert to byte array the entire data string using UTF-8 encoding
-        # then split into 1024 bit chunks and encrypt each chunk to base64 encoded string
-        # join all the base64 encoded strings and return the encrypted data as a string
-        data_bytes = data.encode("utf-8")
+    @staticmethod
+    def validate_encryption_mode(encryption_mode: str) -> str:
+        if encryption_mode not in DataEncryptor.SUPPORTED_ENCRYPTION_MODES:
+            raise ValueError(f"unsupported encryption mode {encryption_mode}, supported modes are "
+                             f"{DataEncryptor.SUPPORTED_ENCRYPTION_MODES}")
+        return encryption_mode
 
-        # since it is a 1024 bit key, we can encrypt upto 118 bytes at a time so
-        # we need to break the data into chunks of 100 bytes (safe side)
-        chunk_size = 100
-        chunks = [data_bytes[i:i + chunk_size] for i in range(0, len(data_bytes), chunk_size)]
+    @staticmethod
+    def is_envelope_encrypted(data: str) -> bool:
+        """Returns True if the given encrypted data is in the envelope format."""
+        return isinstance(data, str) and data.startswith(DataEncryptor.ENVELOPE_HEADER)
 
-        processed_data_parts = [self.encrypt_chunk(chunk) for chunk in chunks]
+    @staticmethod
+    def get_encryption_mode_of(data: str) -> str:
+        """Returns the encryption mode of the given encrypted data."""
+        if DataEncryptor.is_envelope_encrypted(data):
+            return DataEncryptor.ENCRYPTION_MODE_ENVELOPE
+        return DataEncryptor.ENCRYPTION_MODE_LEGACY
 
-        return ''.join(processed_data_parts)
+    @staticmethod
+    def iter_pieces(data):
+        """Yields the given text or bytes, or the items of the given iterable, in pieces of bounded size."""
+        if isinstance(data, (str, bytes, bytearray)):
+            data = (data,)
+        for part in data:
+            if not isinstance(part, (str, bytes, bytearray)):
+                raise TypeError(f"expected text or bytes parts, got {type(part).__name__}")
+            for start in range(0, len(part), DataEncryptor.STREAM_PIECE_SIZE):
+                yield part[start:start + DataEncryptor.STREAM_PIECE_SIZE]
 
-    def decrypt_data(self, data):
-        # split the encrypted data string which is base64 encoded into 172 bytes chunks which is 128 bytes of encrypted data
-        # decrypt each chunk and get the bytes and join all the bytes to get the original data
-        # finally encode the entire byte array to string using UTF-8 encoding
+    @staticmethod
+    def iter_bytes(data):
+        """Yields the UTF-8 bytes of the given text, bytes or iterable of texts and bytes in pieces of bounded size."""
+        for piece in DataEncryptor.iter_pieces(data):
+            yield piece.encode("utf-8") if isinstance(piece, str) else bytes(piece)
 
-        # the encrypted data will be 128 byte long which is 172 bytes base64 encoded
-        chunk_size = 172
-        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    def encrypt_data(self, data):
+        # the UTF-8 bytes of the data are split into 100 byte chunks, each chunk is encrypted to a base64 encoded string
+        # and all the base64 encoded strings are joined
+        return ''.join(self.encrypt_data_stream((data.encode("utf-8"),)))
 
-        processed_data_parts_bytes = [self.decrypt_chunk(chunk) for chunk in chunks]
+    def encrypt_data_stream(self, data):
+        """Encrypts the data in the legacy mode, yielding the encrypted chunks as soon as their bytes are available."""
+        # since it is a 1024 bit key, we can encrypt upto 118 bytes at a time so
+        # we need to break the data into chunks of 100 bytes (safe side)
+        chunk_size = DataEncryptor.LEGACY_CHUNK_SIZE
+        pending_bytes = b""
+        for data_bytes in DataEncryptor.iter_bytes(data):
+            pending_bytes += data_bytes
+            complete_size = len(pending_bytes) - len(pending_bytes) % chunk_size
+            if complete_size:
+                yield ''.join(self.encrypt_chunk(pending_bytes[i:i + chunk_size])
+                              for i in range(0, complete_size, chunk_size))
+                pending_bytes = pending_bytes[complete_size:]
+        if pending_bytes:
+            yield self.encrypt_chunk(pending_bytes)
 
-        return (b''.join(processed_data_parts_bytes)).decode("utf-8")
+    def decrypt_data(self, data):
+        # the base64 encoded data is split into 172 characters chunks which are 128 bytes of encrypted data, each chunk
+        # is decrypted and the decrypted bytes are decoded together using UTF-8 encoding
+        return ''.join(self.decrypt_data_stream((data,)))
+
+    def decrypt_data_stream(self, data):
+        """Decrypts legacy encrypted data, yielding the decrypted text as soon as its chunks are available."""
+        chunk_size = DataEncryptor.LEGACY_ENCRYPTED_CHUNK_SIZE
+        # a character can be split across chunks, the decoder keeps its first bytes until the rest is decrypted
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending_text = ""
+        for text in DataEncryptor.iter_pieces(data):
+            pending_text += text
+            complete_size = len(pending_text) - len(pending_text) % chunk_size
+            if complete_size:
+                decrypted_text = decoder.decode(b''.join(self.decrypt_chunk(pending_text[i:i + chunk_size])
+                                                         for i in range(0, complete_size, chunk_size)))
+                pending_text = pending_text[complete_size:]
+                if decrypted_text:
+                    yield decrypted_text
+        decrypted_text = decoder.decode(self.decrypt_chunk(pending_text) if pending_text else b"", final=True)
+        if decrypted_text:
+            yield decrypted_text
+
+    def encrypt_envelope(self, data):
+        """Encrypts the data with a new AES-GCM data key wrapped with the public key."""
+        return ''.join(self.encrypt_envelope_stream((data.encode("utf-8"),)))
+
+    def encrypt_envelope_stream(self, data):
+        """
+        Encrypts the data with a new AES-GCM data key wrapped with the public key, yielding the header first and then
+        the base64 encoded ciphertext as soon as it is available.
+        """
+        data_key = AESGCM.generate_key(bit_length=DataEncryptor.ENVELOPE_DATA_KEY_SIZE_BITS)
+        nonce = os.urandom(DataEncryptor.ENVELOPE_NONCE_SIZE)
+        encryptor = Cipher(algorithms.AES(data_key), modes.GCM(nonce)).encryptor()
+        encryptor.authenticate_additional_data(DataEncryptor.ENVELOPE_HEADER.encode("utf-8"))
+        wrapped_data_key = self.public_key.encrypt(data_key, DataEncryptor.ENVELOPE_KEY_WRAP_PADDING)
+        yield (DataEncryptor.ENVELOPE_HEADER + base64.b64encode(wrapped_data_key).decode("utf-8") + ":" +
+               base64.b64encode(nonce).decode("utf-8") + ":")
+
+        # base64 encodes 3 bytes groups, the bytes of an incomplete group wait for the next ciphertext
+        pending_bytes = b""
+        for data_bytes in DataEncryptor.iter_bytes(data):
+            pending_bytes += encryptor.update(data_bytes)
+            complete_size = len(pending_bytes) - len(pending_bytes) % 3
+            if complete_size:
+                yield base64.b64encode(pending_bytes[:complete_size]).decode("utf-8")
+                pending_bytes = pending_bytes[complete_size:]
+        yield base64.b64encode(pending_bytes + encryptor.finalize() + encryptor.tag).decode("utf-8")
+
+    def decrypt_envelope_stream(self, data):
+        """
+        Decrypts envelope encrypted data, yielding the decrypted text as soon as its ciphertext is available.
+
+        The authentication tag is at the end of the ciphertext, so the yielded text is verified only once the whole
+        ciphertext is read: InvalidTag is raised at the end of the iteration if the data was tampered with, and the
+        callers must then discard the text already received. Use decrypt to get verified text only.
+        """
+        pieces = iter(DataEncryptor.iter_pieces(data))
+        header_text = ""
+        for text in pieces:
+            header_text += text
+            if header_text.count(":", len(DataEncryptor.ENVELOPE_HEADER)) >= 2:
+                break
+        parts = header_text[len(DataEncryptor.ENVELOPE_HEADER):].split(":", 2)
+        if len(parts) != 3:
+            raise ValueError("invalid envelope encrypted data")
+        wrapped_data_key, nonce = (base64.b64decode(part) for part in parts[:2])
+        data_key = self.private_key.decrypt(wrapped_data_key, DataEncryptor.ENVELOPE_KEY_WRAP_PADDING)
+        decryptor = Cipher(algorithms.AES(data_key), modes.GCM(nonce)).decryptor()
+        decryptor.authenticate_additional_data(DataEncryptor.ENVELOPE_HEADER.encode("utf-8"))
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        # base64 decodes 4 characters groups, and the last bytes of the ciphertext are held back as they may be the tag
+        pending_text = parts[2]
+        pending_bytes = b""
+        for text in itertools.chain((None,), pieces):
+            if text is not None:
+                pending_text += text
+            complete_size = len(pending_text) - len(pending_text) % 4
+            pending_bytes += base64.b64decode(pending_text[:complete_size])
+            pending_text = pending_text[complete_size:]
+            if len(pending_bytes) > DataEncryptor.ENVELOPE_TAG_SIZE:
+                decrypted_text = decoder.decode(decryptor.update(pending_bytes[:-DataEncryptor.ENVELOPE_TAG_SIZE]))
+                pending_bytes = pending_bytes[-DataEncryptor.ENVELOPE_TAG_SIZE:]
+                if decrypted_text:
+                    yield decrypted_text
+        if pending_text or len(pending_bytes) != DataEncryptor.ENVELOPE_TAG_SIZE:
+            raise ValueError("invalid envelope encrypted data")
+        decrypted_text = decoder.decode(decryptor.finalize_with_tag(pending_bytes), final=True)
+        if decrypted_text:
+            yield decrypted_text
+
+    def decrypt_envelope(self, data):
+        """Decrypts envelope encrypted data, unwrapping its data key with the private key."""
+        parts = data[len(DataEncryptor.ENVELOPE_HEADER):].split(":")
+        if len(parts) != 3:
+            raise ValueError("invalid envelope encrypted data")
+        wrapped_data_key, nonce, ciphertext = (base64.b64decode(part) for part in parts)
+        data_key = self.private_key.decrypt(wrapped_data_key, DataEncryptor.ENVELOPE_KEY_WRAP_PADDING)
+        header = DataEncryptor.ENVELOPE_HEADER.encode("utf-8")
+        return AESGCM(data_key).decrypt(nonce, ciphertext, header).decode("utf-8")
 
     def encrypt_chunk(self, chunk: bytes) -> str:
         """Encrypts a chunk of data bytes and returns the base64 encoded encrypted data."""
@@ -143,16 +385,59 @@ class DataEncryptor:
         )
         return decrypted_data_bytes
 
-    def encrypt(self, data):
+    def encrypt(self, data, encryption_mode: str = None):
+        """
+        Encrypts the data in the given encryption mode, or in the encryption mode of this encryptor if not given.
+        """
         if self.public_key is None:
             raise ValueError("public key is not set")
+        encryption_mode = DataEncryptor.validate_encryption_mode(encryption_mode or self.encryption_mode)
+        if encryption_mode == DataEncryptor.ENCRYPTION_MODE_ENVELOPE:
+            return self.encrypt_envelope(data)
         return self.encrypt_data(data)
 
     def decrypt(self, data):
+        """
+        Decrypts data encrypted in any of the supported encryption modes.
+        """
         if self.private_key is None:
             raise ValueError("private key is not set")
+        if DataEncryptor.is_envelope_encrypted(data):
+            return self.decrypt_envelope(data)
         return self.decrypt_data(data)
 
+    def encrypt_stream(self, data, encryption_mode: str = None):
+        """
+        Encrypts the given text, bytes or iterable of texts and bytes in the given encryption mode, or in the encryption
+        mode of this encryptor if not given, yielding the encrypted text incrementally. The joined output is the same
+        as the output of encrypt for the joined data.
+        """
+        if self.public_key is None:
+            raise ValueError("public key is not set")
+        encryption_mode = DataEncryptor.validate_encryption_mode(encryption_mode or self.encryption_mode)
+        if encryption_mode == DataEncryptor.ENCRYPTION_MODE_ENVELOPE:
+            return self.encrypt_envelope_stream(data)
+        return self.encrypt_data_stream(data)
+
+    def decrypt_stream(self, data):
+        """
+        Decrypts the given encrypted text or iterable of encrypted texts, encrypted in any of the supported encryption
+        modes, yielding the decrypted text incrementally. See decrypt_envelope_stream for the verification of envelope
+        encrypted data.
+        """
+        if self.private_key is None:
+            raise ValueError("private key is not set")
+        pieces = iter(DataEncryptor.iter_pieces(data))
+        # enough of the data is read to tell the encryption mode from the header
+        head_text = ""
+        for text in pieces:
+            head_text += text
+            if len(head_text) >= len(DataEncryptor.ENVELOPE_HEADER):
+                break
+        if DataEncryptor.is_envelope_encrypted(head_text):
+            return self.decrypt_envelope_stream(itertools.chain((head_text,), pieces))
+        return self.decrypt_data_stream(itertools.chain((head_text,), pieces))
+
 
 class EncryptionKeyInfo:
     def __init__(self, response_dict):
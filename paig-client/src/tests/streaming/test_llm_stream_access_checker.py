@@ -196,8 +196,8 @@ def test_create_stream_access_audit_request_masked():
     assert request.traits == ["trait1", "trait3", "trait5"]
     assert request.masked_traits == {"trait2": "masked_trait", "trait4": "masked_trait", "trait6": "masked_trait"}
     assert request.messages == [{
-        "originalMessage": "original_full_reply",
-        "maskedMessage": "masked_full_reply",
+        "originalMessage": ["original_full_reply"],
+        "maskedMessage": ["masked_full_reply"],
         "analyzerResult": '["result1", "result2", "result3"]'
     }]
     assert request.ranger_audit_ids == ["ranger_audit_id1", "ranger_audit_id2", "ranger_audit_id3"]
@@ -254,8 +254,8 @@ def test_create_stream_access_audit_request_denied():
     assert request.traits == ["trait1", "trait3", "trait5"]
     assert request.masked_traits == {"trait2": "masked_trait", "trait4": "masked_trait", "trait6": "masked_trait"}
     assert request.messages == [{
-        "originalMessage": "original_full_reply",
-        "maskedMessage": "masked_full_reply",
+        "originalMessage": ["original_full_reply"],
+        "maskedMessage": ["masked_full_reply"],
         "analyzerResult": '["result1", "result2", "result3"]'
     }]
     assert request.ranger_audit_ids == ["ranger_audit_id1", "ranger_audit_id2", "ranger_audit_id3"]
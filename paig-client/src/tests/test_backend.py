@@ -56,3 +56,55 @@ def test_post3(setup_paig_plugin_with_app_config_file_name):
         thread.start()
     for thread in thread_list:
         thread.join()
+
+
+@pytest.mark.parametrize("encryption_modes_header, expected_encryption_mode", [
+    ("legacy,envelope", "envelope"),
+    ("legacy", "legacy"),
+    (None, "legacy"),
+])
+def test_init_shield_server_negotiates_encryption_mode(setup_paig_plugin_with_app_config_file_name, mocker,
+                                                      encryption_modes_header, expected_encryption_mode):
+    app_config_file, encryption_keys_info = load_app_config_file(setup_paig_plugin_with_app_config_file_name)
+    client = ShieldRestHttpClient(base_url=SHIELD_SERVER_URL, tenant_id=app_config_file['tenantId'],
+                                  api_key=app_config_file['apiKey'],
+                                  encryption_keys_info=encryption_keys_info)
+    mock_response = mocker.MagicMock(status=200)
+    mock_response.headers = {"x-paig-encryption-modes": encryption_modes_header} if encryption_modes_header else {}
+    mocker.patch("paig_client.backend.HttpTransport.get_http").return_value.request.return_value = mock_response
+
+    client.init_shield_server("application_key")
+
+    shield_data_encryptor = client.get_plugin_access_request_encryptor().shield_data_encryptor
+    assert shield_data_encryptor.encryption_mode == expected_encryption_mode
+    encrypted_message = client.get_plugin_access_request_encryptor().encrypt_message("hello")
+    assert encrypted_message.startswith("paig:v1:") == (expected_encryption_mode == "envelope")
+
+
+@pytest.mark.parametrize("response_status, expected_result", [(200, True), (404, False)])
+def test_log_stream_access_audits_posts_batch(setup_paig_plugin_with_app_config_file_name, mocker, response_status,
+                                              expected_result):
+    app_config_file, encryption_keys_info = load_app_config_file(setup_paig_plugin_with_app_config_file_name)
+    client = ShieldRestHttpClient(base_url=SHIELD_SERVER_URL, tenant_id=app_config_file['tenantId'],
+                                  api_key=app_config_file['apiKey'],
+                                  encryption_keys_info=encryption_keys_info)
+    mock_request = mocker.patch("paig_client.backend.HttpTransport.get_http").return_value.request
+    mock_request.return_value = mocker.MagicMock(status=response_status)
+    audit_requests = [mocker.MagicMock(**{"to_payload_dict.return_value": {"requestId": str(i)}}) for i in range(2)]
+
+    assert client.log_stream_access_audits(audit_requests) is expected_result
+
+    assert mock_request.call_args.kwargs["url"] == SHIELD_SERVER_URL + "/shield/audit/batch"
+    assert mock_request.call_args.kwargs["json"] == [{"requestId": "0"}, {"requestId": "1"}]
+
+
+def test_log_stream_access_audits_raises_on_error(setup_paig_plugin_with_app_config_file_name, mocker):
+    app_config_file, encryption_keys_info = load_app_config_file(setup_paig_plugin_with_app_config_file_name)
+    client = ShieldRestHttpClient(base_url=SHIELD_SERVER_URL, tenant_id=app_config_file['tenantId'],
+                                  api_key=app_config_file['apiKey'],
+                                  encryption_keys_info=encryption_keys_info)
+    mocker.patch("paig_client.backend.HttpTransport.get_http").return_value.request.return_value = \
+        mocker.MagicMock(status=500)
+
+    with pytest.raises(Exception, match="status code 500"):
+        client.log_stream_access_audits([mocker.MagicMock()])
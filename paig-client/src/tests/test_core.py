@@ -128,3 +128,31 @@ def test_get_plugin_app_config_without_api_key(mock_fetch_config):
         result = PAIGApplication.get_plugin_app_config({})
         assert result == {"defaultConfig": "defaultValue"}
         mock_fetch_config.assert_called_with(None, {})
+
+
+def test_stream_audit_logger_pushes_batch_in_one_request(tmp_path):
+    from paig_client.core import StreamAuditLogger
+    shield_client = MagicMock()
+    shield_client.log_stream_access_audits.return_value = True
+    audit_logger = StreamAuditLogger(shield_client, str(tmp_path))
+    audit_events = [MagicMock(), MagicMock()]
+
+    audit_logger.push_audit_events_to_server(audit_events)
+
+    shield_client.log_stream_access_audits.assert_called_once_with(audit_events)
+    shield_client.log_stream_access_audit.assert_not_called()
+
+
+def test_stream_audit_logger_pushes_one_by_one_without_batch_endpoint(tmp_path):
+    from paig_client.core import StreamAuditLogger
+    shield_client = MagicMock()
+    shield_client.log_stream_access_audits.return_value = False
+    audit_logger = StreamAuditLogger(shield_client, str(tmp_path))
+    audit_events = [MagicMock(), MagicMock()]
+
+    audit_logger.push_audit_events_to_server(audit_events)
+    audit_logger.push_audit_events_to_server(audit_events)
+
+    # the batch endpoint is not tried again
+    shield_client.log_stream_access_audits.assert_called_once_with(audit_events)
+    assert shield_client.log_stream_access_audit.call_count == 4
@@ -43,3 +43,65 @@ def test_data_encryptor_non_ascii(setup_curr_dir):
     decrypted_data = data_encryptor.decrypt(encrypted_data)
 
     assert decrypted_data == original_data
+
+
+def test_data_encryptor_envelope_mode_reads_legacy_data():
+    rsa_key_info = paig_client.encryption.RSAKeyUtil.generate_key_pair()
+    DataEncryptor = paig_client.encryption.DataEncryptor
+    legacy_data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                          private_key=rsa_key_info.private_key_encoded_str)
+    envelope_data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                            private_key=rsa_key_info.private_key_encoded_str,
+                                            encryption_mode=DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+    original_data = "prompt “with” non-ascii characters " * 1000
+
+    envelope_encrypted_data = envelope_data_encryptor.encrypt(original_data)
+    assert envelope_encrypted_data.startswith(DataEncryptor.ENVELOPE_HEADER)
+    assert legacy_data_encryptor.decrypt(envelope_encrypted_data) == original_data
+    assert envelope_data_encryptor.decrypt(legacy_data_encryptor.encrypt(original_data)) == original_data
+
+
+def test_data_encryptors_share_parsed_keys():
+    rsa_key_info = paig_client.encryption.RSAKeyUtil.generate_key_pair()
+    DataEncryptor = paig_client.encryption.DataEncryptor
+    first_data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                         private_key=rsa_key_info.private_key_encoded_str)
+    second_data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                          private_key=rsa_key_info.private_key_encoded_str)
+
+    assert first_data_encryptor.public_key is second_data_encryptor.public_key
+    assert first_data_encryptor.private_key is second_data_encryptor.private_key
+    assert second_data_encryptor.decrypt(first_data_encryptor.encrypt("hello")) == "hello"
+
+
+def test_data_encryptor_streams():
+    rsa_key_info = paig_client.encryption.RSAKeyUtil.generate_key_pair()
+    DataEncryptor = paig_client.encryption.DataEncryptor
+    data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                   private_key=rsa_key_info.private_key_encoded_str)
+    reply_parts = ["First “sentence”. ", "Second sentence. " * 100]
+
+    for encryption_mode in DataEncryptor.SUPPORTED_ENCRYPTION_MODES:
+        encrypted_reply = "".join(data_encryptor.encrypt_stream(reply_parts, encryption_mode))
+        assert data_encryptor.decrypt(encrypted_reply) == "".join(reply_parts)
+        assert "".join(data_encryptor.decrypt_stream(iter(encrypted_reply))) == "".join(reply_parts)
+
+
+def test_plugin_access_request_encryptor_encrypts_message_parts():
+    from paig_client.PluginAccessRequestEncryptor import PluginAccessRequestEncryptor
+
+    shield_server_key = paig_client.encryption.RSAKeyUtil.generate_key_pair()
+    plugin_key = paig_client.encryption.RSAKeyUtil.generate_key_pair()
+    encryptor = PluginAccessRequestEncryptor("tenant_id", {
+        "shield_server_public_key": shield_server_key.public_key_encoded_str,
+        "shield_plugin_private_key": plugin_key.private_key_encoded_str,
+        "shield_server_key_id": 1,
+        "shield_plugin_key_id": 2
+    })
+    shield_server_data_encryptor = paig_client.encryption.DataEncryptor(
+        public_key=None, private_key=shield_server_key.private_key_encoded_str)
+    reply_parts = ["First sentence. ", "Second sentence. " * 100]
+
+    encrypted_reply = encryptor.encrypt_message_stream(reply_parts)
+
+    assert shield_server_data_encryptor.decrypt(encrypted_reply) == "".join(reply_parts)
@@ -133,6 +133,7 @@ class AsyncReturnValue:
     def __init__(self, response: httpx.Response):
         self.status_code = response.status_code
         self.text = response.text
+        self.headers = response.headers
 
     def json(self):
         return json.loads(self.text)
@@ -1,17 +1,22 @@
 import abc
+import gzip
 import json
 import logging
 import os
 import queue
+import random
+import re
 import threading
 import time
+import zlib
 from abc import ABC, abstractmethod
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from queue import Queue
 from typing import List, TypeVar
 
 from .file_utils import FileUtils
-from .paig_exception import AuditEventQueueFullException, DiskFullException
+from .paig_exception import DiskFullException
 
 _logger = logging.getLogger(__name__)
 T = TypeVar('T')
@@ -54,28 +59,385 @@ class AuditEvent(ABC):
         pass
 
 
+class SpoolSegment:
+    """
+    The state of a spool segment file.
+
+    Attributes:
+        event_count (int): The number of events in the segment, final only when is_complete is set.
+        is_complete (bool): Whether event_count is final. Segments found on disk are complete once fully read.
+        acked_offset (int): All the events before this offset are acknowledged.
+        acked_offsets_ahead (set): The acknowledged offsets after acked_offset, acknowledged out of order.
+        replay_offset (int): The offset from which the events of the segment are replayed.
+        file_size (int): The size of the segment file in bytes.
+        is_compressed (bool): Whether the segment file is compressed.
+    """
+
+    __slots__ = ("event_count", "is_complete", "acked_offset", "acked_offsets_ahead", "replay_offset", "file_size",
+                 "is_compressed")
+
+    def __init__(self, event_count=0, is_complete=True, acked_offset=0, file_size=0, is_compressed=False):
+        self.event_count = event_count
+        self.is_complete = is_complete
+        self.acked_offset = acked_offset
+        self.acked_offsets_ahead = set()
+        self.replay_offset = acked_offset
+        self.file_size = file_size
+        self.is_compressed = is_compressed
+
+    def acknowledge(self, offset):
+        if offset == self.acked_offset:
+            self.acked_offset += 1
+            while self.acked_offset in self.acked_offsets_ahead:
+                self.acked_offsets_ahead.remove(self.acked_offset)
+                self.acked_offset += 1
+        elif offset > self.acked_offset:
+            self.acked_offsets_ahead.add(offset)
+
+    def is_acknowledged(self):
+        return self.is_complete and self.acked_offset >= self.event_count
+
+    def get_unacknowledged_event_count(self):
+        """
+        Returns the number of events which are not acknowledged, or None if the event count is not known yet.
+        """
+        if not self.is_complete:
+            return None
+        return max(0, self.event_count - self.acked_offset - len(self.acked_offsets_ahead))
+
+
 class AuditSpooler:
     """
     Class to manage spooled audit events.
 
+    The spool is a write-ahead log: the events are appended as JSON lines to numbered segment files, each holding at
+    most segment_max_events events, and a segment file is deleted once all its events are acknowledged. The consumer
+    checkpoint, the segment and offset before which all the events are acknowledged, is persisted every
+    checkpoint_interval_events acknowledgements and whenever a segment is deleted, so the events are replayed from the
+    checkpoint after a restart. Adding and acknowledging an event cost constant time and replaying streams the segments,
+    so a large backlog is drained in linear time and constant memory. Events acknowledged after the last persisted
+    checkpoint may be replayed again after a crash.
+
+    The position of an event in the spool is kept on the event object, so the event given to remove_audit_event
+    must be the object given to add_audit_event or returned by the replay.
+    Daily spool files written by older versions are moved into segments when the spooled events are read.
+
+    Once a segment is full, and for the segments left by a previous run, the segment file is compressed in the
+    background into gzip frames of compression_frame_size uncompressed bytes each, so that a replay decompresses one
+    frame at a time. The total size of the segment files is capped at max_size_bytes: with the drop_oldest eviction
+    policy the oldest segments are dropped, losing their events, to make room for new events, with the reject_new
+    policy new events are rejected with a DiskFullException until events are acknowledged.
+
     Args:
         audit_spool_dir (str): The directory path where spooled audit events are stored.
     """
 
-    def __init__(self, audit_spool_dir: str, audit_event_cls):
+    SEGMENT_FILE_PREFIX = "audit_spool_segment_"
+    SEGMENT_FILE_SUFFIX = ".jsonl"
+    COMPRESSED_SEGMENT_FILE_SUFFIX = ".jsonl.gz"
+    SEGMENT_FILE_PATTERN = re.compile(r"^audit_spool_segment_(\d+)\.jsonl(\.gz)?$")
+    LEGACY_FILE_PATTERN = re.compile(r"^audit_spool_\d{4}-\d{2}-\d{2}\.json$")
+    CHECKPOINT_FILE_NAME = "audit_spool_checkpoint.json"
+    SPOOL_POSITION_ATTRIBUTE = "_audit_spool_position"
+    EVICTION_POLICY_DROP_OLDEST = "drop_oldest"
+    EVICTION_POLICY_REJECT_NEW = "reject_new"
+
+    def __init__(self, audit_spool_dir: str, audit_event_cls, segment_max_events=10000,
+                 checkpoint_interval_events=1000, max_size_bytes=0, eviction_policy=EVICTION_POLICY_DROP_OLDEST,
+                 compress_segments=True, compression_frame_size=65536):
         """
         Initializes an AuditSpooler object.
 
         Args:
             audit_spool_dir (str): The directory path where spooled audit events are stored.
+            audit_event_cls (cls): Class of audit event.
+            segment_max_events (int): The maximum number of events in a segment file.
+            checkpoint_interval_events (int): The number of acknowledgements after which the checkpoint is persisted.
+            max_size_bytes (int): The maximum total size of the segment files, 0 means unlimited.
+            eviction_policy (str): What to do when the spool is full, drop_oldest or reject_new.
+            compress_segments (bool): Whether the full segment files are compressed.
+            compression_frame_size (int): The number of uncompressed bytes in a compressed frame.
         """
+        if eviction_policy not in (AuditSpooler.EVICTION_POLICY_DROP_OLDEST, AuditSpooler.EVICTION_POLICY_REJECT_NEW):
+            raise ValueError(f"Invalid audit spool eviction policy: {eviction_policy}")
         self.audit_spool_dir = audit_spool_dir
         self.audit_event_cls = audit_event_cls
+        self.segment_max_events = segment_max_events
+        self.checkpoint_interval_events = checkpoint_interval_events
+        self.max_size_bytes = max_size_bytes
+        self.eviction_policy = eviction_policy
+        self.compression_frame_size = compression_frame_size
+        self.compression_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-spool-compressor") \
+            if compress_segments else None
 
         if not os.path.exists(self.audit_spool_dir):
             os.makedirs(self.audit_spool_dir)
 
         self.lock = threading.Lock()
+        self.segments = {}
+        self.current_segment_id = None
+        self.acks_since_checkpoint = 0
+        self.spool_size = 0
+        self.evicted_event_count = 0
+        self.recover_segments()
+        for segment_id in list(self.segments):
+            self.schedule_compression(segment_id)
+
+    def recover_segments(self):
+        """
+        Registers the segment files left by a previous run, which are replayed from the persisted checkpoint.
+        """
+        checkpoint = self.read_checkpoint()
+        segment_ids = self.get_segment_ids()
+        for segment_id in segment_ids:
+            if segment_id < checkpoint["segment_id"]:
+                # fully acknowledged before the checkpoint was persisted
+                self.delete_segment_file(segment_id)
+                continue
+            acked_offset = checkpoint["offset"] if segment_id == checkpoint["segment_id"] else 0
+            is_compressed = os.path.exists(self.get_compressed_segment_file_path(segment_id))
+            if is_compressed:
+                # the compression was interrupted after the compressed file was complete
+                self.delete_file(self.get_segment_file_path(segment_id))
+                file_size = os.path.getsize(self.get_compressed_segment_file_path(segment_id))
+            else:
+                file_size = os.path.getsize(self.get_segment_file_path(segment_id))
+            self.segments[segment_id] = SpoolSegment(is_complete=False, acked_offset=acked_offset,
+                                                     file_size=file_size, is_compressed=is_compressed)
+            self.spool_size += file_size
+        self.next_segment_id = max(segment_ids + [checkpoint["segment_id"]]) + 1
+
+    def get_segment_ids(self):
+        segment_ids = set()
+        for file_name in os.listdir(self.audit_spool_dir):
+            match = AuditSpooler.SEGMENT_FILE_PATTERN.match(file_name)
+            if match:
+                segment_ids.add(int(match.group(1)))
+            elif file_name.endswith(AuditSpooler.COMPRESSED_SEGMENT_FILE_SUFFIX + '.temp'):
+                # left by an interrupted compression
+                self.delete_file(os.path.join(self.audit_spool_dir, file_name))
+        return sorted(segment_ids)
+
+    def get_segment_file_path(self, segment_id) -> str:
+        return os.path.join(self.audit_spool_dir,
+                            f"{AuditSpooler.SEGMENT_FILE_PREFIX}{segment_id:010d}{AuditSpooler.SEGMENT_FILE_SUFFIX}")
+
+    def get_compressed_segment_file_path(self, segment_id) -> str:
+        return os.path.join(self.audit_spool_dir, f"{AuditSpooler.SEGMENT_FILE_PREFIX}{segment_id:010d}"
+                                                  f"{AuditSpooler.COMPRESSED_SEGMENT_FILE_SUFFIX}")
+
+    def open_segment_file(self, segment_id):
+        """
+        Opens the segment file for reading, compressed or not. The segment may be compressed while it is opened, so
+        the compressed file is tried again when the uncompressed one is gone.
+        """
+        compressed_file_path = self.get_compressed_segment_file_path(segment_id)
+        try:
+            return gzip.open(compressed_file_path, 'rt')
+        except FileNotFoundError:
+            pass
+        try:
+            return open(self.get_segment_file_path(segment_id), 'r')
+        except FileNotFoundError:
+            return gzip.open(compressed_file_path, 'rt')
+
+    def schedule_compression(self, segment_id):
+        if self.compression_executor is not None:
+            self.compression_executor.submit(self.compress_segment, segment_id)
+
+    def compress_segment(self, segment_id):
+        """
+        Compresses the segment file into gzip frames, each holding compression_frame_size uncompressed bytes. The
+        frames are gzip members, so the compressed file reads as a single gzip stream.
+        """
+        with self.lock:
+            segment = self.segments.get(segment_id)
+            if segment is None or segment.is_compressed or segment_id == self.current_segment_id:
+                return
+        file_path = self.get_segment_file_path(segment_id)
+        compressed_file_path = self.get_compressed_segment_file_path(segment_id)
+        temp_file_path = compressed_file_path + '.temp'
+        try:
+            with open(file_path, 'rb') as read_file, open(temp_file_path, 'wb') as write_file:
+                while True:
+                    frame = read_file.read(self.compression_frame_size)
+                    if not frame:
+                        break
+                    write_file.write(gzip.compress(frame, mtime=0))
+            compressed_file_size = os.path.getsize(temp_file_path)
+            with self.lock:
+                segment = self.segments.get(segment_id)
+                if segment is None:
+                    # acknowledged or evicted meanwhile
+                    self.delete_file(temp_file_path)
+                    return
+                os.replace(temp_file_path, compressed_file_path)
+                self.delete_file(file_path)
+                self.spool_size += compressed_file_size - segment.file_size
+                segment.file_size = compressed_file_size
+                segment.is_compressed = True
+        except FileNotFoundError:
+            self.delete_file(temp_file_path)
+        except Exception as e:
+            _logger.warning(f"Unable to compress audit spool segment {segment_id}, it is kept uncompressed: {e}")
+            self.delete_file(temp_file_path)
+
+    def get_checkpoint_file_path(self) -> str:
+        return os.path.join(self.audit_spool_dir, AuditSpooler.CHECKPOINT_FILE_NAME)
+
+    def read_checkpoint(self):
+        try:
+            with open(self.get_checkpoint_file_path(), 'r') as f:
+                checkpoint = json.load(f)
+            return {"segment_id": int(checkpoint["segment_id"]), "offset": int(checkpoint["offset"])}
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            _logger.warning(f"Ignoring invalid audit spool checkpoint, replaying all the segments: {e}")
+        return {"segment_id": 0, "offset": 0}
+
+    def save_checkpoint(self):
+        """
+        Persists the consumer checkpoint, or removes it when no segment is left. Called with the lock held.
+        """
+        self.acks_since_checkpoint = 0
+        checkpoint_file_path = self.get_checkpoint_file_path()
+        if not self.segments:
+            if os.path.exists(checkpoint_file_path):
+                os.remove(checkpoint_file_path)
+            return
+        segment_id = min(self.segments)
+        temp_file_path = checkpoint_file_path + '.temp'
+        with open(temp_file_path, 'w') as f:
+            json.dump({"segment_id": segment_id, "offset": self.segments[segment_id].acked_offset}, f)
+        os.replace(temp_file_path, checkpoint_file_path)
+
+    @staticmethod
+    def delete_file(file_path):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    def delete_segment_file(self, segment_id):
+        self.delete_file(self.get_segment_file_path(segment_id))
+        self.delete_file(self.get_compressed_segment_file_path(segment_id))
+
+    def migrate_legacy_spool_files(self):
+        """
+        Moves the daily spool files written by older versions into segments, which have the same JSON lines format.
+        """
+        legacy_file_names = sorted(file_name for file_name in os.listdir(self.audit_spool_dir)
+                                   if AuditSpooler.LEGACY_FILE_PATTERN.match(file_name))
+        for file_name in legacy_file_names:
+            with self.lock:
+                # the current segment is closed, so the migrated events are not mixed with new events
+                sealed_segment_id = self.current_segment_id
+                self.current_segment_id = None
+                segment_id = self.next_segment_id
+                self.next_segment_id += 1
+                os.replace(os.path.join(self.audit_spool_dir, file_name), self.get_segment_file_path(segment_id))
+                file_size = os.path.getsize(self.get_segment_file_path(segment_id))
+                self.segments[segment_id] = SpoolSegment(is_complete=False, file_size=file_size)
+                self.spool_size += file_size
+            _logger.info(f"Moved audit spool file {file_name} to segment {segment_id}")
+            if sealed_segment_id is not None:
+                self.schedule_compression(sealed_segment_id)
+            self.schedule_compression(segment_id)
+
+    def iter_spooled_audit_events(self, start_position=None, end_position=None):
+        """
+        Returns an iterator over the spooled audit events which are not acknowledged. The segments are read one line
+        at a time while iterating.
+
+        Args:
+            start_position (tuple): The (segment id, offset) position of the first event to read, all the spooled events
+                including the daily spool files of older versions are read when not given.
+            end_position (tuple): The position before which the events are read, as returned by get_end_position, the
+                current end of the spool when not given.
+
+        Returns:
+            Iterator[AuditEvent]: The spooled audit events, in the order they were spooled.
+        """
+        if start_position is None:
+            self.migrate_legacy_spool_files()
+        with self.lock:
+            if end_position is None:
+                end_position = self.get_end_position_locked()
+            segments_to_read = []
+            for segment_id, segment in sorted(self.segments.items()):
+                if start_position is not None and segment_id < start_position[0]:
+                    continue
+                if (segment_id, 0) >= end_position:
+                    break
+                start_offset = start_position[1] if start_position is not None and \
+                    segment_id == start_position[0] else 0
+                event_count = segment.event_count if segment.is_complete else None
+                if segment_id == end_position[0]:
+                    event_count = end_position[1]
+                segments_to_read.append((segment_id, start_offset, event_count))
+        return self.read_spooled_segments(segments_to_read)
+
+    def read_spooled_segments(self, segments_to_read):
+        for segment_id, start_offset, event_count in segments_to_read:
+            with self.lock:
+                segment = self.segments.get(segment_id)
+            if segment is None:
+                continue
+            offset = 0
+            try:
+                with self.open_segment_file(segment_id) as f:
+                    for line in f:
+                        if event_count is not None and offset >= event_count:
+                            break
+                        if offset >= max(start_offset, segment.replay_offset, segment.acked_offset) and \
+                                offset not in segment.acked_offsets_ahead:
+                            try:
+                                event_dict = json.loads(line)
+                            except ValueError as e:
+                                _logger.warning(f"Skipping invalid audit event in spool segment {segment_id} at "
+                                                f"offset {offset}: {e}")
+                                with self.lock:
+                                    segment.acknowledge(offset)
+                            else:
+                                audit_event = self.audit_event_cls.from_payload_dict(event_dict)
+                                setattr(audit_event, AuditSpooler.SPOOL_POSITION_ATTRIBUTE, (segment_id, offset))
+                                yield audit_event
+                        offset += 1
+            except FileNotFoundError:
+                pass
+            except (OSError, EOFError, zlib.error) as e:
+                _logger.error(f"Skipping the rest of the corrupted audit spool segment {segment_id} from offset "
+                              f"{offset}: {e}")
+            if event_count is None:
+                # the segment was left by a previous run, its event count is known once it is fully read
+                with self.lock:
+                    segment.event_count = offset
+                    segment.is_complete = True
+                    self.delete_segment_if_acknowledged(segment_id)
+
+    def get_end_position(self):
+        """
+        Returns the position of the next event to be added, all the events added so far are before this position.
+
+        Returns:
+            tuple: The (segment id, offset) position.
+        """
+        with self.lock:
+            return self.get_end_position_locked()
+
+    def get_end_position_locked(self):
+        segment = self.segments.get(self.current_segment_id)
+        if segment is None:
+            return self.next_segment_id, 0
+        return self.current_segment_id, segment.event_count
+
+    @staticmethod
+    def get_spool_position(audit_event):
+        """
+        Returns the (segment id, offset) position of the given spooled audit event, or None if it is not spooled.
+        """
+        return getattr(audit_event, AuditSpooler.SPOOL_POSITION_ATTRIBUTE, None)
 
     def get_spooled_audit_events(self):
         """
@@ -84,32 +446,39 @@ class AuditSpooler:
         Returns:
             List[AuditEvent]: A list of AuditEvent objects representing spooled audit events.
         """
-        spooled_audit_events = []
-
-        file_paths = FileUtils.get_file_paths_in_directory(self.audit_spool_dir)
-        for file_path in file_paths:
-            with self.lock:
-                spooled_events = FileUtils.load_json_from_file(file_path)
-                for event_dict_str in spooled_events:
-                    event_dict = json.loads(event_dict_str)
-                    access_audit_event = self.audit_event_cls.from_payload_dict(event_dict)
-                    spooled_audit_events.append(access_audit_event)
-
-        return spooled_audit_events
+        return list(self.iter_spooled_audit_events())
 
     def add_audit_event(self, access_audit_event: T):
         """
-        Adds an audit event to the spool directory.
+        Adds an audit event to the current segment of the spool.
 
         Args:
             access_audit_event (AuditEvent): The audit event to add.
         """
-        event_time = self.get_event_time(access_audit_event)
-        file_path = self.get_file_path_for_event_time(event_time)
         access_audit_event_dict = access_audit_event.to_payload_dict()
+        sealed_segment_id = None
         try:
             with self.lock:
-                FileUtils.append_json_to_file(file_path, access_audit_event_dict)
+                self.ensure_capacity()
+                segment = self.segments.get(self.current_segment_id)
+                if segment is None or segment.event_count >= self.segment_max_events:
+                    if segment is not None:
+                        sealed_segment_id = self.current_segment_id
+                    self.current_segment_id = self.next_segment_id
+                    self.next_segment_id += 1
+                    segment = SpoolSegment()
+                    self.segments[self.current_segment_id] = segment
+                file_size = FileUtils.append_json_to_file(self.get_segment_file_path(self.current_segment_id),
+                                                          access_audit_event_dict)
+                position = (self.current_segment_id, segment.event_count)
+                segment.event_count += 1
+                self.spool_size += file_size - segment.file_size
+                segment.file_size = file_size
+            setattr(access_audit_event, AuditSpooler.SPOOL_POSITION_ATTRIBUTE, position)
+            if sealed_segment_id is not None:
+                self.schedule_compression(sealed_segment_id)
+        except DiskFullException:
+            raise
         except OSError as e:
             if e.errno == 28:
                 _logger.error("No space left on device. Disk is full.Please increase the disk size or free "
@@ -120,6 +489,41 @@ class AuditSpooler:
                 _logger.error(f"Error writing audit event to file: {e}")
                 raise Exception(f"Error writing audit event to file: {e}")
 
+    def ensure_capacity(self):
+        """
+        Makes room for an event when the spool size is capped, evicting the oldest segments or rejecting the event
+        depending on the eviction policy. The cap may be exceeded by the size of the event. Called with the lock held.
+
+        Raises:
+            DiskFullException: If there is no room for the event.
+        """
+        if self.max_size_bytes <= 0:
+            return
+        while self.spool_size >= self.max_size_bytes:
+            if self.eviction_policy != AuditSpooler.EVICTION_POLICY_DROP_OLDEST or not self.segments:
+                _logger.error(f"Audit spool size limit of {self.max_size_bytes} bytes reached, rejecting the audit "
+                              f"event.")
+                raise DiskFullException(f"Audit spool size limit of {self.max_size_bytes} bytes reached. The audits "
+                                        f"are rejected until the spooled audits are pushed.")
+            self.evict_segment(min(self.segments))
+
+    def evict_segment(self, segment_id):
+        """
+        Drops the segment with its events which are not acknowledged yet. Called with the lock held.
+        """
+        segment = self.segments.pop(segment_id)
+        if segment_id == self.current_segment_id:
+            self.current_segment_id = None
+        self.spool_size -= segment.file_size
+        self.delete_segment_file(segment_id)
+        self.save_checkpoint()
+        unacknowledged_event_count = segment.get_unacknowledged_event_count()
+        if unacknowledged_event_count is not None:
+            self.evicted_event_count += unacknowledged_event_count
+        _logger.error(f"Audit spool size limit of {self.max_size_bytes} bytes reached, dropped spool segment "
+                      f"{segment_id} with {'its' if unacknowledged_event_count is None else unacknowledged_event_count}"
+                      f" unacknowledged audit events.")
+
     def get_event_time(self, access_audit_event):
         event_time = None
         if hasattr(access_audit_event, 'event_time'):
@@ -130,27 +534,48 @@ class AuditSpooler:
 
     def remove_audit_event(self, access_audit_event: T):
         """
-        Removes an audit event from the spool directory.
+        Acknowledges an audit event, deleting its segment file once all the events of the segment are acknowledged.
 
         Args:
             access_audit_event (AuditEvent): The audit event to remove.
         """
-        event_time = self.get_event_time(access_audit_event)
-        file_path = self.get_file_path_for_event_time(event_time)
-        access_audit_event_dict = access_audit_event.to_payload_dict()
+        position = AuditSpooler.get_spool_position(access_audit_event)
+        if position is None:
+            _logger.warning("Ignoring the removal of an audit event which was not spooled by this spooler")
+            return
+        segment_id, offset = position
         with self.lock:
-            FileUtils.remove_line_from_file(file_path, access_audit_event_dict)
-
-        today = date.today()
-        today_file_name = today.strftime("audit_spool_%Y-%m-%d.json")
+            segment = self.segments.get(segment_id)
+            if segment is None:
+                return
+            segment.acknowledge(offset)
+            self.acks_since_checkpoint += 1
+            if not self.delete_segment_if_acknowledged(segment_id) and \
+                    self.acks_since_checkpoint >= self.checkpoint_interval_events:
+                self.save_checkpoint()
+
+    def delete_segment_if_acknowledged(self, segment_id) -> bool:
+        """
+        Deletes the segment file if all its events are acknowledged and persists the checkpoint. Called with the lock
+        held.
 
-        # Call remove_empty_files method with today's file name in the exclude list
-        exclude_files = [today_file_name]
-        FileUtils.remove_empty_files(self.audit_spool_dir, exclude_files)
+        Returns:
+            bool: Whether the segment was deleted.
+        """
+        segment = self.segments.get(segment_id)
+        if segment is None or not segment.is_acknowledged():
+            return False
+        del self.segments[segment_id]
+        if segment_id == self.current_segment_id:
+            self.current_segment_id = None
+        self.spool_size -= segment.file_size
+        self.delete_segment_file(segment_id)
+        self.save_checkpoint()
+        return True
 
     def get_file_path_for_event_time(self, event_time_millis) -> str:
         """
-        Generates the file path for the given event time.
+        Generates the path of the daily spool file of older versions for the given event time.
 
         Args:
             event_time_millis (int): The event time in milliseconds.
@@ -166,112 +591,265 @@ class AuditLogger(threading.Thread, metaclass=abc.ABCMeta):
     """
     A class to log audit data and push it to a server.
 
+    The events are spooled, then put into a bounded in-memory queue from which the sender thread pushes them in
+    batches of up to max_batch_size events, waiting at most max_batch_wait_ms for a batch to fill while other events
+    are queued, a lone event is pushed at once. The batch size is halved when a push fails and doubled back up to
+    max_batch_size while full batches succeed.
+
+    The spool is the source of truth: when the queue is full, or a push fails, the in-memory queue is dropped and the
+    events are read back from the spool by the feeder thread, after a jittered exponential backoff when a push failed,
+    until it has caught up with the spool. Events are delivered at least once.
+
     Attributes:
         audit_spool_dir (str): A directory to store spooled audit files.
     """
 
-    def __init__(self, audit_spool_dir: str, audit_event_cls, max_queue_size=10000, audit_event_queue_timeout=5):
+    def __init__(self, audit_spool_dir: str, audit_event_cls, max_queue_size=10000, audit_event_queue_timeout=5,
+                 max_batch_size=100, max_batch_wait_ms=100, retry_initial_delay_sec=1, retry_max_delay_sec=120,
+                 spool_max_size_bytes=0, spool_eviction_policy=AuditSpooler.EVICTION_POLICY_DROP_OLDEST):
         """
         Initializes the AuditLogger.
 
         Args:
             audit_spool_dir (str): Audit spool directory
             audit_event_cls (cls): Class of audit event
+            max_queue_size (int): Maximum number of events held in memory, 0 means unbounded
+            audit_event_queue_timeout (int): Time in seconds the feeder waits for space in the queue before it checks
+                whether the queue was dropped
+            max_batch_size (int): Maximum number of events pushed in one call
+            max_batch_wait_ms (int): Maximum time to wait for a batch to fill after its first event, when more events
+                are queued
+            retry_initial_delay_sec (float): Delay before the first retry of a failed push
+            retry_max_delay_sec (float): Maximum delay between the retries of a failed push
+            spool_max_size_bytes (int): Maximum size of the audit spool on disk, 0 means unlimited
+            spool_eviction_policy (str): What to do when the audit spool is full, drop_oldest or reject_new
         """
         super().__init__()
 
         self.audit_event_queue_timeout = audit_event_queue_timeout
-        self.audit_spooler = AuditSpooler(audit_spool_dir, audit_event_cls)
+        self.audit_spooler = AuditSpooler(audit_spool_dir, audit_event_cls, max_size_bytes=spool_max_size_bytes,
+                                          eviction_policy=spool_eviction_policy)
 
         self.audit_event_queue = Queue(maxsize=max_queue_size)
-        self.failed_audit_event_queue = Queue(maxsize=max_queue_size)
 
-        # Load spooled audits
-        self.load_spooled_audit_events()
-
-        self.retry_failed_audit_thread = threading.Thread(target=self.retry_failed_audit_events)
-        self.retry_failed_audit_thread.daemon = True  # Daemonize the thread
-        self.retry_failed_audit_thread.start()
-
-    def retry_failed_audit_events(self):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_wait_sec = max(0, max_batch_wait_ms) / 1000
+        self.batch_size = self.max_batch_size
+        self.retry_initial_delay_sec = retry_initial_delay_sec
+        self.retry_max_delay_sec = retry_max_delay_sec
+        self.consecutive_failures = 0
+
+        # While spilling, the events are read from the spool starting at spill_position instead of being queued in
+        # memory. The generation is bumped whenever the queue is dropped, so that the feeder restarts from the spool.
+        self.spill_condition = threading.Condition()
+        self.spilling = True
+        self.spill_position = None
+        self.spill_generation = 0
+        self.retry_due = 0
+
+        # Feed the spooled audits of previous runs, and later the spilled ones, in the background, the queue being
+        # bounded a large backlog is read from the spool as it is drained
+        self.spooled_audit_events_feeder_thread = threading.Thread(target=self.feed_spooled_audit_events)
+        self.spooled_audit_events_feeder_thread.daemon = True
+        self.spooled_audit_events_feeder_thread.start()
+
+    def get_retry_delay(self):
         """
-        Periodically retries failed audit events from the failed audit event queue.
-
-        This method continuously retrieves failed audit events from the failed audit event queue,
-        adds them back to the audit event queue for retry, and waits for 2 minutes before retrying
-        again. The retry process ensures that failed audit events are reprocessed at regular intervals.
+        Returns the delay before retrying after the consecutive failures, growing exponentially up to the max retry
+        delay, with jitter so that many loggers do not retry at the same time.
+        """
+        delay = min(self.retry_max_delay_sec, self.retry_initial_delay_sec * (2 ** (self.consecutive_failures - 1)))
+        return delay * random.uniform(0.5, 1)
 
+    def spill(self, position, retry_delay=0):
+        """
+        Drops the in-memory queue, the events from the given spool position on, and the dropped ones, are read back
+        from the spool by the feeder thread. Must be called with the spill condition held.
         """
+        positions = [] if position is None else [position]
         while True:
-            failed_audit_events = []
-            while not self.failed_audit_event_queue.empty():
-                failed_audit_event = self.failed_audit_event_queue.get()
-                failed_audit_events.append(failed_audit_event)
-
-            if failed_audit_events:
-                _logger.debug(f"Retrying {len(failed_audit_events)} failed audit events.")
-                for failed_audit_event in failed_audit_events:
-                    self.audit_event_queue.put(failed_audit_event, timeout=self.audit_event_queue_timeout)
-            else:
-                _logger.debug("No failed audit events to retry.")
-
-            # Wait for 2 minutes and try this failed audit retries every 2 mins interval
-            time.sleep(120)
-
-    def load_spooled_audit_events(self):
+            try:
+                dropped_position = AuditSpooler.get_spool_position(self.audit_event_queue.get_nowait())
+            except queue.Empty:
+                break
+            if dropped_position is not None:
+                positions.append(dropped_position)
+        if not self.spilling:
+            self.spill_position = min(positions) if positions else self.audit_spooler.get_end_position()
+        elif self.spill_position is not None and positions:
+            # spill_position None means from the beginning of the spool
+            self.spill_position = min(positions + [self.spill_position])
+        self.spilling = True
+        self.spill_generation += 1
+        self.retry_due = max(self.retry_due, time.monotonic() + retry_delay)
+        self.spill_condition.notify_all()
+
+    def feed_spooled_audit_events(self):
+        """
+        Reads the spooled audit events into the audit event queue while spilling, that is at startup, when the queue
+        was full and after a push failed.
+        """
+        while True:
+            with self.spill_condition:
+                while not self.spilling:
+                    self.spill_condition.wait()
+                generation = self.spill_generation
+                start_position = self.spill_position
+                retry_due = self.retry_due
+                end_position = self.audit_spooler.get_end_position()
+            delay = retry_due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            try:
+                if self.load_spooled_audit_events(
+                        self.audit_spooler.iter_spooled_audit_events(start_position, end_position), generation):
+                    with self.spill_condition:
+                        if self.spill_generation == generation:
+                            if self.audit_spooler.get_end_position() == end_position:
+                                # caught up with the spool, the new events are queued by log from now on
+                                self.spilling = False
+                            else:
+                                self.spill_position = end_position
+            except Exception as e:
+                _logger.error(f"Error while loading spooled audit events: {e}")
+                with self.spill_condition:
+                    self.retry_due = time.monotonic() + self.retry_max_delay_sec
+
+    def load_spooled_audit_events(self, spooled_audit_events=None, generation=None):
         """
         Loads spooled audit events from the AuditSpooler and puts them into the audit event queue.
 
-        This method retrieves spooled audit events from the AuditSpooler and puts them into the audit event queue for processing.
+        The events are read from the spool while they are put into the queue, waiting for free space in the queue.
+
+        Args:
+            spooled_audit_events (Iterator[AuditEvent]): The spooled audit events, all the events which are not
+                acknowledged when not given.
+            generation (int): The spill generation the events are loaded for, the loading stops when the queue is
+                dropped in the meantime.
 
+        Returns:
+            bool: True if all the events were loaded, False if the loading was stopped.
         """
-        spooled_audit_events = self.audit_spooler.get_spooled_audit_events()
+        if spooled_audit_events is None:
+            spooled_audit_events = self.audit_spooler.iter_spooled_audit_events()
         for audit_event in spooled_audit_events:
-            self.audit_event_queue.put(audit_event, timeout=self.audit_event_queue_timeout)
+            while True:
+                if generation is not None and self.spill_generation != generation:
+                    return False
+                try:
+                    self.audit_event_queue.put(audit_event, timeout=max(self.audit_event_queue_timeout, 0.1))
+                    break
+                except queue.Full:
+                    pass
+            if generation is not None and self.spill_generation != generation:
+                # the queue was dropped while this event was put
+                return False
+        return True
 
     def log(self, audit_event: T):
         """
         Logs the provided data.
 
+        The event is spooled and queued for the sender thread. When the queue is full it is left in the spool and read
+        back once the sender has caught up, so that logging does not block.
+
         Args:
             audit_event (object): The audit event to be logged.
         """
-        # Add event to spool file
-        self.audit_spooler.add_audit_event(audit_event)
-        try:
-            self.audit_event_queue.put(audit_event, timeout=self.audit_event_queue_timeout)
-        except queue.Full:
-            _logger.error("Audit event queue is full.The push rate is too high for the audit spooler to process.")
-            raise AuditEventQueueFullException("Audit event queue is full.The push rate is too high for the audit "
-                                               "spooler to process.")
+        with self.spill_condition:
+            # Add event to spool file
+            self.audit_spooler.add_audit_event(audit_event)
+            if self.spilling:
+                return
+            try:
+                self.audit_event_queue.put_nowait(audit_event)
+            except queue.Full:
+                _logger.warning("Audit event queue is full, the audit events are read back from the spool once the "
+                                "queued ones are pushed.")
+                self.spill(AuditSpooler.get_spool_position(audit_event))
+
+    def next_batch(self):
+        """
+        Returns the next batch of audit events, waiting for the first one. When more events are already queued, it
+        waits up to max_batch_wait_ms for the batch to fill, a lone event is returned at once so that it is not delayed
+        when the load is low.
+        """
+        batch = [self.audit_event_queue.get()]
+        self.drain_queue(batch)
+        if len(batch) == 1:
+            return batch
+        deadline = time.monotonic() + self.max_batch_wait_sec
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.audit_event_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            self.drain_queue(batch)
+        return batch
+
+    def drain_queue(self, batch):
+        """
+        Adds the queued audit events to the batch, up to the batch size, without waiting.
+        """
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.audit_event_queue.get_nowait())
+            except queue.Empty:
+                return
 
     def run(self):
         """
         Runs the AuditLogger thread.
 
-        Continuously checks for new events in the audit_event_queue and pushes them to the server.
+        Continuously takes batches of events from the audit_event_queue and pushes them to the server.
         """
         try:
             while True:
-                # Check for new logs in the audit_event_queue
                 # This is a blocking queue, it will implicitly wait till record available in queue
-                audit_event = self.audit_event_queue.get()
+                audit_events = self.next_batch()
                 try:
-                    # Push audit to server
-                    self.push_audit_event_to_server(audit_event)
+                    # Push audits to server
+                    self.push_audit_events_to_server(audit_events)
                     if _logger.isEnabledFor(logging.DEBUG):
-                        _logger.debug("Audit event data pushed to server: %s", audit_event)
-
-                    # After successfully pushing audits to server, removing it from spool directory
-                    self.audit_spooler.remove_audit_event(audit_event)
+                        _logger.debug("%d audit events pushed to server", len(audit_events))
                 except Exception as e:
-                    _logger.warning("Failed to push audit event data %s to server: %s. Retrying request. Will add it "
-                                    "back in the audit-queue.", audit_event, e)
-                    # Adding failed audits for retries
-                    self.failed_audit_event_queue.put(audit_event, timeout=self.audit_event_queue_timeout)
+                    self.consecutive_failures += 1
+                    self.batch_size = max(1, self.batch_size // 2)
+                    retry_delay = self.get_retry_delay()
+                    _logger.warning("Failed to push %d audit events to server: %s. Retrying in %.1f seconds.",
+                                    len(audit_events), e, retry_delay)
+                    positions = [position for position in map(AuditSpooler.get_spool_position, audit_events)
+                                 if position is not None]
+                    with self.spill_condition:
+                        self.spill(min(positions) if positions else None, retry_delay)
+                    continue
+
+                # After successfully pushing audits to server, removing them from spool directory
+                for audit_event in audit_events:
+                    self.audit_spooler.remove_audit_event(audit_event)
+                self.consecutive_failures = 0
+                if len(audit_events) >= self.batch_size:
+                    self.batch_size = min(self.max_batch_size, self.batch_size * 2)
         except Exception as e:
             _logger.error("An error occurred in AuditLogger: %s", e)
 
+    def push_audit_events_to_server(self, audit_events: List[T]):
+        """
+        Pushes a batch of audit events to the server, the batch is retried as a whole when an error is raised.
+
+        Subclasses can override this method to push the batch in a single call, by default the events are pushed one
+        by one with push_audit_event_to_server.
+
+        Args:
+            audit_events (List[T]): The audit events to be pushed to the server.
+        """
+        for audit_event in audit_events:
+            self.push_audit_event_to_server(audit_event)
+
     @abstractmethod
     def push_audit_event_to_server(self, audit_event: T):
         """
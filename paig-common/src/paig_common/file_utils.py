@@ -64,10 +64,14 @@ class FileUtils:
         Args:
             file_path (str): The path to the JSON file.
             data (obj): The JSON data to append to the file.
+
+        Returns:
+            int: The size of the file after the append.
         """
         with open(file_path, 'a') as f:
             json.dump(data, f)
             f.write('\n')
+            return f.tell()
 
     @staticmethod
     def remove_line_from_file(file_path, line_to_remove):
@@ -1,5 +1,6 @@
 import os
 import random
+import time
 from unittest.mock import patch
 
 import pytest
@@ -142,3 +143,260 @@ def test_add_audit_event_exception(mock_get_file_path_for_event_time, mock_appen
         spooler.add_audit_event(MockAuditEvent())
     assert str(e.value) == ("No space left on device. Disk is full. Please increase the disk size or free up some "
                             "space to push audits successfully.")
+
+
+def test_acknowledged_segments_are_deleted(tmp_path):
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=3, checkpoint_interval_events=2)
+    events = [TestAuditEvent(event_time=i) for i in range(7)]
+    for event in events:
+        spooler.add_audit_event(event)
+    assert len(spooler.get_segment_ids()) == 3
+
+    # out of order acknowledgements delete a segment only once all its events are acknowledged
+    spooler.remove_audit_event(events[1])
+    spooler.remove_audit_event(events[2])
+    assert len(spooler.get_segment_ids()) == 3
+    spooler.remove_audit_event(events[0])
+    assert len(spooler.get_segment_ids()) == 2
+    assert spooler.read_checkpoint() == {"segment_id": 2, "offset": 0}
+
+    for event in events[3:]:
+        spooler.remove_audit_event(event)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_spooled_events_are_replayed_from_checkpoint(tmp_path):
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=4, checkpoint_interval_events=2)
+    events = [TestAuditEvent(event_time=i) for i in range(10)]
+    for event in events:
+        spooler.add_audit_event(event)
+    for event in events[:6]:
+        spooler.remove_audit_event(event)
+
+    # a new spooler replays the events which are not acknowledged
+    restarted_spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=4)
+    replayed_events = restarted_spooler.get_spooled_audit_events()
+    assert [event.event_time for event in replayed_events] == [6, 7, 8, 9]
+
+    new_event = TestAuditEvent(event_time=10)
+    restarted_spooler.add_audit_event(new_event)
+    for event in replayed_events + [new_event]:
+        restarted_spooler.remove_audit_event(event)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_legacy_spool_files_are_migrated(tmp_path):
+    FileUtils.append_json_to_file(str(tmp_path / "audit_spool_2022-01-01.json"), {"eventTime": 1640995200000})
+    FileUtils.append_json_to_file(str(tmp_path / "audit_spool_2022-01-01.json"), {"eventTime": 1640995200001})
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent)
+
+    spooled_events = spooler.get_spooled_audit_events()
+    assert [event.event_time for event in spooled_events] == [1640995200000, 1640995200001]
+    for event in spooled_events:
+        spooler.remove_audit_event(event)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_full_segments_are_compressed_in_frames(tmp_path):
+    import gzip
+
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=50, compression_frame_size=256)
+    for i in range(120):
+        spooler.add_audit_event(TestAuditEvent(event_time=i))
+    spooler.compression_executor.shutdown(wait=True)
+
+    file_names = sorted(os.listdir(str(tmp_path)))
+    assert file_names == ["audit_spool_segment_0000000001.jsonl.gz", "audit_spool_segment_0000000002.jsonl.gz",
+                          "audit_spool_segment_0000000003.jsonl"]
+    compressed_file_path = os.path.join(str(tmp_path), file_names[0])
+    with open(compressed_file_path, 'rb') as f:
+        # one gzip member per frame
+        assert f.read().count(b"\x1f\x8b\x08") > 1
+    with gzip.open(compressed_file_path, 'rt') as f:
+        assert len(f.readlines()) == 50
+    assert spooler.spool_size == sum(os.path.getsize(os.path.join(str(tmp_path), file_name))
+                                     for file_name in file_names)
+
+    # the compressed segments are streamed on replay after a restart
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=50)
+    spooled_events = list(spooler.iter_spooled_audit_events())
+    assert [event.event_time for event in spooled_events] == list(range(120))
+    for event in spooled_events:
+        spooler.remove_audit_event(event)
+    spooler.compression_executor.shutdown(wait=True)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_spool_size_cap_drops_oldest_segments(tmp_path):
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=10, compress_segments=False,
+                           max_size_bytes=1000)
+    events = [TestAuditEvent(event_time=i) for i in range(100)]
+    for event in events:
+        spooler.add_audit_event(event)
+    event_size = os.path.getsize(spooler.get_segment_file_path(spooler.current_segment_id)) // 10
+
+    assert spooler.spool_size < 1000 + event_size
+    assert spooler.spool_size == sum(os.path.getsize(os.path.join(str(tmp_path), file_name))
+                                     for file_name in os.listdir(str(tmp_path))
+                                     if file_name != AuditSpooler.CHECKPOINT_FILE_NAME)
+    spooled_event_times = [event.event_time for event in spooler.iter_spooled_audit_events()]
+    assert spooled_event_times == list(range(100 - len(spooled_event_times), 100))
+    assert spooler.evicted_event_count == 100 - len(spooled_event_times)
+
+    # the events of dropped segments are ignored when acknowledged
+    spooler.remove_audit_event(events[0])
+
+
+def test_spool_size_cap_rejects_new_events(tmp_path):
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=10, compress_segments=False,
+                           max_size_bytes=500, eviction_policy=AuditSpooler.EVICTION_POLICY_REJECT_NEW)
+    events = []
+    with pytest.raises(DiskFullException):
+        for i in range(100):
+            event = TestAuditEvent(event_time=i)
+            spooler.add_audit_event(event)
+            events.append(event)
+    assert 0 < len(events) < 100
+    assert spooler.evicted_event_count == 0
+
+    for event in events[:10]:
+        spooler.remove_audit_event(event)
+    spooler.add_audit_event(TestAuditEvent(event_time=100))
+
+
+def test_invalid_eviction_policy(tmp_path):
+    with pytest.raises(ValueError):
+        AuditSpooler(str(tmp_path), TestAuditEvent, eviction_policy="drop_newest")
+
+
+def test_audit_logger_drains_backlog_larger_than_queue(tmp_path):
+    import threading
+    from paig_common.audit_spooler import AuditLogger
+
+    spooler = AuditSpooler(str(tmp_path), TestAuditEvent, segment_max_events=10)
+    for i in range(50):
+        spooler.add_audit_event(TestAuditEvent(event_time=i))
+
+    pushed_event_times = []
+    all_pushed = threading.Event()
+
+    class TestAuditLogger(AuditLogger):
+        def push_audit_event_to_server(self, audit_event):
+            pushed_event_times.append(audit_event.event_time)
+            if len(pushed_event_times) == 50:
+                all_pushed.set()
+
+    audit_logger = TestAuditLogger(str(tmp_path), TestAuditEvent, max_queue_size=5)
+    audit_logger.daemon = True
+    audit_logger.start()
+
+    assert all_pushed.wait(timeout=10)
+    assert pushed_event_times == list(range(50))
+    # the last event is acknowledged after it is pushed
+    for _ in range(100):
+        if not os.listdir(str(tmp_path)):
+            break
+        time.sleep(0.1)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def create_test_audit_logger(tmp_path, push_audit_events, **kwargs):
+    from paig_common.audit_spooler import AuditLogger
+
+    class TestAuditLogger(AuditLogger):
+        def push_audit_events_to_server(self, audit_events):
+            push_audit_events(audit_events)
+
+        def push_audit_event_to_server(self, audit_event):
+            pass
+
+    audit_logger = TestAuditLogger(str(tmp_path), TestAuditEvent, **kwargs)
+    audit_logger.daemon = True
+    return audit_logger
+
+
+def test_audit_logger_pushes_batches(tmp_path):
+    batches = []
+    audit_logger = create_test_audit_logger(tmp_path, lambda events: batches.append([e.event_time for e in events]),
+                                            max_batch_size=4, max_batch_wait_ms=1000)
+    assert wait_until(lambda: not audit_logger.spilling)
+    for i in range(10):
+        audit_logger.log(TestAuditEvent(event_time=i))
+    audit_logger.start()
+
+    assert wait_until(lambda: sum(len(batch) for batch in batches) == 10)
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert wait_until(lambda: not os.listdir(str(tmp_path)))
+
+
+def test_audit_logger_retries_failed_batch_from_spool(tmp_path):
+    pushed_event_times = []
+    attempts = []
+
+    def push_audit_events(audit_events):
+        attempts.append(len(audit_events))
+        if len(attempts) <= 2:
+            raise Exception("server unavailable")
+        pushed_event_times.extend(e.event_time for e in audit_events)
+
+    audit_logger = create_test_audit_logger(tmp_path, push_audit_events, max_batch_size=8, max_batch_wait_ms=50,
+                                            retry_initial_delay_sec=0.01, retry_max_delay_sec=0.05)
+    assert wait_until(lambda: not audit_logger.spilling)
+    for i in range(8):
+        audit_logger.log(TestAuditEvent(event_time=i))
+    audit_logger.start()
+
+    assert wait_until(lambda: len(pushed_event_times) == 8)
+    assert pushed_event_times == list(range(8))
+    # the batch size is halved after each failure
+    assert attempts[:3] == [8, 4, 2]
+    assert audit_logger.consecutive_failures == 0
+    assert wait_until(lambda: not os.listdir(str(tmp_path)))
+
+
+def test_audit_logger_spills_to_spool_when_queue_is_full(tmp_path):
+    import threading
+
+    pushed_event_times = []
+    release = threading.Event()
+
+    def push_audit_events(audit_events):
+        release.wait()
+        pushed_event_times.extend(e.event_time for e in audit_events)
+
+    audit_logger = create_test_audit_logger(tmp_path, push_audit_events, max_queue_size=3, max_batch_size=2,
+                                            max_batch_wait_ms=0)
+    assert wait_until(lambda: not audit_logger.spilling)
+    audit_logger.start()
+    for i in range(20):
+        # does not block nor raise while the sender is stuck
+        audit_logger.log(TestAuditEvent(event_time=i))
+    assert audit_logger.spilling
+    release.set()
+
+    assert wait_until(lambda: len(pushed_event_times) >= 20)
+    assert pushed_event_times == list(range(20))
+    assert wait_until(lambda: not audit_logger.spilling)
+    assert wait_until(lambda: not os.listdir(str(tmp_path)))
+
+
+def test_audit_logger_pushes_lone_event_without_waiting(tmp_path):
+    pushed_at = []
+    audit_logger = create_test_audit_logger(tmp_path, lambda events: pushed_at.append(time.monotonic()),
+                                            max_batch_size=4, max_batch_wait_ms=5000)
+    assert wait_until(lambda: not audit_logger.spilling)
+    audit_logger.start()
+    logged_at = time.monotonic()
+    audit_logger.log(TestAuditEvent(event_time=1))
+
+    assert wait_until(lambda: pushed_at, timeout=2)
+    assert pushed_at[0] - logged_at < 1
@@ -67,3 +67,128 @@ def test_rsa_util_error_keys():
 
     assert public_key_err is None
     assert private_key_err is None
+
+
+def test_envelope_encrypt_decrypt():
+    envelope_data_encryptor = DataEncryptor(public_key=rsa_key_info.public_key_encoded_str,
+                                            private_key=rsa_key_info.private_key_encoded_str,
+                                            encryption_mode=DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+    large_data = "Large prompt with non-ascii characters “ ” " * 2500
+
+    encrypted_data = envelope_data_encryptor.encrypt(large_data)
+    assert encrypted_data.startswith("paig:v1:")
+    assert DataEncryptor.is_envelope_encrypted(encrypted_data)
+    assert len(encrypted_data) < len(large_data.encode("utf-8")) * 1.4
+    assert envelope_data_encryptor.decrypt(encrypted_data) == large_data
+    # a new data key is used for every encryption
+    assert envelope_data_encryptor.encrypt(msg_data) != envelope_data_encryptor.encrypt(msg_data)
+
+
+def test_encryption_mode_per_call_and_legacy_is_readable():
+    legacy_encrypted_data = data_encryptor.encrypt(msg_data)
+    envelope_encrypted_data = data_encryptor.encrypt(msg_data, DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+
+    assert DataEncryptor.get_encryption_mode_of(legacy_encrypted_data) == DataEncryptor.ENCRYPTION_MODE_LEGACY
+    assert DataEncryptor.get_encryption_mode_of(envelope_encrypted_data) == DataEncryptor.ENCRYPTION_MODE_ENVELOPE
+    assert data_encryptor.decrypt(legacy_encrypted_data) == msg_data
+    assert data_encryptor.decrypt(envelope_encrypted_data) == msg_data
+    assert data_encryptor.decrypt(data_encryptor.encrypt("")) == ""
+    assert data_encryptor.decrypt(data_encryptor.encrypt("", DataEncryptor.ENCRYPTION_MODE_ENVELOPE)) == ""
+
+
+def test_envelope_decrypt_rejects_tampered_data():
+    from cryptography.exceptions import InvalidTag
+
+    encrypted_data = data_encryptor.encrypt(msg_data, DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+    wrapped_data_key, nonce, ciphertext = encrypted_data[len("paig:v1:"):].split(":")
+    tampered_ciphertext = base64.b64encode(bytes([base64.b64decode(ciphertext)[0] ^ 1]) +
+                                           base64.b64decode(ciphertext)[1:]).decode("utf-8")
+
+    with pytest.raises(InvalidTag):
+        data_encryptor.decrypt(f"paig:v1:{wrapped_data_key}:{nonce}:{tampered_ciphertext}")
+    with pytest.raises(ValueError):
+        data_encryptor.decrypt(f"paig:v1:{wrapped_data_key}:{nonce}")
+
+
+def test_unsupported_encryption_mode():
+    with pytest.raises(ValueError):
+        DataEncryptor(public_key=None, private_key=None, encryption_mode="rot13")
+    with pytest.raises(ValueError):
+        data_encryptor.encrypt(msg_data, "rot13")
+
+
+def test_keys_are_parsed_once_and_shared(mocker):
+    from paig_common.encryption import rsa_key_handle_cache
+    key_info = RSAKeyUtil.generate_key_pair()
+    str_to_public_key_spy = mocker.spy(RSAKeyUtil, "str_to_public_key")
+    str_to_private_key_spy = mocker.spy(RSAKeyUtil, "str_to_private_key")
+
+    encryptors = [DataEncryptor(public_key=key_info.public_key_encoded_str,
+                                private_key=key_info.private_key_encoded_str) for _ in range(3)]
+
+    assert str_to_public_key_spy.call_count == 1
+    assert str_to_private_key_spy.call_count == 1
+    assert all(encryptor.public_key is encryptors[0].public_key for encryptor in encryptors)
+    assert all(encryptor.private_key is encryptors[0].private_key for encryptor in encryptors)
+    assert encryptors[1].decrypt(encryptors[2].encrypt(msg_data)) == msg_data
+    assert rsa_key_handle_cache.hits >= 4
+
+
+def test_key_handle_cache_evicts_least_recently_used_key():
+    from paig_common.encryption import RSAKeyHandleCache
+    key_infos = [RSAKeyUtil.generate_key_pair() for _ in range(3)]
+    key_handle_cache = RSAKeyHandleCache(capacity=2)
+
+    first_key = key_handle_cache.get_public_key(key_infos[0].public_key_encoded_str)
+    key_handle_cache.get_public_key(key_infos[1].public_key_encoded_str)
+    key_handle_cache.get_public_key(key_infos[0].public_key_encoded_str)
+    key_handle_cache.get_public_key(key_infos[2].public_key_encoded_str)
+
+    assert len(key_handle_cache.cache) == 2
+    assert key_handle_cache.get_public_key(key_infos[0].public_key_encoded_str) is first_key
+    assert key_handle_cache.get_public_key("not a key") is None
+    assert len(key_handle_cache.cache) == 2
+
+
+@pytest.mark.parametrize("encryption_mode", DataEncryptor.SUPPORTED_ENCRYPTION_MODES)
+def test_encrypt_and_decrypt_streams(encryption_mode, mocker):
+    mocker.patch.object(DataEncryptor, "STREAM_PIECE_SIZE", 7)
+    text_parts = ["Sentence “one” with non-ascii characters. ", "Sentence two. " * 20, "", "é" * 150]
+    full_text = "".join(text_parts)
+
+    encrypted_pieces = list(data_encryptor.encrypt_stream(iter(text_parts), encryption_mode))
+    encrypted_text = "".join(encrypted_pieces)
+    assert len(encrypted_pieces) > 1
+    assert DataEncryptor.get_encryption_mode_of(encrypted_text) == encryption_mode
+    assert data_encryptor.decrypt(encrypted_text) == full_text
+
+    # the encrypted text is read in pieces splitting the chunks, base64 groups and multi-byte characters
+    encrypted_parts = [encrypted_text[i:i + 5] for i in range(0, len(encrypted_text), 5)]
+    decrypted_pieces = list(data_encryptor.decrypt_stream(encrypted_parts))
+    assert len(decrypted_pieces) > 1
+    assert "".join(decrypted_pieces) == full_text
+    assert "".join(data_encryptor.decrypt_stream(data_encryptor.encrypt(full_text, encryption_mode))) == full_text
+    assert "".join(data_encryptor.decrypt_stream(data_encryptor.encrypt_stream(b"", encryption_mode))) == ""
+
+
+def test_envelope_decrypt_stream_rejects_tampered_data():
+    from cryptography.exceptions import InvalidTag
+
+    encrypted_data = data_encryptor.encrypt(msg_data * 10, DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+    tampered_data = encrypted_data[:-8] + ("A" if encrypted_data[-8] != "A" else "B") + encrypted_data[-7:]
+
+    with pytest.raises(InvalidTag):
+        list(data_encryptor.decrypt_stream(tampered_data))
+    with pytest.raises(ValueError):
+        list(data_encryptor.decrypt_stream(encrypted_data[:-3]))
+
+
+@pytest.mark.parametrize("encryption_mode", DataEncryptor.SUPPORTED_ENCRYPTION_MODES)
+def test_encrypt_and_decrypt_reject_lists(encryption_mode):
+    # only the streams take the data as parts, encrypt and decrypt take text
+    with pytest.raises(AttributeError):
+        data_encryptor.encrypt(["hello", "world"], encryption_mode)
+    with pytest.raises(TypeError):
+        data_encryptor.decrypt([data_encryptor.encrypt("hello", encryption_mode)])
+    with pytest.raises(TypeError):
+        list(data_encryptor.encrypt_stream([["hello"]], encryption_mode))
@@ -2,13 +2,27 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from opentelemetry import metrics
+from core.config import load_config_file
+import asyncio
 import base64
+import hashlib
+import hmac
 import logging
+import os
+import time
 
 
 
 logger = logging.getLogger(__name__)
 
+meter = metrics.get_meter(__name__)
+
+conf = load_config_file()
+
 # Constants for AES/GCM encryption
 CIPHER_ALGO = "AES/GCM/NoPadding"
 SECRET_KEY_FACTORY_ALGO = "PBKDF2WithHmacSHA256"
@@ -58,10 +72,68 @@ def _get_cipher(key: bytes):
     return cipher.encryptor()
 
 
-def _get_secret_key(secret: str) -> bytes:
+class DerivedKeyCache:
+    """
+    Bounded in-memory cache of the keys derived from the API key secrets.
+
+    Deriving a key runs PBKDF2 with 65,536 iterations, which takes tens of milliseconds, while the secrets are the few
+    level-1 and level-2 keys, so the derived keys are reused. The cache is keyed by an HMAC of the secret and the salt
+    with a random per-process key, so neither the secrets nor their plain hashes are kept, and nothing is persisted.
+    When the cache is full the least recently used key is evicted.
+
+    Args:
+        capacity (int): The maximum number of derived keys the cache can hold, 0 disables the cache.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self._hmac_key = os.urandom(32)
+
+    def cache_key(self, secret: str, salt: bytes) -> bytes:
+        return hmac.new(self._hmac_key, salt + b":" + secret.encode(), hashlib.sha256).digest()
+
+    def get(self, cache_key: bytes):
+        with self.lock:
+            key = self.cache.get(cache_key)
+            if key is not None:
+                self.cache.move_to_end(cache_key)
+            return key
+
+    def put(self, cache_key: bytes, key: bytes):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.cache[cache_key] = key
+            self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+_api_key_config = conf.get("api_key") or {}
+derived_key_cache = DerivedKeyCache(int(_api_key_config.get("derived_key_cache_max_size", 64)))
+# key derivations which are not cached run on this executor, so they do not block the event loop
+key_derivation_executor = ThreadPoolExecutor(max_workers=int(_api_key_config.get("key_derivation_max_workers", 2)),
+                                             thread_name_prefix="apikey-key-derivation")
+
+key_derivation_counter = meter.create_counter(
+    name="apikey_key_derivation_count",
+    description="Number of API key secret derivations, the cache hits are not counted"
+)
+key_derivation_histogram = meter.create_histogram("apikey_key_derivation_duration", "ms",
+                                                  "Histogram for API key secret derivation")
+
+
+def _derive_secret_key(secret: str) -> bytes:
     """
     Generate a secret key using PBKDF2 with SHA256.
     """
+    start_time = time.perf_counter()
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=KEY_LENGTH // 8,  # Convert bits to bytes
@@ -69,7 +141,36 @@ def _get_secret_key(secret: str) -> bytes:
         iterations=ITERATION_COUNT,
         backend=default_backend()
     )
-    return kdf.derive(secret.encode())
+    key = kdf.derive(secret.encode())
+    key_derivation_counter.add(1)
+    key_derivation_histogram.record((time.perf_counter() - start_time) * 1000)
+    return key
+
+
+def _get_secret_key(secret: str) -> bytes:
+    """
+    Return the secret key derived from the secret, deriving it only when it is not cached.
+    """
+    cache_key = derived_key_cache.cache_key(secret, SALT)
+    key = derived_key_cache.get(cache_key)
+    if key is None:
+        key = _derive_secret_key(secret)
+        derived_key_cache.put(cache_key, key)
+    return key
+
+
+async def _load_secret_key_async(secret: str):
+    """
+    Derive the secret key on the key derivation executor when it is not cached, so that the encryption or decryption
+    which follows finds it in the cache. Invalid secrets are left to the encryption or decryption to report.
+    """
+    try:
+        cache_key = derived_key_cache.cache_key(secret, SALT)
+        if derived_key_cache.get(cache_key) is None:
+            key = await asyncio.get_running_loop().run_in_executor(key_derivation_executor, _derive_secret_key, secret)
+            derived_key_cache.put(cache_key, key)
+    except Exception as e:
+        logger.debug(f"Unable to derive secret key. Error: {e}")
 
 
 def apikey_decrypt(encrypted_data: str, password: str, version: str = None) -> str:
@@ -113,6 +214,22 @@ def apikey_decrypt(encrypted_data: str, password: str, version: str = None) -> s
         raise Exception("Unable to Decrypt text")
 
 
+async def apikey_encrypt_async(data: str, secret: str) -> str:
+    """
+    Encrypt the given data like apikey_encrypt, without deriving the key on the event loop.
+    """
+    await _load_secret_key_async(secret)
+    return apikey_encrypt(data, secret)
+
+
+async def apikey_decrypt_async(encrypted_data: str, password: str, version: str = None) -> str:
+    """
+    Decrypt the given encrypted data like apikey_decrypt, without deriving the key on the event loop.
+    """
+    await _load_secret_key_async(password)
+    return apikey_decrypt(encrypted_data, password, version)
+
+
 def mask_api_key(api_key: str) -> str:
     """
     Mask an API key by showing only the first 5 and last 5 characters.
@@ -7,7 +7,8 @@ from api.apikey.services.paig_level2_encryption_key_service import PaigLevel2Enc
 from api.apikey.services.paig_api_key_service import PaigApiKeyService
 from api.encryption.factory.secure_encryptor_factory import SecureEncryptorFactory
 from core.exceptions import BadRequestException
-from api.apikey.factory.apikey_secure_encryptor import apikey_decrypt
+from api.apikey.factory.apikey_secure_encryptor import apikey_decrypt_async
+from api.apikey.factory.verified_apikey_cache import VerifiedAPIKeyCache, hash_api_key
 from api.apikey.utils import validate_token_expiry_time
 from api.encryption.utils.secure_encryptor import SecureEncryptor
 from core.config import load_config_file
@@ -31,9 +32,9 @@ class APIKeyValidator:
         self.secure_encryptor_factory = secure_encryptor_factory
         self.paig_level1_encryption_key_service = paig_level1_encryption_key_service
         self.paig_level2_encryption_key_service= paig_level2_encryption_key_service
+        self.verified_api_key_cache = VerifiedAPIKeyCache()
 
     async def validate_api_key(self, request: Request):
-        secure_encryptor: SecureEncryptor = await self.secure_encryptor_factory.get_or_create_secure_encryptor()
         api_key_config = conf.get("api_key")
         api_key_header_name = api_key_config.get("header_name")
         paig_app_api_key = request.headers.get(api_key_header_name)
@@ -42,6 +43,21 @@ class APIKeyValidator:
             logger.error("API key header is missing")
             raise BadRequestException("API key header is missing")
 
+        # keys validated before are resolved from the cache without database lookups and decryption
+        api_key_hash = hash_api_key(paig_app_api_key)
+        verified_api_key = self.verified_api_key_cache.get(api_key_hash)
+        if verified_api_key is not None:
+            if not validate_token_expiry_time(verified_api_key.token_expiry_epoch_time):
+                raise BadRequestException("API Key is expired")
+            return {
+                "user_id": verified_api_key.user_id,
+                "api_id": verified_api_key.api_id
+            }
+
+        # captured before the database lookups, so the key is not cached if it is revoked while it is validated
+        cache_generation = self.verified_api_key_cache.get_generation()
+        secure_encryptor: SecureEncryptor = await self.secure_encryptor_factory.get_or_create_secure_encryptor()
+
         try:
             decode_final_api_key = base64.urlsafe_b64decode(paig_app_api_key.encode()).decode('utf-8')
         except Exception as e:
@@ -70,7 +86,7 @@ class APIKeyValidator:
             raise BadRequestException("Invalid API key")
         try:
             level2_key_value = secure_encryptor.decrypt(level2_encrypted_key.paig_key_value)
-            decryptedData2 = apikey_decrypt(level2_encrypted_data, level2_key_value, "v2")
+            decryptedData2 = await apikey_decrypt_async(level2_encrypted_data, level2_key_value, "v2")
         except Exception as e:
             logger.error("Invalid API key", exc_info=e)
             raise BadRequestException("Invalid API key")
@@ -91,7 +107,7 @@ class APIKeyValidator:
 
         try:
             level1_key_value = secure_encryptor.decrypt(level1_encrypted_key.paig_key_value)
-            decryptedData1 = apikey_decrypt(level1_encrypted_data, level1_key_value, "v2")
+            decryptedData1 = await apikey_decrypt_async(level1_encrypted_data, level1_key_value, "v2")
         except Exception as e:
             logger.error("Invalid API key", exc_info=e)
             raise BadRequestException("Invalid API key")
@@ -109,6 +125,9 @@ class APIKeyValidator:
         if not validate_token_expiry_time(int(token_expiry_epoch_time)):
             raise BadRequestException("API Key is expired")
 
+        self.verified_api_key_cache.put(api_key_hash, api_key.id, user_id, api_id, int(token_expiry_epoch_time),
+                                        generation=cache_generation)
+
         return {
             "user_id": user_id,
             "api_id": api_id
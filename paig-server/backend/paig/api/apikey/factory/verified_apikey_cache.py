@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from threading import Lock
+from typing import Optional
+
+from core.config import load_config_file
+from core.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+conf = load_config_file()
+
+
+@dataclass(frozen=True)
+class VerifiedAPIKey:
+    """
+    The identity resolved from an API key which passed the validation.
+
+    Attributes:
+        api_key_id (int): The database id of the API key.
+        user_id (int): The id of the user who created the API key.
+        api_id (int): The id of the AI application of the API key.
+        token_expiry_epoch_time (int): The expiry time of the API key.
+        cached_until (float): The monotonic time after which the entry must be validated again.
+    """
+    api_key_id: int
+    user_id: int
+    api_id: int
+    token_expiry_epoch_time: int
+    cached_until: float
+
+
+def hash_api_key(api_key: str) -> bytes:
+    """
+    Returns the SHA-256 digest of the presented API key, used as cache key so that the raw keys are not kept in memory.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).digest()
+
+
+class VerifiedAPIKeyCache(Singleton):
+    """
+    Bounded cache of the API keys which passed the validation, keyed by the hash of the presented key.
+
+    A validation reads the API key and the level-1 and level-2 keys from the database and decrypts the key twice, a
+    cached key is validated with one hash and one dict lookup. Entries are removed when their API key is disabled or
+    deleted, when an application is deleted and when the level-1 or level-2 keys are rotated or deleted. The changes
+    made by other server processes are picked up once the entries expire.
+
+    Every removal bumps the generation of the cache. A validation captures the generation before it reads the key from
+    the database and passes it to put, so a key disabled or deleted while it was being validated is not cached again.
+    Configurable limits (api_key section):
+        validation_cache_max_size: Maximum number of cached API keys, 0 disables the cache.
+        validation_cache_ttl_sec: Time a validated API key is reused before it is validated again.
+    """
+
+    def __init__(self):
+        if self.is_instance_initialized():
+            return
+        api_key_config = conf.get("api_key") or {}
+        self.max_size = int(api_key_config.get("validation_cache_max_size", 1000))
+        self.ttl_sec = float(api_key_config.get("validation_cache_ttl_sec", 300))
+        self.cache = OrderedDict()
+        self.generation = 0
+        self.lock = Lock()
+
+    def get_generation(self) -> int:
+        """
+        Returns the generation of the cache, to be passed to put by a validation starting its database lookups.
+        """
+        with self.lock:
+            return self.generation
+
+    def get(self, api_key_hash: bytes) -> Optional[VerifiedAPIKey]:
+        """
+        Returns the verified API key of the given hash, or None if it is not cached or expired.
+        """
+        with self.lock:
+            verified_api_key = self.cache.get(api_key_hash)
+            if verified_api_key is None:
+                return None
+            if verified_api_key.cached_until <= time.monotonic():
+                del self.cache[api_key_hash]
+                return None
+            self.cache.move_to_end(api_key_hash)
+            return verified_api_key
+
+    def put(self, api_key_hash: bytes, api_key_id: int, user_id: int, api_id: int, token_expiry_epoch_time: int,
+            generation: Optional[int] = None):
+        """
+        Caches the identity resolved from a validated API key, unless entries were removed since the given generation
+        was captured.
+        """
+        if self.max_size <= 0:
+            return
+        verified_api_key = VerifiedAPIKey(api_key_id=api_key_id, user_id=user_id, api_id=api_id,
+                                          token_expiry_epoch_time=token_expiry_epoch_time,
+                                          cached_until=time.monotonic() + self.ttl_sec)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.cache.pop(api_key_hash, None)
+            while len(self.cache) >= self.max_size:
+                self.cache.popitem(last=False)
+            self.cache[api_key_hash] = verified_api_key
+
+    def invalidate_api_key(self, api_key_id: int):
+        """
+        Removes the entries of the API key with the given database id, called when the key is disabled or deleted.
+        """
+        self._invalidate(lambda verified_api_key: verified_api_key.api_key_id == api_key_id)
+
+    def invalidate_application(self, application_id: int):
+        """
+        Removes the entries of all the API keys of the given application, called when the application is deleted.
+        """
+        self._invalidate(lambda verified_api_key: verified_api_key.api_id == application_id)
+
+    def clear(self):
+        """
+        Removes all the entries, called when the level-1 or level-2 keys are rotated or deleted.
+        """
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+
+    def _invalidate(self, predicate):
+        with self.lock:
+            self.generation += 1
+            for api_key_hash in [key for key, value in self.cache.items() if predicate(value)]:
+                del self.cache[api_key_hash]
+
+
+def invalidates_verified_api_key(function):
+    """
+    Decorator removing the cached entries of the API key, passed as first argument after self, once the decorated
+    function completed. Apply it above @Transactional, so that a validation running before the change is committed
+    cannot cache the key again.
+    """
+    @wraps(function)
+    async def decorator(self, key_id, *args, **kwargs):
+        result = await function(self, key_id, *args, **kwargs)
+        VerifiedAPIKeyCache().invalidate_api_key(key_id)
+        return result
+
+    return decorator
+
+
+def invalidates_verified_application(function):
+    """
+    Decorator removing the cached entries of the API keys of the application, passed as first argument after self,
+    once the decorated function completed. Apply it above @Transactional, like invalidates_verified_api_key.
+    """
+    @wraps(function)
+    async def decorator(self, application_id, *args, **kwargs):
+        result = await function(self, application_id, *args, **kwargs)
+        VerifiedAPIKeyCache().invalidate_application(application_id)
+        return result
+
+    return decorator
+
+
+def clears_verified_api_keys(function):
+    """
+    Decorator removing all the cached entries once the decorated function completed, for the changes of the level-1 or
+    level-2 keys. Apply it above @Transactional, like invalidates_verified_api_key.
+    """
+    @wraps(function)
+    async def decorator(*args, **kwargs):
+        result = await function(*args, **kwargs)
+        VerifiedAPIKeyCache().clear()
+        return result
+
+    return decorator
@@ -13,7 +13,8 @@ from core.db_session.transactional import Transactional, Propagation
 from api.apikey.utils import convert_token_expiry_to_epoch_time, validate_token_expiry_time, short_uuid, get_default_token_expiry_epoch_time, APIKeyStatus
 from core.exceptions import BadRequestException
 from core.exceptions.error_messages_parser import get_error_message, ERROR_FIELD_INVALID
-from api.apikey.factory.apikey_secure_encryptor import apikey_encrypt, mask_api_key, apikey_decrypt
+from api.apikey.factory.apikey_secure_encryptor import apikey_encrypt_async, mask_api_key
+from api.apikey.factory.verified_apikey_cache import invalidates_verified_api_key
 from core.exceptions import NotFoundException
 from core.constants import DEFAULT_TENANT_ID, DEFAULT_SCOP_ID
 import base64
@@ -97,11 +98,11 @@ class PaigApiKeyService(BaseController[PaigApiKeyModel, PaigApiKeyView]):
             separator=COLON_SEPARATOR
         )
 
-        level1_encrypted_data = apikey_encrypt(user_data, level1_decrypted_key)
+        level1_encrypted_data = await apikey_encrypt_async(user_data, level1_decrypted_key)
 
 
         level2_data = str(level1_encrypted_key.key_id) + COLON_SEPARATOR + level1_encrypted_data
-        level2_encrypted_data = apikey_encrypt(level2_data, level2_decrypted_key)
+        level2_encrypted_data = await apikey_encrypt_async(level2_data, level2_decrypted_key)
 
 
         api_key_temp = str(api_key_uuid) + COLON_SEPARATOR + "2" + COLON_SEPARATOR + str(level2_encrypted_key.key_id) + COLON_SEPARATOR + level2_encrypted_data + SEMI_COLON_SEPARATOR + shield_server_url
@@ -127,14 +128,17 @@ class PaigApiKeyService(BaseController[PaigApiKeyModel, PaigApiKeyView]):
         return paig_app_api_key_dict
 
 
+    @invalidates_verified_api_key
     @Transactional(propagation=Propagation.REQUIRED)
     async def disable_api_key(self, key_id: int):
         paig_app_api_key =  await self.repository.disable_api_key(key_id)
         return paig_app_api_key.to_ui_dict()
 
+    @invalidates_verified_api_key
     @Transactional(propagation=Propagation.REQUIRED)
     async def permanent_delete_api_key(self, key_id: int):
-        return await self.repository.permanent_delete_api_key(key_id)
+        result = await self.repository.permanent_delete_api_key(key_id)
+        return result
 
 
     async def get_paig_api_key_by_uuid(self, key_uuid: str):
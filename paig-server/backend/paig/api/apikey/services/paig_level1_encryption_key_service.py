@@ -9,6 +9,7 @@ from api.encryption.factory.secure_encryptor_factory import SecureEncryptorFacto
 from core.exceptions import NotFoundException
 from api.apikey.utils import generate_hex_key, short_uuid, EncryptionKeyStatus
 from core.db_session.transactional import Transactional, Propagation
+from api.apikey.factory.verified_apikey_cache import clears_verified_api_keys
 
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,7 @@ class PaigLevel1EncryptionKeyService(BaseController[PaigLevel1EncryptionKeyModel
         return await self.repository.get_paig_level1_encryption_key_by_uuid(key_uuid)
 
 
+    @clears_verified_api_keys
     @Transactional(propagation=Propagation.REQUIRED)
     async def create_paig_level1_encryption_key(self):
         repository = self.get_repository()
@@ -85,6 +87,8 @@ class PaigLevel1EncryptionKeyService(BaseController[PaigLevel1EncryptionKeyModel
         return response
 
 
+    @clears_verified_api_keys
+    @Transactional(propagation=Propagation.REQUIRED)
     async def delete_paig_level1_encryption_key(self, key_id: str):
         return await self.repository.delete_by(filters={"id": key_id})
 
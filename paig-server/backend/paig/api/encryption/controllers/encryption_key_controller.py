@@ -4,7 +4,7 @@ from core.controllers.paginated_response import Pageable
 from core.db_session import Transactional, Propagation
 from api.encryption.api_schemas.encryption_key import EncryptionKeyFilter, EncryptionKeyView
 from api.encryption.database.db_models.encryption_key_model import EncryptionKeyType, EncryptionKeyStatus
-from api.encryption.services.encryption_key_service import EncryptionKeyService
+from api.encryption.services.encryption_key_service import EncryptionKeyService, notifies_encryption_key_change
 from core.utils import SingletonDepends
 
 
@@ -37,6 +37,7 @@ class EncryptionKeyController:
             filter.key_status = EncryptionKeyStatus.ACTIVE.value + "," + EncryptionKeyStatus.PASSIVE.value
         return await self.encryption_key_service.list_encryption_keys(filter, page_number, size, sort)
 
+    @notifies_encryption_key_change
     @Transactional(propagation=Propagation.REQUIRED)
     async def create_encryption_key(self, key_type: EncryptionKeyType = EncryptionKeyType.MSG_PROTECT_SHIELD) -> (
             EncryptionKeyView):
@@ -87,6 +88,7 @@ class EncryptionKeyController:
         """
         return await self.encryption_key_service.get_active_encryption_key_by_type(key_type)
 
+    @notifies_encryption_key_change
     @Transactional(propagation=Propagation.REQUIRED)
     async def delete_disabled_encryption_key(self, id: int):
         """
@@ -97,6 +99,7 @@ class EncryptionKeyController:
         """
         return await self.encryption_key_service.delete_disabled_encryption_key(id)
 
+    @notifies_encryption_key_change
     @Transactional(propagation=Propagation.REQUIRED)
     async def disable_passive_encryption_key(self, id: int):
         """
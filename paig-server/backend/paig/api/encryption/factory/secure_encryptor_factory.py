@@ -2,11 +2,24 @@ from api.encryption.database.db_models.encryption_master_key_model import Encryp
 from api.encryption.database.db_operations.encryption_master_key_repository import EncryptionMasterKeyRepository
 from api.encryption.utils.secure_encryptor import SecureEncryptor
 from core.utils import SingletonDepends
-from typing import Optional
+from opentelemetry import metrics
+from threading import Lock
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter(__name__)
 
 
 
 class SecureEncryptorFactory:
+    """
+    Creates the SecureEncryptor of the active master key and caches it in memory, keyed by the master key id, so the
+    master key is read from the database and its cipher is built once per process rather than on every use.
+    Call invalidate_secure_encryptors when the master key is rotated, the next call then loads the active master key
+    again.
+    """
     _instance = None
 
     def __new__(cls, *args, **kwargs):
@@ -19,7 +32,13 @@ class SecureEncryptorFactory:
         if self._initialized:
             return
         self.encryption_master_key_repository = encryption_master_key_repository
-        self.secure_encryptor: Optional[SecureEncryptor] = None
+        self.secure_encryptors: Dict[int, SecureEncryptor] = {}
+        self.active_master_key_id: Optional[int] = None
+        self.lock = Lock()
+        self.cache_counter = meter.create_counter(
+            name="secure_encryptor_cache_count",
+            description="Number of SecureEncryptor lookups, by result of the master key cache lookup"
+        )
         self._initialized = True
 
     async def get_or_create_secure_encryptor(self) -> SecureEncryptor:
@@ -29,7 +48,35 @@ class SecureEncryptorFactory:
         Returns:
             SecureEncryptor: The secure encryptor instance.
         """
-        if self.secure_encryptor is None:
-            master_key: EncryptionMasterKeyModel = await self.encryption_master_key_repository.get_active_encryption_master_key()
-            self.secure_encryptor = SecureEncryptor(master_key.key)
-        return self.secure_encryptor
+        secure_encryptor = self.secure_encryptors.get(self.active_master_key_id)
+        if secure_encryptor is not None:
+            self.cache_counter.add(1, {"result": "hit"})
+            return secure_encryptor
+
+        self.cache_counter.add(1, {"result": "miss"})
+        master_key: EncryptionMasterKeyModel = await self.encryption_master_key_repository.get_active_encryption_master_key()
+        with self.lock:
+            secure_encryptor = self.secure_encryptors.get(master_key.id)
+            if secure_encryptor is None:
+                secure_encryptor = SecureEncryptor(master_key.key, master_key_id=master_key.id)
+                self.secure_encryptors[master_key.id] = secure_encryptor
+            self.active_master_key_id = master_key.id
+        return secure_encryptor
+
+    def invalidate_secure_encryptors(self, master_key_id: Optional[int] = None):
+        """
+        Removes the cached SecureEncryptor of the given master key, or all of them, called when the master key is
+        rotated.
+
+        Args:
+            master_key_id (Optional[int]): The id of the master key to remove, None removes all the master keys.
+        """
+        with self.lock:
+            if master_key_id is None:
+                self.secure_encryptors.clear()
+            else:
+                self.secure_encryptors.pop(master_key_id, None)
+            if self.active_master_key_id not in self.secure_encryptors:
+                self.active_master_key_id = None
+        logger.info(f"Invalidated the cached secure encryptors of master key "
+                    f"{'all' if master_key_id is None else master_key_id}")
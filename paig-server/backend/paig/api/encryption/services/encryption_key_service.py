@@ -1,5 +1,6 @@
 import logging
-from typing import List
+from functools import wraps
+from typing import Callable, List
 from paig_common.encryption import RSAKeyInfo, RSAKeyUtil
 
 from core.controllers.base_controller import BaseController
@@ -17,6 +18,49 @@ from api.encryption.utils.secure_encryptor import SecureEncryptor
 
 logger = logging.getLogger(__name__)
 
+_encryption_key_change_listeners = []
+
+
+def add_encryption_key_change_listener(listener: Callable[[], None]):
+    """
+    Registers a function called every time the encryption keys are created, disabled or deleted, so that the local
+    consumers of the keys can reload them without waiting for their next refresh.
+    """
+    _encryption_key_change_listeners.append(listener)
+
+
+def remove_encryption_key_change_listener(listener: Callable[[], None]):
+    """
+    Unregisters a function registered with add_encryption_key_change_listener.
+    """
+    if listener in _encryption_key_change_listeners:
+        _encryption_key_change_listeners.remove(listener)
+
+
+def notify_encryption_key_change_listeners():
+    """
+    Calls all the registered encryption key change listeners.
+    """
+    for listener in list(_encryption_key_change_listeners):
+        try:
+            listener()
+        except Exception as e:
+            logger.error(f"Encryption key change listener {listener} failed. Error: {e}")
+
+
+def notifies_encryption_key_change(function):
+    """
+    Decorator notifying the encryption key change listeners after the decorated function completed. Apply it above
+    @Transactional, so that the listeners reload the keys once the change is committed.
+    """
+    @wraps(function)
+    async def decorator(*args, **kwargs):
+        result = await function(*args, **kwargs)
+        notify_encryption_key_change_listeners()
+        return result
+
+    return decorator
+
 
 class EncryptionKeyRequestValidator:
     """
@@ -5,6 +5,14 @@ from typing import Union
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.padding import PKCS7
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+cipher_build_counter = meter.create_counter(
+    name="secure_encryptor_cipher_build_count",
+    description="Number of AES ciphers built from the master key, the reused ciphers are not counted"
+)
 
 
 class SecureEncryptor:
@@ -26,12 +34,13 @@ class SecureEncryptor:
     TIMESTAMP_ON_CRYPT = True
     KEY_SIZE_IN_BYTES = 16
 
-    def __init__(self, master_key: str):
+    def __init__(self, master_key: str, master_key_id: int = None):
         """
         Initializes the SecureEncryptor with the provided master key.
 
         Args:
             master_key (str): The master key for encryption and decryption.
+            master_key_id (int): The id of the master key, if it is stored in the database.
 
         Raises:
             ValueError: If the master key is None or empty.
@@ -41,8 +50,11 @@ class SecureEncryptor:
 
         self.master_key_in_bytes = self.make_fixed_length_key(master_key.encode(), self.KEY_SIZE_IN_BYTES)
         self.secret_key = self.master_key_in_bytes
+        self.master_key_id = master_key_id
         self.backend = default_backend()
         self.logger = logging.getLogger(self.__class__.__name__)
+        # the secret key and the cipher built from it, replaced together
+        self._cipher_entry = None
 
     # noinspection PyMethodMayBeStatic
     def make_fixed_length_key(self, key: bytes, length: int) -> bytes:
@@ -60,6 +72,22 @@ class SecureEncryptor:
             key += key * (length // len(key)) + key[:length % len(key)]
         return key[:length]
 
+    def get_cipher(self) -> Cipher:
+        """
+        Returns the AES cipher of the secret key. The cipher is built once and reused, each encryption and decryption
+        only creates its own single-use context from it.
+
+        Returns:
+            Cipher: The AES cipher of the secret key.
+        """
+        cipher_entry = self._cipher_entry
+        if cipher_entry is None or cipher_entry[0] is not self.secret_key:
+            cipher_entry = (self.secret_key,
+                            Cipher(self.CIPHER_ALGO(self.secret_key), modes.ECB(), backend=self.backend))
+            self._cipher_entry = cipher_entry
+            cipher_build_counter.add(1)
+        return cipher_entry[1]
+
     def encrypt(self, text: str) -> Union[str, None]:
         """
         Encrypts the provided text.
@@ -77,7 +105,7 @@ class SecureEncryptor:
             return None
 
         try:
-            cipher = Cipher(self.CIPHER_ALGO(self.secret_key), modes.ECB(), backend=self.backend)
+            cipher = self.get_cipher()
             encryptor = cipher.encryptor()
             padder = PKCS7(128).padder()
 
@@ -115,7 +143,7 @@ class SecureEncryptor:
             encoded_encrypted_bytes = encrypted_text[self.PREFIX_ENCRYPT_TEXT_LEN:].encode()
             encrypted_bytes = base64.b64decode(encoded_encrypted_bytes)
 
-            cipher = Cipher(self.CIPHER_ALGO(self.secret_key), modes.ECB(), backend=self.backend)
+            cipher = self.get_cipher()
             decryptor = cipher.decryptor()
             decrypted_padded_bytes = decryptor.update(encrypted_bytes) + decryptor.finalize()
 
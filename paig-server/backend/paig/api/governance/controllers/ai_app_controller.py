@@ -3,6 +3,7 @@ from typing import List
 
 from core.controllers.paginated_response import Pageable
 from core.db_session import Transactional, Propagation
+from api.apikey.factory.verified_apikey_cache import invalidates_verified_application
 from api.governance.api_schemas.ai_app import AIApplicationView, AIApplicationFilter, GuardrailApplicationsAssociation
 from api.governance.api_schemas.ai_app_config import AIApplicationConfigView
 from api.governance.api_schemas.ai_app_policy import AIApplicationPolicyView
@@ -116,6 +117,8 @@ class AIAppController:
         await background_capture_event(event=UpdateAIApplicationEvent())
         return updated_app
 
+    # the API keys of the application are deleted with it
+    @invalidates_verified_application
     @Transactional(propagation=Propagation.REQUIRED)
     async def delete_ai_application(self, id: int):
         """
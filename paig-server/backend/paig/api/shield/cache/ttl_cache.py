@@ -0,0 +1,135 @@
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+meter = metrics.get_meter(__name__)
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    A bounded cache whose items expire a fixed time after they were put, however often they are read.
+
+    Unlike LRUCache, which evicts items that were not accessed for a while, TTLCache is meant for values that become
+    stale, like temporary credentials or remote evaluation results. When the cache is full the least recently used
+    item is evicted. Expired items are removed when they are read or when the cache is full, so there is no cleanup
+    thread.
+
+    Args:
+        cache_name (str): The name of the cache, used as prefix of the cache metrics.
+        capacity (int): The maximum number of items the cache can hold.
+        ttl_sec (float): The time (in seconds) an item stays in the cache after it was put.
+    """
+
+    def __init__(self, cache_name, capacity, ttl_sec):
+        self.cache = OrderedDict()
+        self.capacity = capacity
+        self.ttl_sec = ttl_sec
+        self.lock = Lock()
+        self.cache_name = cache_name
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # OTel metrics
+        self.cache_size_metric = meter.create_observable_gauge(
+            name=self.cache_name + "_cache_size",
+            callbacks=[self.get_cache_size],
+            description="The current size of the cache"
+        )
+
+        self.cache_hit_ratio_metric = meter.create_observable_gauge(
+            name=self.cache_name + "_cache_hit_ratio",
+            callbacks=[self.get_cache_hit_ratio],
+            description="The cache hit ratio"
+        )
+
+    def get(self, key):
+        """
+        Retrieve a value from the cache by key.
+
+        Args:
+            key (Hashable): The key to retrieve the value for.
+
+        Returns:
+            Any: The value associated with the key, or None if the key is not found or expired.
+        """
+        with self.lock:
+            item = self.cache.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at > time.monotonic():
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self.cache.pop(key)
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Put a key-value pair into the cache.
+
+        Args:
+            key (Hashable): The key of the item to be stored.
+            value (Any): The value to be stored.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if key in self.cache:
+                self.cache.pop(key)
+            elif len(self.cache) >= self.capacity:
+                self._evict()
+            self.cache[key] = (value, time.monotonic() + self.ttl_sec)
+
+    def _evict(self):
+        now = time.monotonic()
+        expired_keys = [key for key, (_, expires_at) in self.cache.items() if expires_at <= now]
+        for key in expired_keys:
+            self.cache.pop(key)
+        if not expired_keys:
+            self.cache.popitem(last=False)
+        self.evictions += max(1, len(expired_keys))
+
+    def clear(self):
+        """
+        Remove all the items from the cache.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.cache.clear()
+
+    def get_cache_size(self, options):
+        """
+        Get the current size of the cache.
+
+        Returns:
+            Iterable[Observation]: The current number of items in the cache.
+        """
+        with self.lock:
+            return [Observation(value=len(self.cache))]
+
+    def get_cache_hit_ratio(self, options):
+        """
+        Get the cache hit ratio.
+
+        Returns:
+            Iterable[Observation]: The cache hit ratio.
+        """
+        with self.lock:
+            total_accesses = self.hits + self.misses
+            if total_accesses == 0:
+                return [Observation(value=0.0)]
+            return [Observation(value=self.hits / total_accesses)]
@@ -26,6 +26,9 @@ class HttpAccountServiceClient(AsyncBaseRESTHttpClient, IAccountServiceClient):
 
            get_all_encryption_keys(tenant_id):
                Retrieves all encryption keys for a specific tenant from the account service API.
+
+       The keys are fetched with a conditional request when the account service returned an ETag for them, so
+       unchanged keys are not transferred again.
        """
 
     def __init__(self):
@@ -35,6 +38,8 @@ class HttpAccountServiceClient(AsyncBaseRESTHttpClient, IAccountServiceClient):
         super().__init__(config_utils.get_property_value("account_service_base_url"))
         self.account_service_request_histogram = meter.create_histogram("account_service_request_duration", "ms",
                                                                         "Histogram for account_service request")
+        # tenant id -> (ETag, keys) of the last keys received
+        self.encryption_keys_etags = {}
 
     @staticmethod
     def get_headers(tenant_id: str):
@@ -70,17 +75,30 @@ class HttpAccountServiceClient(AsyncBaseRESTHttpClient, IAccountServiceClient):
         logger.debug(f"Using base-url={self.baseUrl} uri={url} for tenant-id={tenant_id}")
         request_start_time = time.perf_counter()
         response = None
+        headers = self.get_headers(tenant_id)
+        cached_etag, cached_keys = self.encryption_keys_etags.get(tenant_id, (None, None))
+        if cached_etag:
+            headers["If-None-Match"] = cached_etag
         try:
 
             response = await self.get(
                 url=url,
-                headers=self.get_headers(tenant_id)
+                headers=headers
             )
 
             logger.debug(f"response received: {response.__str__()}")
 
+            if response.status_code == 304 and cached_etag:
+                logger.debug(f"Encryption keys of tenant-id={tenant_id} not modified")
+                return cached_keys
             if response.status_code == 200:
-                return response.json()
+                encryption_keys = response.json()
+                etag = response.headers.get("ETag")
+                if etag:
+                    self.encryption_keys_etags[tenant_id] = (etag, encryption_keys)
+                else:
+                    self.encryption_keys_etags.pop(tenant_id, None)
+                return encryption_keys
             else:
                 error_message = (f"Request all_latest_encryption_key({tenant_id}) failed "
                                  f"with status code {response.status_code}: {response.text}")
@@ -63,3 +63,31 @@ class FluentdRestHttpClient(BaseRESTHttpClient):
         except Exception as ex:
             logger.error(f"Failed to log message: {message} with error: {ex}")
             raise ShieldException(f"Failed to log message: {message} with error: {ex}")
+
+    def log_messages(self, messages: list):
+        """
+        Sends a batch of log messages to the Fluentd service in a single request, the Fluentd http input accepts an
+        array of records.
+
+        Args:
+            messages (list): The messages to be logged.
+
+        Raises:
+            ShieldException: If an error occurs while logging the messages.
+        """
+        logger.debug(f"Using base-url={self.baseUrl} , tag={self.audit_tag} and logging {len(messages)} messages")
+        try:
+            response = self.post(
+                url="/" + self.audit_tag,
+                headers=self.get_headers(),
+                json=messages
+            )
+            logger.debug(f"logging response received: {response.__str__()}")
+            if response.status_code == 200:
+                logger.debug(f"Successfully logged {len(messages)} messages")
+            else:
+                logger.error(f"Failed to log {len(messages)} messages with response: {response.__str__()}")
+                raise ShieldException(f"Failed to log {len(messages)} messages with response: {response.__str__()}")
+        except Exception as ex:
+            logger.error(f"Failed to log {len(messages)} messages with error: {ex}")
+            raise ShieldException(f"Failed to log {len(messages)} messages with error: {ex}")
@@ -7,9 +7,12 @@ import json
 import logging
 
 from core.utils import SingletonDepends
+from paig_common.encryption import DataEncryptor
 
 logger = logging.getLogger(__name__)
 
+ENCRYPTION_MODES_HEADER = "x-paig-encryption-modes"
+
 
 class ShieldController:
     """
@@ -63,8 +66,10 @@ class ShieldController:
                                                     shield_plugin_key_id,
                                                     application_key)
 
+        # advertise the encryption modes the plugin can use for the request messages
         return Response(content=f"Initialization completed successfully for tenant {x_tenant_id}",
-                        media_type="text/plain")
+                        media_type="text/plain",
+                        headers={ENCRYPTION_MODES_HEADER: ",".join(DataEncryptor.SUPPORTED_ENCRYPTION_MODES)})
 
     async def authorize(self, request, x_tenant_id, x_user_role):
         """
@@ -79,15 +84,13 @@ class ShieldController:
             Response: A JSON response containing the authorization result.
         """
         logger.debug(f"Authorization started for tenant: {x_tenant_id}")
-        masked_req_obj = json_utils.mask_json_fields(json.dumps(request), ['messages'])
-        logger.debug(f"Incoming request: {masked_req_obj}")
+        logger.debug("Incoming request: %s", json_utils.LazyMaskedJson(request, ['messages']))
 
         auth_request = AuthorizeRequest(request, x_tenant_id, x_user_role)
         auth_response = await self.shield_service.authorize(auth_req=auth_request)
 
         response = json.dumps(auth_response.__dict__)
-        masked_res_obj = json_utils.mask_json_fields(response, ['responseText'])
-        logger.debug(f"Outgoing response: {masked_res_obj}")
+        logger.debug("Outgoing response: %s", json_utils.LazyMaskedJson(auth_response.__dict__, ['responseText']))
 
         return Response(content=response, media_type="application/json")
 
@@ -103,8 +106,7 @@ class ShieldController:
         Returns:
             Response: A JSON response containing the VectorDB authorization result.
         """
-        masked_req_obj = json_utils.mask_json_fields(json.dumps(request), ['messages'])
-        logger.debug(f"Incoming request {masked_req_obj}")
+        logger.debug("Incoming request %s", json_utils.LazyMaskedJson(request, ['messages']))
 
         if not x_tenant_id:
             raise BadRequestException("Missing x-tenant-id in request")
@@ -123,8 +125,7 @@ class ShieldController:
         Returns:
             Response: A JSON response indicating the success of the audit operation.
         """
-        masked_req_obj = json_utils.mask_json_fields(json.dumps(request), ['messages'])
-        logger.debug(f"Incoming request: {masked_req_obj}")
+        logger.debug("Incoming request: %s", json_utils.LazyMaskedJson(request, ['messages']))
 
         audit_response = await self.shield_service.audit(request)
         response_data = {
@@ -133,6 +134,27 @@ class ShieldController:
         }
         return Response(content=json.dumps(response_data), media_type="application/json")
 
+    async def audit_batch(self, requests):
+        """
+        Audits a batch of requests and logs the data.
+
+        Args:
+            requests (list): The audit requests, each as sent to the audit endpoint.
+
+        Returns:
+            Response: A JSON response indicating the success of the audit operation.
+        """
+        if not isinstance(requests, list) or not all(isinstance(request, dict) for request in requests):
+            raise BadRequestException("Audit batch must be a list of audit records")
+        logger.debug("Incoming audit batch of %d records", len(requests))
+
+        audit_responses = await self.shield_service.audit_batch(requests)
+        response_data = {
+            "message": f"Audited {len(audit_responses)} records Successfully",
+            "status": 200,
+        }
+        return Response(content=json.dumps(response_data), media_type="application/json")
+
     async def guardrail_test(self, request, tenant_id, user_role):
         """
         Handles the guardrail test request.
@@ -142,8 +164,7 @@ class ShieldController:
         Returns:
             Response: A JSON response indicating the success of the guardrail test operation.
         """
-        masked_req_obj = json_utils.mask_json_fields(json.dumps(request), ['messages'])
-        logger.debug(f"Incoming request: {masked_req_obj}")
+        logger.debug("Incoming request: %s", json_utils.LazyMaskedJson(request, ['messages']))
 
         response = await self.shield_service.guardrail_test(request, tenant_id, user_role)
 
@@ -1,9 +1,11 @@
 import os
+from typing import List
 
-from paig_common.audit_spooler import AuditLogger
+from paig_common.audit_spooler import AuditLogger, AuditSpooler
 
 from api.shield.client.http_fluentd_client import FluentdRestHttpClient
 from api.shield.model.shield_audit import ShieldAudit
+from api.shield.utils import config_utils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,21 @@ def create_message_log_path(directory_path):
     logger.debug(f"log path '{directory_path}' created successfully.")
 
 
+def get_audit_logger_kwargs():
+    """
+    Returns the batching, retry and spool settings of the audit loggers.
+    """
+    return {
+        "max_batch_size": config_utils.get_property_value_int("audit_event_batch_max_size", 100),
+        "max_batch_wait_ms": config_utils.get_property_value_int("audit_event_batch_max_wait_ms", 100),
+        "retry_initial_delay_sec": config_utils.get_property_value_float("audit_event_retry_initial_delay_sec", 1),
+        "retry_max_delay_sec": config_utils.get_property_value_float("audit_event_retry_max_delay_sec", 120),
+        "spool_max_size_bytes": config_utils.get_property_value_int("audit_spool_max_size_mb", 0) * 1024 * 1024,
+        "spool_eviction_policy": config_utils.get_property_value("audit_spool_eviction_policy", None) or
+                                 AuditSpooler.EVICTION_POLICY_DROP_OLDEST
+    }
+
+
 class FluentdAuditLogger(AuditLogger):
     """
     FluentAuditLogger class for logging audit events to Fluentd.
@@ -31,9 +48,9 @@ class FluentdAuditLogger(AuditLogger):
             max_queue_size (int): The maximum queue size.
             audit_event_queue_timeout_sec (int): The audit event queue timeout in seconds.
         """
-        # Setting max_queue_size to 0 to make the queue size infinite
         super().__init__(audit_spool_dir=audit_spool_dir, audit_event_cls=ShieldAudit,
-                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec)
+                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec,
+                         **get_audit_logger_kwargs())
         self.http_fluentd_client = http_fluentd_client
 
     def push_audit_event_to_server(self, audit_event: ShieldAudit):
@@ -45,6 +62,15 @@ class FluentdAuditLogger(AuditLogger):
         """
         self.http_fluentd_client.log_message(audit_event.to_payload_dict())
 
+    def push_audit_events_to_server(self, audit_events: List[ShieldAudit]):
+        """
+        Pushes the batch of audit events to the server in a single request.
+
+        Args:
+            audit_events (List[ShieldAudit]): The audit events to push.
+        """
+        self.http_fluentd_client.log_messages([audit_event.to_payload_dict() for audit_event in audit_events])
+
 
 class S3AuditLogger(AuditLogger):
     """
@@ -64,10 +90,12 @@ class S3AuditLogger(AuditLogger):
             max_queue_size (int): The maximum queue size.
             audit_event_queue_timeout_sec (int): The audit event queue timeout in seconds.
         """
-        # Setting max_queue_size to 0 to make the queue size infinite
         super().__init__(audit_spool_dir=audit_spool_dir, audit_event_cls=ShieldAudit,
-                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec)
+                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec,
+                         **get_audit_logger_kwargs())
         self.log_message_in_s3 = log_message_in_s3
+        if self.log_message_in_s3.part_files_enabled is True:
+            self.log_message_in_s3.part_file_writer.start()
 
     def push_audit_event_to_server(self, audit_event: ShieldAudit):
         """
@@ -83,6 +111,19 @@ class S3AuditLogger(AuditLogger):
             f"Uploading logs to S3 bucket: {self.log_message_in_s3.bucket_name} with object key: {full_object_key}")
         self.log_message_in_s3.write_log_to_s3(full_object_key, audit_event)
 
+    def push_audit_events_to_server(self, audit_events: List[ShieldAudit]):
+        """
+        Pushes the batch of audit events to the part files of the S3 logger when they are enabled, the events are
+        acknowledged once they are staged on the local disk.
+
+        Args:
+            audit_events (List[ShieldAudit]): The audit events to push.
+        """
+        if self.log_message_in_s3.part_files_enabled is True:
+            self.log_message_in_s3.write_logs_to_part_files(audit_events)
+        else:
+            super().push_audit_events_to_server(audit_events)
+
 
 class LocalAuditLogger(AuditLogger):
     """
@@ -103,10 +144,12 @@ class LocalAuditLogger(AuditLogger):
             max_queue_size (int): The maximum queue size.
             audit_event_queue_timeout_sec (int): The audit event queue timeout in seconds.
         """
-        # Setting max_queue_size to 0 to make the queue size infinite
         super().__init__(audit_spool_dir=audit_spool_dir, audit_event_cls=ShieldAudit,
-                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec)
+                         max_queue_size=max_queue_size, audit_event_queue_timeout=audit_event_queue_timeout_sec,
+                         **get_audit_logger_kwargs())
         self.log_message_in_local = log_message_in_local
+        if self.log_message_in_local.rolling_files_enabled is True:
+            self.log_message_in_local.rolling_file_writer.start()
 
     def push_audit_event_to_server(self, audit_event: ShieldAudit):
         """
@@ -120,3 +163,15 @@ class LocalAuditLogger(AuditLogger):
         log_path = os.path.dirname(full_log_path)
         create_message_log_path(log_path)
         self.log_message_in_local.write_log_to_local_file(full_log_path, audit_event)
+
+    def push_audit_events_to_server(self, audit_events: List[ShieldAudit]):
+        """
+        Pushes the batch of audit events to the rolling files of the local logger when they are enabled.
+
+        Args:
+            audit_events (List[ShieldAudit]): The audit events to push.
+        """
+        if self.log_message_in_local.rolling_files_enabled is True:
+            self.log_message_in_local.write_logs_to_rolling_files(audit_events)
+        else:
+            super().push_audit_events_to_server(audit_events)
@@ -4,7 +4,7 @@ from datetime import datetime
 from api.shield.model.shield_audit import ShieldAudit
 from api.shield.utils import config_utils
 from api.shield.utils.custom_exceptions import ShieldException
-from paig_common.paig_exception import DiskFullException, AuditEventQueueFullException
+from paig_common.paig_exception import DiskFullException
 
 
 class LogMessageInFile:
@@ -21,7 +21,7 @@ class LogMessageInFile:
         """
         self.audit_failure_error_enabled = config_utils.get_property_value_boolean("audit_failure_error_enabled", True)
         self.audit_event_queue_timeout_sec = config_utils.get_property_value_int("audit_event_queue_timeout_sec", 5)
-        self.max_queue_size = config_utils.get_property_value_int("max_queue_size", 0)
+        self.max_queue_size = config_utils.get_property_value_int("max_queue_size", 10000)
 
     def create_file_structure(self, message_data: ShieldAudit) -> str:
         """
@@ -38,11 +38,26 @@ class LogMessageInFile:
         event_time_month = event_datetime.strftime("%m")
         event_time_day = event_datetime.strftime("%d")
 
-        folder_structure = f'tenant_id={message_data.tenantId}/year={event_time_year}/month={event_time_month}/day={event_time_day}'
+        folder_structure = self.create_partition_path(message_data)
         log_file_name = f'{message_data.tenantId}_{event_time_year}_{event_time_month}_{event_time_day}_{message_data.threadId}_{message_data.threadSequenceNumber}.json'
 
         return f'{folder_structure}/{log_file_name}'
 
+    @staticmethod
+    def create_partition_path(message_data: ShieldAudit) -> str:
+        """
+        Creates the tenant and event date partition folder of the audit data.
+
+        Args:
+            message_data (ShieldAudit): The audit data containing tenant ID and event time.
+
+        Returns:
+            str: The partition folder, e.g. tenant_id=1/year=2024/month=05/day=01.
+        """
+        event_datetime = datetime.fromtimestamp(message_data.eventTime/1000)
+        return (f'tenant_id={message_data.tenantId}/year={event_datetime.strftime("%Y")}/'
+                f'month={event_datetime.strftime("%m")}/day={event_datetime.strftime("%d")}')
+
     @abstractmethod
     def log(self, log_data: ShieldAudit):
         """
@@ -63,10 +78,6 @@ class LogMessageInFile:
             if self.audit_failure_error_enabled is True:
                 raise ShieldException("No space left on device. Disk is full. Please increase the disk size or free "
                                       "up some space to push audits successfully.")
-        except AuditEventQueueFullException:
-            if self.audit_failure_error_enabled is True:
-                raise ShieldException("Audit event queue is full.The push rate is too high for the audit "
-                                      "spooler to process.")
         except Exception as e:
             raise ShieldException(f"Failed to log audit record! for audit event: {audit_event} get exception: {e}")
 
@@ -3,6 +3,7 @@ import logging
 import traceback
 
 from api.shield.logfile.audit_loggers import LocalAuditLogger
+from api.shield.logfile.rolling_partition_file_writer import RollingPartitionFileWriter
 from api.shield.model.shield_audit import ShieldAudit
 from api.shield.utils import config_utils
 from api.shield.logfile.log_message_in_file import LogMessageInFile
@@ -25,6 +26,18 @@ class LogMessageInLocal(LogMessageInFile):
         self.local_audit_logger = None
         self.audit_spool_dir = config_utils.get_property_value("audit_spool_dir", "/workdir/shield/audit-spool")
 
+        # append the audits to rolling files per partition instead of writing a file per audit
+        self.rolling_files_enabled = config_utils.get_property_value_boolean("local_audit_rolling_files_enabled", True)
+        self.rolling_file_writer = None
+        if self.rolling_files_enabled is True:
+            self.rolling_file_writer = RollingPartitionFileWriter(
+                self.directory_path,
+                file_max_size_bytes=config_utils.get_property_value_int(
+                    "local_audit_file_max_size_mb", 128) * 1024 * 1024,
+                file_max_age_sec=config_utils.get_property_value_float("local_audit_file_max_age_sec", 3600),
+                fsync_interval_sec=config_utils.get_property_value_float("local_audit_fsync_interval_sec", 1),
+                index_block_events=config_utils.get_property_value_int("local_audit_index_block_events", 1000))
+
     async def log(self, log_data: ShieldAudit):
         """
         Logs the audit data to the local file system.
@@ -60,6 +73,25 @@ class LogMessageInLocal(LogMessageInFile):
             raise ShieldException(f"Error writing logs to local path=>{e.__class__}:{e}, Please check whether the "
                                   f"user has sufficient permission to write to the path")
 
+    def write_logs_to_rolling_files(self, log_data_list):
+        """
+        Appends the batch of audit data to the rolling files of their partitions.
+
+        Args:
+            log_data_list (List[ShieldAudit]): The audit data to log.
+
+        Raises:
+            ShieldException: If there is an error writing logs to the local path.
+        """
+        try:
+            self.rolling_file_writer.add_events([(self.create_partition_path(log_data), log_data.eventTime,
+                                                  log_data.__dict__) for log_data in log_data_list])
+        except Exception as e:
+            logger.error(f"Error writing logs to local path=>{e.__class__}:{e} , Please check whether the user has "
+                         f"sufficient permission to write to the path \n{traceback.format_exc()}")
+            raise ShieldException(f"Error writing logs to local path=>{e.__class__}:{e}, Please check whether the "
+                                  f"user has sufficient permission to write to the path")
+
     def get_or_create_local_audit_logger(self):
         if self.local_audit_logger is None:
             self.local_audit_logger = LocalAuditLogger(self, self.audit_spool_dir,
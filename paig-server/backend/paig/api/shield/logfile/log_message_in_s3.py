@@ -6,8 +6,10 @@ import logging
 
 from botocore.credentials import DeferredRefreshableCredentials
 from botocore.credentials import create_assume_role_refresher
+from paig_common.audit_spooler import AuditSpooler
 
 from api.shield.logfile.audit_loggers import S3AuditLogger
+from api.shield.logfile.s3_part_file_writer import S3PartFileWriter
 from api.shield.model.shield_audit import ShieldAudit
 from api.shield.utils import config_utils
 from api.shield.logfile.log_message_in_file import LogMessageInFile
@@ -64,6 +66,25 @@ class LogMessageInS3File(LogMessageInFile):
         self.s3_audit_logger = None
         self.audit_spool_dir = config_utils.get_property_value("audit_spool_dir", "/workdir/shield/audit-spool")
 
+        # buffer the audits into compressed NDJSON part files instead of writing an object per audit
+        self.part_files_enabled = config_utils.get_property_value_boolean("s3_audit_part_files_enabled", True)
+        self.part_file_writer = None
+        if self.part_files_enabled is True:
+            self.part_file_writer = S3PartFileWriter(
+                self.s3_client, self.bucket_name, self.bucket_prefix,
+                staging_dir=config_utils.get_property_value("s3_audit_staging_dir", None) or
+                "/workdir/shield/s3-audit-staging",
+                part_max_size_bytes=config_utils.get_property_value_int("s3_audit_part_max_size_mb", 64) * 1024 * 1024,
+                part_max_age_sec=config_utils.get_property_value_float("s3_audit_part_max_age_sec", 300),
+                multipart_threshold_bytes=config_utils.get_property_value_int(
+                    "s3_audit_multipart_threshold_mb", 16) * 1024 * 1024,
+                multipart_chunk_size_bytes=config_utils.get_property_value_int(
+                    "s3_audit_multipart_chunk_size_mb", 8) * 1024 * 1024,
+                staging_max_size_bytes=config_utils.get_property_value_int(
+                    "s3_audit_staging_max_size_mb", 0) * 1024 * 1024,
+                staging_eviction_policy=config_utils.get_property_value("s3_audit_staging_eviction_policy", None) or
+                AuditSpooler.EVICTION_POLICY_DROP_OLDEST)
+
     def init_s3_client(self):
         """
         Initializes the S3 client based on the connection mode specified in the configuration.
@@ -72,6 +93,8 @@ class LogMessageInS3File(LogMessageInFile):
             ShieldException: If the S3 connection mode is invalid or required credentials are not provided.
         """
         s3_connection_mode = config_utils.get_property_value("s3_connection_mode", None)
+        # endpoint of an S3 compatible service, e.g. a local stub, None means the AWS endpoint
+        endpoint_url = config_utils.get_property_value("s3_endpoint_url", None) or None
         if s3_connection_mode == "keys":
             # this will use the credentials from properties file
             access_key = config_utils.get_property_value("s3_access_key", None)
@@ -87,7 +110,8 @@ class LogMessageInS3File(LogMessageInFile):
                                           aws_access_key_id=access_key,
                                           aws_secret_access_key=secret_key,
                                           region_name=region,
-                                          aws_session_token=session_token)
+                                          aws_session_token=session_token,
+                                          endpoint_url=endpoint_url)
         elif s3_connection_mode == "iam_role":
             # this will use the iam role from properties file and assume it
             assume_role_arn = config_utils.get_property_value("s3_assume_role_arn", None)
@@ -98,11 +122,11 @@ class LogMessageInS3File(LogMessageInFile):
                 raise ShieldException("S3 connection mode is set to iam_role but s3_assume_role_arn is not provided!")
 
             session = assume_role(assume_role_arn, assume_role_session_name)
-            self.s3_client = session.client('s3')
+            self.s3_client = session.client('s3', endpoint_url=endpoint_url)
 
         elif s3_connection_mode == "default":
             # this will use the default credentials from ec2 instance role
-            self.s3_client = boto3.client('s3')
+            self.s3_client = boto3.client('s3', endpoint_url=endpoint_url)
         else:
             raise ShieldException(f"S3 connection mode provided {s3_connection_mode} is invalid!")
 
@@ -158,6 +182,24 @@ class LogMessageInS3File(LogMessageInFile):
             logger.error(f"Error uploading logs to S3=> {type(e).__name__}: {str(e)} \n{traceback.format_exc()}")
             raise ShieldException(f"Error uploading logs to S3=> {type(e).__name__}: {str(e)}")
 
+    def write_logs_to_part_files(self, log_data_list):
+        """
+        Writes the batch of audit data to the part files of their partitions, which are uploaded to the S3 bucket by
+        size or age.
+
+        Args:
+            log_data_list (List[ShieldAudit]): The audit data to log.
+
+        Raises:
+            ShieldException: If there is an error staging the logs.
+        """
+        try:
+            self.part_file_writer.add_events([(self.create_partition_path(log_data), log_data.__dict__)
+                                              for log_data in log_data_list])
+        except Exception as e:
+            logger.error(f"Error staging logs for S3=> {type(e).__name__}: {str(e)} \n{traceback.format_exc()}")
+            raise ShieldException(f"Error staging logs for S3=> {type(e).__name__}: {str(e)}")
+
     def get_or_create_s3_audit_logger(self):
         if self.s3_audit_logger is None:
             self.s3_audit_logger = S3AuditLogger(self, self.audit_spool_dir,
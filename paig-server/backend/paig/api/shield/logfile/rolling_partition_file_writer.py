@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class RollingPartitionFile:
+    """
+    An open audit file of a partition with its index block being filled.
+
+    Attributes:
+        file_path (str): The path of the NDJSON data file.
+        data_file: The data file opened for appends.
+        index_file: The index file opened for appends.
+        created_at (float): The monotonic time the file was opened.
+        size (int): The size of the data file in bytes.
+        is_dirty (bool): Whether data was written since the last fsync.
+        block_offset (int): The offset of the first event of the index block being filled.
+        block_event_count (int): The number of events in the index block being filled.
+        block_min_event_time (int): The minimum event time in the index block being filled.
+        block_max_event_time (int): The maximum event time in the index block being filled.
+        pending_index_lines (list): The index lines of the full blocks, written to the index file once the data of
+            the blocks is synced.
+    """
+
+    __slots__ = ("file_path", "data_file", "index_file", "created_at", "size", "is_dirty", "block_offset",
+                 "block_event_count", "block_min_event_time", "block_max_event_time", "pending_index_lines")
+
+    def __init__(self, file_path, data_file, index_file):
+        self.file_path = file_path
+        self.data_file = data_file
+        self.index_file = index_file
+        self.created_at = time.monotonic()
+        self.size = 0
+        self.is_dirty = False
+        self.block_offset = 0
+        self.block_event_count = 0
+        self.block_min_event_time = None
+        self.block_max_event_time = None
+        self.pending_index_lines = []
+
+
+class RollingPartitionFileWriter:
+    """
+    Appends the audit events to rolling NDJSON files, one open file per tenant and day partition, instead of writing a
+    file per event.
+
+    A file is rotated once it reaches the max file size or the max file age. The data is flushed to the operating
+    system after each batch and synced to the disk every fsync interval and on rotation, so a crash of the host may
+    lose the events of the last interval. Next to each data file, an index file holds a JSON line per block of
+    index_block_events events, and of the last events of a closed file, with the offset and length in bytes of the
+    block and the minimum and maximum event time in the block, so a time range is read by seeking to the matching
+    blocks. A block stays open across the syncs until it is full, and its index line is written once its data is
+    synced. The events after the last indexed block, e.g. of a file which is still open, are read by scanning.
+
+    Args:
+        directory_path (str): The base directory of the partitions.
+        file_max_size_bytes (int): The size at which a file is rotated.
+        file_max_age_sec (float): The age at which a file is rotated.
+        fsync_interval_sec (float): The interval at which the written data is synced to the disk.
+        index_block_events (int): The maximum number of events of an index block.
+    """
+
+    DATA_FILE_SUFFIX = ".ndjson"
+    INDEX_FILE_SUFFIX = ".ndjson.idx"
+
+    def __init__(self, directory_path: str, file_max_size_bytes: int = 128 * 1024 * 1024,
+                 file_max_age_sec: float = 3600, fsync_interval_sec: float = 1, index_block_events: int = 1000):
+        self.directory_path = directory_path
+        self.file_max_size_bytes = file_max_size_bytes
+        self.file_max_age_sec = file_max_age_sec
+        self.fsync_interval_sec = fsync_interval_sec
+        self.index_block_events = max(1, index_block_events)
+
+        self.lock = threading.Lock()
+        self.open_files = {}
+        self.syncer_thread = None
+
+    def start(self):
+        """
+        Starts the thread which syncs the written data to the disk and rotates the files which reached the max age.
+        """
+        if self.syncer_thread is not None:
+            return
+        self.syncer_thread = threading.Thread(target=self.run_syncer, name="local-audit-file-syncer", daemon=True)
+        self.syncer_thread.start()
+
+    def run_syncer(self):
+        while True:
+            time.sleep(max(0.1, min(self.fsync_interval_sec, self.file_max_age_sec)))
+            try:
+                self.sync(rotate_expired=True)
+            except Exception as e:
+                logger.error(f"Error while syncing the local audit files: {e}")
+
+    @staticmethod
+    def get_index_file_path(file_path) -> str:
+        base_path = file_path[:-len(RollingPartitionFileWriter.DATA_FILE_SUFFIX)]
+        return base_path + RollingPartitionFileWriter.INDEX_FILE_SUFFIX
+
+    def add_events(self, partitioned_events):
+        """
+        Appends the events to the open files of their partitions.
+
+        Args:
+            partitioned_events (list): The (partition path, event time, event dict) tuples.
+        """
+        with self.lock:
+            for partition_path, event_time, event_dict in partitioned_events:
+                rolling_file = self.open_files.get(partition_path)
+                if rolling_file is None:
+                    rolling_file = self.open_file(partition_path)
+                line = (json.dumps(event_dict) + "\n").encode()
+                rolling_file.data_file.write(line)
+                rolling_file.size += len(line)
+                rolling_file.is_dirty = True
+                rolling_file.block_event_count += 1
+                if event_time is not None:
+                    if rolling_file.block_min_event_time is None or event_time < rolling_file.block_min_event_time:
+                        rolling_file.block_min_event_time = event_time
+                    if rolling_file.block_max_event_time is None or event_time > rolling_file.block_max_event_time:
+                        rolling_file.block_max_event_time = event_time
+                if rolling_file.block_event_count >= self.index_block_events:
+                    self.close_index_block(rolling_file)
+                if rolling_file.size >= self.file_max_size_bytes:
+                    self.close_file(partition_path)
+            for rolling_file in self.open_files.values():
+                if rolling_file.is_dirty:
+                    rolling_file.data_file.flush()
+
+    def open_file(self, partition_path) -> RollingPartitionFile:
+        """
+        Opens a new file for the partition. Called with the lock held.
+        """
+        partition_dir = os.path.join(self.directory_path, *partition_path.split("/"))
+        os.makedirs(partition_dir, exist_ok=True)
+        file_name = (f"audits-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+                     f"{RollingPartitionFileWriter.DATA_FILE_SUFFIX}")
+        file_path = os.path.join(partition_dir, file_name)
+        data_file = open(file_path, 'ab')
+        index_file = open(self.get_index_file_path(file_path), 'a')
+        rolling_file = RollingPartitionFile(file_path, data_file, index_file)
+        self.open_files[partition_path] = rolling_file
+        return rolling_file
+
+    @staticmethod
+    def close_index_block(rolling_file: RollingPartitionFile):
+        """
+        Queues the index line of the block being filled until its data is synced and starts a new block. Called with
+        the lock held.
+        """
+        if rolling_file.block_event_count == 0:
+            return
+        rolling_file.pending_index_lines.append(json.dumps({
+            "offset": rolling_file.block_offset,
+            "length": rolling_file.size - rolling_file.block_offset,
+            "eventCount": rolling_file.block_event_count,
+            "minEventTime": rolling_file.block_min_event_time,
+            "maxEventTime": rolling_file.block_max_event_time
+        }) + "\n")
+        rolling_file.block_offset = rolling_file.size
+        rolling_file.block_event_count = 0
+        rolling_file.block_min_event_time = None
+        rolling_file.block_max_event_time = None
+
+    @staticmethod
+    def sync_file(rolling_file: RollingPartitionFile):
+        """
+        Syncs the data to the disk, then writes and syncs the index lines of the blocks it holds. Called with the lock
+        held.
+        """
+        rolling_file.data_file.flush()
+        os.fsync(rolling_file.data_file.fileno())
+        rolling_file.is_dirty = False
+        if rolling_file.pending_index_lines:
+            # the index lines only reach the index file once the data of their blocks is on the disk
+            rolling_file.index_file.write("".join(rolling_file.pending_index_lines))
+            rolling_file.pending_index_lines = []
+            rolling_file.index_file.flush()
+            os.fsync(rolling_file.index_file.fileno())
+
+    def close_file(self, partition_path):
+        """
+        Indexes the last block, syncs and closes the open file of the partition. Called with the lock held.
+        """
+        rolling_file = self.open_files.pop(partition_path)
+        try:
+            self.close_index_block(rolling_file)
+            self.sync_file(rolling_file)
+        finally:
+            rolling_file.data_file.close()
+            rolling_file.index_file.close()
+
+    def sync(self, rotate_expired=False, close_all=False):
+        """
+        Syncs the written data to the disk.
+
+        Args:
+            rotate_expired (bool): Whether to close the files which reached the max file age.
+            close_all (bool): Whether to close all the open files.
+        """
+        now = time.monotonic()
+        with self.lock:
+            for partition_path, rolling_file in list(self.open_files.items()):
+                if close_all or (rotate_expired and now - rolling_file.created_at >= self.file_max_age_sec):
+                    self.close_file(partition_path)
+                elif rolling_file.is_dirty:
+                    self.sync_file(rolling_file)
+
+    def iter_events(self, partition_path, start_event_time=None, end_event_time=None):
+        """
+        Returns an iterator over the events of the partition with an event time in the given range, reading only the
+        index blocks which overlap the range.
+
+        Args:
+            partition_path (str): The partition, as created by create_partition_path.
+            start_event_time (int): The minimum event time in milliseconds, no minimum when not given.
+            end_event_time (int): The maximum event time in milliseconds, no maximum when not given.
+
+        Returns:
+            Iterator[dict]: The events, file by file in the order the files were created.
+        """
+        partition_dir = os.path.join(self.directory_path, *partition_path.split("/"))
+        if not os.path.isdir(partition_dir):
+            return
+        file_names = sorted(file_name for file_name in os.listdir(partition_dir)
+                            if file_name.endswith(RollingPartitionFileWriter.DATA_FILE_SUFFIX))
+        for file_name in file_names:
+            file_path = os.path.join(partition_dir, file_name)
+            blocks = self.read_index(file_path)
+            indexed_size = blocks[-1]["offset"] + blocks[-1]["length"] if blocks else 0
+            with open(file_path, 'rb') as f:
+                for block in blocks:
+                    if block["minEventTime"] is not None and (
+                            (start_event_time is not None and block["maxEventTime"] < start_event_time) or
+                            (end_event_time is not None and block["minEventTime"] > end_event_time)):
+                        continue
+                    f.seek(block["offset"])
+                    yield from self.filter_events(f.read(block["length"]).splitlines(), start_event_time,
+                                                  end_event_time)
+                # the events which are not indexed yet
+                f.seek(indexed_size)
+                yield from self.filter_events(f, start_event_time, end_event_time)
+
+    def read_index(self, file_path):
+        blocks = []
+        try:
+            with open(self.get_index_file_path(file_path), 'r') as f:
+                for line in f:
+                    try:
+                        blocks.append(json.loads(line))
+                    except ValueError:
+                        # partially written when the process stopped
+                        break
+        except FileNotFoundError:
+            pass
+        return blocks
+
+    @staticmethod
+    def filter_events(lines, start_event_time, end_event_time):
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            event_time = event.get("eventTime")
+            if event_time is not None and ((start_event_time is not None and event_time < start_event_time) or
+                                           (end_event_time is not None and event_time > end_event_time)):
+                continue
+            yield event
@@ -0,0 +1,393 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+
+from paig_common.audit_spooler import AuditSpooler
+
+from api.shield.utils.custom_exceptions import ShieldException
+
+logger = logging.getLogger(__name__)
+
+
+class StagedPartFile:
+    """
+    A part file staged on the local disk before it is uploaded to S3.
+
+    Attributes:
+        file_path (str): The path of the staged file.
+        object_key (str): The S3 object key, relative to the bucket prefix.
+        created_at (float): The monotonic time the part was opened.
+        size (int): The size of the staged file in bytes.
+        is_sealed (bool): Whether the part is closed for appends and ready to be uploaded.
+        is_uploading (bool): Whether the part is being uploaded.
+        compressor: The gzip stream of an open part, appended to by each batch.
+        retry_at (float): The monotonic time before which a failed upload is not retried.
+        retry_delay_sec (float): The delay before the next retry of a failed upload.
+    """
+
+    __slots__ = ("file_path", "object_key", "created_at", "size", "is_sealed", "is_uploading", "compressor",
+                 "retry_at", "retry_delay_sec")
+
+    def __init__(self, file_path, object_key, size=0, is_sealed=False):
+        self.file_path = file_path
+        self.object_key = object_key
+        self.created_at = time.monotonic()
+        self.size = size
+        self.is_sealed = is_sealed
+        self.is_uploading = False
+        self.compressor = None if is_sealed else zlib.compressobj(S3PartFileWriter.COMPRESSION_LEVEL, zlib.DEFLATED,
+                                                                  S3PartFileWriter.GZIP_WBITS)
+        self.retry_at = 0
+        self.retry_delay_sec = 0
+
+
+class S3PartFileWriter:
+    """
+    Buffers the audit events into compressed NDJSON part files, one open part per partition, and uploads the parts to
+    S3 once they reach the max part size or the max part age.
+
+    Each part file staged in the local staging dir is a single gzip stream, so the events of all the batches of a part
+    are compressed together. Each batch is appended with a sync flush of the stream and synced to the disk before
+    add_events returns, so the audit spool can acknowledge the events, and the end of the stream is written when the
+    part is sealed. The staged parts left by a previous run are uploaded at startup, the parts which were not sealed
+    are completed first, without an event partially written when the process stopped. Parts are uploaded with a
+    single put_object, or with a multipart upload from the multipart threshold on, and the staged file is deleted once
+    it is uploaded. A failed upload is retried with an exponential backoff.
+
+    The total size of the staged parts is capped at the staging max size, so an S3 outage does not fill the disk. When
+    the cap is reached, drop_oldest deletes the oldest sealed parts which are not being uploaded, while reject_new, or
+    drop_oldest without such a part, fails add_events so the events stay unacknowledged in the audit spool.
+
+    Args:
+        s3_client: The boto3 S3 client.
+        bucket_name (str): The S3 bucket.
+        bucket_prefix (str): The key prefix of the objects in the bucket, may be empty.
+        staging_dir (str): The local directory of the staged part files.
+        part_max_size_bytes (int): The staged size at which a part is uploaded.
+        part_max_age_sec (float): The age at which a part is uploaded.
+        multipart_threshold_bytes (int): The part size from which the part is uploaded in a multipart upload.
+        multipart_chunk_size_bytes (int): The size of the chunks of a multipart upload, at least 5 MB for S3.
+        staging_max_size_bytes (int): The maximum total size of the staged parts, 0 means unlimited.
+        staging_eviction_policy (str): What to do when the staging dir is full, drop_oldest or reject_new.
+    """
+
+    PART_FILE_SUFFIX = ".ndjson.gz"
+    CONTENT_TYPE = "application/x-ndjson"
+    MAX_RETRY_DELAY_SEC = 300
+    COMPRESSION_LEVEL = 6
+    # a gzip header and trailer around the deflate stream
+    GZIP_WBITS = 16 + zlib.MAX_WBITS
+    READ_CHUNK_SIZE_BYTES = 64 * 1024
+
+    def __init__(self, s3_client, bucket_name: str, bucket_prefix: str, staging_dir: str,
+                 part_max_size_bytes: int = 64 * 1024 * 1024, part_max_age_sec: float = 300,
+                 multipart_threshold_bytes: int = 16 * 1024 * 1024,
+                 multipart_chunk_size_bytes: int = 8 * 1024 * 1024, staging_max_size_bytes: int = 0,
+                 staging_eviction_policy: str = AuditSpooler.EVICTION_POLICY_DROP_OLDEST):
+        if staging_eviction_policy not in (AuditSpooler.EVICTION_POLICY_DROP_OLDEST,
+                                           AuditSpooler.EVICTION_POLICY_REJECT_NEW):
+            raise ValueError(f"Invalid S3 audit staging eviction policy: {staging_eviction_policy}")
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.bucket_prefix = bucket_prefix
+        self.staging_dir = staging_dir
+        self.part_max_size_bytes = part_max_size_bytes
+        self.part_max_age_sec = part_max_age_sec
+        self.multipart_threshold_bytes = multipart_threshold_bytes
+        self.multipart_chunk_size_bytes = multipart_chunk_size_bytes
+        self.staging_max_size_bytes = staging_max_size_bytes
+        self.staging_eviction_policy = staging_eviction_policy
+
+        self.lock = threading.Lock()
+        self.upload_lock = threading.Lock()
+        self.open_parts = {}
+        self.sealed_parts = []
+        self.staged_size = 0
+        self.flush_event = threading.Event()
+        self.flusher_thread = None
+
+    def start(self):
+        """
+        Recovers the part files staged by a previous run and starts the thread which uploads the parts.
+        """
+        if self.flusher_thread is not None:
+            return
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.recover_staged_parts()
+        self.flusher_thread = threading.Thread(target=self.run_flusher, name="s3-audit-part-flusher", daemon=True)
+        self.flusher_thread.start()
+
+    def recover_staged_parts(self):
+        for dir_path, _, file_names in os.walk(self.staging_dir):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                if not file_name.endswith(S3PartFileWriter.PART_FILE_SUFFIX):
+                    if file_name.endswith(S3PartFileWriter.PART_FILE_SUFFIX + ".temp"):
+                        os.remove(file_path)
+                    continue
+                if not self.salvage_part_file(file_path):
+                    continue
+                object_key = os.path.relpath(file_path, self.staging_dir).replace(os.sep, "/")
+                part = StagedPartFile(file_path, object_key, os.path.getsize(file_path), True)
+                self.sealed_parts.append(part)
+                self.staged_size += part.size
+        if self.sealed_parts:
+            logger.info(f"Recovered {len(self.sealed_parts)} staged S3 audit part files")
+
+    @staticmethod
+    def salvage_part_file(file_path) -> bool:
+        """
+        Checks the staged part file by streaming it, a complete part is kept as it is. A part which was not sealed when
+        the process stopped is rewritten as a complete gzip stream of its complete events, without the event which was
+        partially written at its end. The other events of a partially written batch were not acknowledged in the audit
+        spool, so they may be uploaded twice.
+
+        Returns:
+            bool: Whether the part file holds any event.
+        """
+        has_data = False
+        try:
+            for data in S3PartFileWriter.read_part_file(file_path):
+                has_data = has_data or bool(data)
+            if not has_data:
+                os.remove(file_path)
+            return has_data
+        except (EOFError, zlib.error):
+            pass
+
+        temp_file_path = file_path + ".temp"
+        has_data = False
+        partial_line = b""
+        with gzip.GzipFile(temp_file_path, 'wb', compresslevel=S3PartFileWriter.COMPRESSION_LEVEL, mtime=0) as f:
+            try:
+                for data in S3PartFileWriter.read_part_file(file_path):
+                    data = partial_line + data
+                    end = data.rfind(b"\n") + 1
+                    if end > 0:
+                        f.write(data[:end])
+                        has_data = True
+                    partial_line = data[end:]
+            except (EOFError, zlib.error):
+                pass
+        if not has_data:
+            os.remove(temp_file_path)
+            os.remove(file_path)
+            return False
+        os.replace(temp_file_path, file_path)
+        if partial_line:
+            logger.warning(f"Completed the staged S3 audit part file {file_path}, dropped an event partially written "
+                           f"at its end")
+        else:
+            logger.info(f"Completed the staged S3 audit part file {file_path}")
+        return True
+
+    @staticmethod
+    def read_part_file(file_path):
+        """
+        Yields the decompressed data of the staged part file chunk by chunk, the part may hold several gzip members.
+
+        Raises:
+            EOFError: If the last gzip member is not complete.
+            zlib.error: If the compressed data is corrupted.
+        """
+        decompressor = None
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(S3PartFileWriter.READ_CHUNK_SIZE_BYTES), b""):
+                while chunk:
+                    if decompressor is None:
+                        decompressor = zlib.decompressobj(S3PartFileWriter.GZIP_WBITS)
+                    yield decompressor.decompress(chunk)
+                    chunk = decompressor.unused_data
+                    if decompressor.eof:
+                        decompressor = None
+        if decompressor is not None:
+            raise EOFError(f"The gzip stream of the staged part file {file_path} is not complete")
+
+    def get_full_object_key(self, object_key) -> str:
+        return "/".join([self.bucket_prefix, object_key]) if self.bucket_prefix else object_key
+
+    def add_events(self, partitioned_events):
+        """
+        Appends the events to the open parts of their partitions, the events are on the disk when this returns.
+
+        Args:
+            partitioned_events (list): The (partition path, event dict) pairs.
+
+        Raises:
+            ShieldException: If the staging dir is full and no staged part can be dropped.
+        """
+        lines_by_partition = {}
+        for partition_path, event_dict in partitioned_events:
+            lines_by_partition.setdefault(partition_path, []).append(json.dumps(event_dict) + "\n")
+
+        with self.lock:
+            self.ensure_staging_capacity()
+            for partition_path, lines in lines_by_partition.items():
+                part = self.open_parts.get(partition_path)
+                if part is None:
+                    part = self.open_part(partition_path)
+                compressor = part.compressor
+                self.append_to_part(part, compressor.compress("".join(lines).encode()) +
+                                    compressor.flush(zlib.Z_SYNC_FLUSH))
+                if part.size >= self.part_max_size_bytes:
+                    self.seal_part(partition_path)
+                    self.flush_event.set()
+
+    def append_to_part(self, part: StagedPartFile, data: bytes):
+        """
+        Appends the compressed data to the staged file of the part and syncs it to the disk. Called with the lock held.
+        """
+        with open(part.file_path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        self.staged_size += size - part.size
+        part.size = size
+
+    def ensure_staging_capacity(self):
+        """
+        Makes room for a batch when the staging size is capped, dropping the oldest sealed parts or rejecting the batch
+        depending on the eviction policy. The cap may be exceeded by the size of the batch. Called with the lock held.
+
+        Raises:
+            ShieldException: If there is no room for the batch.
+        """
+        if self.staging_max_size_bytes <= 0:
+            return
+        while self.staged_size >= self.staging_max_size_bytes:
+            part = None
+            if self.staging_eviction_policy == AuditSpooler.EVICTION_POLICY_DROP_OLDEST:
+                part = next((part for part in self.sealed_parts if part.is_uploading is False), None)
+            if part is None:
+                logger.error(f"S3 audit staging size limit of {self.staging_max_size_bytes} bytes reached, rejecting "
+                             f"the audit events.")
+                raise ShieldException(f"S3 audit staging size limit of {self.staging_max_size_bytes} bytes reached. "
+                                      f"The audits are rejected until the staged parts are uploaded.")
+            self.drop_part(part)
+
+    def drop_part(self, part: StagedPartFile):
+        """
+        Deletes a sealed part with its events which are not uploaded yet. Called with the lock held.
+        """
+        self.sealed_parts.remove(part)
+        self.staged_size -= part.size
+        try:
+            os.remove(part.file_path)
+        except FileNotFoundError:
+            pass
+        logger.error(f"S3 audit staging size limit of {self.staging_max_size_bytes} bytes reached, dropped the staged "
+                     f"part file {part.object_key} which was not uploaded.")
+
+    def open_part(self, partition_path) -> StagedPartFile:
+        """
+        Opens a new part for the partition. Called with the lock held.
+        """
+        file_name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}{S3PartFileWriter.PART_FILE_SUFFIX}"
+        object_key = f"{partition_path}/{file_name}"
+        file_path = os.path.join(self.staging_dir, *object_key.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        part = StagedPartFile(file_path, object_key)
+        self.open_parts[partition_path] = part
+        return part
+
+    def seal_part(self, partition_path):
+        """
+        Closes the open part of the partition for appends, writing the end of its gzip stream. Called with the lock
+        held.
+        """
+        part = self.open_parts.pop(partition_path)
+        part.is_sealed = True
+        self.sealed_parts.append(part)
+        compressor = part.compressor
+        part.compressor = None
+        # a part left without the end of the stream is completed by salvage_part_file at the next startup
+        self.append_to_part(part, compressor.flush())
+
+    def run_flusher(self):
+        check_interval_sec = max(0.1, min(self.part_max_age_sec, 5))
+        while True:
+            self.flush_event.wait(check_interval_sec)
+            self.flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error while uploading the S3 audit part files: {e}")
+
+    def flush(self, force=False):
+        """
+        Uploads the parts which reached the max part size or age, or all the parts when forced.
+
+        Args:
+            force (bool): Whether to upload the open parts and to retry the failed uploads now.
+        """
+        with self.upload_lock:
+            now = time.monotonic()
+            with self.lock:
+                for partition_path, part in list(self.open_parts.items()):
+                    if force or now - part.created_at >= self.part_max_age_sec:
+                        self.seal_part(partition_path)
+                parts_to_upload = [part for part in self.sealed_parts if force or part.retry_at <= now]
+
+            for part in parts_to_upload:
+                with self.lock:
+                    if part not in self.sealed_parts:
+                        # dropped when the staging size limit was reached
+                        continue
+                    part.is_uploading = True
+                try:
+                    self.upload_part(part)
+                except Exception as e:
+                    part.retry_delay_sec = min(S3PartFileWriter.MAX_RETRY_DELAY_SEC,
+                                               max(1.0, part.retry_delay_sec * 2))
+                    part.retry_at = time.monotonic() + part.retry_delay_sec
+                    logger.error(f"Error uploading the audit part file {part.object_key} to S3, retrying in "
+                                 f"{part.retry_delay_sec} seconds=> {type(e).__name__}: {str(e)}")
+                    with self.lock:
+                        part.is_uploading = False
+                    continue
+                with self.lock:
+                    self.sealed_parts.remove(part)
+                    self.staged_size -= part.size
+                os.remove(part.file_path)
+
+    def upload_part(self, part: StagedPartFile):
+        """
+        Uploads the staged part file, with a multipart upload from the multipart threshold on.
+        """
+        full_object_key = self.get_full_object_key(part.object_key)
+        logger.debug(f"Uploading audit part file to S3 bucket: {self.bucket_name} with object key: {full_object_key}")
+        if part.size < self.multipart_threshold_bytes:
+            with open(part.file_path, 'rb') as f:
+                self.s3_client.put_object(Body=f.read(), Bucket=self.bucket_name, Key=full_object_key,
+                                          ContentType=S3PartFileWriter.CONTENT_TYPE)
+            return
+
+        upload_id = self.s3_client.create_multipart_upload(Bucket=self.bucket_name, Key=full_object_key,
+                                                           ContentType=S3PartFileWriter.CONTENT_TYPE)["UploadId"]
+        try:
+            uploaded_parts = []
+            with open(part.file_path, 'rb') as f:
+                while True:
+                    chunk = f.read(self.multipart_chunk_size_bytes)
+                    if not chunk:
+                        break
+                    part_number = len(uploaded_parts) + 1
+                    response = self.s3_client.upload_part(Body=chunk, Bucket=self.bucket_name, Key=full_object_key,
+                                                          PartNumber=part_number, UploadId=upload_id)
+                    uploaded_parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            self.s3_client.complete_multipart_upload(Bucket=self.bucket_name, Key=full_object_key,
+                                                     UploadId=upload_id,
+                                                     MultipartUpload={"Parts": uploaded_parts})
+        except Exception as e:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=full_object_key,
+                                                      UploadId=upload_id)
+            except Exception as abort_error:
+                logger.warning(f"Unable to abort the multipart upload of {full_object_key}: {abort_error}")
+            raise ShieldException(f"Error in the multipart upload of {full_object_key}: {e}")
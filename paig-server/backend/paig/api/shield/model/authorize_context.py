@@ -0,0 +1,74 @@
+import time
+
+from api.shield.model.authorize_request import AuthorizeRequest
+
+
+class AuthorizeContext:
+    """
+    A class to represent the state of a single authorize request while it flows through the shield pipeline
+    (decrypt -> scan -> authz -> guardrail -> mask -> audit -> encrypt).
+
+    AuthService is shared by all requests, so everything that belongs to one request is kept here and passed
+    explicitly between the pipeline stages instead of being stored on the service.
+
+    Attributes:
+        auth_req (AuthorizeRequest): The authorization request.
+        all_result_traits (list): Traits found by all scanners for all messages.
+        access_control_traits (set): Actions returned by the scanners, e.g. BLOCKED or ANONYMIZED.
+        analyzer_result_map (dict): Analyzer results keyed by request message.
+        masked_messages (list): Response messages returned to the plugin.
+        original_masked_text_list (list): Original and masked messages used for the audit.
+        stage_timings (dict): Time taken by each pipeline stage in milliseconds, keyed by stage name.
+    """
+
+    def __init__(self, auth_req: AuthorizeRequest):
+        """
+        Initializes an instance of AuthorizeContext for the given request.
+
+        Args:
+            auth_req (AuthorizeRequest): The authorization request.
+        """
+        self.auth_req = auth_req
+        self.start_time = time.perf_counter()
+        self.all_result_traits = []
+        self.access_control_traits = set()
+        self.analyzer_result_map = {}
+        self.masked_messages = []
+        self.original_masked_text_list = []
+        self.stage_timings = {}
+
+    @property
+    def previous_sentence_length(self) -> int:
+        """
+        Length of the text already sent for the stream of this request, used to offset the analyzer results.
+        """
+        request_context = self.auth_req.context or {}
+        return request_context.get('previous_sentence_length', 0)
+
+    def record_stage_time(self, stage: str, stage_start_time: float) -> str:
+        """
+        Record the time taken by a pipeline stage.
+
+        Args:
+            stage (str): The name of the stage.
+            stage_start_time (float): The time.perf_counter() value taken when the stage started.
+
+        Returns:
+            str: The stage time in milliseconds formatted with three decimals.
+        """
+        stage_time = f"{((time.perf_counter() - stage_start_time) * 1000):.3f}"
+        self.stage_timings[stage] = stage_time
+        return stage_time
+
+    def get_stage_time(self, stage: str, default="0") -> str:
+        """
+        Get the recorded time of a pipeline stage.
+
+        Args:
+            stage (str): The name of the stage.
+            default: The value returned when the stage was not recorded.
+
+        Returns:
+            str: The stage time in milliseconds.
+        """
+        return self.stage_timings.get(stage, default)
@@ -38,6 +38,8 @@ class AuthorizeRequest:
         self.stream_id = req_data.get("streamId")
         self.enable_audit = req_data.get("enableAudit")
         self.user_role = user_role
+        # encryption mode of the request messages, set when they are decrypted
+        self.encryption_mode = None
 
     @staticmethod
     def extract_data(req_data, key):
@@ -0,0 +1,29 @@
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+authorize_stage_duration_histogram = meter.create_histogram(
+    name="shield_authorize_stage_duration",
+    unit="ms",
+    description="Histogram for the time taken by each stage of the shield authorize pipeline"
+)
+
+
+def record_authorize_stage_duration(stage: str, duration_ms: float, tenant_id: str = None,
+                                    application_key: str = None, **attributes):
+    """
+    Records the time taken by a stage of the shield authorize pipeline.
+
+    Args:
+        stage (str): The name of the stage, e.g. decryption, scanner, authz, guardrail, masking, audit_encryption,
+            audit_dispatch, response_encryption.
+        duration_ms (float): The time taken by the stage in milliseconds.
+        tenant_id (str): The tenant ID of the request.
+        application_key (str): The application key of the request.
+        **attributes: Additional attributes, e.g. the scanner name for the scanner stage.
+    """
+    stage_attributes = {"stage": stage, "tenant_id": tenant_id, "application_key": application_key}
+    stage_attributes.update(attributes)
+    # OpenTelemetry drops attributes with None values with a warning, so skip them here
+    stage_attributes = {key: value for key, value in stage_attributes.items() if value is not None}
+    authorize_stage_duration_histogram.record(float(duration_ms), stage_attributes)
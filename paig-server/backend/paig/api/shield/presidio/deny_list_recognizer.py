@@ -0,0 +1,184 @@
+"""
+This module provides a presidio recognizer for large deny lists of keywords.
+
+Classes:
+    KeywordAutomaton: Aho-Corasick automaton matching many keywords in a single pass over a text.
+    DenyListRecognizer: Presidio recognizer detecting the keywords of a deny list with a KeywordAutomaton.
+"""
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from presidio_analyzer import EntityRecognizer, RecognizerResult, AnalysisExplanation
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+logger = logging.getLogger(__name__)
+
+
+def _fold(text: str) -> str:
+    """
+    Case fold the text character by character, so that offsets in the folded text are offsets in the original text.
+    Characters whose lower case form has more than one character are kept as they are.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton built from a list of keywords.
+
+    The text is scanned once whatever the number of keywords, so the scan time depends on the length of the text and
+    the number of matches, not on the size of the keyword list. Matching is case-insensitive and only whole words are
+    matched: a match must start at the beginning of the text or after a non-word character and end at the end of the
+    text or before a non-word character, like the deny list regex of presidio PatternRecognizer.
+    Overlapping matches are resolved leftmost-longest, e.g. "lung cancer" wins over "lung" and "cancer".
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Build the automaton from the given keywords. Empty keywords and duplicates are ignored.
+
+        Args:
+            keywords (Iterable[str]): The keywords to match.
+        """
+        # node 0 is the root, each node has its transitions, its failure link and the lengths of the keywords ending
+        # at it, including the keywords reachable through its failure links
+        self._transitions = [{}]
+        self._failure = [0]
+        self._outputs = [()]
+        self.keyword_count = 0
+
+        for keyword in {_fold(keyword.strip()) for keyword in keywords if keyword and keyword.strip()}:
+            self._add_keyword(keyword)
+            self.keyword_count += 1
+        self._build_failure_links()
+
+    def _add_keyword(self, keyword: str):
+        node = 0
+        for char in keyword:
+            next_node = self._transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self._transitions)
+                self._transitions.append({})
+                self._failure.append(0)
+                self._outputs.append(())
+                self._transitions[node][char] = next_node
+            node = next_node
+        self._outputs[node] = (len(keyword),)
+
+    def _build_failure_links(self):
+        # breadth first, so the failure link of a node is complete before the nodes below it are linked
+        queue = list(self._transitions[0].values())
+        index = 0
+        while index < len(queue):
+            node = queue[index]
+            index += 1
+            for char, child in self._transitions[node].items():
+                failure = self._failure[node]
+                while failure and char not in self._transitions[failure]:
+                    failure = self._failure[failure]
+                child_failure = self._transitions[failure].get(char, 0)
+                self._failure[child] = child_failure if child_failure != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._failure[child]]
+                queue.append(child)
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find the keywords in the given text.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            List[Tuple[int, int]]: The (start, end) offsets of the non-overlapping whole word matches, in text order.
+        """
+        if self.keyword_count == 0:
+            return []
+
+        transitions = self._transitions
+        failure = self._failure
+        outputs = self._outputs
+        text_length = len(text)
+        candidates = []
+        node = 0
+        for end, char in enumerate(_fold(text), start=1):
+            while node and char not in transitions[node]:
+                node = failure[node]
+            node = transitions[node].get(char, 0)
+            if outputs[node] and (end == text_length or not _is_word_char(text[end])):
+                for length in outputs[node]:
+                    start = end - length
+                    if start == 0 or not _is_word_char(text[start - 1]):
+                        candidates.append((start, end))
+
+        matches = []
+        last_end = 0
+        for start, end in sorted(candidates, key=lambda match: (match[0], -match[1])):
+            if start >= last_end:
+                matches.append((start, end))
+                last_end = end
+        return matches
+
+
+class DenyListRecognizer(EntityRecognizer):
+    """
+    Presidio recognizer detecting the keywords of a deny list with a KeywordAutomaton.
+
+    It is a drop-in replacement of a PatternRecognizer built with a deny list only, for deny lists with thousands of
+    keywords, where the single alternation regex of PatternRecognizer is tried keyword by keyword at every position.
+    """
+
+    def __init__(self, supported_entity: str, deny_list: List[str], name: str = None, deny_list_score: float = 1.0,
+                 supported_language: str = "en"):
+        """
+        Initialize the DenyListRecognizer.
+
+        Args:
+            supported_entity (str): The entity type of the detected keywords.
+            deny_list (List[str]): The keywords to detect.
+            name (str): The name of the recognizer.
+            deny_list_score (float): The score of a detected keyword.
+            supported_language (str): The language of the recognizer.
+        """
+        self.deny_list = deny_list
+        self.deny_list_score = deny_list_score
+        self.automaton = None
+        super().__init__(supported_entities=[supported_entity], name=name, supported_language=supported_language)
+
+    def load(self) -> None:
+        """
+        Build the automaton of the deny list.
+        """
+        self.automaton = KeywordAutomaton(self.deny_list)
+        logger.debug(f"Built deny list automaton of recognizer {self.name} with {self.automaton.keyword_count} keywords")
+
+    def analyze(self, text: str, entities: List[str],
+                nlp_artifacts: Optional[NlpArtifacts] = None) -> List[RecognizerResult]:
+        """
+        Detect the keywords of the deny list in the given text.
+
+        Args:
+            text (str): The text to analyze.
+            entities (List[str]): The entities requested by the analyzer.
+            nlp_artifacts (NlpArtifacts): Not used, the keywords are matched on the raw text.
+
+        Returns:
+            List[RecognizerResult]: A result for each detected keyword.
+        """
+        results = []
+        for start, end in self.automaton.find_all(text):
+            explanation = AnalysisExplanation(recognizer=self.name, original_score=self.deny_list_score,
+                                              pattern_name="deny_list")
+            results.append(RecognizerResult(entity_type=self.supported_entities[0], start=start, end=end,
+                                            score=self.deny_list_score, analysis_explanation=explanation,
+                                            recognition_metadata={
+                                                RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                                                RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+                                            }))
+        return results
@@ -1,6 +1,8 @@
 import logging
+from threading import Lock
+from typing import List, Optional
 
-from presidio_analyzer import AnalyzerEngine
+from presidio_analyzer import AnalyzerEngine, EntityRecognizer
 
 from api.shield.presidio.nlp_handler import NLPHandler
 from api.shield.utils import config_utils
@@ -11,6 +13,29 @@ logger = logging.getLogger(__name__)
 
 
 class PresidioAnalyzerEngine:
+    """
+    Wrapper over the presidio AnalyzerEngine.
+
+    The analyzer (and its recognizer registry) is expensive to build, so scanners should use the process-wide
+    instance returned by get_shared_instance(). The registry of the shared instance only holds the base recognizers;
+    application specific recognizers are passed per call as ad-hoc recognizers and never registered on it.
+    """
+    _shared_instance = None
+    _shared_lock = Lock()
+
+    @classmethod
+    def get_shared_instance(cls):
+        """
+        Get the process-wide analyzer engine, creating it on first use.
+
+        Returns:
+            PresidioAnalyzerEngine: Shared analyzer engine instance.
+        """
+        if cls._shared_instance is None:
+            with cls._shared_lock:
+                if cls._shared_instance is None:
+                    cls._shared_instance = cls()
+        return cls._shared_instance
 
     def __init__(self):
         self.score_threshold = config_utils.get_property_value_float('presidio_analyzer_score_threshold')
@@ -48,10 +73,11 @@ class PresidioAnalyzerEngine:
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("No recognizers found to remove")
 
-    def analyze(self, text: str):
+    def analyze(self, text: str, ad_hoc_recognizers: Optional[List[EntityRecognizer]] = None):
         """
         Analyze the given text using the presidio analyzer
         :param text:
+        :param ad_hoc_recognizers: recognizers used only for this call, on top of the registry recognizers
         :return: list of RecognizerResult as analyzer result
         """
         logger.debug("Analyzing starting")
@@ -59,6 +85,7 @@ class PresidioAnalyzerEngine:
             text=text,
             entities=None,
             language="en",
-            score_threshold=self.score_threshold)
+            score_threshold=self.score_threshold,
+            ad_hoc_recognizers=ad_hoc_recognizers or None)
         logger.debug("Analyzing completed")
         return analyzer_result
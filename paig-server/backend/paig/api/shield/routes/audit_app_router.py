@@ -21,3 +21,18 @@ async def audit(request: Annotated[dict | None, Body()],
            The result of the audit operation handled by `ShieldController`.
        """
     return await shield_controller.audit(request)
+
+
+@audit_app_router.post("/batch")
+async def audit_batch(request: Annotated[list | None, Body()],
+                      shield_controller: ShieldController = shield_controller_instance):
+    """
+       Handles POST requests to audit a batch of logs.
+
+       This endpoint processes a list of audit requests, as sent one by one to the audit endpoint, and delegates the
+       task to the `ShieldController`.
+
+       Returns:
+           The result of the audit operation handled by `ShieldController`.
+       """
+    return await shield_controller.audit_batch(request)
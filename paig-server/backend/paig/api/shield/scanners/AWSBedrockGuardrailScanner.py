@@ -5,6 +5,7 @@ from api.shield.enum.ShieldEnums import Guardrail, RequestType
 from api.shield.model.scanner_result import ScannerResult
 from api.shield.model.analyzer_result import AnalyzerResult
 from api.shield.scanners.BaseScanner import Scanner
+from api.shield.scanners.bedrock_guardrail_runtime import BedrockGuardrailRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class AWSBedrockGuardrailScanner(Scanner):
             enable (bool): Flag to enable or disable the scanner.
         """
         super().__init__(**kwargs)
+        self.bedrock_guardrail_runtime = BedrockGuardrailRuntime()
 
     def scan(self, message: str) -> ScannerResult:
         """
@@ -46,10 +48,7 @@ class AWSBedrockGuardrailScanner(Scanner):
             logger.debug("AWSBedrockGuardrailScanner: Guardrail details not found. Hence skipping the scan.")
             return ScannerResult(traits=[])
 
-        from api.guardrails.providers.backend.bedrock import BedrockGuardrailProvider
         connection_details = self.get_property('connection_details')
-        bedrock_client_provider = BedrockGuardrailProvider(connection_details if connection_details else {})
-        bedrock_client = bedrock_client_provider.create_bedrock_client('bedrock-runtime')
 
         guardrail_source = Guardrail.INPUT.value if self.get_property('scan_for_req_type') in [
             RequestType.PROMPT.value,
@@ -58,12 +57,9 @@ class AWSBedrockGuardrailScanner(Scanner):
         ] else Guardrail.OUTPUT.value
         logger.debug(f"AWSBedrockGuardrailScanner: Scanning message: {message} with guardrail source: {guardrail_source} for {self.get_property('scan_for_req_type')}")
 
-        response = bedrock_client.apply_guardrail(
-            guardrailIdentifier=guardrail_id,
-            guardrailVersion=guardrail_version,
-            source=guardrail_source,
-            content=[{'text': {'text': message}}]
-        )
+        response = self.bedrock_guardrail_runtime.apply_guardrail(connection_details if connection_details else {},
+                                                                  guardrail_id, guardrail_version, guardrail_source,
+                                                                  message)
         logger.debug(f"AWSBedrockGuardrailScanner: Response received: {response}")
 
         if response.get('action') == Guardrail.GUARDRAIL_INTERVENED.value:
@@ -9,6 +9,10 @@ class Scanner(ABC):
     Scanner class that holds the properties of a scanner.
     """
 
+    # scanners which don't block override scan_async and set is_async, they are awaited on the event loop instead of
+    # running on a scanner worker
+    is_async = False
+
     def __init__(self, **kwargs):
         """
         Initialize the required models and variables for the scanner.
@@ -46,3 +50,15 @@ class Scanner(ABC):
         Returns:
             ScannerResult: The result of the scanner operation.
         """
+
+    async def scan_async(self, message: str) -> ScannerResult:
+        """
+        Process the input prompt without blocking the event loop, used when is_async is set.
+
+        Parameters:
+            message (str): The input prompt that needs to be processed.
+
+        Returns:
+            ScannerResult: The result of the scanner operation.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support async scans")
@@ -7,6 +7,7 @@ from core.utils import format_to_root_path
 from api.shield.model.analyzer_result import AnalyzerResult
 from api.shield.scanners.BaseScanner import Scanner
 from api.shield.presidio.presidio_analyzer_engine import PresidioAnalyzerEngine
+from api.shield.presidio.deny_list_recognizer import DenyListRecognizer
 from presidio_analyzer import PatternRecognizer, Pattern
 
 from api.shield.utils.custom_exceptions import ShieldException, UnsupportedFileTypeException
@@ -136,8 +137,9 @@ class PIIScanner(Scanner):
         """
         super().__init__(**kwargs)
 
-        self.presidio_analyzer = PresidioAnalyzerEngine()
+        self.presidio_analyzer = PresidioAnalyzerEngine.get_shared_instance()
         self.recognizers = {}
+        self.custom_recognizers = []
         self.recognizer_ignore_dict = {}
 
     def init_recognizers(self):
@@ -157,7 +159,7 @@ class PIIScanner(Scanner):
         """
 
         # analyze the prompt using the presidio analyzer
-        analyzer_result_list = self.presidio_analyzer.analyze(message)
+        analyzer_result_list = self.presidio_analyzer.analyze(message, ad_hoc_recognizers=self.custom_recognizers)
         refined_analyzer_results = build_analyzer_result(analyzer_result_list, model_name=self.model_path,
                                                          scanner_name=self.name)
 
@@ -179,41 +181,47 @@ class PIIScanner(Scanner):
         for key, value in self.recognizers.items():
             ignore_list = self._load_keyword_list(value.ignore_list)
             if ignore_list:
-                recognizer_ignore_dict[value.name] = ignore_list
+                recognizer_ignore_dict[value.name] = frozenset(ignore_list)
         return recognizer_ignore_dict
 
     def _add_custom_recognizers(self):
         """
-        Add custom recognizers to the presidio analyzer
+        Build the custom recognizers of this scanner. They are passed to the shared presidio analyzer on every scan
+        instead of being added to its registry, so applications do not leak recognizers into each other.
+        The detect list of a recognizer is matched by a DenyListRecognizer, which scans the message once whatever the
+        size of the list, and the detect regex by a PatternRecognizer with the same name.
         :return: None
         """
-        logger.debug("Adding custom recognizers to presidio registry")
         logger.debug(f"Found {len(self.recognizers)} custom recognizers")
+        custom_recognizers = []
         for key, value in self.recognizers.items():
 
             detect_list = self._load_keyword_list(value.detect_list)
+            if not detect_list and not value.detect_regex:
+                raise ShieldException(f"Recognizer {value.name} should have a detect_list or a detect_regex")
+
+            if detect_list:
+                custom_recognizers.append(DenyListRecognizer(name=value.name,
+                                                             supported_entity=value.entity_type,
+                                                             deny_list=detect_list,
+                                                             deny_list_score=value.detect_list_score))
 
             # check if the regex pattern is provided
-            detect_regex_pattern = None
             if value.detect_regex:
                 detect_regex_pattern = [Pattern(name="detect_regex", regex=value.detect_regex,
                                                 score=value.detect_list_score)]
-            # create custom recognizer
-            _custom_recognizer = PatternRecognizer(name=value.name,
-                                                   supported_entity=value.entity_type,
-                                                   deny_list=detect_list,
-                                                   deny_list_score=value.detect_list_score,
-                                                   patterns=detect_regex_pattern)
+                custom_recognizers.append(PatternRecognizer(name=value.name,
+                                                            supported_entity=value.entity_type,
+                                                            patterns=detect_regex_pattern))
 
-            # add custom recognizer to presidio analyzer recognizer registry
-            self.presidio_analyzer.analyzer.registry.add_recognizer(_custom_recognizer)
+        self.custom_recognizers = custom_recognizers
 
     @staticmethod
     def _remove_ignore_list_keywords(analyzer_result_list, recognizer_ignore_dict, message):
         """
         Remove the ignore list keywords from the analyzer result list
         :param analyzer_result_list: list of RecognizerResult
-        :param recognizer_ignore_dict: list of keywords to ignore for each recognizer
+        :param recognizer_ignore_dict: set of keywords to ignore for each recognizer
         :param message: input prompt
         :return: list of RecognizerResult
         """
@@ -3,7 +3,7 @@ import logging
 from api.shield.model.scanner_result import ScannerResult
 from api.shield.model.analyzer_result import AnalyzerResult
 from api.shield.scanners.BaseScanner import Scanner
-from profanity_check import predict_prob
+from api.shield.scanners.toxic_score_batcher import ToxicScoreBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -11,8 +11,12 @@ logger = logging.getLogger(__name__)
 class ToxicContentScanner(Scanner):
     """
     Scanner implementation for detecting toxic content in the input prompt.
+    The messages are scored in micro batches shared with the other scans running at the same time, the async scan
+    awaits the score of its batch on the event loop instead of holding a scanner worker.
     """
 
+    is_async = True
+
     def __init__(self, **kwargs):
         """
         Initialize the ToxicContentScanner with the specified parameters.
@@ -29,6 +33,7 @@ class ToxicContentScanner(Scanner):
             enable (bool): Flag to enable or disable the scanner.
         """
         super().__init__(**kwargs)
+        self.toxic_score_batcher = ToxicScoreBatcher()
 
     def scan(self, message: str) -> ScannerResult:
         """
@@ -40,11 +45,25 @@ class ToxicContentScanner(Scanner):
         Returns:
             dict: dictionary consisting of tags and other additional infos
         """
-        score = predict_prob([message])
-        is_safe = score[0] < self.model_score_threshold
+        return self.get_scan_result(message, self.toxic_score_batcher.score_blocking(message))
+
+    async def scan_async(self, message: str) -> ScannerResult:
+        """
+        Process the input prompt, awaiting the score of the batch of the message.
+
+        Parameters:
+            message (str): The input prompt that needs to be processed.
+
+        Returns:
+            dict: dictionary consisting of tags and other additional infos
+        """
+        return self.get_scan_result(message, await self.toxic_score_batcher.score(message))
+
+    def get_scan_result(self, message: str, score: float) -> ScannerResult:
+        is_safe = score < self.model_score_threshold
 
         if not is_safe:
-            analyzer_result = AnalyzerResult(start=0, end=len(message), entity_type=self.get_property('entity_type'), score=score[0],
+            analyzer_result = AnalyzerResult(start=0, end=len(message), entity_type=self.get_property('entity_type'), score=score,
                                          model_name='', scanner_name=self.get_property('name'), analysis_explanation=None,
                                          recognition_metadata=None)
             logger.debug(f"ToxicContentScanner: {self.entity_type} content detected in the input prompt.")
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+from threading import Lock
+
+from api.shield.cache.ttl_cache import TTLCache
+from api.shield.utils import config_utils
+from core.utils import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class BedrockGuardrailRuntime(Singleton):
+    """
+    The BedrockGuardrailRuntime class applies Bedrock guardrails with pooled bedrock-runtime clients.
+
+    Creating a boto3 client, and assuming a role for it, takes hundreds of milliseconds, so the clients are created
+    once per set of connection details and reused by all the requests until they expire. The clients expire so that
+    clients built from temporary credentials are recreated before the credentials do.
+    Guardrail verdicts can be cached too, keyed by the guardrail id, version and region, the guardrail source and a
+    hash of the content, so repeated identical messages are not sent to Bedrock again. DRAFT guardrail versions can
+    change at any time and are never cached.
+    Configurable limits:
+        bedrock_guardrail_client_pool_max_size: Maximum number of pooled clients.
+        bedrock_guardrail_client_ttl_sec: Time a pooled client is reused after it was created.
+        bedrock_guardrail_verdict_cache_enabled: Flag to cache the guardrail verdicts.
+        bedrock_guardrail_verdict_cache_max_size: Maximum number of cached verdicts.
+        bedrock_guardrail_verdict_cache_ttl_sec: Time a verdict is reused after it was received.
+        bedrock_guardrail_endpoint_url: Endpoint of the bedrock-runtime service, e.g. a local stub. Empty means the
+            AWS endpoint of the region.
+    """
+
+    def __init__(self):
+        """
+        Initialize the BedrockGuardrailRuntime with the client pool and the verdict cache.
+        """
+        if self.is_instance_initialized():
+            return
+        self.endpoint_url = config_utils.get_property_value("bedrock_guardrail_endpoint_url", None) or None
+        self.client_pool = TTLCache(
+            "bedrock_guardrail_client_pool",
+            config_utils.get_property_value_int("bedrock_guardrail_client_pool_max_size", 32),
+            config_utils.get_property_value_int("bedrock_guardrail_client_ttl_sec", 1800))
+        self._client_creation_lock = Lock()
+
+        self.verdict_cache = None
+        if config_utils.get_property_value_boolean("bedrock_guardrail_verdict_cache_enabled", False):
+            self.verdict_cache = TTLCache(
+                "bedrock_guardrail_verdict",
+                config_utils.get_property_value_int("bedrock_guardrail_verdict_cache_max_size", 1000),
+                config_utils.get_property_value_int("bedrock_guardrail_verdict_cache_ttl_sec", 300))
+        logger.info(f"BedrockGuardrailRuntime initialized with endpoint_url={self.endpoint_url}, "
+                    f"verdict_cache_enabled={self.verdict_cache is not None}")
+
+    def apply_guardrail(self, connection_details: dict, guardrail_id: str, guardrail_version: str, source: str,
+                        message: str) -> dict:
+        """
+        Apply the given guardrail to the message, returning the cached verdict of the same message when there is one.
+
+        Args:
+            connection_details (dict): The connection details of the guardrail.
+            guardrail_id (str): The guardrail id.
+            guardrail_version (str): The guardrail version.
+            source (str): The guardrail source, INPUT or OUTPUT.
+            message (str): The message to evaluate.
+
+        Returns:
+            dict: The apply_guardrail response.
+        """
+        verdict_key = None
+        if self.verdict_cache is not None and str(guardrail_version).upper() != "DRAFT":
+            verdict_key = (guardrail_id, str(guardrail_version), connection_details.get('region'), source,
+                           _hash(message))
+            response = self.verdict_cache.get(verdict_key)
+            if response is not None:
+                logger.debug(f"Using cached verdict of guardrail {guardrail_id}:{guardrail_version}")
+                return response
+
+        response = self.get_client(connection_details).apply_guardrail(
+            guardrailIdentifier=guardrail_id,
+            guardrailVersion=guardrail_version,
+            source=source,
+            content=[{'text': {'text': message}}]
+        )
+
+        if verdict_key is not None:
+            self.verdict_cache.put(verdict_key, response)
+        return response
+
+    def get_client(self, connection_details: dict):
+        """
+        Get the pooled bedrock-runtime client of the given connection details, creating it when there is none.
+
+        Args:
+            connection_details (dict): The connection details of the guardrail.
+
+        Returns:
+            boto3.client: The bedrock-runtime client.
+        """
+        client_key = _hash(json.dumps(connection_details, sort_keys=True, default=str))
+        client = self.client_pool.get(client_key)
+        if client is not None:
+            return client
+
+        # boto3 clients are created from the shared default session, which is not thread safe
+        with self._client_creation_lock:
+            client = self.client_pool.get(client_key)
+            if client is None:
+                from api.guardrails.providers.backend.bedrock import BedrockGuardrailProvider
+                client_kwargs = {'endpoint_url': self.endpoint_url} if self.endpoint_url else {}
+                client = BedrockGuardrailProvider(dict(connection_details)).create_bedrock_client('bedrock-runtime',
+                                                                                                  **client_kwargs)
+                self.client_pool.put(client_key, client)
+                logger.debug("Created pooled bedrock-runtime client")
+        return client
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from opentelemetry import metrics
+from profanity_check import predict_prob
+
+from api.shield.utils import config_utils
+from core.utils import Singleton
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+
+class ToxicScoreBatcher(Singleton):
+    """
+    The ToxicScoreBatcher class scores messages for toxic content in micro batches.
+
+    The toxicity model is vectorized, so scoring many messages in one predict_prob call costs much less than one call
+    per message. Scans submit their messages to a queue from the event loop and await the score; a single batching
+    thread collects the messages of concurrent requests, scores them in one call and hands every score back to the
+    scan that submitted the message. A message arriving alone is scored at once, the messages queued while a batch is
+    scored form the next batch.
+    Configurable limits:
+        toxic_scanner_batch_max_size: Maximum number of messages scored in one call.
+        toxic_scanner_batch_window_ms: Time to wait for more messages when other messages were already queued with the
+            first message of a batch, 0 means only the messages already waiting are batched.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ToxicScoreBatcher with the batch limits and start the batching thread.
+        """
+        if self.is_instance_initialized():
+            return
+        self.max_batch_size = max(1, config_utils.get_property_value_int("toxic_scanner_batch_max_size", 32))
+        self.batch_window_sec = config_utils.get_property_value_float("toxic_scanner_batch_window_ms", 2.0) / 1000
+        self._pending = queue.SimpleQueue()
+
+        self.batch_size_histogram = meter.create_histogram(
+            name="toxic_score_batch_size",
+            description="Number of messages scored in one toxic content model call",
+            unit="1"
+        )
+
+        self._batching_thread = threading.Thread(target=self._run, name="toxic-score-batcher", daemon=True)
+        self._batching_thread.start()
+        logger.info(f"ToxicScoreBatcher initialized with max_batch_size={self.max_batch_size}, "
+                    f"batch_window_ms={self.batch_window_sec * 1000}")
+
+    async def score(self, message: str) -> float:
+        """
+        Score the given message for toxic content, awaiting the score of the batch of the message.
+
+        Args:
+            message (str): The message to score.
+
+        Returns:
+            float: The probability that the message is toxic.
+        """
+        return await asyncio.wrap_future(self.submit(message))
+
+    def score_blocking(self, message: str) -> float:
+        """
+        Score the given message for toxic content, blocking until the batch of the message is scored.
+
+        Args:
+            message (str): The message to score.
+
+        Returns:
+            float: The probability that the message is toxic.
+        """
+        return self.submit(message).result()
+
+    def submit(self, message: str) -> Future:
+        """
+        Submit the given message to the next batch.
+
+        Args:
+            message (str): The message to score.
+
+        Returns:
+            Future: A future resolved with the probability that the message is toxic.
+        """
+        future = Future()
+        self._pending.put((message, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                logger.error(f"Error in toxic score batching thread: {e}")
+
+    def _collect_batch(self) -> list:
+        batch = [self._pending.get()]
+        self._drain_pending(batch)
+        if len(batch) == 1:
+            # nothing else is queued, a lone message does not wait for the window
+            return batch
+        deadline = time.monotonic() + self.batch_window_sec
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self._pending.get(timeout=timeout))
+                else:
+                    batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain_pending(self, batch: list):
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                return
+
+    def _score_batch(self, batch: list):
+        # the futures of the cancelled scans are skipped, the others can no longer be cancelled once running
+        batch = [(message, future) for message, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        messages = [message for message, _ in batch]
+        try:
+            scores = predict_prob(messages)
+        except Exception as e:
+            logger.error(f"Toxic content scoring failed for a batch of {len(batch)} messages: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batch_size_histogram.record(len(batch))
+        for (_, future), score in zip(batch, scores):
+            future.set_result(float(score))
@@ -1,3 +1,5 @@
+import asyncio
+import copy
 import logging
 
 from api.shield.model.scanner_result import ScannerResult
@@ -5,9 +7,10 @@ from api.shield.model.authorize_request import AuthorizeRequest
 from api.shield.scanners.BaseScanner import Scanner
 from api.shield.scanners.scanner_util import parse_properties
 from api.shield.cache.lru_cache import LRUCache
+from api.shield.otel.otel_metrics import record_authorize_stage_duration
+from api.shield.services.scanner_executor_service import ScannerExecutor
 from api.shield.utils import config_utils
 from opentelemetry import metrics
-import concurrent.futures
 
 from api.shield.utils.custom_exceptions import ShieldException
 import time
@@ -36,7 +39,7 @@ class ApplicationManager(Singleton):
         max_idle_time = config_utils.get_property_value_int("max_scanners_cache_idle_time", 1800)
         self.cache_name = "ApplicationKey_Scanners"
         self.application_key_scanners = LRUCache(self.cache_name, max_capacity, max_idle_time)
-        self.shield_scanner_max_workers = config_utils.get_property_value_int("shield_scanner_max_workers", 4)
+        self.scanner_executor = ScannerExecutor()
         ApplicationManager.scan_timings_histogram = meter.create_histogram("scan_timings", "ms",
                                                                            "Histogram for scan timings")
 
@@ -55,6 +58,8 @@ class ApplicationManager(Singleton):
         """
         Get the scanners for the given application key.
         If the scanners are not in the cache, load them.
+        The returned scanners are shallow copies of the cached scanners, so the request specific attributes set on
+        them do not leak into concurrent requests of the same application. Models and recognizers stay shared.
 
         Args:
             application_key (str): The application key.
@@ -71,7 +76,7 @@ class ApplicationManager(Singleton):
         all_scanners = self.application_key_scanners.get(application_key)
 
         scanners_list = [
-            scanner for scanner in all_scanners
+            copy.copy(scanner) for scanner in all_scanners
             if getattr(scanner, 'enforce_access_control', False) == is_authz_scan and request_type in getattr(scanner, 'request_types', [])
         ]
 
@@ -98,9 +103,11 @@ class ApplicationManager(Singleton):
 
         return scanners_list
 
-    def scan_messages(self, message: str, auth_req: AuthorizeRequest, is_authz_scan: bool) -> (dict[str, ScannerResult], dict[str, str]):
+    async def scan_messages(self, message: str, auth_req: AuthorizeRequest, is_authz_scan: bool) -> (dict[str, ScannerResult], dict[str, str]):
         """
         Scan the given messages for all the scanners where the enforce access control flag is true.
+        The scanners run concurrently on the shared scanner executor, the async scanners are awaited on the event
+        loop.
 
         Args:
             message (str): The message to scan.
@@ -118,17 +125,20 @@ class ApplicationManager(Singleton):
         logger.debug(f"Found {len(scanners)} scanners for application key: {application_key}")
 
         scan_results, scan_timings = {}, {}
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.shield_scanner_max_workers) as executor:
-            future_to_scanner = {executor.submit(scan_with_scanner, scanner, message, tenant_id): scanner for scanner in scanners}
-            for future in concurrent.futures.as_completed(future_to_scanner):
-                scanner = future_to_scanner[future]
-                try:
-                    scanner_name, result, message_scan_time = future.result()
-                    scan_results[scanner_name] = result
-                    scan_timings[scanner_name] = message_scan_time
-                except Exception as e:
-                    logger.error(f"Scanner {scanner.name} failed with exception: {e}")
-                    raise ShieldException(f"Scanner {scanner.name} failed with exception: {e}")
+        scan_outcomes = await asyncio.gather(
+            *[scan_with_async_scanner(scanner, message, tenant_id) if scanner.is_async is True
+              else self.scanner_executor.run(scanner.name, scan_with_scanner, scanner, message, tenant_id)
+              for scanner in scanners],
+            return_exceptions=True)
+        for scanner, outcome in zip(scanners, scan_outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                logger.error(f"Scanner {scanner.name} failed with exception: {outcome}")
+                raise ShieldException(f"Scanner {scanner.name} failed with exception: {outcome}")
+            scanner_name, result, message_scan_time = outcome
+            scan_results[scanner_name] = result
+            scan_timings[scanner_name] = message_scan_time
         return scan_results, scan_timings
 
 
@@ -147,12 +157,38 @@ def scan_with_scanner(scanner: Scanner, message: str, tenant_id: str) -> (str, S
     logger.debug(f"Scanning message with scanner: {scanner.name}")
     message_scan_start_time = time.perf_counter()
     result = scanner.scan(message)
+    return record_scan_result(scanner, message, tenant_id, result, message_scan_start_time)
+
+
+async def scan_with_async_scanner(scanner: Scanner, message: str, tenant_id: str) -> (str, ScannerResult, str):
+    """
+    Scan the given message with the given async scanner on the event loop.
+
+    Args:
+        scanner (Scanner): The scanner to use.
+        message (str): The message to scan.
+        tenant_id (str): The tenant ID.
+
+    Returns:
+        dict: The scan results.
+    """
+    logger.debug(f"Scanning message with async scanner: {scanner.name}")
+    message_scan_start_time = time.perf_counter()
+    result = await scanner.scan_async(message)
+    return record_scan_result(scanner, message, tenant_id, result, message_scan_start_time)
+
+
+def record_scan_result(scanner: Scanner, message: str, tenant_id: str, result: ScannerResult,
+                       message_scan_start_time: float) -> (str, ScannerResult, str):
     logger.debug(f"Scanner {scanner.name} got this result: {result} for message: {message}, which is having access "
                  f"control: {scanner.enforce_access_control}")
     message_scan_time = f"{((time.perf_counter() - message_scan_start_time) * 1000):.3f}"
     ApplicationManager.scan_timings_histogram.record(float(message_scan_time),
                                                      {"scanner": scanner.name,
                                                       "tenant_id": tenant_id})
+    record_authorize_stage_duration("scanner", float(message_scan_time), tenant_id=tenant_id,
+                                    application_key=getattr(scanner, 'application_key', None),
+                                    scanner=scanner.name)
     return scanner.name, result, message_scan_time
 
 def _extract_guardrail_instance_infos(context: dict) -> list:
@@ -1,3 +1,4 @@
+import asyncio
 import copy
 import json
 import logging
@@ -8,10 +9,12 @@ from api.shield.enum.ShieldEnums import Guardrail
 from api.shield.factory.account_service_factory import AccountServiceFactory
 from api.shield.factory.authz_service_client_factory import AuthzServiceClientFactory
 from api.shield.logfile.audit_loggers import FluentdAuditLogger
+from api.shield.otel.otel_metrics import record_authorize_stage_duration
 from api.shield.services.application_manager_service import ApplicationManager
 from api.shield.presidio.nlp_handler import NLPHandler
 from api.shield.presidio.presidio_anonymizer_engine import PresidioAnonymizerEngine
 from api.shield.utils import config_utils
+from api.shield.model.authorize_context import AuthorizeContext
 from api.shield.model.authorize_request import AuthorizeRequest
 from api.shield.model.authorize_response import AuthorizeResponse
 from api.shield.model.authz_service_request import AuthzServiceRequest
@@ -25,7 +28,7 @@ from api.shield.utils.custom_exceptions import ShieldException
 from api.shield.utils import json_utils
 from api.shield.logfile.log_message_in_s3 import LogMessageInS3File
 from api.shield.logfile.log_message_in_local import LogMessageInLocal
-from paig_common.paig_exception import DiskFullException, AuditEventQueueFullException
+from paig_common.paig_exception import DiskFullException
 from api.shield.factory.governance_service_factory import GovernanceServiceFactory
 from api.shield.factory.guardrail_service_factory import GuardrailServiceFactory
 from api.shield.services.guardrail_service import process_guardrail_response
@@ -73,8 +76,6 @@ class AuthService:
         self.tenant_data_encryptor_service = TenantDataEncryptorService(self.account_service_client)
         self.presidio_anonymizer_engine = PresidioAnonymizerEngine()
 
-        self.access_log_timing_message = ""
-        self.auth_req_context = {}
         self.message_log_objs = []
         self.fluentd_audit_logger = None
         self.audit_spool_dir = config_utils.get_property_value("audit_spool_dir", "/workdir/shield/audit-spool")
@@ -92,121 +93,145 @@ class AuthService:
         Authorizes a request by processing and analyzing the authorization request, performing
         access control checks, masking sensitive information, and logging audit data.
 
+        All the state of the request is kept in an AuthorizeContext, so concurrent requests can be processed by the
+        same AuthService instance.
+
         Returns:
             AuthorizeResponse: The response object containing the authorization result and masked messages.
 
         """
-        authorize_start_time = time.perf_counter()
-        masked_messages = []
-        original_masked_text_list = []
-        all_result_traits = []
-        access_control_traits = set()
-        analyzer_result_map = {}
-        self.auth_req_context = auth_req.context
+        auth_ctx = AuthorizeContext(auth_req)
 
         # Decrypt authorize request
         decrypt_start_time = time.perf_counter()
         await self.tenant_data_encryptor_service.decrypt_authorize_request(auth_req)
-        logger.debug("Auth Request After Decrypt : " + json_utils.mask_json_fields(json.dumps(auth_req.__dict__),
-                                                                                   ['messages']))
-        decrypt_time = f"{((time.perf_counter() - decrypt_start_time) * 1000):.3f}"
+        logger.debug("Auth Request After Decrypt : %s", json_utils.LazyMaskedJson(auth_req.__dict__, ['messages']))
+        self.record_stage_time(auth_ctx, "decryption", decrypt_start_time)
 
         # loop through the messages in request to scan for traits
         message_analyze_start_time = time.perf_counter()
-        scan_timings_per_message = self.analyze_scan_messages(access_control_traits, all_result_traits,
-                                                              analyzer_result_map, auth_req, True, {})
-        message_analyze_time = f"{((time.perf_counter() - message_analyze_start_time) * 1000):.3f}"
-        logger.debug(f"All resulted tags from input text {all_result_traits}")
+        scan_timings_per_message = await self.analyze_scan_messages(auth_ctx.access_control_traits,
+                                                                    auth_ctx.all_result_traits,
+                                                                    auth_ctx.analyzer_result_map, auth_req, True, {})
+        self.record_stage_time(auth_ctx, "message_analysis", message_analyze_start_time)
+        logger.debug(f"All resulted tags from input text {auth_ctx.all_result_traits}")
 
         # authorize traits
         authz_start_time = time.perf_counter()
         logger.debug(f"Calling authz service with request: {auth_req} "
-                     f"with traits for access control: {all_result_traits}")
-        authz_service_res = await self.do_authz_authorize(auth_req, all_result_traits)
-        authz_time = f"{((time.perf_counter() - authz_start_time) * 1000):.3f}"
+                     f"with traits for access control: {auth_ctx.all_result_traits}")
+        authz_service_res = await self.do_authz_authorize(auth_req, auth_ctx.all_result_traits)
+        self.record_stage_time(auth_ctx, "authz", authz_start_time)
         logger.debug(f"Received authz service response: {authz_service_res.__dict__}")
         is_allowed = authz_service_res.authorized
 
         # process for non authz scanners
         non_authz_scan_timings_per_message = 0
         if is_allowed:
-            is_allowed, non_authz_scan_timings_per_message = await self.do_guardrail_scan(access_control_traits,
-                                                                                          all_result_traits,
-                                                                                          analyzer_result_map, auth_req,
-                                                                                          authz_service_res)
+            guardrail_start_time = time.perf_counter()
+            is_allowed, non_authz_scan_timings_per_message = await self.do_guardrail_scan(
+                auth_ctx.access_control_traits, auth_ctx.all_result_traits, auth_ctx.analyzer_result_map, auth_req,
+                authz_service_res)
+            self.record_stage_time(auth_ctx, "guardrail", guardrail_start_time)
 
         masking_start_time = time.perf_counter()
         # post authz process i.e masking the message
-        self.post_authz_process(analyzer_result_map, auth_req, authz_service_res, masked_messages, original_masked_text_list)
-        masking_time = f"{((time.perf_counter() - masking_start_time) * 1000):.3f}"
+        self.post_authz_process(auth_ctx, authz_service_res)
+        self.record_stage_time(auth_ctx, "masking", masking_start_time)
 
         # encrypt the message
-        await self.tenant_data_encryptor_service.encrypt_shield_audit(original_masked_text_list,
+        audit_encrypt_start_time = time.perf_counter()
+        await self.tenant_data_encryptor_service.encrypt_shield_audit(auth_ctx.original_masked_text_list,
                                                                       tenant_id=auth_req.tenant_id,
                                                                       encryption_key_id=auth_req.shield_server_key_id)
+        self.record_stage_time(auth_ctx, "audit_encryption", audit_encrypt_start_time)
         logger.debug("Encrypted the message before shield audit object creation")
 
         # log audit
-        all_result_traits = sorted(all_result_traits)
-        shield_audit = ShieldAudit(auth_req, authz_service_res, all_result_traits, original_masked_text_list)
+        all_result_traits = sorted(auth_ctx.all_result_traits)
+        shield_audit = ShieldAudit(auth_req, authz_service_res, all_result_traits, auth_ctx.original_masked_text_list)
         audit_cloud_time, audit_self_managed_time = 0, 0
         if auth_req.enable_audit is None or auth_req.enable_audit:
             # audit the message to fluentd or S3
+            audit_dispatch_start_time = time.perf_counter()
             audit_cloud_time, audit_self_managed_time = await self.audit(shield_audit)
+            self.record_stage_time(auth_ctx, "audit_dispatch", audit_dispatch_start_time)
 
         logger.debug("Completed audit logging")
         # Updating Authorize response Object response_messages with the data required by plugin in case of
         # streaming.
-        self.enrich_auth_response(authz_service_res, masked_messages, all_result_traits)
+        self.enrich_auth_response(authz_service_res, auth_ctx.masked_messages, all_result_traits)
 
         # process authorize response
-        auth_response = AuthorizeResponse(is_allowed=is_allowed, response_messages=masked_messages, auth_req=auth_req)
+        auth_response = AuthorizeResponse(is_allowed=is_allowed, response_messages=auth_ctx.masked_messages,
+                                          auth_req=auth_req)
         # Encrypt the response messages with plugin's provided public key
         encrypt_start_time = time.perf_counter()
         if auth_response.isAllowed:
             await self.tenant_data_encryptor_service.encrypt_authorize_response(auth_req, auth_response)
-            logger.debug("Auth Response After Encrypt : " + json_utils.mask_json_fields(
-                json.dumps(auth_response.__dict__),
-                ['responseMessages']))
-        encrypt_time = f"{((time.perf_counter() - encrypt_start_time) * 1000):.3f}"
-
-        authorize_total_time = f"{((time.perf_counter() - authorize_start_time) * 1000):.3f}"
-        self.access_log_timing_message = (f" Total time= {authorize_total_time}ms, "
-                                          f"Decryption time= {decrypt_time}ms, Message analysis time= {message_analyze_time}ms, "
-                                          f"Authz authorization time = {authz_time}ms, Masking time= {masking_time}ms, "
-                                          f"Encryption time= {encrypt_time}ms, Audit Cloud time= {audit_cloud_time}ms ,"
-                                          f"Audit Self managed time= {audit_self_managed_time}ms ,"
-                                          f"Message Scan timings= {scan_timings_per_message}ms, "
-                                          f"Non Authz Message Scan timings= {non_authz_scan_timings_per_message}ms")
+            logger.debug("Auth Response After Encrypt : %s",
+                         json_utils.LazyMaskedJson(auth_response.__dict__, ['responseMessages']))
+        self.record_stage_time(auth_ctx, "response_encryption", encrypt_start_time)
+
+        authorize_total_time = self.record_stage_time(auth_ctx, "total", auth_ctx.start_time)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Authorize timings for request {auth_req.request_id}: "
+                         f"Total time= {authorize_total_time}ms, "
+                         f"Decryption time= {auth_ctx.get_stage_time('decryption')}ms, "
+                         f"Message analysis time= {auth_ctx.get_stage_time('message_analysis')}ms, "
+                         f"Authz authorization time = {auth_ctx.get_stage_time('authz')}ms, "
+                         f"Guardrail time= {auth_ctx.get_stage_time('guardrail')}ms, "
+                         f"Masking time= {auth_ctx.get_stage_time('masking')}ms, "
+                         f"Audit Encryption time= {auth_ctx.get_stage_time('audit_encryption')}ms, "
+                         f"Encryption time= {auth_ctx.get_stage_time('response_encryption')}ms, "
+                         f"Audit Cloud time= {audit_cloud_time}ms ,"
+                         f"Audit Self managed time= {audit_self_managed_time}ms ,"
+                         f"Message Scan timings= {scan_timings_per_message}ms, "
+                         f"Non Authz Message Scan timings= {non_authz_scan_timings_per_message}ms")
 
         return auth_response
 
-    def post_authz_process(self, analyzer_result_map, auth_req, authz_service_res, masked_messages,
-                           original_masked_text_list):
+    @staticmethod
+    def record_stage_time(auth_ctx: AuthorizeContext, stage: str, stage_start_time: float) -> str:
+        """
+        Records the time taken by a stage of the authorize pipeline on the request context and in the
+        stage duration histogram, tagged with the tenant and application of the request.
+
+        Returns:
+            str: The stage time in milliseconds.
+        """
+        stage_time = auth_ctx.record_stage_time(stage, stage_start_time)
+        record_authorize_stage_duration(stage, float(stage_time), tenant_id=auth_ctx.auth_req.tenant_id,
+                                        application_key=auth_ctx.auth_req.application_key)
+        return stage_time
+
+    def post_authz_process(self, auth_ctx: AuthorizeContext, authz_service_res):
         """
         Processes the authorization response by either masking the request messages or appending an error message
         based on the authorization result.
 
         """
-        for request_text in auth_req.messages:
-            self.process_masking(analyzer_result_map.get(request_text, []), request_text, authz_service_res,
-                                    masked_messages,
-                                    original_masked_text_list)
+        for request_text in auth_ctx.auth_req.messages:
+            self.process_masking(auth_ctx, auth_ctx.analyzer_result_map.get(request_text, []), request_text,
+                                 authz_service_res)
 
-    def analyze_scan_messages(self, access_control_traits, all_result_traits, analyzer_result_map, auth_req,
+    async def analyze_scan_messages(self, access_control_traits, all_result_traits, analyzer_result_map, auth_req,
                               is_authz_scan, masked_traits_dict):
         """
         Analyzes the messages in the authorization request to extract traits and generate scan results.
+        The messages are scanned concurrently, so batching scanners can score them together, and the results are
+        merged in the order of the messages.
 
         Returns:
             list: A list of dictionaries where each dictionary contains the scan timings for a message, with each
                   dictionary keyed by scanner names and their respective scan timings in milliseconds.
         """
+        scan_outcomes = await asyncio.gather(
+            *[self.application_manager.scan_messages(request_text, auth_req, is_authz_scan)
+              for request_text in auth_req.messages])
+
         scan_timings_per_message = []
-        for request_text in auth_req.messages:
-            # Analyze traits
-            scanners_results, message_scan_timings = self.application_manager.scan_messages(
-                request_text, auth_req, is_authz_scan)
+        for request_text, (scanners_results, message_scan_timings) in zip(auth_req.messages, scan_outcomes):
             scan_timings = {scanner_name: f"{message_scan_time}ms" for scanner_name, message_scan_time in
                             message_scan_timings.items()}
 
@@ -283,12 +308,11 @@ class AuthService:
     async def audit_stream_data(self, shield_audit):
         """
         Performs decryption and encryption of the provided `shield_audit` object and then logs the audit data.
+        The decrypted messages are streamed into the encryption, the full replies of long streams are not held as
+        plaintext.
 
         """
-        await self.tenant_data_encryptor_service.decrypt_shield_audit(shield_audit)
-        await self.tenant_data_encryptor_service.encrypt_shield_audit(shield_audit.messages,
-                                                                      tenant_id=shield_audit.tenantId,
-                                                                      encryption_key_id=shield_audit.encryptionKeyId)
+        await self.tenant_data_encryptor_service.reencrypt_shield_audit(shield_audit)
 
         await self.audit(shield_audit)
 
@@ -306,18 +330,21 @@ class AuthService:
         authz_service_req = AuthzServiceRequest(auth_req=auth_req, traits=result_entities)
         return await self.authz_service_client.post_authorize(authz_service_req, auth_req.tenant_id)
 
-    def process_masking(self, analyzer_result, request_text, authz_service_res: AuthzServiceResponse, masked_messages,
-                        original_masked_text_list):
+    def process_masking(self, auth_ctx: AuthorizeContext, analyzer_result, request_text,
+                        authz_service_res: AuthzServiceResponse):
         """
         Processes and masks sensitive information in the request text based on the authorization response.
 
         This method handles the masking of sensitive information identified in the request text.
         It utilizes the Presidio Anonymizer Engine to mask entities as specified by the authorization service response.
-        The results are added to `masked_messages` and `original_masked_text_list`.
+        The results are added to `masked_messages` and `original_masked_text_list` of the request context.
         """
         logger.debug("Masking process started")
+        masked_messages = auth_ctx.masked_messages
+        original_masked_text_list = auth_ctx.original_masked_text_list
         masking_list = authz_service_res.masked_traits
-        final_analyzer_result = self.process_and_convert_analyzer_result(analyzer_result)
+        final_analyzer_result = self.process_and_convert_analyzer_result(analyzer_result,
+                                                                         auth_ctx.previous_sentence_length)
 
         if masking_list:
             entities_with_custom_masked_value = masking_list
@@ -344,7 +371,8 @@ class AuthService:
 
         logger.debug("Masking process finished")
 
-    def process_and_convert_analyzer_result(self, analyzer_result):
+    @staticmethod
+    def process_and_convert_analyzer_result(analyzer_result, previous_sentence_length=0):
         """
         Processes and converts the analyzer results to adjust entity positions and prepare them for JSON serialization.
 
@@ -353,7 +381,6 @@ class AuthService:
         into a JSON-serializable format.
         """
         analyzer_result_copy = copy.deepcopy(analyzer_result)
-        previous_sentence_length = self.auth_req_context.get('previous_sentence_length', 0)
 
         result_json_list = []
         for result in analyzer_result_copy:
@@ -375,16 +402,15 @@ class AuthService:
             shield_audit (ShieldAudit): The audit data to be logged.
 
         Raises:
-            ShieldException: If there is no space left on the device, the audit event queue is full, or logging fails
-            due to other reasons and audit failure error is enabled.
+            ShieldException: If there is no space left on the device, or logging fails due to other reasons and audit
+            failure error is enabled.
        """
 
         audit_msg_content_to_paig_cloud = config_utils.get_property_value_boolean("audit_msg_content_to_paig_cloud",
                                                                                   False)
         if audit_msg_content_to_paig_cloud is False:
-            masked_audit_obj = json_utils.mask_json_fields(json.dumps(shield_audit.__dict__),
-                                                           ['originalMessage', 'maskedMessage'], "")
-            shield_audit.__dict__ = json.loads(masked_audit_obj)
+            shield_audit.__dict__ = json_utils.mask_fields(shield_audit.__dict__,
+                                                           {'originalMessage', 'maskedMessage'}, "")
 
         fluentd_audit_logger = self.get_or_create_fluentd_audit_logger()
         fluentd_failure_enabled = config_utils.get_property_value_boolean("audit_failure_error_enabled", True)
@@ -395,11 +421,6 @@ class AuthService:
                 self.fluentd_failure_counter.add(1)
                 raise ShieldException("No space left on device. Disk is full. Please increase the disk size or free "
                                       "up some space to push audits successfully.")
-        except AuditEventQueueFullException:
-            if fluentd_failure_enabled is True:
-                self.fluentd_failure_counter.add(1)
-                raise ShieldException("Audit event queue is full.The push rate is too high for the audit "
-                                      "spooler to process.")
         except Exception as e:
             logger.error(
                 f"Error logging audit message to fluentd: {type(e).__name__}: {str(e)} \n{traceback.format_exc()}")
@@ -476,7 +497,7 @@ class AuthService:
         :return:
         """
         audit_event_queue_timeout_sec = config_utils.get_property_value_int("audit_event_queue_timeout_sec", 5)
-        max_queue_size = config_utils.get_property_value_int("audit_event_queue_max_size", 0)
+        max_queue_size = config_utils.get_property_value_int("audit_event_queue_max_size", 10000)
         if self.fluentd_audit_logger is None:
             self.fluentd_audit_logger = FluentdAuditLogger(self.fluentd_logger_client, self.audit_spool_dir,
                                                            max_queue_size,
@@ -536,7 +557,7 @@ class AuthService:
             auth_req.context.update({"guardrail_info": guardrail_info})
             auth_req.context.update({"pii_traits": all_result_traits})
             masked_traits = {}
-            non_authz_scan_timings_per_message = self.analyze_scan_messages(access_control_traits, all_result_traits,
+            non_authz_scan_timings_per_message = await self.analyze_scan_messages(access_control_traits, all_result_traits,
                                                                             analyzer_result_map, auth_req, False,
                                                                             masked_traits)
 
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from opentelemetry import metrics
+
+from api.shield.utils import config_utils
+from api.shield.utils.custom_exceptions import ShieldException
+from core.utils import Singleton
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+
+class ScannerExecutor(Singleton):
+    """
+    The ScannerExecutor class runs the scanners of all requests on one long-lived thread pool.
+
+    Scanners are blocking (model inference, regex matching, remote guardrail calls), so they are executed on worker
+    threads and async callers await the result without blocking the event loop.
+    Configurable limits:
+        shield_scanner_max_workers: Number of worker threads shared by all requests.
+        shield_scanner_max_queue_size: Maximum number of scans waiting for a free worker or a free slot of their
+            scanner, 0 means unbounded.
+            Scans submitted while the queue is full are rejected with a ShieldException.
+        shield_scanner_max_concurrency_per_scanner: Maximum number of concurrent runs of a single scanner,
+            0 means no limit. Scans over the limit wait on the event loop, so they don't hold the workers needed by
+            the other scanners.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ScannerExecutor with the thread pool, limits and metrics.
+        """
+        if self.is_instance_initialized():
+            return
+        self.max_workers = config_utils.get_property_value_int("shield_scanner_max_workers", 4)
+        self.max_queue_size = config_utils.get_property_value_int("shield_scanner_max_queue_size", 0)
+        self.max_concurrency_per_scanner = config_utils.get_property_value_int(
+            "shield_scanner_max_concurrency_per_scanner", 0)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="shield-scanner")
+
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._scanner_semaphores = {}
+
+        self.queue_depth_counter = meter.create_up_down_counter(
+            name="scanner_queue_depth",
+            description="Number of scans waiting for a free scanner worker",
+            unit="1"
+        )
+        self.in_flight_counter = meter.create_up_down_counter(
+            name="scanner_in_flight",
+            description="Number of scans currently running on scanner workers",
+            unit="1"
+        )
+        self.rejected_counter = meter.create_counter(
+            name="scanner_rejected_total",
+            description="Count of scans rejected because the scanner queue was full",
+            unit="1"
+        )
+        logger.info(f"ScannerExecutor initialized with max_workers={self.max_workers}, "
+                    f"max_queue_size={self.max_queue_size}, "
+                    f"max_concurrency_per_scanner={self.max_concurrency_per_scanner}")
+
+    def get_queue_depth(self) -> int:
+        """
+        Get the number of scans waiting for a free worker.
+
+        Returns:
+            int: The current queue depth.
+        """
+        return self._queue_depth
+
+    async def run(self, scanner_name: str, func, *args):
+        """
+        Run the given blocking function for the given scanner on the shared thread pool and await its result.
+
+        Args:
+            scanner_name (str): The name of the scanner, used for per scanner limits and metrics.
+            func (callable): The function to execute.
+            *args: Arguments passed to the function.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            ShieldException: If the scanner queue is full.
+        """
+        self._enqueue(scanner_name)
+        # the scan waits for a slot of its scanner on the event loop, so it holds a worker only once it can run
+        semaphore = self._get_scanner_semaphore(scanner_name)
+        if semaphore is not None:
+            try:
+                await semaphore.acquire()
+            except BaseException:
+                self._dequeue(scanner_name)
+                raise
+        try:
+            future = self.executor.submit(self._run_scan, scanner_name, func, *args)
+        except Exception:
+            self._dequeue(scanner_name)
+            if semaphore is not None:
+                semaphore.release()
+            raise
+        # a scan cancelled before it was picked by a worker never reaches _run_scan
+        future.add_done_callback(lambda f: f.cancelled() and self._dequeue(scanner_name))
+        if semaphore is not None:
+            # the slot is released once the scan is done, even when the awaiting request was cancelled
+            loop = asyncio.get_running_loop()
+            future.add_done_callback(lambda f: self._release_scanner_semaphore(loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+    def _enqueue(self, scanner_name: str):
+        with self._lock:
+            if 0 < self.max_queue_size <= self._queue_depth:
+                self.rejected_counter.add(1, {"scanner": scanner_name})
+                logger.error(f"Scanner queue is full with {self._queue_depth} pending scans, "
+                             f"rejecting scan for scanner: {scanner_name}")
+                raise ShieldException("Scanner queue is full. The request rate is too high for the scanners "
+                                      "to process.")
+            self._queue_depth += 1
+        self.queue_depth_counter.add(1, {"scanner": scanner_name})
+
+    def _dequeue(self, scanner_name: str):
+        with self._lock:
+            self._queue_depth -= 1
+        self.queue_depth_counter.add(-1, {"scanner": scanner_name})
+
+    def _get_scanner_semaphore(self, scanner_name: str):
+        """
+        Get the semaphore limiting the concurrent runs of the scanner, bound to the running event loop.
+        """
+        if self.max_concurrency_per_scanner <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore_loop, semaphore = self._scanner_semaphores.get(scanner_name, (None, None))
+            if semaphore is None or semaphore_loop is not loop:
+                semaphore = asyncio.Semaphore(self.max_concurrency_per_scanner)
+                self._scanner_semaphores[scanner_name] = (loop, semaphore)
+        return semaphore
+
+    @staticmethod
+    def _release_scanner_semaphore(loop, semaphore):
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # the event loop is closed, the semaphore is not used anymore
+            pass
+
+    def _run_scan(self, scanner_name: str, func, *args):
+        self._dequeue(scanner_name)
+        self.in_flight_counter.add(1, {"scanner": scanner_name})
+        try:
+            return func(*args)
+        finally:
+            self.in_flight_counter.add(-1, {"scanner": scanner_name})
@@ -87,6 +87,14 @@ class ShieldService:
 
         return stream_shield_audit
 
+    async def audit_batch(self, requests):
+        # all the records are parsed before any is logged, so a malformed record rejects the whole batch
+        stream_shield_audits = [ShieldAuditViaApi(request) for request in requests]
+        for stream_shield_audit in stream_shield_audits:
+            await self.auth_service.audit_stream_data(stream_shield_audit)
+
+        return stream_shield_audits
+
     # noinspection PyMethodMayBeStatic
     async def guardrail_test(self, request: dict, tenant_id: str , user_role: str):
 
@@ -1,13 +1,20 @@
 import ast
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import threading
 import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from api.encryption.services.encryption_key_service import add_encryption_key_change_listener
 from api.shield.model.shield_audit import ShieldAuditViaApi
 from api.shield.utils.custom_exceptions import ShieldException
 from paig_common.encryption import DataEncryptor
@@ -18,11 +25,18 @@ from api.shield.model.authorize_request import AuthorizeRequest
 from core.utils import Singleton
 
 logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+# fields of the audit messages which are not encrypted
+AUDIT_UNENCRYPTED_FIELDS = frozenset(["analyzerResult"])
+# fields of the authorize response messages which are encrypted
+RESPONSE_ENCRYPTED_FIELDS = frozenset(["responseText"])
 
 
 class ShieldDataEncryptor:
 
-    def __init__(self, tenant_id, enable_background_key_refresh=True, account_service_client=None):
+    def __init__(self, tenant_id, enable_background_key_refresh=True, account_service_client=None,
+                 data_encryptor_provider=None):
         logger.debug(
             f"==> {tenant_id} : ShieldDataEncryptor(tenant_id={tenant_id}, "
             f"enable_encryption_key_refresher={enable_background_key_refresh})")
@@ -35,6 +49,8 @@ class ShieldDataEncryptor:
         self.account_service_client = account_service_client
         self.enable_background_key_refresh = enable_background_key_refresh
         self.encryption_key_refresher = None
+        # returns the DataEncryptor of a key pair, e.g. one shared by the encryptors using the same keys
+        self.data_encryptor_provider = data_encryptor_provider
 
         logger.debug(
             f"<== ShieldDataEncryptor(tenant_id={tenant_id}, enable_encryption_key_refresher="
@@ -64,18 +80,21 @@ class ShieldDataEncryptor:
             if public_key is None and private_key is None:
                 raise ShieldException(
                     f"Encryption keys with id {encryption_key_id} not found for tenant {self.tenant_id}")
-            self.data_encryptor = DataEncryptor(public_key=public_key, private_key=private_key)
+            if self.data_encryptor_provider is not None:
+                self.data_encryptor = self.data_encryptor_provider(public_key, private_key)
+            else:
+                self.data_encryptor = DataEncryptor(public_key=public_key, private_key=private_key)
         else:
             raise ValueError("Encryption key id cannot be -1")
 
         logger.debug(f"<== {self.tenant_id} : ShieldDataEncryptor::create_data_encryptor()")
 
-    def encrypt(self, data):
+    def encrypt(self, data, encryption_mode=None):
         if self.data_encryptor is None:
             logger.error(f"Encryption keys not loaded for tenant = {self.tenant_id}")
             raise ShieldException()
 
-        return self.data_encryptor.encrypt(data)
+        return self.data_encryptor.encrypt(data, encryption_mode)
 
     def decrypt(self, data):
         if self.data_encryptor is None:
@@ -84,6 +103,90 @@ class ShieldDataEncryptor:
 
         return self.data_encryptor.decrypt(data)
 
+    def encrypt_stream(self, data, encryption_mode=None):
+        """
+        Encrypts the given text or iterable of texts, yielding the encrypted text incrementally, see
+        DataEncryptor.encrypt_stream.
+        """
+        if self.data_encryptor is None:
+            logger.error(f"Encryption keys not loaded for tenant = {self.tenant_id}")
+            raise ShieldException()
+
+        return self.data_encryptor.encrypt_stream(data, encryption_mode)
+
+    def decrypt_stream(self, data):
+        """
+        Decrypts the given encrypted text or iterable of encrypted texts, yielding the decrypted text incrementally,
+        see DataEncryptor.decrypt_stream.
+        """
+        if self.data_encryptor is None:
+            logger.error(f"Encryption keys not loaded for tenant = {self.tenant_id}")
+            raise ShieldException()
+
+        return self.data_encryptor.decrypt_stream(data)
+
+    def encrypt_records(self, records, fields=None, skip_fields=(), encryption_mode=None):
+        """
+        Encrypts the non-null fields of all the given records in a single pass, replacing the values in place.
+
+        Args:
+            records (list of dict): The records to encrypt.
+            fields (collection of str): The fields to encrypt, all the fields when None.
+            skip_fields (collection of str): The fields left unencrypted.
+            encryption_mode (str): The encryption mode, the mode of the data encryptor when None.
+
+        Returns:
+            list of dict: The given records.
+        """
+        return self._transform_records(records, lambda value: self.encrypt(value, encryption_mode), fields,
+                                       skip_fields)
+
+    def reencrypt_records(self, records, skip_fields=(), encryption_mode=None):
+        """
+        Decrypts and encrypts again the non-null fields of all the given records, replacing the values in place. The
+        decrypted text is streamed into the encryption, so the plaintext of a long message is never held as a whole.
+
+        Args:
+            records (list of dict): The records to encrypt again.
+            skip_fields (collection of str): The fields left as they are.
+            encryption_mode (str): The encryption mode, the mode of the data encryptor when None.
+
+        Returns:
+            list of dict: The given records.
+        """
+        return self._transform_records(
+            records, lambda value: "".join(self.encrypt_stream(self.decrypt_stream(value), encryption_mode)), None,
+            skip_fields)
+
+    def decrypt_records(self, records, fields=None, skip_fields=()):
+        """
+        Decrypts the non-null fields of all the given records in a single pass, replacing the values in place.
+
+        Args:
+            records (list of dict): The records to decrypt.
+            fields (collection of str): The fields to decrypt, all the fields when None.
+            skip_fields (collection of str): The fields left as they are.
+
+        Returns:
+            list of dict: The given records.
+        """
+        return self._transform_records(records, self.decrypt, fields, skip_fields)
+
+    @staticmethod
+    def _transform_records(records, transform, fields, skip_fields):
+        for record in records:
+            for key, value in record.items():
+                if value is not None and key not in skip_fields and (fields is None or key in fields):
+                    record[key] = transform(value)
+        return records
+
+    def get_key_bytes(self):
+        """
+        Returns the size of the encryption keys held by this encryptor.
+        """
+        return sum(len(str(key)) for key_map in (self.shield_server_public_key_map, self.shield_server_private_key_map,
+                                                 self.shield_plugin_public_key_map) for key in key_map.values())
+
     def cleanup(self):
         logger.debug(f"==> {self.tenant_id} : ShieldDataEncryptor::cleanup()")
         if self.enable_background_key_refresh:
@@ -92,6 +195,16 @@ class ShieldDataEncryptor:
 
 
 class EncryptionKeyRefresher:
+    """
+    Keeps the encryption keys of a ShieldDataEncryptor up to date.
+
+    The keys are downloaded periodically, and reloaded only when the key set changed, which is detected by comparing
+    the version (hash) of the downloaded key set with the one of the loaded keys. While the keys are unchanged the poll
+    interval is doubled after every download, up to encryption_key_refresher_max_poll_interval_sec, and it is reset
+    when the keys change or are invalidated. Changes of the local encryption keys invalidate the keys, so they are
+    reloaded right away.
+    """
+
     def __init__(self, data_encryptor: ShieldDataEncryptor, account_service_client=None):
 
         logger.debug(f"==> {data_encryptor.tenant_id} : EncryptionKeyRefresher({data_encryptor})")
@@ -105,7 +218,14 @@ class EncryptionKeyRefresher:
         encryption_keys_cache_dir = config_utils.get_property_value("encryption_keys_cache_dir", "/tmp/encrypt_cache")
         self.key_file_path = encryption_keys_cache_dir + f"/key_{self.tenant_id}.json"
 
-        self.poll_interval_sec = config_utils.get_property_value_int("encryption_key_refresher_poll_interval_sec", 10)
+        self.base_poll_interval_sec = config_utils.get_property_value_int("encryption_key_refresher_poll_interval_sec",
+                                                                          10)
+        self.max_poll_interval_sec = max(self.base_poll_interval_sec, config_utils.get_property_value_int(
+            "encryption_key_refresher_max_poll_interval_sec", self.base_poll_interval_sec))
+        self.poll_interval_sec = self.base_poll_interval_sec
+        self.key_set_version = None
+        self.refresh_event = asyncio.Event()
+        self.refresh_task = None
 
         self.enable_encryption_keys_cache_dir = config_utils.get_property_value_boolean(
             "enable_encryption_keys_cache_dir")
@@ -120,6 +240,7 @@ class EncryptionKeyRefresher:
             if len(encryption_key_info_list) > 0:
                 for encryption_key_info in encryption_key_info_list:
                     self.refresh_context_with_key_info(EncryptionKeyInfo(encryption_key_info))
+                self.key_set_version = self.get_key_set_version(encryption_key_info_list)
 
         await self.download_and_refresh_key()
 
@@ -129,7 +250,30 @@ class EncryptionKeyRefresher:
         logger.debug(f"==> {self.tenant_id} : EncryptionKeyRefresher::async_run() started")
         while not self.exit_event.is_set():
             await self.download_and_refresh_key()
-            await asyncio.sleep(self.poll_interval_sec)
+            await self.wait_for_next_refresh()
+
+    async def wait_for_next_refresh(self):
+        """
+        Waits for the poll interval to elapse, or for the keys to be invalidated.
+        """
+        try:
+            await asyncio.wait_for(self.refresh_event.wait(), timeout=self.poll_interval_sec)
+        except asyncio.TimeoutError:
+            pass
+        self.refresh_event.clear()
+
+    def invalidate(self):
+        """
+        Reloads the keys right away and resets the poll interval, called when the encryption keys changed.
+        """
+        logger.debug(f"{self.tenant_id} : EncryptionKeyRefresher::invalidate()")
+        self.poll_interval_sec = self.base_poll_interval_sec
+        self.key_set_version = None
+        if self.task is not None:
+            self.refresh_event.set()
+        elif self.refresh_task is None or self.refresh_task.done():
+            # there is no background refresh, reload the keys once
+            self.refresh_task = asyncio.get_running_loop().create_task(self.download_and_refresh_key())
 
     def start(self):
         if self.task is None:
@@ -139,6 +283,7 @@ class EncryptionKeyRefresher:
     def cleanup(self):
         logger.debug(f"==> {self.tenant_id} : EncryptionKeyRefresher::cleanup()")
         self.exit_event.set()
+        self.refresh_event.set()
         logger.debug(f"<== {self.tenant_id} : EncryptionKeyRefresher::cleanup()")
 
     def get_key_from_cache(self):
@@ -194,6 +339,16 @@ class EncryptionKeyRefresher:
         try:
             encryption_key_infos = await self.account_service_client.get_all_encryption_keys(self.tenant_id)
 
+            key_set_version = self.get_key_set_version(encryption_key_infos)
+            if key_set_version == self.key_set_version:
+                # nothing changed, poll less often until the keys change
+                self.poll_interval_sec = min(self.poll_interval_sec * 2, self.max_poll_interval_sec)
+                logger.debug(f"{self.tenant_id} : Encryption keys not changed, next refresh in "
+                             f"{self.poll_interval_sec} sec")
+                return
+            self.key_set_version = key_set_version
+            self.poll_interval_sec = self.base_poll_interval_sec
+
             if self.enable_encryption_keys_cache_dir:
                 self.store_key_to_cache(encryption_key_infos)
 
@@ -204,6 +359,13 @@ class EncryptionKeyRefresher:
 
         logger.debug(f"<== {self.tenant_id} : EncryptionKeyRefresher::download_and_refresh_key()")
 
+    @staticmethod
+    def get_key_set_version(encryption_key_infos) -> str:
+        """
+        Returns a version of the given key set, which changes when any of the keys is added, removed or changed.
+        """
+        return hashlib.sha256(json.dumps(encryption_key_infos, sort_keys=True, default=str).encode()).hexdigest()
+
     def load_self_managed_encrypt_keys(self):
         # following properties will be available in self_managed mode only
         plugin_public_keys = config_utils.get_property_value("plugin_public_key")
@@ -235,6 +397,19 @@ class EncryptionKeyRefresher:
 
 
 class TenantDataEncryptorService(Singleton):
+    """
+    Registry of the data encryptors of the tenants, one per tenant and encryption key id.
+
+    The registry is bounded: the least recently used encryptor is evicted when tenant_data_encryptor_max_size
+    encryptors are registered, and the encryptors idle for tenant_data_encryptor_max_idle_time_sec are removed by a
+    cleanup thread. Concurrent first requests for the same encryptor wait for a single initialization, instead of each
+    downloading the keys. Encryptors of the same key pair share one DataEncryptor, so the RSA keys are parsed once.
+    With tenant_data_encryptor_prewarm_enabled the encryptors of the active keys found in the encryption keys cache dir
+    are created at startup, so the first requests after a restart do not pay for the initialization.
+    The messages of a request with at least tenant_data_encryptor_parallel_crypto_min_messages messages are decrypted
+    and encrypted in parallel on a thread pool shared by all the requests, sized by
+    tenant_data_encryptor_crypto_max_workers, so the time of multi-message requests scales with the cores.
+    """
 
     def __init__(self, account_service_client=None):
         if self.is_instance_initialized():
@@ -243,7 +418,20 @@ class TenantDataEncryptorService(Singleton):
         logger.debug("==> TenantDataEncryptorService()")
         self.account_service_client = account_service_client
         self.max_idle_time = config_utils.get_property_value_int("tenant_data_encryptor_max_idle_time_sec", 120)
-        self.tenant_data_encryptors = {}
+        self.max_size = config_utils.get_property_value_int("tenant_data_encryptor_max_size", 1000)
+        self.tenant_data_encryptors = OrderedDict()
+        # guards tenant_data_encryptors, which is also changed by the cleanup thread
+        self.registry_lock = threading.Lock()
+        self.pending_initializations = {}
+        self.data_encryptors_by_key_pair = OrderedDict()
+
+        self.crypto_max_workers = (config_utils.get_property_value_int("tenant_data_encryptor_crypto_max_workers", 0)
+                                   or os.cpu_count() or 1)
+        self.parallel_crypto_min_messages = config_utils.get_property_value_int(
+            "tenant_data_encryptor_parallel_crypto_min_messages", 4)
+        self.crypto_executor = ThreadPoolExecutor(max_workers=self.crypto_max_workers,
+                                                  thread_name_prefix="shield-crypto") \
+            if self.crypto_max_workers > 1 else None
 
         self.cleanup_interval_sec = config_utils.get_property_value_int("tenant_data_encryptor_cleanup_interval_sec",
                                                                         120)
@@ -259,16 +447,35 @@ class TenantDataEncryptorService(Singleton):
         self.data_encryptors_cleanup_thread.daemon = True
         self.data_encryptors_cleanup_thread_started = False
 
+        add_encryption_key_change_listener(self.invalidate_encryption_keys)
+
+        self.registry_size_metric = meter.create_observable_gauge(
+            name="tenant_data_encryptor_registry_size",
+            callbacks=[self.get_registry_size],
+            description="The number of registered tenant data encryptors"
+        )
+        self.registry_key_bytes_metric = meter.create_observable_gauge(
+            name="tenant_data_encryptor_registry_key_bytes",
+            callbacks=[self.get_registry_key_bytes],
+            description="The size of the encryption keys held by the registered tenant data encryptors"
+        )
+
         logger.debug("<== TenantDataEncryptorService()")
 
+    def invalidate_encryption_keys(self):
+        """
+        Makes all the data encryptors reload their encryption keys, called when the local encryption keys changed.
+        """
+        for shield_data_encryptor in list(self.tenant_data_encryptors.values()):
+            if shield_data_encryptor.encryption_key_refresher is not None:
+                shield_data_encryptor.encryption_key_refresher.invalidate()
+
     async def get_data_encryptor(self, tenant_id, encryption_key_id=None) -> ShieldDataEncryptor:
         logger.debug(
             f"==> TenantDataEncryptorService::get_data_encryptor_common(tenant_id={tenant_id}, encryption_key_id="
             f"{encryption_key_id})")
         current_time = time.time()
 
-        provided_encryption_key_id = encryption_key_id if encryption_key_id is not None else -1
-
         if not self.data_encryptors_cleanup_thread_started:
             self.data_encryptors_cleanup_thread.start()
             self.data_encryptors_cleanup_thread_started = True
@@ -276,20 +483,22 @@ class TenantDataEncryptorService(Singleton):
         encryptor_dict_key = f"{tenant_id}_{encryption_key_id}" if encryption_key_id is not None else tenant_id
 
         # Check if an instance already exists for the tenant
-        if encryptor_dict_key in self.tenant_data_encryptors:
-            shield_data_encryptor = self.tenant_data_encryptors[encryptor_dict_key]
-            shield_data_encryptor.last_access_time = current_time
-        else:
-            logger.info(f"Creating new data encryptor instance for tenant = {tenant_id} with key = {encryption_key_id}")
-
-            start_refresher = config_utils.get_property_value("shield_run_mode") == "cloud"
-            shield_data_encryptor = ShieldDataEncryptor(tenant_id=tenant_id,
-                                                        enable_background_key_refresh=start_refresher,
-                                                        account_service_client=self.account_service_client)
-            await shield_data_encryptor.initialize_encryption_key_refresher(start_refresher)
-            shield_data_encryptor.create_data_encryptor(encryption_key_id=provided_encryption_key_id)
-            shield_data_encryptor.last_access_time = current_time
-            self.tenant_data_encryptors[encryptor_dict_key] = shield_data_encryptor
+        with self.registry_lock:
+            shield_data_encryptor = self.tenant_data_encryptors.get(encryptor_dict_key)
+            if shield_data_encryptor is not None:
+                self.tenant_data_encryptors.move_to_end(encryptor_dict_key)
+                shield_data_encryptor.last_access_time = current_time
+
+        if shield_data_encryptor is None:
+            # concurrent requests for a new encryptor wait for the same initialization
+            initialization = self.pending_initializations.get(encryptor_dict_key)
+            if initialization is None:
+                initialization = asyncio.ensure_future(
+                    self.create_data_encryptor(tenant_id, encryption_key_id, encryptor_dict_key))
+                self.pending_initializations[encryptor_dict_key] = initialization
+                initialization.add_done_callback(
+                    lambda _: self.pending_initializations.pop(encryptor_dict_key, None))
+            shield_data_encryptor = await asyncio.shield(initialization)
 
         logger.debug(
             f"<== TenantDataEncryptorService::get_data_encryptor_common(tenant_id={tenant_id}, "
@@ -297,59 +506,180 @@ class TenantDataEncryptorService(Singleton):
 
         return shield_data_encryptor
 
+    async def create_data_encryptor(self, tenant_id, encryption_key_id, encryptor_dict_key) -> ShieldDataEncryptor:
+        """
+        Creates the data encryptor of the given tenant and encryption key id, and registers it.
+        """
+        logger.info(f"Creating new data encryptor instance for tenant = {tenant_id} with key = {encryption_key_id}")
+        provided_encryption_key_id = encryption_key_id if encryption_key_id is not None else -1
+
+        start_refresher = config_utils.get_property_value("shield_run_mode") == "cloud"
+        shield_data_encryptor = ShieldDataEncryptor(tenant_id=tenant_id,
+                                                    enable_background_key_refresh=start_refresher,
+                                                    account_service_client=self.account_service_client,
+                                                    data_encryptor_provider=self.get_shared_data_encryptor)
+        await shield_data_encryptor.initialize_encryption_key_refresher(start_refresher)
+        shield_data_encryptor.create_data_encryptor(encryption_key_id=provided_encryption_key_id)
+        shield_data_encryptor.last_access_time = time.time()
+
+        evicted_data_encryptors = []
+        with self.registry_lock:
+            self.tenant_data_encryptors[encryptor_dict_key] = shield_data_encryptor
+            while len(self.tenant_data_encryptors) > max(self.max_size, 1):
+                evicted_data_encryptors.append(self.tenant_data_encryptors.popitem(last=False))
+        for evicted_dict_key, evicted_data_encryptor in evicted_data_encryptors:
+            logger.info(f"Evicting least recently used data encryptor instance {evicted_dict_key}")
+            self.cleanup_data_encryptor(evicted_dict_key, evicted_data_encryptor)
+        return shield_data_encryptor
+
+    def get_shared_data_encryptor(self, public_key, private_key) -> DataEncryptor:
+        """
+        Returns the DataEncryptor of the given key pair, creating it when no registered encryptor uses the key pair.
+        """
+        key_pair = hashlib.sha256(f"{public_key}|{private_key}".encode()).digest()
+        data_encryptor = self.data_encryptors_by_key_pair.get(key_pair)
+        if data_encryptor is None:
+            data_encryptor = DataEncryptor(public_key=public_key, private_key=private_key)
+            self.data_encryptors_by_key_pair[key_pair] = data_encryptor
+            while len(self.data_encryptors_by_key_pair) > max(self.max_size, 1):
+                self.data_encryptors_by_key_pair.popitem(last=False)
+        else:
+            self.data_encryptors_by_key_pair.move_to_end(key_pair)
+        return data_encryptor
+
+    async def prewarm_data_encryptors(self):
+        """
+        Creates the data encryptors of the active keys found in the encryption keys cache dir.
+        """
+        encryption_keys_cache_dir = Path(config_utils.get_property_value("encryption_keys_cache_dir"))
+        for key_file_path in sorted(encryption_keys_cache_dir.glob("key_*.json")):
+            tenant_id = key_file_path.stem[len("key_"):]
+            try:
+                with open(key_file_path, 'r') as key_file:
+                    encryption_key_info_list = json.load(key_file)
+                for encryption_key_info in encryption_key_info_list:
+                    if str(encryption_key_info.get("keyStatus")).split(".")[-1] == "ACTIVE":
+                        await self.get_data_encryptor(tenant_id, encryption_key_info.get("id"))
+                logger.info(f"Pre-warmed data encryptors for tenant = {tenant_id}")
+            except Exception as ex:
+                logger.error(f"Error while pre-warming data encryptors for tenant = {tenant_id}: {ex}")
+
+    def cleanup_data_encryptor(self, encryptor_dict_key, shield_data_encryptor):
+        try:
+            shield_data_encryptor.cleanup()
+        except Exception as ex:
+            logger.error(f"Error while cleaning up data_encryptor instance {encryptor_dict_key} and exception = {ex}")
+
     def cleanup_idle_instances(self):
         logger.debug("==> TenantDataEncryptorService::cleanup_idle_instances()")
         while True:
 
             current_time = time.time()
             # Remove instances that have been idle for more than max_idle_time
-            for tenant_id, shield_data_encryptor in list(self.tenant_data_encryptors.items()):
-                if current_time - shield_data_encryptor.last_access_time > self.max_idle_time:
-                    logger.info(f"Cleaning up data encryptor instance for tenant = {tenant_id}")
-                    try:
-                        shield_data_encryptor.cleanup()
-                        del self.tenant_data_encryptors[tenant_id]
-                    except Exception as ex:
-                        logger.error(f"Error while cleaning up data_encryptor instance for tenant id = {tenant_id} "
-                                     f"and exception = {ex}")
+            with self.registry_lock:
+                idle_data_encryptors = [(encryptor_dict_key, shield_data_encryptor) for
+                                        encryptor_dict_key, shield_data_encryptor in self.tenant_data_encryptors.items()
+                                        if current_time - shield_data_encryptor.last_access_time > self.max_idle_time]
+                for encryptor_dict_key, _ in idle_data_encryptors:
+                    del self.tenant_data_encryptors[encryptor_dict_key]
+            for encryptor_dict_key, shield_data_encryptor in idle_data_encryptors:
+                logger.info(f"Cleaning up data encryptor instance for tenant = {encryptor_dict_key}")
+                self.cleanup_data_encryptor(encryptor_dict_key, shield_data_encryptor)
 
             time.sleep(self.cleanup_interval_sec)
 
-    async def encrypt(self, tenant_id, data, encryption_key_id=None):
+    def get_registry_size(self, options):
+        """
+        Get the number of registered data encryptors.
+
+        Returns:
+            Iterable[Observation]: The number of registered data encryptors.
+        """
+        return [Observation(value=len(self.tenant_data_encryptors))]
+
+    def get_registry_key_bytes(self, options):
+        """
+        Get the size of the encryption keys held by the registered data encryptors.
+
+        Returns:
+            Iterable[Observation]: The size of the encryption keys in bytes.
+        """
+        with self.registry_lock:
+            shield_data_encryptors = list(self.tenant_data_encryptors.values())
+        return [Observation(value=sum(shield_data_encryptor.get_key_bytes()
+                                      for shield_data_encryptor in shield_data_encryptors))]
+
+    async def encrypt(self, tenant_id, data, encryption_key_id=None, encryption_mode=None):
         data_encryptor = await self.get_data_encryptor(tenant_id, encryption_key_id)
-        return data_encryptor.encrypt(data)
+        return data_encryptor.encrypt(data, encryption_mode)
 
     async def decrypt(self, tenant_id, data, encryption_key_id=None):
         data_encryptor = await self.get_data_encryptor(tenant_id, encryption_key_id)
         return data_encryptor.decrypt(data)
 
+    async def run_crypto_stage(self, crypto_function, messages):
+        """
+        Applies the crypto function to each of the messages off the event loop and returns the results in the order of
+        the messages.
+
+        Few messages are processed in a single worker thread call. More messages are fanned out to the shared crypto
+        thread pool one message per task, and a failing message does not stop the others; once all the messages are
+        done the error of the first failing message is raised.
+
+        Args:
+            crypto_function (callable): The function decrypting or encrypting a single message.
+            messages (list): The messages.
+
+        Returns:
+            list: The results of the crypto function, in the order of the messages.
+        """
+        if self.crypto_executor is None or len(messages) < max(self.parallel_crypto_min_messages, 2):
+            return await asyncio.to_thread(lambda: [crypto_function(message) for message in messages])
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(self.crypto_executor, crypto_function, message) for message in messages],
+            return_exceptions=True)
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error while processing message {index} of {len(messages)}: {result}")
+                raise result
+        return results
+
+    # The CPU heavy crypto of a request runs off the event loop, see run_crypto_stage.
     async def encrypt_shield_audit(self, audit_message, tenant_id, encryption_key_id):
-        for message_object in audit_message:
-            for key, value in message_object.items():
-                if value is not None and key != "analyzerResult":
-                    message_object[key] = await self.encrypt(tenant_id, value, encryption_key_id)
+        data_encryptor = await self.get_data_encryptor(tenant_id, encryption_key_id)
+        await self.run_crypto_stage(
+            lambda message: data_encryptor.encrypt_records([message], skip_fields=AUDIT_UNENCRYPTED_FIELDS),
+            audit_message)
 
     async def decrypt_authorize_request(self, auth_request: AuthorizeRequest):
-        decrypted_messages = []
-        for message in auth_request.messages:
-            decrypted_message = await self.decrypt(auth_request.tenant_id, message, auth_request.shield_server_key_id)
-            decrypted_messages.append(decrypted_message)
+        # the response messages are encrypted in the encryption mode the plugin used for the request messages
+        if auth_request.messages:
+            auth_request.encryption_mode = DataEncryptor.get_encryption_mode_of(auth_request.messages[0])
 
-        auth_request.messages = decrypted_messages
+        data_encryptor = await self.get_data_encryptor(auth_request.tenant_id, auth_request.shield_server_key_id)
+        auth_request.messages = await self.run_crypto_stage(data_encryptor.decrypt, auth_request.messages)
 
     async def decrypt_shield_audit(self, shield_audit: ShieldAuditViaApi):
-        for message_object in shield_audit.messages:
-            for key, value in message_object.items():
-                if value is not None and key != "analyzerResult":
-                    message_object[key] = await self.decrypt(shield_audit.tenantId, value, shield_audit.encryptionKeyId)
+        data_encryptor = await self.get_data_encryptor(shield_audit.tenantId, shield_audit.encryptionKeyId)
+        await self.run_crypto_stage(
+            lambda message: data_encryptor.decrypt_records([message], skip_fields=AUDIT_UNENCRYPTED_FIELDS),
+            shield_audit.messages)
+
+    async def reencrypt_shield_audit(self, shield_audit: ShieldAuditViaApi):
+        data_encryptor = await self.get_data_encryptor(shield_audit.tenantId, shield_audit.encryptionKeyId)
+        await self.run_crypto_stage(
+            lambda message: data_encryptor.reencrypt_records([message], skip_fields=AUDIT_UNENCRYPTED_FIELDS),
+            shield_audit.messages)
 
     async def encrypt_authorize_response(self, auth_request: AuthorizeRequest, auth_response: AuthorizeResponse):
-        encrypted_messages = []
-        for message in auth_response.responseMessages:
-            message_copy = message.copy()
-            message_copy["responseText"] = await self.encrypt(auth_request.tenant_id, message_copy["responseText"],
-                                                              auth_request.shield_plugin_key_id)
-            encrypted_messages.append(message_copy)
+        encrypted_messages = [message.copy() for message in auth_response.responseMessages]
+        data_encryptor = await self.get_data_encryptor(auth_request.tenant_id, auth_request.shield_plugin_key_id)
+        await self.run_crypto_stage(
+            lambda message: data_encryptor.encrypt_records([message], fields=RESPONSE_ENCRYPTED_FIELDS,
+                                                           encryption_mode=auth_request.encryption_mode),
+            encrypted_messages)
 
         auth_response.responseMessages = encrypted_messages
 
@@ -359,3 +689,28 @@ class TenantDataEncryptorService(Singleton):
             connection_details_value = str(value)
             if connection_details_value.startswith("GuardrailEncrypt:"):
                     connection_details[key] = await self.decrypt(tenant_id, connection_details_value.replace("GuardrailEncrypt:", ""), encryption_key_id)
+
+
+async def prewarm_tenant_data_encryptors():
+    """
+    Creates the data encryptors of the tenants found in the encryption keys cache dir, when
+    tenant_data_encryptor_prewarm_enabled and enable_encryption_keys_cache_dir are set.
+    """
+    if not (config_utils.get_property_value_boolean("tenant_data_encryptor_prewarm_enabled", False) and
+            config_utils.get_property_value_boolean("enable_encryption_keys_cache_dir", False)):
+        return
+
+    from api.shield.factory.account_service_factory import AccountServiceFactory
+    from core.db_session import session, set_session_context, reset_session_context
+    from core.utils import SingletonDepends
+
+    # the local account service client reads the keys from the database
+    context = set_session_context(session_id="tenant_data_encryptor_prewarm")
+    try:
+        account_service_client = SingletonDepends(AccountServiceFactory).get_account_service_client()
+        await TenantDataEncryptorService(account_service_client).prewarm_data_encryptors()
+    except Exception as ex:
+        logger.error(f"Error while pre-warming tenant data encryptors: {ex}")
+    finally:
+        await session.remove()
+        reset_session_context(context=context)
@@ -1,4 +1,6 @@
 import logging
+from types import MappingProxyType
+from typing import NamedTuple, Optional
 
 from jproperties import Properties
 
@@ -8,12 +10,102 @@ logger = logging.getLogger(__file__)
 
 configs_properties = Properties()
 
+# marks a property value which cannot be converted to the requested type
+_INVALID = object()
+
+
+class CompiledProperty(NamedTuple):
+    """
+    A property value converted once to each type it can be read as.
+    int_value and float_value are _INVALID when the value cannot be converted to the type.
+    """
+    value: str
+    int_value: object
+    float_value: object
+    bool_value: bool
+    list_value: tuple
+
+
+def _compile_property(value: str) -> CompiledProperty:
+    try:
+        int_value = int(value)
+    except ValueError:
+        int_value = _INVALID
+    try:
+        float_value = float(value)
+    except ValueError:
+        float_value = _INVALID
+    return CompiledProperty(value=value, int_value=int_value, float_value=float_value,
+                            bool_value=value.lower() in ['true'], list_value=tuple(value.split(",")))
+
+
+class ConfigSnapshot:
+    """
+    Immutable snapshot of the shield configuration, compiled from the loaded properties files.
+
+    Every non-empty property is converted once to all the types it can be read as, so a lookup is a dict read
+    without parsing or locking. The snapshot is never changed, loading or overriding properties compiles a new snapshot
+    which replaces the current one atomically.
+    """
+
+    __slots__ = ("_properties",)
+
+    def __init__(self, properties: dict):
+        """
+        Args:
+            properties (dict): The property names and their string values.
+        """
+        object.__setattr__(self, "_properties", MappingProxyType(
+            {name: _compile_property(value) for name, value in properties.items() if value}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    @property
+    def properties(self) -> MappingProxyType:
+        """
+        Returns a read-only mapping of the property names to their compiled values.
+        """
+        return self._properties
+
+    def get(self, property_name: str) -> Optional[CompiledProperty]:
+        """
+        Returns the compiled value of the specified property, or None if the property is not set or empty.
+        """
+        return self._properties.get(property_name)
+
+    def keys(self):
+        return self._properties.keys()
+
+
+_snapshot = ConfigSnapshot({})
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """
+    Returns the current configuration snapshot. Keep the returned snapshot to read several properties consistently,
+    it is not changed by later reloads.
+    """
+    return _snapshot
+
+
+def reload_config_snapshot() -> ConfigSnapshot:
+    """
+    Compiles the loaded properties into a new snapshot and replaces the current snapshot with it.
+
+    Returns:
+        ConfigSnapshot: The new snapshot.
+    """
+    global _snapshot
+    _snapshot = ConfigSnapshot({name: configs_properties[name].data for name in configs_properties.keys()})
+    return _snapshot
+
 
 # You can load multiple config files, but order matters. The latest one will overwrite any
 # properties defined by previous config files
 def load_config_file(config_file_path):
     """
-    Loads properties from the specified configuration file.
+    Loads properties from the specified configuration file and reloads the configuration snapshot.
 
     The latest file loaded will overwrite any properties defined by previously loaded files.
     """
@@ -21,6 +113,19 @@ def load_config_file(config_file_path):
     logger.info(f"Loading config file {config_file_path}")
     with open(config_file_path, 'rb') as config_file:
         configs_properties.load(config_file)
+    reload_config_snapshot()
+
+
+def set_property_values(property_values: dict):
+    """
+    Overrides the given properties and reloads the configuration snapshot.
+
+    Args:
+        property_values (dict): The property names and their string values.
+    """
+    for property_name, property_value in property_values.items():
+        configs_properties[property_name] = property_value
+    reload_config_snapshot()
 
 
 def get_property_value(property_name, default_value=None):
@@ -30,9 +135,9 @@ def get_property_value(property_name, default_value=None):
     Returns:
         str: The value of the property, or the default value if the property is not found.
     """
-    property_value = configs_properties.get(property_name)
-    if property_value and property_value.data:
-        return property_value.data
+    compiled_property = _snapshot.get(property_name)
+    if compiled_property:
+        return compiled_property.value
     return default_value
 
 
@@ -43,7 +148,11 @@ def get_property_value_list(property_name, default_value=None):
     Returns:
         list: The list of strings from the property value, or the default value if conversion fails.
     """
-    value = get_property_value(property_name, default_value)
+    compiled_property = _snapshot.get(property_name)
+    if compiled_property:
+        return list(compiled_property.list_value)
+
+    value = default_value
     try:
         if isinstance(value, list):
             return value
@@ -64,16 +173,15 @@ def get_property_value_int(property_name, default_value=None):
      Returns:
          int: The integer value of the property, or the default value if conversion fails.
      """
-    value = get_property_value(property_name, default_value)
-    if not value:
-        return default_value
+    compiled_property = _snapshot.get(property_name)
+    if not compiled_property:
+        return _convert_default_value(property_name, default_value, int)
 
-    try:
-        # Try to convert it to an integer and return
-        return int(value)
-    except ValueError:
-        logger.error(f"The property '{property_name}' with value '{value}' cannot be converted to an integer.")
+    if compiled_property.int_value is _INVALID:
+        logger.error(f"The property '{property_name}' with value '{compiled_property.value}' cannot be converted to "
+                     f"an integer.")
         return default_value
+    return compiled_property.int_value
 
 
 def get_property_value_float(property_name, default_value=None):
@@ -83,15 +191,15 @@ def get_property_value_float(property_name, default_value=None):
     Returns:
         float: The float value of the property, or the default value if conversion fails.
     """
-    value = get_property_value(property_name, default_value)
-    if not value:
-        return default_value
-    try:
-        # Try to convert it to an integer and return
-        return float(value)
-    except ValueError:
-        logger.error(f"The property '{property_name}' with value '{value}' cannot be converted to float.")
+    compiled_property = _snapshot.get(property_name)
+    if not compiled_property:
+        return _convert_default_value(property_name, default_value, float)
+
+    if compiled_property.float_value is _INVALID:
+        logger.error(f"The property '{property_name}' with value '{compiled_property.value}' cannot be converted to "
+                     f"float.")
         return default_value
+    return compiled_property.float_value
 
 
 def get_property_value_boolean(property_name, default_value=None):
@@ -101,19 +209,23 @@ def get_property_value_boolean(property_name, default_value=None):
     Returns:
         bool: The boolean value of the property, or the default value if conversion fails.
     """
-    value = get_property_value(property_name, default_value)
-    if not value:
+    compiled_property = _snapshot.get(property_name)
+    if not compiled_property:
+        if isinstance(default_value, str) and default_value:
+            return default_value.lower() in ['true']
         return default_value
+    return compiled_property.bool_value
+
 
+def _convert_default_value(property_name, default_value, value_type):
+    # default values are usually of the requested type already, other defaults are converted like property values
+    if not default_value or type(default_value) is value_type:
+        return default_value
     try:
-        if isinstance(value, bool):
-            return value
-        elif isinstance(value, str):
-            return value.lower() in ['true']
-        else:
-            return default_value
+        return value_type(default_value)
     except ValueError:
-        logger.error(f"The property '{property_name}' with value '{value}' cannot be converted to boolean.")
+        logger.error(f"The property '{property_name}' with value '{default_value}' cannot be converted to "
+                     f"{value_type.__name__}.")
         return default_value
 
 
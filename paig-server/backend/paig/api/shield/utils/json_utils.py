@@ -1,6 +1,27 @@
 import json
 
 
+def mask_fields(data, fields_to_mask, mask_value="*****"):
+    """
+    Returns a copy of the given data with the specified fields masked, in a single pass over the data.
+    Dicts and lists are copied, other values are shared with the given data, which is left unchanged.
+
+    Args:
+        data (Any): The data to be masked, usually a dict or a list parsed from or serializable to JSON.
+        fields_to_mask (collection of str): The field names (keys) that should be masked.
+        mask_value (str): The value to use as a mask. Defaults to "*****".
+
+    Returns:
+        Any: The masked copy of the data.
+    """
+    if isinstance(data, dict):
+        return {key: mask_value if key in fields_to_mask else mask_fields(value, fields_to_mask, mask_value)
+                for key, value in data.items()}
+    if isinstance(data, list):
+        return [mask_fields(item, fields_to_mask, mask_value) for item in data]
+    return data
+
+
 def mask_json_fields(request_obj, fields_to_mask, mask_value="*****"):
     """
     Masks specified fields in a JSON string with a given mask value.
@@ -13,23 +34,31 @@ def mask_json_fields(request_obj, fields_to_mask, mask_value="*****"):
     Returns:
         str: A JSON-formatted string with the specified fields masked.
    """
-    def recursive_mask(request_data):
-        if isinstance(request_data, dict):
-            for key, value in request_data.items():
-                if key in fields_to_mask:
-                    request_data[key] = mask_value
-                elif isinstance(value, (dict, list)):
-                    recursive_mask(value)
-        elif isinstance(request_data, list):
-            for item in request_data:
-                recursive_mask(item)
-
-    # Parse the JSON data
-    data = json.loads(request_obj)
-
-    # Mask the specified fields
-    recursive_mask(data)
-
-    # Serialize the JSON back to a string
-    masked_json = json.dumps(data)
-    return masked_json
+    return json.dumps(mask_fields(json.loads(request_obj), frozenset(fields_to_mask), mask_value))
+
+
+class LazyMaskedJson:
+    """
+    Log argument serializing the given data to JSON with the specified fields masked only when it is formatted.
+
+    Pass it as an argument of a logging call instead of an f-string, so that the data is masked and serialized only
+    when the logger is enabled for the level of the call:
+
+        logger.debug("Incoming request: %s", LazyMaskedJson(request, ['messages']))
+    """
+
+    __slots__ = ("data", "fields_to_mask", "mask_value")
+
+    def __init__(self, data, fields_to_mask, mask_value="*****"):
+        """
+        Args:
+            data (Any): The data to be logged, a dict or a list serializable to JSON.
+            fields_to_mask (list of str): A list of field names (keys) that should be masked.
+            mask_value (str): The value to use as a mask. Defaults to "*****".
+        """
+        self.data = data
+        self.fields_to_mask = frozenset(fields_to_mask)
+        self.mask_value = mask_value
+
+    def __str__(self):
+        return json.dumps(mask_fields(self.data, self.fields_to_mask, self.mask_value), default=str)
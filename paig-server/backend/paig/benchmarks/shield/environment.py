@@ -0,0 +1,168 @@
+"""
+This module prepares an isolated environment for the shield benchmark.
+
+The benchmark runs the real shield services against a throwaway SQLite database and local stand-ins for the
+account, authz, governance and guardrail services. Everything it writes (database, scanner configs, audit files)
+goes to the benchmark work directory, so a run never touches the database or configs of a local installation.
+
+Functions:
+    prepare_environment: Points the server config at the benchmark database. Must run before importing server modules.
+    apply_shield_configs: Overrides the shield properties for the benchmark run.
+    write_scanner_properties: Writes a scanner properties file with only the scanners of a scanner mix.
+    resolve_scanner_mix: Converts a scanner mix name to the scanner names it contains.
+"""
+import configparser
+import os
+import re
+
+BENCHMARK_DEPLOYMENT = "benchmark"
+
+DEFAULT_SCANNER_PROPERTIES_FILE = "api/shield/conf/shield_scanner.properties"
+
+SCANNER_ALIASES = {
+    "pii": "PIIScanner",
+    "toxic": "ToxicContentScanner",
+    "paig_guardrail": "PAIGPIIGuardrailScanner",
+    "bedrock_guardrail": "AWSBedrockGuardrailScanner"
+}
+
+AUDIT_SINKS = ["none", "local"]
+
+
+def prepare_environment(work_dir: str) -> str:
+    """
+    Create the benchmark work directory and point the server config at a fresh SQLite database inside it.
+
+    The server reads its database url when core.db_session is imported, so this must be called before any server
+    module is imported.
+
+    Args:
+        work_dir (str): The benchmark work directory.
+
+    Returns:
+        str: The database url used by the benchmark.
+    """
+    work_dir = os.path.abspath(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    db_path = os.path.join(work_dir, "benchmark.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    database_url = f"sqlite+aiosqlite:///{db_path}"
+    with open(os.path.join(work_dir, f"{BENCHMARK_DEPLOYMENT}_config.yaml"), "w") as config_file:
+        config_file.write(f"database:\n  url: \"{database_url}\"\n")
+
+    os.environ["PAIG_DEPLOYMENT"] = BENCHMARK_DEPLOYMENT
+    os.environ.setdefault("CONFIG_PATH", "conf")
+    os.environ["EXT_CONFIG_PATH"] = work_dir
+    os.environ.setdefault("LOG_PATH", os.path.join(work_dir, "logs"))
+    os.makedirs(os.environ["LOG_PATH"], exist_ok=True)
+    return database_url
+
+
+def apply_shield_configs(work_dir: str, audit_sink: str, scanner_max_workers: int = None):
+    """
+    Override the shield properties for the benchmark run.
+
+    The shield runs in self managed mode with all the local service clients. The audit sink is either a no-op
+    (audits are built and encrypted but not stored) or the local file sink writing to the work directory.
+
+    Args:
+        work_dir (str): The benchmark work directory.
+        audit_sink (str): The audit sink, one of AUDIT_SINKS.
+        scanner_max_workers (int): The number of scanner worker threads, None keeps the configured value.
+    """
+    from api.shield.utils import config_utils
+
+    if audit_sink not in AUDIT_SINKS:
+        raise ValueError(f"Invalid audit sink {audit_sink}, supported audit sinks are {AUDIT_SINKS}")
+
+    work_dir = os.path.abspath(work_dir)
+    overrides = {
+        "shield_run_mode": "self_managed",
+        "authz_client": "local",
+        "account_service_client": "local",
+        "governance_service_client": "local",
+        "guardrail_service_client": "local",
+        "enable_encryption_keys_cache_dir": "False",
+        "default_msg_metadata_storage_system": "none",
+        "audit_spool_dir": os.path.join(work_dir, "audit_spool"),
+        "local_directory_path": os.path.join(work_dir, "audit_logs")
+    }
+    if audit_sink == "local":
+        overrides["audit_msg_content_to_self_managed_storage"] = "True"
+        overrides["audit_msg_content_storage_system"] = "local"
+    else:
+        overrides["audit_msg_content_to_self_managed_storage"] = "False"
+        overrides["audit_msg_content_storage_system"] = "none"
+    if scanner_max_workers:
+        overrides["shield_scanner_max_workers"] = str(scanner_max_workers)
+
+    config_utils.set_property_values(overrides)
+
+
+def resolve_scanner_mix(scanner_mix: str) -> list:
+    """
+    Convert a scanner mix name to the scanner names it contains.
+
+    A scanner mix is "none" or scanner aliases / scanner names joined with "+", e.g. "pii+toxic".
+
+    Args:
+        scanner_mix (str): The scanner mix name.
+
+    Returns:
+        list: The scanner names of the mix.
+    """
+    if scanner_mix == "none":
+        return []
+    return [SCANNER_ALIASES.get(name.strip(), name.strip()) for name in scanner_mix.split("+") if name.strip()]
+
+
+def write_scanner_properties(work_dir: str, scanner_mix: str,
+                             source_file: str = DEFAULT_SCANNER_PROPERTIES_FILE) -> str:
+    """
+    Write a scanner properties file containing only the scanners of the given scanner mix.
+
+    The scanner sections and their recognizer sections are copied from the source file and renumbered.
+
+    Args:
+        work_dir (str): The benchmark work directory.
+        scanner_mix (str): The scanner mix name.
+        source_file (str): The scanner properties file to copy the scanners from.
+
+    Returns:
+        str: The path of the written properties file.
+    """
+    scanner_names = resolve_scanner_mix(scanner_mix)
+
+    source = configparser.ConfigParser(interpolation=None)
+    source.optionxform = str
+    source.read(source_file)
+
+    target = configparser.ConfigParser(interpolation=None)
+    target.optionxform = str
+    found_scanner_names = set()
+    scanner_index = 0
+    for section in source.sections():
+        if not re.fullmatch(r"scanner\[\d+]", section):
+            continue
+        scanner_name = source.get(section, "name", fallback=None)
+        if scanner_name not in scanner_names:
+            continue
+        found_scanner_names.add(scanner_name)
+        new_section = f"scanner[{scanner_index}]"
+        target[new_section] = dict(source.items(section))
+        for sub_section in source.sections():
+            if sub_section.startswith(f"{section}."):
+                target[new_section + sub_section[len(section):]] = dict(source.items(sub_section))
+        scanner_index += 1
+
+    missing_scanner_names = set(scanner_names) - found_scanner_names
+    if missing_scanner_names:
+        raise ValueError(f"Scanners {sorted(missing_scanner_names)} of scanner mix {scanner_mix} not found in "
+                         f"{source_file}")
+
+    properties_file = os.path.join(work_dir, f"scanners_{scanner_mix.replace('+', '_')}.properties")
+    with open(properties_file, "w") as target_file:
+        target.write(target_file)
+    return properties_file
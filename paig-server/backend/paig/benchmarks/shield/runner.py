@@ -0,0 +1,376 @@
+"""
+This module runs the shield benchmark.
+
+It drives ShieldService.authorize and ShieldService.authorize_vectordb end to end against the seeded benchmark
+database, either in-process or over HTTP through the real FastAPI application served by uvicorn, and reports the
+throughput and the p50/p95/p99 latencies for every combination of scanner mix, message size and message count.
+
+Run it from the paig-server/backend/paig directory:
+    python -m benchmarks.shield --help
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import product
+
+from benchmarks.shield import environment
+from benchmarks.shield.stats import summarize, format_results
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_TENANT_ID = "benchmark"
+BENCHMARK_USER_ROLE = "USER"
+PAYLOAD_VARIANTS = 8
+
+VOCABULARY = ["the", "customer", "asked", "about", "quarterly", "revenue", "forecast", "for", "our", "new", "product",
+              "line", "and", "wants", "a", "summary", "of", "the", "support", "tickets", "opened", "last", "week",
+              "please", "include", "shipping", "delays", "contract", "renewal", "dates", "pricing", "details"]
+SENSITIVE_SNIPPETS = ["john.doe@example.com", "+1 202 555 0147", "Jane Smith", "diabetes", "ibuprofen"]
+
+
+def build_message(rng: random.Random, size: int) -> str:
+    """
+    Build a synthetic message of the given size in characters.
+
+    Roughly one word in twelve is a sensitive value (email, phone number, person, disease or medicine), so the PII
+    scanner and the masking stage have work to do.
+
+    Args:
+        rng (random.Random): The random generator, seeded for reproducible messages.
+        size (int): The message size in characters.
+
+    Returns:
+        str: The message.
+    """
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(SENSITIVE_SNIPPETS) if rng.random() < 1 / 12 else rng.choice(VOCABULARY)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+class PayloadFactory:
+    """
+    Builds the request payloads sent by the benchmark, the same way the shield plugin builds them.
+
+    The messages are encrypted with the shield server public key ahead of the measurement, because encrypting the
+    request is done by the client and is not part of the server latency.
+    """
+
+    def __init__(self, benchmark_data, seed: int):
+        from paig_common.encryption import DataEncryptor
+
+        self.benchmark_data = benchmark_data
+        self.seed = seed
+        self.plugin_data_encryptor = DataEncryptor(public_key=benchmark_data.shield_server_public_key,
+                                                   private_key=None)
+
+    def authorize_payloads(self, application_key: str, message_size: int, message_count: int) -> list:
+        payloads = []
+        for variant in range(PAYLOAD_VARIANTS):
+            rng = random.Random(f"{self.seed}-{message_size}-{message_count}-{variant}")
+            messages = [self.plugin_data_encryptor.encrypt(build_message(rng, message_size))
+                        for _ in range(message_count)]
+            payloads.append({
+                "threadId": str(uuid.UUID(int=rng.getrandbits(128))),
+                "sequenceNumber": 1,
+                "requestType": "prompt",
+                "requestDateTime": int(time.time() * 1000),
+                "applicationKey": application_key,
+                "clientApplicationKey": "benchmark",
+                "shieldServerKeyId": self.benchmark_data.shield_server_key_id,
+                "shieldPluginKeyId": self.benchmark_data.shield_plugin_key_id,
+                "userId": self.benchmark_data.users[variant % len(self.benchmark_data.users)],
+                "messages": messages,
+                "context": {},
+                "clientIp": "127.0.0.1",
+                "clientHostName": "benchmark"
+            })
+        return payloads
+
+    def vectordb_payloads(self, application_key: str) -> list:
+        return [{"userId": user, "applicationKey": application_key} for user in self.benchmark_data.users]
+
+
+def with_request_id(payload: dict) -> dict:
+    request = dict(payload)
+    request["requestId"] = str(uuid.uuid4())
+    if "messages" in request:
+        request["messages"] = list(request["messages"])
+    return request
+
+
+class InProcessDriver:
+    """
+    Calls the ShieldService directly, with a database session scoped to each call like the SQLAlchemy middleware does.
+    """
+    name = "inproc"
+
+    async def start(self):
+        from api.shield.services.shield_service import ShieldService
+        from core.utils import SingletonDepends
+
+        self.shield_service = SingletonDepends(ShieldService)
+
+    async def stop(self):
+        pass
+
+    async def _in_session(self, coroutine_function, *args):
+        from core.db_session import session, set_session_context, reset_session_context
+
+        context = set_session_context(session_id=str(uuid.uuid4()))
+        try:
+            return await coroutine_function(*args)
+        finally:
+            await session.remove()
+            reset_session_context(context=context)
+
+    async def authorize(self, payload: dict):
+        from api.shield.model.authorize_request import AuthorizeRequest
+
+        auth_req = AuthorizeRequest(with_request_id(payload), BENCHMARK_TENANT_ID, BENCHMARK_USER_ROLE)
+        await self._in_session(self.shield_service.authorize, auth_req)
+
+    async def authorize_vectordb(self, payload: dict):
+        await self._in_session(self.shield_service.authorize_vectordb, BENCHMARK_TENANT_ID, BENCHMARK_USER_ROLE,
+                               payload)
+
+
+class HttpDriver:
+    """
+    Serves the FastAPI application with uvicorn on a free local port and calls the shield endpoints over HTTP.
+    """
+    name = "http"
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.server = None
+        self.server_task = None
+        self.client = None
+
+    async def start(self):
+        import httpx
+        import uvicorn
+        from server import app
+
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            port = free_socket.getsockname()[1]
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off",
+                                                    access_log=False, log_level="warning"))
+        self.server_task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self.server_task.done():
+                raise RuntimeError(f"Benchmark server failed to start on port {port}")
+            await asyncio.sleep(0.05)
+
+        self.client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0,
+                                        headers={"x-tenant-id": BENCHMARK_TENANT_ID,
+                                                 "x-user-role": BENCHMARK_USER_ROLE},
+                                        limits=httpx.Limits(max_connections=self.concurrency,
+                                                            max_keepalive_connections=self.concurrency))
+
+    async def stop(self):
+        if self.client:
+            await self.client.aclose()
+        if self.server:
+            self.server.should_exit = True
+            await self.server_task
+
+    async def _post(self, path: str, payload: dict):
+        response = await self.client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned status {response.status_code}: {response.text}")
+
+    async def authorize(self, payload: dict):
+        await self._post("/shield/authorize", with_request_id(payload))
+
+    async def authorize_vectordb(self, payload: dict):
+        await self._post("/shield/authorize/vectordb", payload)
+
+
+async def measure(call, payloads: list, num_requests: int, concurrency: int, warmup: int):
+    """
+    Send num_requests requests with the given number of concurrent callers, after warmup requests that are not
+    measured.
+
+    Returns:
+        tuple: The latencies of the successful requests in milliseconds, the number of failed requests and the
+            duration of the measurement in seconds.
+    """
+    for index in range(warmup):
+        await call(payloads[index % len(payloads)])
+
+    latencies_ms = []
+    failures = []
+    request_indexes = iter(range(num_requests))
+
+    async def caller():
+        for request_index in request_indexes:
+            request_start_time = time.perf_counter()
+            try:
+                await call(payloads[request_index % len(payloads)])
+                latencies_ms.append((time.perf_counter() - request_start_time) * 1000)
+            except Exception as e:
+                if not failures:
+                    logger.error(f"Benchmark request failed: {type(e).__name__}: {e}")
+                failures.append(e)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    return latencies_ms, len(failures), time.perf_counter() - start_time
+
+
+def load_application_scanners(work_dir: str, application):
+    """
+    Load the scanners of the application's scanner mix into the scanner cache of the ApplicationManager.
+    """
+    from api.shield.services.application_manager_service import ApplicationManager
+    from api.shield.utils import config_utils
+
+    properties_file = environment.write_scanner_properties(work_dir, application.scanner_mix)
+    config_utils.set_property_values({"custom_scanner_properties_file": properties_file})
+    ApplicationManager().load_scanners(application.application_key)
+
+
+async def run_benchmark(args, benchmark_data) -> list:
+    payload_factory = PayloadFactory(benchmark_data, args.seed)
+    modes = ["inproc", "http"] if args.mode == "both" else [args.mode]
+    results = []
+    for mode in modes:
+        driver = InProcessDriver() if mode == "inproc" else HttpDriver(args.concurrency)
+        await driver.start()
+        try:
+            for scanner_mix in args.scanner_mixes:
+                application = benchmark_data.applications[scanner_mix]
+                load_application_scanners(args.work_dir, application)
+                for message_size, message_count in product(args.message_sizes, args.message_counts):
+                    payloads = payload_factory.authorize_payloads(application.application_key, message_size,
+                                                                  message_count)
+                    latencies_ms, errors, duration_sec = await measure(driver.authorize, payloads, args.requests,
+                                                                       args.concurrency, args.warmup)
+                    result = summarize(mode, "authorize", scanner_mix, message_size, message_count,
+                                       args.concurrency, latencies_ms, errors, duration_sec)
+                    print(format_results([result]).splitlines()[-1], flush=True)
+                    results.append(result)
+
+            if not args.skip_vectordb:
+                application = benchmark_data.applications[args.scanner_mixes[0]]
+                payloads = payload_factory.vectordb_payloads(application.application_key)
+                latencies_ms, errors, duration_sec = await measure(driver.authorize_vectordb, payloads,
+                                                                   args.requests, args.concurrency, args.warmup)
+                result = summarize(mode, "authorize_vectordb", "-", 0, 0, args.concurrency, latencies_ms, errors,
+                                   duration_sec)
+                print(format_results([result]).splitlines()[-1], flush=True)
+                results.append(result)
+        finally:
+            await driver.stop()
+    return results
+
+
+async def seed_and_run(args) -> list:
+    from benchmarks.shield.seed import seed_database
+
+    benchmark_data = await seed_database(args.scanner_mixes, args.users)
+    return await run_benchmark(args, benchmark_data)
+
+
+def parse_int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.shield",
+        description="Benchmark /shield/authorize and /shield/authorize/vectordb with local service stand-ins and a "
+                    "seeded SQLite database.")
+    parser.add_argument("--mode", choices=["inproc", "http", "both"], default="both",
+                        help="Call ShieldService in-process, over HTTP through the FastAPI app, or both.")
+    parser.add_argument("--scanner-mixes", default="none,pii",
+                        type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+                        help="Comma separated scanner mixes. A mix is 'none' or scanners joined with '+', e.g. "
+                             "'pii+toxic'. Aliases: " + ", ".join(environment.SCANNER_ALIASES) + ".")
+    parser.add_argument("--message-sizes", default="64,1024,8192", type=parse_int_list,
+                        help="Comma separated message sizes in characters.")
+    parser.add_argument("--message-counts", default="1,4", type=parse_int_list,
+                        help="Comma separated number of messages per request.")
+    parser.add_argument("--requests", default=200, type=int, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", default=10, type=int, help="Unmeasured warmup requests per scenario.")
+    parser.add_argument("--concurrency", default=8, type=int, help="Number of concurrent callers.")
+    parser.add_argument("--users", default=10, type=int, help="Number of seeded users.")
+    parser.add_argument("--audit-sink", choices=environment.AUDIT_SINKS, default="none",
+                        help="'none' builds and encrypts the audits without storing them, 'local' writes them to "
+                             "the work directory.")
+    parser.add_argument("--scanner-workers", type=int, default=None,
+                        help="Override shield_scanner_max_workers.")
+    parser.add_argument("--seed", default=42, type=int, help="Seed of the synthetic messages.")
+    parser.add_argument("--skip-vectordb", action="store_true", help="Do not benchmark authorize_vectordb.")
+    parser.add_argument("--work-dir", default=None,
+                        help="Directory for the benchmark database, configs and audits. Defaults to a new "
+                             "temporary directory.")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+    if args.work_dir is None:
+        args.work_dir = tempfile.mkdtemp(prefix="paig-shield-benchmark-")
+    args.work_dir = os.path.abspath(args.work_dir)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    environment.prepare_environment(args.work_dir)
+
+    from core import constants
+    constants.MODE = "benchmark"
+    from core.logging_init import set_logging
+    set_logging()
+    from api.shield.utils import config_utils
+    load_shield_configs = config_utils.load_shield_configs
+
+    def load_benchmark_shield_configs():
+        load_shield_configs()
+        environment.apply_shield_configs(args.work_dir, args.audit_sink, args.scanner_workers)
+
+    load_benchmark_shield_configs()
+    if args.mode in ("http", "both"):
+        # importing the server creates the FastAPI app, which reloads the shield configs and creates the shield
+        # services, so the benchmark overrides must be applied again when the configs are reloaded
+        config_utils.load_shield_configs = load_benchmark_shield_configs
+        import server  # noqa: F401
+
+    from alembic_db import create_or_update_tables
+    create_or_update_tables()
+
+    print(f"Benchmark work directory: {args.work_dir}")
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = asyncio.run(seed_and_run(args))
+
+    print()
+    print(format_results(results))
+
+    if args.output:
+        report = {
+            "started_at": started_at,
+            "environment": {"python": sys.version.split()[0], "platform": platform.platform(),
+                            "cpu_count": os.cpu_count()},
+            "config": {key: value for key, value in vars(args).items() if key not in ("output",)},
+            "results": [result.to_dict() for result in results]
+        }
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+    return 1 if any(result.errors for result in results) else 0
@@ -0,0 +1,157 @@
+"""
+This module seeds the benchmark database with synthetic data.
+
+The data is created the same way the server creates its defaults at startup: the encryption keys are created by the
+encryption startup events and the applications, policies, users and vector DBs are inserted as database models.
+
+Classes:
+    BenchmarkApplication: Holds the keys of a seeded AI application.
+    BenchmarkData: Holds everything the benchmark needs to build requests for the seeded data.
+
+Functions:
+    seed_database: Seeds the benchmark database and returns the seeded data.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from api.encryption.database.db_models.encryption_key_model import EncryptionKeyType
+from api.encryption.database.db_operations.encryption_key_repository import EncryptionKeyRepository
+from api.encryption.database.db_operations.encryption_master_key_repository import EncryptionMasterKeyRepository
+from api.encryption.events.startup import create_default_encryption_keys
+from api.encryption.utils.secure_encryptor import SecureEncryptor
+from api.governance.database.db_models.ai_app_config_model import AIApplicationConfigModel
+from api.governance.database.db_models.ai_app_model import AIApplicationModel
+from api.governance.database.db_models.ai_app_policy_model import AIApplicationPolicyModel, PermissionType
+from api.governance.database.db_models.vector_db_model import VectorDBModel, VectorDBType
+from api.governance.database.db_models.vector_db_policy_model import VectorDBPolicyModel
+from api.user.database.db_models import User
+from api.user.database.db_models.groups_model import Groups, GroupMembers
+from core.db_session import session, set_session_context, reset_session_context
+from core.utils import generate_unique_identifier_key
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_GROUP = "benchmark_analysts"
+BENCHMARK_VECTOR_DB = "benchmark_vector_db"
+
+
+@dataclass
+class BenchmarkApplication:
+    name: str
+    application_key: str
+    scanner_mix: str
+
+
+@dataclass
+class BenchmarkData:
+    shield_server_key_id: int
+    shield_server_public_key: str
+    shield_plugin_key_id: int
+    users: List[str]
+    applications: Dict[str, BenchmarkApplication] = field(default_factory=dict)
+
+
+async def seed_database(scanner_mixes: List[str], num_users: int) -> BenchmarkData:
+    """
+    Seed the benchmark database with encryption keys, users, a vector DB and one AI application per scanner mix.
+
+    Every application allows the public group, redacts personal identifiers in replies and denies toxic prompts.
+    Half of the users are members of the benchmark group, which is the only group allowed by the vector DB policies,
+    so authorize_vectordb exercises both the allowed and the filtered path.
+
+    Args:
+        scanner_mixes (List[str]): The scanner mixes, one application is created for each.
+        num_users (int): The number of users to create.
+
+    Returns:
+        BenchmarkData: The seeded data.
+    """
+    await create_default_encryption_keys()
+
+    context = set_session_context(session_id="benchmark_seed")
+    try:
+        users = await _seed_users(num_users)
+        await _seed_vector_db()
+        applications = {}
+        for scanner_mix in scanner_mixes:
+            applications[scanner_mix] = await _seed_application(scanner_mix)
+        await session.commit()
+
+        shield_server_key, shield_plugin_key = await _get_active_message_keys()
+        benchmark_data = BenchmarkData(shield_server_key_id=shield_server_key["id"],
+                                       shield_server_public_key=shield_server_key["public_key"],
+                                       shield_plugin_key_id=shield_plugin_key["id"],
+                                       users=users,
+                                       applications=applications)
+    finally:
+        await session.remove()
+        reset_session_context(context=context)
+
+    logger.info(f"Seeded benchmark database with {len(users)} users and {len(applications)} applications")
+    return benchmark_data
+
+
+async def _seed_users(num_users: int) -> List[str]:
+    group = Groups(name=BENCHMARK_GROUP, description="Group of the benchmark users")
+    session.add(group)
+    await session.flush()
+
+    usernames = []
+    for index in range(num_users):
+        username = f"benchmark_user_{index}"
+        user = User(username=username, first_name="Benchmark", last_name=str(index),
+                    email=f"{username}@example.com", is_tenant_owner=False)
+        session.add(user)
+        await session.flush()
+        if index % 2 == 0:
+            session.add(GroupMembers(group_id=group.id, user_id=user.id))
+        usernames.append(username)
+    return usernames
+
+
+async def _seed_vector_db():
+    vector_db = VectorDBModel(name=BENCHMARK_VECTOR_DB, description="Vector DB of the benchmark applications",
+                              type=VectorDBType.OPENSEARCH, user_enforcement=1, group_enforcement=1)
+    session.add(vector_db)
+    await session.flush()
+    session.add(VectorDBPolicyModel(name="Confidential documents", description="Analysts only",
+                                    vector_db_id=vector_db.id, metadata_key="security",
+                                    metadata_value="confidential", operator="eq",
+                                    allowed_groups=[BENCHMARK_GROUP]))
+    session.add(VectorDBPolicyModel(name="Public documents", description="Everyone",
+                                    vector_db_id=vector_db.id, metadata_key="security", metadata_value="public",
+                                    operator="eq", allowed_groups=["public"]))
+
+
+async def _seed_application(scanner_mix: str) -> BenchmarkApplication:
+    name = f"benchmark_{scanner_mix.replace('+', '_')}"
+    application = AIApplicationModel(name=name, description=f"Benchmark application for scanner mix {scanner_mix}",
+                                     application_key=generate_unique_identifier_key(),
+                                     vector_dbs=[BENCHMARK_VECTOR_DB])
+    session.add(application)
+    await session.flush()
+    session.add(AIApplicationConfigModel(allowed_groups=["public"], application_id=application.id))
+    session.add(AIApplicationPolicyModel(name="Personal Identifier Redaction",
+                                         description="Personal Identifier Redaction",
+                                         groups=["public"], tags=["EMAIL_ADDRESS", "PHONE_NUMBER", "PERSON"],
+                                         prompt=PermissionType.ALLOW, reply=PermissionType.REDACT,
+                                         enriched_prompt=PermissionType.ALLOW, application_id=application.id))
+    session.add(AIApplicationPolicyModel(name="Toxic Content", description="Deny toxic prompts",
+                                         groups=["public"], tags=["TOXIC"], prompt=PermissionType.DENY,
+                                         reply=PermissionType.DENY, enriched_prompt=PermissionType.DENY,
+                                         application_id=application.id))
+    return BenchmarkApplication(name=name, application_key=application.application_key, scanner_mix=scanner_mix)
+
+
+async def _get_active_message_keys():
+    master_key = await EncryptionMasterKeyRepository().get_active_encryption_master_key()
+    secure_encryptor = SecureEncryptor(master_key=master_key.key)
+    encryption_key_repository = EncryptionKeyRepository()
+
+    message_keys = []
+    for key_type in [EncryptionKeyType.MSG_PROTECT_SHIELD, EncryptionKeyType.MSG_PROTECT_PLUGIN]:
+        encryption_key = await encryption_key_repository.get_active_encryption_key_by_type(key_type)
+        message_keys.append({"id": encryption_key.id,
+                             "public_key": secure_encryptor.decrypt(encryption_key.public_key)})
+    return message_keys
@@ -0,0 +1,103 @@
+"""
+This module aggregates the latencies measured by the shield benchmark.
+
+Classes:
+    ScenarioResult: Throughput and latency percentiles of one benchmark scenario.
+
+Functions:
+    percentile: Computes a percentile of a sorted list of latencies.
+    summarize: Builds a ScenarioResult from the measured latencies of a scenario.
+    format_results: Formats scenario results as a plain text table.
+"""
+import math
+from dataclasses import dataclass, asdict
+from typing import List
+
+
+@dataclass
+class ScenarioResult:
+    mode: str
+    endpoint: str
+    scanner_mix: str
+    message_size: int
+    message_count: int
+    concurrency: int
+    requests: int
+    errors: int
+    duration_sec: float
+    throughput_rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentile(sorted_latencies: List[float], percent: float) -> float:
+    """
+    Compute a percentile with the nearest-rank method.
+
+    Args:
+        sorted_latencies (List[float]): The latencies sorted in ascending order.
+        percent (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The latency at the given percentile, 0 when there are no latencies.
+    """
+    if not sorted_latencies:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_latencies)))
+    return sorted_latencies[min(rank, len(sorted_latencies)) - 1]
+
+
+def summarize(mode: str, endpoint: str, scanner_mix: str, message_size: int, message_count: int, concurrency: int,
+              latencies_ms: List[float], errors: int, duration_sec: float) -> ScenarioResult:
+    """
+    Build the result of a scenario from the latencies of its successful requests.
+
+    Returns:
+        ScenarioResult: The throughput and latency percentiles of the scenario.
+    """
+    sorted_latencies = sorted(latencies_ms)
+    completed = len(sorted_latencies)
+    return ScenarioResult(
+        mode=mode,
+        endpoint=endpoint,
+        scanner_mix=scanner_mix,
+        message_size=message_size,
+        message_count=message_count,
+        concurrency=concurrency,
+        requests=completed,
+        errors=errors,
+        duration_sec=round(duration_sec, 3),
+        throughput_rps=round(completed / duration_sec, 2) if duration_sec > 0 else 0.0,
+        mean_ms=round(sum(sorted_latencies) / completed, 3) if completed else 0.0,
+        p50_ms=round(percentile(sorted_latencies, 50), 3),
+        p95_ms=round(percentile(sorted_latencies, 95), 3),
+        p99_ms=round(percentile(sorted_latencies, 99), 3),
+        max_ms=round(sorted_latencies[-1], 3) if completed else 0.0
+    )
+
+
+def format_results(results: List[ScenarioResult]) -> str:
+    """
+    Format the scenario results as a plain text table.
+
+    Args:
+        results (List[ScenarioResult]): The scenario results.
+
+    Returns:
+        str: The formatted table.
+    """
+    headers = ["mode", "endpoint", "scanners", "size", "msgs", "conc", "reqs", "errors", "rps", "p50_ms", "p95_ms",
+               "p99_ms", "max_ms"]
+    rows = [[result.mode, result.endpoint, result.scanner_mix, result.message_size, result.message_count,
+             result.concurrency, result.requests, result.errors, result.throughput_rps, result.p50_ms, result.p95_ms,
+             result.p99_ms, result.max_ms] for result in results]
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(value).rjust(width) for value, width in zip(row, widths)) for row in [headers] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
@@ -78,6 +78,14 @@ async def background_init_load_scanners():
     asyncio.create_task(asyncio.to_thread(threaded_load_scanners))  # Run the blocking code in a background thread
 
 
+async def background_prewarm_tenant_data_encryptors():
+    """
+    Run the pre-warm of the tenant data encryptors as a background task without delaying the startup.
+    """
+    from api.shield.services.tenant_data_encryptor_service import prewarm_tenant_data_encryptors
+    asyncio.create_task(prewarm_tenant_data_encryptors())
+
+
 @asynccontextmanager
 async def register_usage_events(application: FastAPI):
     async def init_usage_collector():
@@ -105,6 +113,7 @@ async def register_usage_events(application: FastAPI):
             logger.info("Scheduler shutdown and lock released.")
 
     await init_usage_collector()  # called on startup
+    await background_prewarm_tenant_data_encryptors()
     yield
     await shutdown_usage_collector()  # called on shutdown
 
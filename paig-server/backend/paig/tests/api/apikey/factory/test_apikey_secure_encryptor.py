@@ -65,3 +65,58 @@ def test_encrypt_invalid_type():
 def test_decrypt_invalid_type():
     with pytest.raises(Exception, match="Unable to Decrypt text"):
         apikey_decrypt(12345, SECRET)
+
+
+def test_derived_key_is_cached(mocker):
+    from api.apikey.factory import apikey_secure_encryptor
+    apikey_secure_encryptor.derived_key_cache.clear()
+    derive_spy = mocker.spy(apikey_secure_encryptor, "_derive_secret_key")
+
+    encrypted = apikey_encrypt(DATA, SECRET)
+    assert apikey_decrypt(encrypted, SECRET) == DATA
+
+    assert derive_spy.call_count == 1
+    assert all(SECRET.encode() not in cache_key for cache_key in apikey_secure_encryptor.derived_key_cache.cache)
+
+
+def test_derived_key_cache_evicts_least_recently_used():
+    from api.apikey.factory.apikey_secure_encryptor import DerivedKeyCache
+    cache = DerivedKeyCache(2)
+    cache.put(b"key1", b"value1")
+    cache.put(b"key2", b"value2")
+    cache.get(b"key1")
+    cache.put(b"key3", b"value3")
+
+    assert cache.get(b"key2") is None
+    assert cache.get(b"key1") == b"value1"
+    assert cache.get(b"key3") == b"value3"
+
+
+@pytest.mark.asyncio
+async def test_async_encrypt_and_decrypt_derive_key_on_executor(mocker):
+    import threading
+    from api.apikey.factory import apikey_secure_encryptor
+    from api.apikey.factory.apikey_secure_encryptor import apikey_encrypt_async, apikey_decrypt_async
+    apikey_secure_encryptor.derived_key_cache.clear()
+    derive_threads = []
+    derive_secret_key = apikey_secure_encryptor._derive_secret_key
+
+    def derive_on_thread(secret):
+        derive_threads.append(threading.current_thread().name)
+        return derive_secret_key(secret)
+
+    mocker.patch.object(apikey_secure_encryptor, "_derive_secret_key", side_effect=derive_on_thread)
+
+    encrypted = await apikey_encrypt_async(DATA, SECRET)
+    assert await apikey_decrypt_async(encrypted, SECRET) == DATA
+    assert apikey_decrypt(encrypted, SECRET) == DATA
+
+    assert len(derive_threads) == 1
+    assert derive_threads[0].startswith("apikey-key-derivation")
+
+
+@pytest.mark.asyncio
+async def test_async_decrypt_invalid_secret():
+    from api.apikey.factory.apikey_secure_encryptor import apikey_decrypt_async
+    with pytest.raises(Exception, match="Unable to Decrypt text"):
+        await apikey_decrypt_async(apikey_encrypt(DATA, SECRET), None)
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from api.apikey.factory.verified_apikey_cache import VerifiedAPIKeyCache, hash_api_key, invalidates_verified_api_key, \
+    invalidates_verified_application, clears_verified_api_keys
+
+
+@pytest.fixture
+def cache():
+    cache = VerifiedAPIKeyCache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_put_and_get(cache):
+    api_key_hash = hash_api_key("api_key")
+    cache.put(api_key_hash, api_key_id=1, user_id=2, api_id=3, token_expiry_epoch_time=4)
+
+    verified_api_key = cache.get(api_key_hash)
+
+    assert (verified_api_key.api_key_id, verified_api_key.user_id, verified_api_key.api_id,
+            verified_api_key.token_expiry_epoch_time) == (1, 2, 3, 4)
+    assert cache.get(hash_api_key("other_api_key")) is None
+
+
+def test_hash_api_key_does_not_keep_raw_key():
+    assert hash_api_key("api_key") == hash_api_key("api_key")
+    assert b"api_key" not in hash_api_key("api_key")
+
+
+def test_expired_entry_is_not_returned(cache, monkeypatch):
+    cache.put(hash_api_key("api_key"), 1, 2, 3, 4)
+    monkeypatch.setattr(time, "monotonic", lambda: float("inf"))
+
+    assert cache.get(hash_api_key("api_key")) is None
+    assert len(cache.cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache, monkeypatch):
+    monkeypatch.setattr(cache, "max_size", 2)
+    cache.put(hash_api_key("key1"), 1, 1, 1, 1)
+    cache.put(hash_api_key("key2"), 2, 1, 1, 1)
+    cache.get(hash_api_key("key1"))
+    cache.put(hash_api_key("key3"), 3, 1, 1, 1)
+
+    assert cache.get(hash_api_key("key2")) is None
+    assert cache.get(hash_api_key("key1")) is not None
+    assert cache.get(hash_api_key("key3")) is not None
+
+
+def test_disabled_cache_keeps_nothing(cache, monkeypatch):
+    monkeypatch.setattr(cache, "max_size", 0)
+    cache.put(hash_api_key("api_key"), 1, 2, 3, 4)
+
+    assert cache.get(hash_api_key("api_key")) is None
+
+
+def test_invalidate_api_key_and_application(cache):
+    cache.put(hash_api_key("key1"), api_key_id=1, user_id=1, api_id=10, token_expiry_epoch_time=1)
+    cache.put(hash_api_key("key2"), api_key_id=2, user_id=1, api_id=10, token_expiry_epoch_time=1)
+    cache.put(hash_api_key("key3"), api_key_id=3, user_id=1, api_id=20, token_expiry_epoch_time=1)
+
+    cache.invalidate_api_key(1)
+    assert cache.get(hash_api_key("key1")) is None
+    assert cache.get(hash_api_key("key2")) is not None
+
+    cache.invalidate_application(10)
+    assert cache.get(hash_api_key("key2")) is None
+    assert cache.get(hash_api_key("key3")) is not None
+
+
+def test_key_revoked_during_its_validation_is_not_cached(cache):
+    generation = cache.get_generation()
+    # the key is disabled while the validation decrypts it
+    cache.invalidate_api_key(1)
+    cache.put(hash_api_key("key1"), api_key_id=1, user_id=1, api_id=10, token_expiry_epoch_time=1,
+              generation=generation)
+    assert cache.get(hash_api_key("key1")) is None
+
+    cache.put(hash_api_key("key1"), api_key_id=1, user_id=1, api_id=10, token_expiry_epoch_time=1,
+              generation=cache.get_generation())
+    assert cache.get(hash_api_key("key1")) is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidates_verified_api_key_after_the_decorated_function(cache):
+    class Service:
+        @invalidates_verified_api_key
+        async def disable_api_key(self, key_id):
+            # a validation running before the change is committed caches the key again
+            cache.put(hash_api_key("key1"), api_key_id=key_id, user_id=1, api_id=10, token_expiry_epoch_time=1)
+            return "disabled"
+
+    assert await Service().disable_api_key(1) == "disabled"
+    assert cache.get(hash_api_key("key1")) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidates_verified_application_and_clears_after_the_decorated_functions(cache):
+    class Service:
+        @invalidates_verified_application
+        async def delete_ai_application(self, id):
+            cache.put(hash_api_key("key1"), api_key_id=1, user_id=1, api_id=id, token_expiry_epoch_time=1)
+            cache.put(hash_api_key("key2"), api_key_id=2, user_id=1, api_id=20, token_expiry_epoch_time=1)
+
+        @clears_verified_api_keys
+        async def create_paig_level1_encryption_key(self):
+            cache.put(hash_api_key("key3"), api_key_id=3, user_id=1, api_id=30, token_expiry_epoch_time=1)
+            return "created"
+
+    await Service().delete_ai_application(10)
+    assert cache.get(hash_api_key("key1")) is None
+    assert cache.get(hash_api_key("key2")) is not None
+
+    assert await Service().create_paig_level1_encryption_key() == "created"
+    assert cache.get(hash_api_key("key2")) is None and cache.get(hash_api_key("key3")) is None
@@ -232,3 +232,33 @@ async def test_permanent_delete_api_key(service, token_expiry_date, api_key_data
 
 
 
+
+
+@pytest.mark.asyncio
+async def test_validated_api_key_is_cached_until_disabled(service, api_key_data, mocker):
+    from api.apikey.factory.apikey_validator import APIKeyValidator
+    from api.apikey.factory.verified_apikey_cache import VerifiedAPIKeyCache
+    from core.exceptions import BadRequestException
+
+    await create_default_encryption_keys()
+    VerifiedAPIKeyCache().clear()
+
+    created_key = await service.create_api_key(api_key_data, 123)
+    api_key_validator = APIKeyValidator(
+        paig_api_key_service=service,
+        secure_encryptor_factory=service.secure_encryptor_factory,
+        paig_level1_encryption_key_service=service.paig_level1_encryption_key_service,
+        paig_level2_encryption_key_service=service.paig_level2_encryption_key_service
+    )
+    request = mocker.Mock(headers={"x-paig-api-key": created_key["apiKeyMasked"]})
+    get_by_uuid_spy = mocker.spy(service, "get_paig_api_key_by_uuid")
+
+    expected_identity = {"user_id": 123, "api_id": api_key_data["application_id"]}
+    assert await api_key_validator.validate_api_key(request) == expected_identity
+    assert await api_key_validator.validate_api_key(request) == expected_identity
+    assert get_by_uuid_spy.call_count == 1
+
+    await service.disable_api_key(created_key["id"])
+
+    with pytest.raises(BadRequestException):
+        await api_key_validator.validate_api_key(request)
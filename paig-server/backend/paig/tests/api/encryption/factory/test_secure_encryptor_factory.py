@@ -24,3 +24,27 @@ async def test_get_secure_encryptor(encryption_master_key_repository, db_session
 
     # Assertions
     assert isinstance(secure_encryptor, SecureEncryptor)
+
+
+@pytest.mark.asyncio
+async def test_secure_encryptor_is_cached_until_invalidated(mocker):
+    secure_encryptor_factory = SecureEncryptorFactory()
+    repository = AsyncMock()
+    repository.get_active_encryption_master_key.side_effect = [
+        EncryptionMasterKeyModel(id=101, key="firstmasterkey"),
+        EncryptionMasterKeyModel(id=102, key="secondmasterkey")
+    ]
+    mocker.patch.object(secure_encryptor_factory, 'encryption_master_key_repository', repository)
+    mocker.patch.object(secure_encryptor_factory, 'secure_encryptors', {})
+    mocker.patch.object(secure_encryptor_factory, 'active_master_key_id', None)
+
+    secure_encryptor = await secure_encryptor_factory.get_or_create_secure_encryptor()
+    assert await secure_encryptor_factory.get_or_create_secure_encryptor() is secure_encryptor
+    assert secure_encryptor.master_key_id == 101
+    assert repository.get_active_encryption_master_key.call_count == 1
+
+    # the rotated master key is loaded after the invalidation
+    secure_encryptor_factory.invalidate_secure_encryptors(101)
+    rotated_secure_encryptor = await secure_encryptor_factory.get_or_create_secure_encryptor()
+    assert rotated_secure_encryptor.master_key_id == 102
+    assert repository.get_active_encryption_master_key.call_count == 2
@@ -68,3 +68,18 @@ def test_decrypt_invalid(encryptor):
         decryptor = SecureEncryptor(encrypted_text)
         decrypted_text = decryptor.decrypt(encrypted_text)
         assert decrypted_text == plaintext
+
+
+def test_cipher_is_built_once_and_reused(encryptor, mocker):
+    from api.encryption.utils import secure_encryptor
+    build_counter = mocker.patch.object(secure_encryptor, 'cipher_build_counter')
+    for plaintext in ["one", "two", "three"]:
+        assert encryptor.decrypt(encryptor.encrypt(plaintext)) == plaintext
+    assert build_counter.add.call_count == 1
+    assert encryptor.get_cipher() is encryptor.get_cipher()
+
+
+def test_cipher_is_rebuilt_when_secret_key_changes(encryptor):
+    cipher = encryptor.get_cipher()
+    encryptor.secret_key = encryptor.make_fixed_length_key(b"othersecretkey", encryptor.KEY_SIZE_IN_BYTES)
+    assert encryptor.get_cipher() is not cipher
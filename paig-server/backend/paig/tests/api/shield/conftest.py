@@ -0,0 +1,14 @@
+import pytest
+
+from api.shield.utils import config_utils
+
+
+@pytest.fixture
+def mock_config_snapshot(mocker):
+    """
+    Returns a function which replaces the shield configuration with the given properties for the test.
+    """
+    def _mock_config_snapshot(properties: dict):
+        mocker.patch('api.shield.utils.config_utils._snapshot', config_utils.ConfigSnapshot(properties))
+
+    return _mock_config_snapshot
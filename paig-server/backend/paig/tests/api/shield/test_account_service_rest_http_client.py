@@ -86,3 +86,25 @@ class TestHttpAccountServiceClient:
             await account_service_client.get_all_encryption_keys(tenant_id)
 
         print(f"\nGot exception=> {e.type}: {e.value}")
+
+    #  keys are fetched again only when they changed
+    @pytest.mark.asyncio
+    async def test_get_all_encryption_keys_with_etag(self, mocker):
+        from api.shield.client.http_account_service_client import HttpAccountServiceClient
+        side_effect = lambda prop, default_value=None: {
+            "account_service_base_url": "base_url",
+            "account_service_get_key_endpoint": "/get_key_endpoint"
+        }.get(prop, default_value)
+
+        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        mocker.patch.object(HttpAccountServiceClient, 'get', side_effect=[
+            Mock(status_code=200, headers={"ETag": '"v1"'}, json=Mock(return_value=[{"key": "value"}])),
+            Mock(status_code=304, headers={"ETag": '"v1"'}, text="")])
+
+        account_service_client = HttpAccountServiceClient()
+        tenant_id = "example_tenant"
+
+        assert await account_service_client.get_all_encryption_keys(tenant_id) == [{"key": "value"}]
+        assert await account_service_client.get_all_encryption_keys(tenant_id) == [{"key": "value"}]
+        account_service_client.get.assert_called_with(url="/get_key_endpoint", headers={
+            "x-tenant-id": tenant_id, "x-user-role": "INTERNAL_SERVICE", "If-None-Match": '"v1"'})
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import patch, MagicMock
 import pytest
 import json
@@ -26,6 +27,19 @@ class TestScanner1(Scanner):
         return ScannerResult(["trait1"], analyzer_result=["result1"])
 
 
+class TestAsyncScanner(Scanner):
+    is_async = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    def scan(self, message: str) -> ScannerResult:
+        raise AssertionError("async scanners are not run on the scanner executor")
+
+    async def scan_async(self, message: str) -> ScannerResult:
+        return ScannerResult(["async_trait"])
+
+
 class TestScanner2(Scanner):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -48,7 +62,6 @@ def mock_scanners():
 @pytest.fixture
 def app_manager(mock_scanners):
     manager = ApplicationManager()
-    manager.max_workers = 4  # Set max_workers for ThreadPoolExecutor
     with patch.object(manager, 'get_scanners', return_value=mock_scanners):
         yield manager
 
@@ -67,11 +80,24 @@ class TestApplicationManager:
         mock_parse_properties.return_value = mock_scanners
         manager = ApplicationManager()
         manager.load_scanners('app_key')
-        assert manager.get_scanners('app_key', 'prompt', True, auth_req)[0] == mock_scanners[0]
-        assert manager.get_scanners('app_key', 'prompt', False, auth_req)[0] == mock_scanners[1]
+        assert manager.get_scanners('app_key', 'prompt', True, auth_req)[0].name == mock_scanners[0].name
+        assert manager.get_scanners('app_key', 'prompt', False, auth_req)[0].name == mock_scanners[1].name
 
     @patch('api.shield.services.application_manager_service.parse_properties')
-    def test_scan_messages(self, mock_parse_properties):
+    def test_get_scanners_does_not_modify_cached_scanners(self, mock_parse_properties, mock_scanners):
+        mock_parse_properties.return_value = mock_scanners
+        manager = ApplicationManager()
+        manager.load_scanners('app_key')
+
+        scanners = manager.get_scanners('app_key', 'prompt', True, auth_req)
+
+        assert scanners[0] is not mock_scanners[0]
+        assert scanners[0].application_key == 'app_key'
+        assert not hasattr(mock_scanners[0], 'application_key')
+
+    @pytest.mark.asyncio
+    @patch('api.shield.services.application_manager_service.parse_properties')
+    async def test_scan_messages(self, mock_parse_properties):
         scanner1 = MagicMock(name='scanner1', request_types=['prompt'], enforce_access_control=True)
         scanner1.scan.return_value = {'traits': ['trait1', 'trait2']}
         scanner2 = MagicMock(name='scanner2', request_types=['prompt', 'reply'], enforce_access_control=False)
@@ -79,11 +105,26 @@ class TestApplicationManager:
         mock_parse_properties.return_value = [scanner1, scanner2]
         manager = ApplicationManager()
         manager.load_scanners('app_key')
-        scan_results, scan_timing = manager.scan_messages('message', auth_req, True)
+        scan_results, scan_timing = await manager.scan_messages('message', auth_req, True)
         assert len(scan_results) == 1
         for key, value in scan_results.items():
             assert value == {'traits': ['trait1', 'trait2']}
 
+    @pytest.mark.asyncio
+    @patch('api.shield.services.application_manager_service.parse_properties')
+    async def test_scan_messages_awaits_async_scanners_on_event_loop(self, mock_parse_properties):
+        async_scanner = TestAsyncScanner(name='async_scanner', request_types=['prompt'], enforce_access_control=True)
+        mock_parse_properties.return_value = [async_scanner]
+        manager = ApplicationManager()
+        manager.load_scanners(auth_req.application_key)
+
+        with patch.object(manager.scanner_executor, 'run') as mock_run:
+            scan_results, scan_timings = await manager.scan_messages('message', auth_req, True)
+
+        mock_run.assert_not_called()
+        assert scan_results['async_scanner'].get_traits() == ['async_trait']
+        assert 'async_scanner' in scan_timings
+
     def test_scan_with_scanner(self):
         scanner = TestScanner1(name='scanner1', request_types=['prompt'], enforce_access_control=True,
                                model_path='model_path', model_score_threshold=0.5, entity_type='entity_type',
@@ -98,8 +139,21 @@ class TestApplicationManager:
             assert scanner_name == "scanner1"
             assert result == {"traits": ["trait1"], "analyzer_result": ["result1"]}
 
+    @patch('api.shield.services.application_manager_service.record_authorize_stage_duration')
+    def test_scan_with_scanner_records_stage_duration(self, mock_record_stage):
+        scanner = TestScanner1(name='scanner1', request_types=['prompt'], enforce_access_control=True,
+                               application_key='app_key')
 
-def test_scan_messages_success(app_manager, mock_scanners):
+        scan_with_scanner(scanner, "test message", "tenant_id")
+
+        mock_record_stage.assert_called_once()
+        assert mock_record_stage.call_args.args[0] == "scanner"
+        assert mock_record_stage.call_args.kwargs == {"tenant_id": "tenant_id", "application_key": "app_key",
+                                                      "scanner": "scanner1"}
+
+
+@pytest.mark.asyncio
+async def test_scan_messages_success(app_manager, mock_scanners):
     message = "test message"
     application_key = "test_app_key"
 
@@ -111,7 +165,7 @@ def test_scan_messages_success(app_manager, mock_scanners):
         traits=[],
         analyzer_result=["result2"]
     )):
-        scan_results, scan_timings = app_manager.scan_messages(message, auth_req, True)
+        scan_results, scan_timings = await app_manager.scan_messages(message, auth_req, True)
 
     # Verify the results
     assert len(scan_results) == 2
@@ -121,7 +175,8 @@ def test_scan_messages_success(app_manager, mock_scanners):
     assert scan_results["scanner1"].get('analyzer_result') == ["result1"]
 
 
-def test_scan_messages_with_exception(app_manager, mock_scanners):
+@pytest.mark.asyncio
+async def test_scan_messages_with_exception(app_manager, mock_scanners):
     message = "test message"
     application_key = "test_app_key"
 
@@ -129,13 +184,23 @@ def test_scan_messages_with_exception(app_manager, mock_scanners):
         with patch.object(mock_scanners[1], 'scan',
                           return_value=ScannerResult(traits=["trait1"], analyzer_result=["result1"])):
             with pytest.raises(ShieldException) as e:
-                scan_results, access_control_traits = app_manager.scan_messages(message, auth_req, True)
+                scan_results, access_control_traits = await app_manager.scan_messages(message, auth_req, True)
 
                 # Verify the results
                 assert len(scan_results) == 1  # scanner1 failed, so only one result
                 assert "scanner2" in scan_results
                 assert access_control_traits == []
 
+
+@pytest.mark.asyncio
+async def test_scan_messages_reraises_cancelled_scan(app_manager, mock_scanners):
+    async_scanner = TestAsyncScanner(name='async_scanner', request_types=['prompt'], enforce_access_control=True)
+
+    with patch.object(app_manager, 'get_scanners', return_value=[async_scanner, mock_scanners[1]]), \
+            patch.object(async_scanner, 'scan_async', side_effect=asyncio.CancelledError()):
+        with pytest.raises(asyncio.CancelledError):
+            await app_manager.scan_messages("test message", auth_req, True)
+
     @patch.object(ApplicationManager, 'load_scanners')
     def test_get_scanners_with_cache_miss(self, mock_load_scanners):
         manager = ApplicationManager()  # Create an instance of ApplicationManager
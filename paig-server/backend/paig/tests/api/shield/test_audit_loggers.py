@@ -42,6 +42,16 @@ def test_fluentd_audit_logger(mock_fluentd_http_client):
     mock_fluentd_http_client.log_message.assert_called_once()
 
 
+@patch('api.shield.client.http_fluentd_client.FluentdRestHttpClient')
+def test_fluentd_audit_logger_pushes_batch_in_one_request(mock_fluentd_http_client):
+    fluentd_audit_logger = FluentdAuditLogger(mock_fluentd_http_client, format_to_root_path('tests/api/shield/audit_spool_dir'), 0, 5)
+    shield_audits = [get_shield_audit_obj(), get_shield_audit_obj()]
+    fluentd_audit_logger.push_audit_events_to_server(shield_audits)
+    mock_fluentd_http_client.log_messages.assert_called_once_with(
+        [shield_audit.to_payload_dict() for shield_audit in shield_audits])
+    mock_fluentd_http_client.log_message.assert_not_called()
+
+
 @patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File')
 def test_s3_audit_logger(mock_log_message_in_s3):
     s3_audit_logger = S3AuditLogger(mock_log_message_in_s3, format_to_root_path('tests/api/shield/audit_spool_dir'), 0, 0)
@@ -52,6 +62,17 @@ def test_s3_audit_logger(mock_log_message_in_s3):
     mock_log_message_in_s3.write_log_to_s3.assert_called_once()
 
 
+@patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File')
+def test_s3_audit_logger_stages_batch_in_part_files(mock_log_message_in_s3):
+    mock_log_message_in_s3.part_files_enabled = True
+    s3_audit_logger = S3AuditLogger(mock_log_message_in_s3, format_to_root_path('tests/api/shield/audit_spool_dir'), 0, 0)
+    mock_log_message_in_s3.part_file_writer.start.assert_called_once()
+    shield_audits = [get_shield_audit_obj(), get_shield_audit_obj()]
+    s3_audit_logger.push_audit_events_to_server(shield_audits)
+    mock_log_message_in_s3.write_logs_to_part_files.assert_called_once_with(shield_audits)
+    mock_log_message_in_s3.write_log_to_s3.assert_not_called()
+
+
 @patch('api.shield.logfile.log_message_in_local.LogMessageInLocal')
 def test_local_audit_logger(mock_log_message_in_local):
     mock_log_message_in_local.directory_path = 'tests/api/shield/test_directory_path'
@@ -59,3 +80,14 @@ def test_local_audit_logger(mock_log_message_in_local):
     shield_audit = get_shield_audit_obj()
     local_audit_logger.push_audit_event_to_server(shield_audit)
     mock_log_message_in_local.write_log_to_local_file.assert_called_once()
+
+
+@patch('api.shield.logfile.log_message_in_local.LogMessageInLocal')
+def test_local_audit_logger_appends_batch_to_rolling_files(mock_log_message_in_local):
+    mock_log_message_in_local.rolling_files_enabled = True
+    local_audit_logger = LocalAuditLogger(mock_log_message_in_local, format_to_root_path('tests/api/shield/audit_spool_dir'), 0, 0)
+    mock_log_message_in_local.rolling_file_writer.start.assert_called_once()
+    shield_audits = [get_shield_audit_obj(), get_shield_audit_obj()]
+    local_audit_logger.push_audit_events_to_server(shield_audits)
+    mock_log_message_in_local.write_logs_to_rolling_files.assert_called_once_with(shield_audits)
+    mock_log_message_in_local.write_log_to_local_file.assert_not_called()
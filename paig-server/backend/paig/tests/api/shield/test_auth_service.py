@@ -1,3 +1,4 @@
+import asyncio
 import json
 import uuid
 from unittest.mock import Mock, MagicMock, AsyncMock
@@ -17,7 +18,7 @@ from api.shield.scanners.AWSBedrockGuardrailScanner import AWSBedrockGuardrailSc
 from api.shield.services.auth_service import AuthService
 from api.shield.utils.custom_exceptions import ShieldException
 from core.exceptions import BadRequestException
-from paig_common.paig_exception import DiskFullException, AuditEventQueueFullException
+from paig_common.paig_exception import DiskFullException
 
 
 def authorize_req_data():
@@ -55,7 +56,7 @@ def authz_res_data_no_masking():
 class TestAuthService:
 
     #  AuthService can be initialized in cloud mode
-    def test_initialize_cloud_mode(self, mocker):
+    def test_initialize_cloud_mode(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
@@ -65,11 +66,9 @@ class TestAuthService:
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
         # Initialize AuthService in cloud mode
-        side_effect = lambda prop, default_value=None: {
+        mock_config_snapshot({
             "shield_run_mode": "cloud"
-        }.get(prop, default_value)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         # Initialize AuthService in cloud mode
         auth_service = self.get_auth_service()
 
@@ -81,7 +80,7 @@ class TestAuthService:
         return auth_service
 
     #  AuthService can be initialized in self-managed mode
-    def test_initialize_self_managed_mode(self, mocker):
+    def test_initialize_self_managed_mode(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
@@ -92,11 +91,9 @@ class TestAuthService:
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
         # Initialize AuthService in self-managed mode
-        side_effect = lambda prop, default_value=None: {
+        mock_config_snapshot({
             "shield_run_mode": "self_managed"
-        }.get(prop, default_value)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         auth_service = self.get_auth_service()
 
         # Assertions
@@ -122,7 +119,7 @@ class TestAuthService:
         auth_service.tenant_data_encryptor_service = mock_tenant_data_encryptor_service
         mocker.patch.object(auth_service.authz_service_client, 'post_authorize', new_callable=AsyncMock,
                             return_value=authz_res_data_no_masking())
-        mocker.patch.object(auth_service.application_manager, 'scan_messages', return_value=({}, {}))
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', new_callable=AsyncMock, return_value=({}, {}))
         mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
 
         mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name', new_callable=AsyncMock, return_value={})
@@ -154,7 +151,7 @@ class TestAuthService:
         auth_service.tenant_data_encryptor_service = mock_tenant_data_encryptor_service
         mocker.patch.object(auth_service.authz_service_client, 'post_authorize', new_callable=AsyncMock,
                             return_value=authz_res_data_no_masking())
-        mocker.patch.object(auth_service.application_manager, 'scan_messages', return_value=({}, {}))
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', new_callable=AsyncMock, return_value=({}, {}))
         mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
 
         mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name', new_callable=AsyncMock, return_value={})
@@ -168,20 +165,44 @@ class TestAuthService:
         # Assertions
         assert auth_service.application_manager.scan_messages.call_count == mock_auth_req.messages.__len__()
 
-    def test_init_log_message_in_file(self, mocker):
+    @pytest.mark.asyncio
+    async def test_analyze_scan_messages_merges_concurrent_scans_in_message_order(self, mocker):
+        mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
+        mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
+        mocker.patch('api.shield.services.auth_service.NLPHandler')
+        mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
+        mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
+        auth_service = self.get_auth_service()
+
+        async def scan_messages(message, auth_req, is_authz_scan):
+            # the first message finishes last
+            await asyncio.sleep(0.05 if message == "first message" else 0)
+            return {"scanner": ScannerResult(traits=[message.upper()])}, {"scanner": len(message)}
+
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', side_effect=scan_messages)
+        auth_req = authorize_req_data()
+        auth_req.messages = ["first message", "second"]
+        all_result_traits, analyzer_result_map = [], {}
+
+        scan_timings = await auth_service.analyze_scan_messages(set(), all_result_traits, analyzer_result_map,
+                                                                auth_req, True, {})
+
+        assert scan_timings == [{"scanner": "13ms"}, {"scanner": "6ms"}]
+        assert all_result_traits == ["FIRST MESSAGE", "SECOND"]
+        assert list(analyzer_result_map.keys()) == ["first message", "second"]
+
+    def test_init_log_message_in_file(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
         mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
-        side_effect = lambda prop, default_value=None: {
+        mock_config_snapshot({
             "shield_run_mode": "self_managed",
             "audit_msg_content_to_self_managed_storage": "True",
             "audit_msg_content_storage_system": "s3,local",
-        }.get(prop, default_value)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.__init__', return_value=None)
         mocker.patch('api.shield.logfile.log_message_in_local.LogMessageInLocal.__init__', return_value=None)
 
@@ -190,20 +211,18 @@ class TestAuthService:
 
         assert auth_service.message_log_objs.__len__() == 2
 
-    def test_init_log_message_in_file_with_invalid_storage(self, mocker):
+    def test_init_log_message_in_file_with_invalid_storage(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
         mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
             "shield_run_mode": "self_managed",
             "audit_msg_content_to_self_managed_storage": "True",
             "audit_msg_content_storage_system": "gcp",
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.__init__')
         mocker.patch('api.shield.logfile.log_message_in_local.LogMessageInLocal.__init__')
 
@@ -237,20 +256,18 @@ class TestAuthService:
                                                                                           "test_tenant")
 
     @pytest.mark.asyncio
-    async def test_log_audit_message_s3_local_storage_type(self, mocker):
+    async def test_log_audit_message_s3_local_storage_type(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
         mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
-        side_effect = lambda prop, default_value=None: {
+        mock_config_snapshot({
             "shield_run_mode": "self_managed",
             "audit_msg_content_to_self_managed_storage": "True",
             "audit_msg_content_storage_system": "s3,local",
-        }.get(prop, default_value)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.__init__', return_value=None)
         mocker.patch('api.shield.logfile.log_message_in_local.LogMessageInLocal.__init__', return_value=None)
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.log', new_callable=AsyncMock)
@@ -272,20 +289,18 @@ class TestAuthService:
             message_log_obj.log.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_log_audit_message_for_data_service_storage_type(self, mocker):
+    async def test_log_audit_message_for_data_service_storage_type(self, mocker, mock_config_snapshot):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
         mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
         mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
-        side_effect = lambda prop, default_value=None: {
+        mock_config_snapshot({
             "shield_run_mode": "self_managed",
             "audit_msg_content_to_self_managed_storage": "True",
             "audit_msg_content_storage_system": "s3,local,data-service",
-        }.get(prop, default_value)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.__init__', return_value=None)
         mocker.patch('api.shield.logfile.log_message_in_local.LogMessageInLocal.__init__', return_value=None)
         mocker.patch('api.shield.logfile.log_message_in_data_service.LogMessageInDataService.__init__',
@@ -335,7 +350,7 @@ class TestAuthService:
         mocker.patch.object(auth_service, 'do_authz_authorize', new_callable=AsyncMock, return_value=authz_res)
         # mocker.patch.object(auth_service, 'log_audit_fluentd')
         mocker.patch.object(auth_service, 'log_audit_message', new_callable=AsyncMock)
-        mocker.patch.object(auth_service.application_manager, 'scan_messages', return_value=({}, {}))
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', new_callable=AsyncMock, return_value=({}, {}))
         mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
 
         mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name', new_callable=AsyncMock, return_value={})
@@ -346,6 +361,75 @@ class TestAuthService:
         assert auth_res.isAllowed == False
         assert auth_res.responseMessages[0].get('responseText') == "Access is denied"
 
+    @pytest.mark.asyncio
+    async def test_authorize_records_stage_durations(self, mocker):
+        mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
+        mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
+        mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
+        mock_tenant_data_encryptor_service = mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
+        mock_tenant_data_encryptor_service.decrypt_authorize_request = AsyncMock()
+        mock_tenant_data_encryptor_service.encrypt_shield_audit = AsyncMock()
+        mock_tenant_data_encryptor_service.encrypt_authorize_response = AsyncMock()
+        mocker.patch('api.shield.services.auth_service.ApplicationManager')
+        mock_record_stage = mocker.patch('api.shield.services.auth_service.record_authorize_stage_duration')
+
+        auth_service = self.get_auth_service()
+        auth_service.tenant_data_encryptor_service = mock_tenant_data_encryptor_service
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', new_callable=AsyncMock,
+                            return_value=({}, {}))
+        mocker.patch.object(auth_service, 'do_authz_authorize', new_callable=AsyncMock,
+                            return_value=authz_res_data_no_masking())
+        mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
+        mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name',
+                            new_callable=AsyncMock, return_value={})
+
+        auth_req = authorize_req_data()
+        await auth_service.authorize(auth_req)
+
+        recorded_stages = [call.args[0] for call in mock_record_stage.call_args_list]
+        assert recorded_stages == ["decryption", "message_analysis", "authz", "guardrail", "masking",
+                                   "audit_encryption", "audit_dispatch", "response_encryption", "total"]
+        for call in mock_record_stage.call_args_list:
+            assert call.kwargs == {"tenant_id": "test_tenant", "application_key": auth_req.application_key}
+
+    # concurrent requests on the same AuthService must not share request state
+    @pytest.mark.asyncio
+    async def test_concurrent_authorize_requests_are_isolated(self, mocker):
+        mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
+        mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
+        mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
+        mock_tenant_data_encryptor_service = mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
+        mock_tenant_data_encryptor_service.decrypt_authorize_request = AsyncMock()
+        mock_tenant_data_encryptor_service.encrypt_shield_audit = AsyncMock()
+        mock_tenant_data_encryptor_service.encrypt_authorize_response = AsyncMock()
+        mocker.patch('api.shield.services.auth_service.ApplicationManager')
+
+        auth_service = self.get_auth_service()
+        auth_service.tenant_data_encryptor_service = mock_tenant_data_encryptor_service
+
+        async def scan_messages(message, auth_req, is_authz_scan):
+            # the first request yields so that the second request runs in between
+            await asyncio.sleep(0.05 if message == "first message" else 0)
+            return {}, {}
+
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', side_effect=scan_messages)
+        mocker.patch.object(auth_service, 'do_authz_authorize', new_callable=AsyncMock,
+                            side_effect=lambda *args: authz_res_data_no_masking())
+        mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
+        mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name',
+                            new_callable=AsyncMock, return_value={})
+
+        first_auth_req = authorize_req_data()
+        first_auth_req.messages = ["first message"]
+        second_auth_req = authorize_req_data()
+        second_auth_req.messages = ["second message"]
+
+        first_res, second_res = await asyncio.gather(auth_service.authorize(first_auth_req),
+                                                     auth_service.authorize(second_auth_req))
+
+        assert [msg.get('responseText') for msg in first_res.responseMessages] == ["first message"]
+        assert [msg.get('responseText') for msg in second_res.responseMessages] == ["second message"]
+
     # test when the auth request is missing required fields
     def test_missing_required_fields_auth_request(self):
         req_data = {
@@ -441,36 +525,6 @@ class TestAuthService:
         with pytest.raises(ShieldException):
             auth_service.log_audit_fluentd(audit_data)
 
-    def test_log_audit_fluentd_audit_event_queue_full_exception(self, mocker):
-        # Mock dependencies
-        mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
-        mocker.patch('api.shield.services.auth_service.TenantDataEncryptorService')
-        mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
-        mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
-        mocker_logger = Mock()
-        mocker.patch('api.shield.services.auth_service.AuthService.get_or_create_fluentd_audit_logger',
-                     return_value=mocker_logger)
-        mocker_logger.log.side_effect = AuditEventQueueFullException
-
-        # Initialize AuthService
-        auth_service = self.get_auth_service()
-
-        auth_req = authorize_req_data()
-        authz_res = authz_res_data()
-        traits = ['TOXIC', 'PERSON', 'EMAIL_ADDRESS']
-        original_masked_text_list = [{"originalMessage": "Hello", "maskedMessage": "Hello"}]
-
-        side_effect = lambda prop, default: {
-            "audit_msg_content_to_paig_cloud": False,
-            "audit_failure_error_enabled": True
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value_boolean', side_effect=side_effect)
-
-        audit_data = ShieldAudit(auth_req, authz_res, traits, original_masked_text_list)
-        with pytest.raises(ShieldException):
-            auth_service.log_audit_fluentd(audit_data)
-
     def test_log_audit_fluentd_exception(self, mocker):
         # Mock dependencies
         mocker.patch('api.shield.services.auth_service.FluentdRestHttpClient')
@@ -534,7 +588,7 @@ class TestAuthService:
 
     #  Decrypts and encrypts shield audit data successfully.
     @pytest.mark.asyncio
-    async def test_decrypts_and_encrypts_successfully(self, mocker):
+    async def test_decrypts_and_encrypts_successfully(self, mocker, mock_config_snapshot):
         mocker.patch('api.shield.services.auth_service.AuthzServiceClientFactory')
         mocker.patch('api.shield.services.auth_service.AccountServiceFactory')
 
@@ -543,31 +597,23 @@ class TestAuthService:
         # Create a shield_audit object
         shield_audit = self.get_stream_shield_obj()
 
-        # Mock the decrypt_shield_audit method of TenantDataEncryptorService
-        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'decrypt_shield_audit', new_callable=AsyncMock)
-
-        # Mock the encrypt_shield_audit method of TenantDataEncryptorService
-        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'encrypt_shield_audit', new_callable=AsyncMock)
+        # Mock the reencrypt_shield_audit method of TenantDataEncryptorService
+        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'reencrypt_shield_audit',
+                            new_callable=AsyncMock)
         auth_service.log_audit_message = AsyncMock()
         mocker_logger = Mock()
         mocker.patch('api.shield.services.auth_service.AuthService.get_or_create_fluentd_audit_logger',
                      return_value=mocker_logger)
         mocker_logger.log = Mock()
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
             "audit_msg_content_storage_system": "fluentd"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Call the audit_stream_data method
         await auth_service.audit_stream_data(shield_audit)
 
-        # Assert that the decrypt_shield_audit method was called once
-        auth_service.tenant_data_encryptor_service.decrypt_shield_audit.assert_called_once_with(shield_audit)
-
-        # Assert that the encrypt_shield_audit method was called once with the correct arguments
-        auth_service.tenant_data_encryptor_service.encrypt_shield_audit.assert_called_once_with(
-            shield_audit.messages, tenant_id=shield_audit.tenantId, encryption_key_id=shield_audit.encryptionKeyId)
+        # Assert that the reencrypt_shield_audit method was called once
+        auth_service.tenant_data_encryptor_service.reencrypt_shield_audit.assert_called_once_with(shield_audit)
 
         mocker_logger.log.assert_called_once()
 
@@ -583,19 +629,19 @@ class TestAuthService:
         # Create a shield_audit object
         shield_audit = self.get_stream_shield_obj()
 
-        # Mock the decrypt_shield_audit method of TenantDataEncryptorService to raise an exception
-        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'decrypt_shield_audit',
+        # Mock the reencrypt_shield_audit method of TenantDataEncryptorService to raise an exception
+        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'reencrypt_shield_audit',
                             side_effect=ShieldException, new_callable=AsyncMock)
-        mocker.patch.object(auth_service.tenant_data_encryptor_service, 'encrypt_shield_audit', new_callable=AsyncMock)
+        mocker.patch.object(auth_service, 'audit', new_callable=AsyncMock)
 
         with pytest.raises(ShieldException):
             await auth_service.audit_stream_data(shield_audit)
 
-        # Assert that the decrypt_shield_audit method was called once
-        auth_service.tenant_data_encryptor_service.decrypt_shield_audit.assert_awaited_once()
+        # Assert that the reencrypt_shield_audit method was called once
+        auth_service.tenant_data_encryptor_service.reencrypt_shield_audit.assert_awaited_once()
 
-        # Assert that the encrypt_shield_audit method was not called
-        auth_service.tenant_data_encryptor_service.encrypt_shield_audit.assert_not_awaited()
+        # Assert that the audit is not logged
+        auth_service.audit.assert_not_awaited()
 
     #  Authorize request with valid input returns expected output
     @pytest.mark.asyncio
@@ -615,7 +661,7 @@ class TestAuthService:
         mocker.patch.object(auth_service.authz_service_client, 'post_authorize', new_callable=AsyncMock, return_value=authz_res_data())
 
         # Mock the analysis method
-        mocker.patch.object(auth_service.application_manager, 'scan_messages', return_value=({}, {}))
+        mocker.patch.object(auth_service.application_manager, 'scan_messages', new_callable=AsyncMock, return_value=({}, {}))
         mocker.patch('api.shield.services.auth_service.AuthService.audit', return_value=(0, 0))
 
         mocker.patch.object(auth_service.governance_service_client, 'get_application_guardrail_name', new_callable=AsyncMock, return_value={})
@@ -731,7 +777,7 @@ class TestAuthService:
         guardrail_info = {"guardrail_connection_details": {}, "config_type": {"SENSITIVE_DATA": {"configs": {"PERSON": "DENY"}, "response_message": "Access Denied"}}}
         mocker.patch.object(auth_service.guardrail_service_client, 'get_guardrail_info_by_name', new_callable=AsyncMock, return_value=guardrail_info)
         mocker.patch.object(auth_service.tenant_data_encryptor_service, 'decrypt_guardrail_connection_details', new_callable=AsyncMock)
-        mocker.patch.object(auth_service, 'analyze_scan_messages', return_value=10)
+        mocker.patch.object(auth_service, 'analyze_scan_messages', new_callable=AsyncMock, return_value=10)
         mocker.patch.object(auth_service, 'generate_access_denied_message', return_value="Access Denied")
 
         auth_req = authorize_req_data()
@@ -791,7 +837,7 @@ class TestAuthService:
 
         mocker.patch.object(auth_service.tenant_data_encryptor_service, 'decrypt_guardrail_connection_details',
                             new_callable=AsyncMock)
-        mocker.patch.object(auth_service, 'analyze_scan_messages', return_value=5)
+        mocker.patch.object(auth_service, 'analyze_scan_messages', new_callable=AsyncMock, return_value=5)
 
         auth_req = authorize_req_data()
         authz_res = authz_res_data()
@@ -887,7 +933,7 @@ class TestAuthService:
                             new_callable=AsyncMock, return_value=guardrail_info)
         mocker.patch.object(auth_service.tenant_data_encryptor_service, 'decrypt_guardrail_connection_details',
                             new_callable=AsyncMock)
-        mocker.patch.object(auth_service, 'analyze_scan_messages', return_value=None)
+        mocker.patch.object(auth_service, 'analyze_scan_messages', new_callable=AsyncMock, return_value=None)
 
         auth_req = authorize_req_data()
         authz_res = authz_res_data()
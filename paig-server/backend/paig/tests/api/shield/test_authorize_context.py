@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from api.shield.model.authorize_context import AuthorizeContext
+from api.shield.model.authorize_request import AuthorizeRequest
+
+
+def authorize_req_data():
+    json_file_path = f"{Path(__file__).parent}/json_data/authorize_request.json"
+    with open(json_file_path, 'r') as json_file:
+        req_json = json.load(json_file)
+
+    return AuthorizeRequest(tenant_id='test_tenant', req_data=req_json, user_role='OWNER')
+
+
+class TestAuthorizeContext:
+
+    def test_new_context_has_empty_request_state(self):
+        auth_ctx = AuthorizeContext(authorize_req_data())
+
+        assert auth_ctx.all_result_traits == []
+        assert auth_ctx.access_control_traits == set()
+        assert auth_ctx.analyzer_result_map == {}
+        assert auth_ctx.masked_messages == []
+        assert auth_ctx.original_masked_text_list == []
+        assert auth_ctx.stage_timings == {}
+
+    def test_contexts_do_not_share_state(self):
+        first_ctx = AuthorizeContext(authorize_req_data())
+        second_ctx = AuthorizeContext(authorize_req_data())
+
+        first_ctx.all_result_traits.append("PERSON")
+        first_ctx.record_stage_time("decryption", first_ctx.start_time)
+
+        assert second_ctx.all_result_traits == []
+        assert second_ctx.get_stage_time("decryption") == "0"
+
+    def test_previous_sentence_length(self):
+        auth_req = authorize_req_data()
+        assert AuthorizeContext(auth_req).previous_sentence_length == 0
+
+        auth_req.context = {"previous_sentence_length": 12}
+        assert AuthorizeContext(auth_req).previous_sentence_length == 12
+
+        auth_req.context = None
+        assert AuthorizeContext(auth_req).previous_sentence_length == 0
+
+    def test_record_stage_time(self):
+        auth_ctx = AuthorizeContext(authorize_req_data())
+
+        stage_time = auth_ctx.record_stage_time("authz", auth_ctx.start_time)
+
+        assert auth_ctx.get_stage_time("authz") == stage_time
+        assert float(stage_time) >= 0
@@ -0,0 +1,125 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.shield.cache.ttl_cache import TTLCache
+from api.shield.scanners.bedrock_guardrail_runtime import BedrockGuardrailRuntime
+
+CONNECTION_DETAILS = {'access_key': 'test-access-key', 'secret_key': 'test-secret-key', 'region': 'us-west-2'}
+
+
+@pytest.fixture
+def bedrock_guardrail_runtime():
+    runtime = BedrockGuardrailRuntime()
+    original_state = (runtime.client_pool, runtime.verdict_cache, runtime.endpoint_url)
+    runtime.client_pool = TTLCache("test_bedrock_guardrail_client_pool", 2, 60)
+    runtime.verdict_cache = TTLCache("test_bedrock_guardrail_verdict", 10, 60)
+    runtime.endpoint_url = None
+    yield runtime
+    runtime.client_pool, runtime.verdict_cache, runtime.endpoint_url = original_state
+
+
+@pytest.fixture
+def bedrock_stub():
+    """
+    Local stub of the bedrock-runtime ApplyGuardrail endpoint, recording the requested paths and texts.
+    """
+    requests = []
+
+    class BedrockStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            requests.append((self.path, body['content'][0]['text']['text']))
+            action = 'GUARDRAIL_INTERVENED' if 'blocked' in body['content'][0]['text']['text'] else 'NONE'
+            response = json.dumps({'action': action, 'outputs': [{'text': 'Sorry'}] if action != 'NONE' else [],
+                                   'assessments': []}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BedrockStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+    server.server_close()
+
+
+class TestBedrockGuardrailRuntime:
+
+    def test_singleton_instance(self):
+        assert BedrockGuardrailRuntime() is BedrockGuardrailRuntime()
+
+    def test_get_client_reuses_client_of_same_connection_details(self, mocker, bedrock_guardrail_runtime):
+        mock_boto3_client = mocker.patch('boto3.client', side_effect=lambda *args, **kwargs: mocker.MagicMock())
+
+        client = bedrock_guardrail_runtime.get_client(dict(CONNECTION_DETAILS))
+        assert bedrock_guardrail_runtime.get_client(dict(reversed(CONNECTION_DETAILS.items()))) is client
+        assert bedrock_guardrail_runtime.get_client({**CONNECTION_DETAILS, 'region': 'us-east-1'}) is not client
+        assert mock_boto3_client.call_count == 2
+
+    def test_get_client_recreates_expired_client(self, mocker, bedrock_guardrail_runtime):
+        mock_boto3_client = mocker.patch('boto3.client', side_effect=lambda *args, **kwargs: mocker.MagicMock())
+        bedrock_guardrail_runtime.client_pool = TTLCache("test_bedrock_guardrail_client_pool", 2, 0)
+
+        bedrock_guardrail_runtime.get_client(CONNECTION_DETAILS)
+        bedrock_guardrail_runtime.get_client(CONNECTION_DETAILS)
+        assert mock_boto3_client.call_count == 2
+
+    def test_get_client_uses_endpoint_url(self, mocker, bedrock_guardrail_runtime):
+        mock_boto3_client = mocker.patch('boto3.client')
+        bedrock_guardrail_runtime.endpoint_url = 'http://localhost:4566'
+
+        bedrock_guardrail_runtime.get_client(CONNECTION_DETAILS)
+        mock_boto3_client.assert_called_once_with('bedrock-runtime', aws_access_key_id='test-access-key',
+                                                  aws_secret_access_key='test-secret-key', region_name='us-west-2',
+                                                  endpoint_url='http://localhost:4566')
+
+    def test_apply_guardrail_caches_verdicts(self, mocker, bedrock_guardrail_runtime):
+        mock_boto3_client = mocker.patch('boto3.client')
+        apply_guardrail = mock_boto3_client.return_value.apply_guardrail
+        apply_guardrail.side_effect = lambda **kwargs: {'action': 'NONE', 'source': kwargs['source']}
+
+        first = bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'hello')
+        assert bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'hello') is first
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'OUTPUT', 'hello')
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '2', 'INPUT', 'hello')
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'hello again')
+        assert apply_guardrail.call_count == 4
+        apply_guardrail.assert_any_call(guardrailIdentifier='gr-1', guardrailVersion='1', source='INPUT',
+                                        content=[{'text': {'text': 'hello'}}])
+
+    def test_apply_guardrail_does_not_cache_draft_or_disabled(self, mocker, bedrock_guardrail_runtime):
+        mock_boto3_client = mocker.patch('boto3.client')
+        apply_guardrail = mock_boto3_client.return_value.apply_guardrail
+        apply_guardrail.return_value = {'action': 'NONE'}
+
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', 'DRAFT', 'INPUT', 'hello')
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', 'DRAFT', 'INPUT', 'hello')
+        bedrock_guardrail_runtime.verdict_cache = None
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'hello')
+        bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'hello')
+        assert apply_guardrail.call_count == 4
+
+    def test_apply_guardrail_against_local_stub(self, bedrock_guardrail_runtime, bedrock_stub):
+        endpoint_url, requests = bedrock_stub
+        bedrock_guardrail_runtime.endpoint_url = endpoint_url
+
+        response = bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'blocked text')
+        assert response['action'] == 'GUARDRAIL_INTERVENED'
+        assert response['outputs'] == [{'text': 'Sorry'}]
+        response = bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'blocked text')
+        assert response['action'] == 'GUARDRAIL_INTERVENED'
+        response = bedrock_guardrail_runtime.apply_guardrail(CONNECTION_DETAILS, 'gr-1', '1', 'INPUT', 'fine text')
+        assert response['action'] == 'NONE'
+
+        assert requests == [('/guardrail/gr-1/version/1/apply', 'blocked text'),
+                            ('/guardrail/gr-1/version/1/apply', 'fine text')]
+        assert len(bedrock_guardrail_runtime.client_pool.cache) == 1
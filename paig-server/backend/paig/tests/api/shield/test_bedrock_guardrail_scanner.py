@@ -1,6 +1,18 @@
 import os
+
+import pytest
+
 from api.shield.enum.ShieldEnums import Guardrail
 from api.shield.scanners.AWSBedrockGuardrailScanner import AWSBedrockGuardrailScanner
+from api.shield.scanners.bedrock_guardrail_runtime import BedrockGuardrailRuntime
+
+
+@pytest.fixture(autouse=True)
+def clear_bedrock_client_pool():
+    # the tests patch boto3.client, so a client pooled by a previous test must not be reused
+    BedrockGuardrailRuntime().client_pool.clear()
+    yield
+    BedrockGuardrailRuntime().client_pool.clear()
 
 
 class TestAWSBedrockGuardrailScanner:
@@ -27,6 +39,17 @@ class TestAWSBedrockGuardrailScanner:
         assert result.actions == ['ACTION1']
         assert result.output_text == 'Intervened text'
 
+    # Scan messages of consecutive requests and verify the bedrock-runtime client is created once
+    def test_scan_reuses_bedrock_client(self, mocker):
+        mock_bedrock_client = mocker.patch('boto3.client')
+        mock_bedrock_client.return_value.apply_guardrail.return_value = {'action': 'NO_ACTION'}
+        for message in ['first message', 'second message']:
+            scanner = AWSBedrockGuardrailScanner(guardrail_id='guardrail_id', guardrail_version='guardrail_version',
+                                                 region='us-west-2', connection_details={'region': 'us-west-2'})
+            assert scanner.scan(message).traits == []
+        mock_bedrock_client.assert_called_once_with('bedrock-runtime', region_name='us-west-2')
+        assert mock_bedrock_client.return_value.apply_guardrail.call_count == 2
+
     # Scan a message that triggers guardrail intervention and verify ScannerResult contains expected traits and actions
     def test_scan_with_guardrail_intervention(self, mocker):
         mock_bedrock_client = mocker.patch('boto3.client')
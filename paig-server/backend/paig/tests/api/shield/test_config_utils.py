@@ -0,0 +1,72 @@
+import pytest
+
+from api.shield.utils import config_utils
+
+
+@pytest.fixture(autouse=True)
+def restore_configs():
+    saved_properties = {name: config_utils.configs_properties[name].data for name in config_utils.get_keys()}
+    yield
+    config_utils.configs_properties.clear()
+    config_utils.set_property_values(saved_properties)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    config_file_path = tmp_path / "test_configs.properties"
+    config_file_path.write_text("int_prop = 42\n"
+                                "float_prop = 0.5\n"
+                                "bool_prop = True\n"
+                                "list_prop = a,b,c\n"
+                                "text_prop = hello\n"
+                                "empty_prop =\n")
+    return str(config_file_path)
+
+
+def test_typed_lookups_after_load(config_file):
+    config_utils.load_config_file(config_file)
+
+    assert config_utils.get_property_value("text_prop") == "hello"
+    assert config_utils.get_property_value_int("int_prop") == 42
+    assert config_utils.get_property_value_float("float_prop") == 0.5
+    assert config_utils.get_property_value_float("int_prop") == 42.0
+    assert config_utils.get_property_value_boolean("bool_prop") is True
+    assert config_utils.get_property_value_boolean("text_prop", True) is False
+    assert config_utils.get_property_value_list("list_prop") == ["a", "b", "c"]
+    assert config_utils.get_property_value_list("text_prop") == ["hello"]
+
+
+def test_missing_empty_and_invalid_properties_return_default(config_file):
+    config_utils.load_config_file(config_file)
+
+    assert config_utils.get_property_value("empty_prop", "default") == "default"
+    assert config_utils.get_property_value_int("missing_prop", 7) == 7
+    assert config_utils.get_property_value_int("missing_prop", "7") == 7
+    assert config_utils.get_property_value_int("text_prop", 7) == 7
+    assert config_utils.get_property_value_float("text_prop", 1.5) == 1.5
+    assert config_utils.get_property_value_boolean("missing_prop", "true") is True
+    assert config_utils.get_property_value_list("missing_prop", "x,y") == ["x", "y"]
+    assert config_utils.get_property_value_list("missing_prop") == []
+
+
+def test_returned_list_does_not_change_snapshot(config_file):
+    config_utils.load_config_file(config_file)
+
+    config_utils.get_property_value_list("list_prop").append("d")
+    assert config_utils.get_property_value_list("list_prop") == ["a", "b", "c"]
+
+
+def test_snapshot_is_immutable_and_replaced_on_reload(config_file):
+    config_utils.load_config_file(config_file)
+    snapshot = config_utils.get_config_snapshot()
+
+    with pytest.raises(AttributeError):
+        snapshot.extra = 1
+    with pytest.raises(TypeError):
+        snapshot.properties["int_prop"] = None
+
+    config_utils.set_property_values({"int_prop": "43"})
+    assert config_utils.get_property_value_int("int_prop") == 43
+    assert config_utils.get_config_snapshot() is not snapshot
+    assert snapshot.get("int_prop").int_value == 42
+
@@ -0,0 +1,54 @@
+from presidio_analyzer import RecognizerResult
+
+from api.shield.presidio.deny_list_recognizer import KeywordAutomaton, DenyListRecognizer
+
+
+class TestKeywordAutomaton:
+
+    def test_find_all_matches_overlapping_keywords(self):
+        automaton = KeywordAutomaton(['he', 'she', 'his', 'hers'])
+        assert automaton.find_all('she and his hers') == [(0, 3), (8, 11), (12, 16)]
+
+    def test_find_all_matches_whole_words_only(self):
+        automaton = KeywordAutomaton(['flu', 'cold'])
+        assert automaton.find_all('influenza, cold_water, cold.') == [(23, 27)]
+        assert automaton.find_all('flu') == [(0, 3)]
+
+    def test_find_all_is_case_insensitive(self):
+        automaton = KeywordAutomaton(['Paracetamol'])
+        text = 'PARACETAMOL or paracetamol'
+        assert [text[start:end] for start, end in automaton.find_all(text)] == ['PARACETAMOL', 'paracetamol']
+
+    def test_find_all_prefers_leftmost_longest_match(self):
+        automaton = KeywordAutomaton(['lung', 'lung cancer', 'cancer', 'small cell lung cancer'])
+        text = 'small cell lung cancer and lung pain and cancer'
+        assert [text[start:end] for start, end in automaton.find_all(text)] == \
+               ['small cell lung cancer', 'lung', 'cancer']
+
+    def test_find_all_keeps_offsets_of_text_with_expanding_lower_case(self):
+        automaton = KeywordAutomaton(['asthma'])
+        text = 'İİ asthma'
+        assert automaton.find_all(text) == [(3, 9)]
+
+    def test_find_all_ignores_empty_and_duplicate_keywords(self):
+        automaton = KeywordAutomaton(['', '  ', 'Asthma', 'asthma ', 'ASTHMA'])
+        assert automaton.keyword_count == 1
+        assert KeywordAutomaton([]).find_all('asthma') == []
+
+
+class TestDenyListRecognizer:
+
+    def test_analyze(self):
+        recognizer = DenyListRecognizer(supported_entity='DISEASE', deny_list=['Asthma', 'Tooth decay'],
+                                        name='DiseaseRecognizer', deny_list_score=0.8)
+        results = recognizer.analyze('He has tooth decay and asthma', ['DISEASE'])
+
+        assert [(result.entity_type, result.start, result.end, result.score) for result in results] == \
+               [('DISEASE', 7, 18, 0.8), ('DISEASE', 23, 29, 0.8)]
+        assert results[0].recognition_metadata[RecognizerResult.RECOGNIZER_NAME_KEY] == 'DiseaseRecognizer'
+        assert results[0].recognition_metadata[RecognizerResult.RECOGNIZER_IDENTIFIER_KEY] == recognizer.id
+
+    def test_analyze_without_match(self):
+        recognizer = DenyListRecognizer(supported_entity='DISEASE', deny_list=['Asthma'])
+        assert recognizer.name == 'DenyListRecognizer'
+        assert recognizer.analyze('nothing to see here', ['DISEASE']) == []
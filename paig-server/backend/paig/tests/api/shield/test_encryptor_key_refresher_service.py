@@ -281,3 +281,79 @@ async def test_start():
     refresher.start()
     await asyncio.sleep(0.1)  # Give some time for the task to start
     assert refresher.task is not None
+
+
+@pytest.mark.asyncio
+async def test_download_and_refresh_key_backs_off_while_keys_unchanged(mocker):
+    mocker.patch.object(EncryptionKeyRefresher, 'load_self_managed_encrypt_keys', return_value=(None, None, None))
+    mocker.patch.object(EncryptionKeyRefresher, 'store_key_to_cache')
+    mocker.patch.object(EncryptionKeyRefresher, 'refresh_context_with_key_info')
+    mocker.patch('api.shield.services.tenant_data_encryptor_service.config_utils.get_property_value_boolean',
+                 return_value=False)
+    key_infos = [{"id": 1, "publicKeyValue": "publicKeyValue", "privateKeyValue": "privateKeyValue",
+                  "keyStatus": "ACTIVE", "keyType": "MSG_PROTECT_PLUGIN", "tenantId": "tenantId"}]
+    account_service_client = AsyncMock()
+    account_service_client.get_all_encryption_keys.return_value = key_infos
+
+    refresher = EncryptionKeyRefresher(data_encryptor=AsyncMock(), account_service_client=account_service_client)
+    refresher.enable_encryption_keys_cache_dir = True
+    refresher.base_poll_interval_sec = refresher.poll_interval_sec = 10
+    refresher.max_poll_interval_sec = 30
+
+    await refresher.download_and_refresh_key()
+    await refresher.download_and_refresh_key()
+    assert refresher.poll_interval_sec == 20
+    await refresher.download_and_refresh_key()
+    assert refresher.poll_interval_sec == 30
+
+    # unchanged keys are neither stored nor reloaded again
+    EncryptionKeyRefresher.store_key_to_cache.assert_called_once()
+    EncryptionKeyRefresher.refresh_context_with_key_info.assert_called_once()
+
+    account_service_client.get_all_encryption_keys.return_value = key_infos + [dict(key_infos[0], id=2)]
+    await refresher.download_and_refresh_key()
+    assert refresher.poll_interval_sec == 10
+    assert EncryptionKeyRefresher.store_key_to_cache.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_wakes_up_refresher():
+    data_encryptor = ShieldDataEncryptor(tenant_id="test_tenant")
+    refresher = EncryptionKeyRefresher(data_encryptor)
+    refresher.download_and_refresh_key = AsyncMock()
+    refresher.poll_interval_sec = 60
+
+    refresher.start()
+    await asyncio.sleep(0.1)
+    refresher.invalidate()
+    await asyncio.sleep(0.1)
+    refresher.cleanup()
+    await asyncio.wait_for(refresher.task, timeout=1)
+
+    assert refresher.download_and_refresh_key.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_without_background_refresh_reloads_keys_once():
+    data_encryptor = ShieldDataEncryptor(tenant_id="test_tenant", enable_background_key_refresh=False)
+    refresher = EncryptionKeyRefresher(data_encryptor)
+    refresher.download_and_refresh_key = AsyncMock()
+
+    refresher.invalidate()
+    await refresher.refresh_task
+
+    refresher.download_and_refresh_key.assert_awaited_once()
+
+
+def test_local_encryption_key_change_invalidates_data_encryptors(mocker):
+    from api.encryption.services.encryption_key_service import notify_encryption_key_change_listeners
+    from api.shield.services.tenant_data_encryptor_service import TenantDataEncryptorService
+
+    tenant_data_encryptor_service = TenantDataEncryptorService()
+    shield_data_encryptor = ShieldDataEncryptor(tenant_id="test_tenant")
+    shield_data_encryptor.encryption_key_refresher = mocker.Mock()
+    mocker.patch.dict(tenant_data_encryptor_service.tenant_data_encryptors, {"test_tenant": shield_data_encryptor})
+
+    notify_encryption_key_change_listeners()
+
+    shield_data_encryptor.encryption_key_refresher.invalidate.assert_called_once()
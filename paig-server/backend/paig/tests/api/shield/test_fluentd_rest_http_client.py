@@ -31,6 +31,42 @@ class TestFluentdRestHttpClient:
         fluentd_client.post.assert_called_once_with(url="/audit_tag", headers=fluentd_client.get_headers(),
                                                     json=message)
 
+    #  Able to log a batch of messages in one request
+    def test_able_to_log_messages_in_one_request(self, mocker):
+        # Arrange
+        messages = [{"message": "first"}, {"message": "second"}]
+        response_mock = mocker.Mock()
+        response_mock.status_code = 200
+
+        side_effect = lambda prop, default=None: {
+            'fluentd_base_url': 'http://localhost:9880',
+            'fluentd_tag': 'audit_tag',
+        }.get(prop, default)
+
+        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+
+        fluentd_client = FluentdRestHttpClient()
+        fluentd_client.post = mocker.Mock(return_value=response_mock)
+
+        # Act
+        fluentd_client.log_messages(messages)
+
+        # Assert
+        fluentd_client.post.assert_called_once_with(url="/audit_tag", headers={}, json=messages)
+
+    #  Unable to log a batch of messages due to server error
+    def test_unable_to_log_messages_due_to_server_error(self, mocker):
+        # Arrange
+        response_mock = mocker.Mock()
+        response_mock.status_code = 500
+
+        fluentd_client = FluentdRestHttpClient()
+        fluentd_client.post = mocker.Mock(return_value=response_mock)
+
+        # Act
+        with pytest.raises(ShieldException):
+            fluentd_client.log_messages([{"message": "first"}])
+
     #  Able to log a message with empty headers
     def test_able_to_log_message_with_empty_headers(self, mocker):
         # Arrange
@@ -0,0 +1,41 @@
+import json
+import logging
+
+from api.shield.utils import json_utils
+
+
+def test_mask_fields_masks_nested_fields_without_changing_data():
+    data = {"requestId": "1", "messages": ["secret"], "context": {"items": [{"responseText": "secret", "id": 2}]}}
+
+    masked = json_utils.mask_fields(data, {"messages", "responseText"})
+
+    assert masked == {"requestId": "1", "messages": "*****",
+                      "context": {"items": [{"responseText": "*****", "id": 2}]}}
+    assert data["messages"] == ["secret"]
+    assert data["context"]["items"][0]["responseText"] == "secret"
+
+
+def test_mask_json_fields():
+    masked = json_utils.mask_json_fields(json.dumps({"originalMessage": "secret", "tenantId": "t1"}),
+                                         ["originalMessage"], "")
+    assert json.loads(masked) == {"originalMessage": "", "tenantId": "t1"}
+
+
+def test_lazy_masked_json_str():
+    lazy_json = json_utils.LazyMaskedJson({"messages": ["secret"], "time": 1}, ["messages"])
+    assert json.loads(str(lazy_json)) == {"messages": "*****", "time": 1}
+
+
+def test_lazy_masked_json_is_not_serialized_when_level_is_disabled(mocker, caplog):
+    mock_mask_fields = mocker.patch("api.shield.utils.json_utils.mask_fields", wraps=json_utils.mask_fields)
+    logger = logging.getLogger("test_json_utils")
+    request = {"messages": ["secret"]}
+
+    with caplog.at_level(logging.INFO, logger="test_json_utils"):
+        logger.debug("Incoming request: %s", json_utils.LazyMaskedJson(request, ["messages"]))
+    mock_mask_fields.assert_not_called()
+
+    with caplog.at_level(logging.DEBUG, logger="test_json_utils"):
+        logger.debug("Incoming request: %s", json_utils.LazyMaskedJson(request, ["messages"]))
+    mock_mask_fields.assert_called()
+    assert 'Incoming request: {"messages": "*****"}' in caplog.text
@@ -1,4 +1,5 @@
 import builtins
+import copy
 import errno
 import json
 import os
@@ -62,17 +63,16 @@ class TestLogMessageInLocal:
 
     #  Logs are successfully written to the local directory path specified in the configuration file
     @pytest.mark.asyncio
-    async def test_logs_written_to_local_directory(self, mocker, log_data):
+    async def test_logs_written_to_local_directory(self, mocker, log_data, mock_config_snapshot):
         # Given
         local_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs"
         audit_spool_dir = f"{Path(__file__).parent}/workdir/shield/audit-spool"
 
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": local_log_path,
             "audit_spool_dir": audit_spool_dir
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # When
         log_message_in_local = LogMessageInLocal()
@@ -89,17 +89,16 @@ class TestLogMessageInLocal:
 
     #  The log file is successfully written to the local directory path even if the directory already exists
     @pytest.mark.asyncio
-    async def test_log_file_written_to_existing_directory(self, mocker, log_data):
+    async def test_log_file_written_to_existing_directory(self, mocker, log_data, mock_config_snapshot):
         # Given
         local_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs"
         assert os.path.exists(local_log_path)
         audit_spool_dir = f"{Path(__file__).parent}/workdir/shield/audit-spool"
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": local_log_path,
             "audit_spool_dir": audit_spool_dir
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # When
         log_data.threadId = '12346'
@@ -117,13 +116,12 @@ class TestLogMessageInLocal:
 
     #  The local directory path specified in the configuration file is invalid or does not exist
     @pytest.mark.asyncio
-    async def test_invalid_or_nonexistent_directory_path(self, mocker, log_data):
+    async def test_invalid_or_nonexistent_directory_path(self, mocker, log_data, mock_config_snapshot):
         # Given
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": "/invalid_directory_path"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch.object(os, 'makedirs', side_effect=OSError)
 
         log_message_in_local = LogMessageInLocal()
@@ -136,16 +134,15 @@ class TestLogMessageInLocal:
 
     #  The log file cannot be created due to insufficient permissions
     @pytest.mark.asyncio
-    async def test_log_file_cannot_be_created_due_to_insufficient_permissions(self, mocker, log_data):
+    async def test_log_file_cannot_be_created_due_to_insufficient_permissions(self, mocker, log_data, mock_config_snapshot):
         # Given
         local_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs"
         assert os.path.exists(local_log_path)
 
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": local_log_path
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch.object(os, 'makedirs', side_effect=PermissionError)
         log_message_in_local = LogMessageInLocal()
 
@@ -157,18 +154,17 @@ class TestLogMessageInLocal:
 
     #  The log file cannot be written due to insufficient permissions
     @pytest.mark.asyncio
-    async def test_log_file_cannot_be_written_due_to_insufficient_permissions(self, mocker, log_data):
+    async def test_log_file_cannot_be_written_due_to_insufficient_permissions(self, mocker, log_data, mock_config_snapshot):
         # Given
         local_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs"
         assert os.path.exists(local_log_path)
         audit_spool_dir = f"{Path(__file__).parent}/workdir/shield/audit-spool"
 
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": local_log_path,
             "audit_spool_dir": audit_spool_dir
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocker.patch.object(builtins, 'open', side_effect=PermissionError)
         log_message_in_local = LogMessageInLocal()
         log_data.threadId = '12347'
@@ -185,18 +181,17 @@ class TestLogMessageInLocal:
 
     #  The log file cannot be written due to a disk space issue
     @pytest.mark.asyncio
-    async def test_log_file_cannot_be_written_due_to_disk_space_issue(self, mocker, log_data):
+    async def test_log_file_cannot_be_written_due_to_disk_space_issue(self, mocker, log_data, mock_config_snapshot):
         # Given
         local_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs"
         assert os.path.exists(local_log_path)
         audit_spool_dir = f"{Path(__file__).parent}/workdir/shield/audit-spool"
 
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "local_audit_rolling_files_enabled": "false",
             "local_directory_path": local_log_path,
             "audit_spool_dir": audit_spool_dir
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         full_log_path = f"{Path(__file__).parent}/workdir/shield/audit_logs/tenant_id=123/year=2022/month=01/day=01/123_2022_01_01_12348_1.json"
         # Custom side effect for json.dump to raise OSError only in write_log_to_local_file
         original_json_dump = json.dump
@@ -220,3 +215,34 @@ class TestLogMessageInLocal:
         assert os.path.exists(f"{local_log_path}/tenant_id=123/year=2022/month=01/day=01/123_2022_01_01_12348_1.json")
         assert os.path.getsize(
             f"{local_log_path}/tenant_id=123/year=2022/month=01/day=01/123_2022_01_01_12348_1.json") == 0
+
+    #  The audit events are appended to a rolling file of their partition
+    @pytest.mark.asyncio
+    async def test_logs_appended_to_rolling_partition_file(self, mocker, log_data, tmp_path, mock_config_snapshot):
+        # Given
+        local_log_path = str(tmp_path / "audit_logs")
+        audit_spool_dir = str(tmp_path / "audit-spool")
+
+        mock_config_snapshot({
+            "local_directory_path": local_log_path,
+            "audit_spool_dir": audit_spool_dir,
+            "local_audit_rolling_files_enabled": "true"
+        })
+
+        # When
+        log_message_in_local = LogMessageInLocal()
+        for sequence_number in range(3):
+            audit_event = copy.copy(log_data)
+            audit_event.threadSequenceNumber = sequence_number
+            await log_message_in_local.log_audit_event(audit_event)
+        partition_path = "tenant_id=123/year=2022/month=01/day=01"
+        writer = log_message_in_local.rolling_file_writer
+        for _ in range(200):
+            if len(list(writer.iter_events(partition_path))) == 3:
+                break
+            sleep(10 / 1000)
+
+        # Then
+        partition_dir = f"{local_log_path}/{partition_path}"
+        assert len([file_name for file_name in os.listdir(partition_dir) if file_name.endswith(".ndjson")]) == 1
+        assert [event["threadSequenceNumber"] for event in writer.iter_events(partition_path)] == [0, 1, 2]
@@ -9,22 +9,21 @@ from api.shield.model.authorize_request import AuthorizeRequest
 from api.shield.model.shield_audit import ShieldAudit
 from api.shield.logfile.log_message_in_s3 import LogMessageInS3File
 from api.shield.utils.custom_exceptions import ShieldException
-from paig_common.paig_exception import AuditEventQueueFullException, DiskFullException
+from paig_common.paig_exception import DiskFullException
 
 
 class TestLogMessageInS3File:
 
     #  logs are uploaded successfully to S3
-    def test_logs_uploaded_successfully_to_s3(self, mocker):
+    def test_logs_uploaded_successfully_to_s3(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -81,16 +80,15 @@ class TestLogMessageInS3File:
         )
 
     #  s3_connection_mode is set to default
-    def test_s3_connection_mode_default(self, mocker):
+    def test_s3_connection_mode_default(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -100,18 +98,17 @@ class TestLogMessageInS3File:
         assert log_message.bucket_name == "your_bucket_name"
 
     #  s3_connection_mode is set to keys
-    def test_s3_connection_mode_keys(self, mocker):
+    def test_s3_connection_mode_keys(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "s3_secret_key": "your_secret_key",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -121,18 +118,17 @@ class TestLogMessageInS3File:
         assert log_message.bucket_name == "your_bucket_name"
 
     #  s3_connection_mode is set to iam_role
-    def test_s3_connection_mode_iam_role(self, mocker):
+    def test_s3_connection_mode_iam_role(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
         mocker.patch('boto3.Session')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "iam_role",
             "s3_assume_role_arn": "your_assume_role_arn",
             "s3_bucket_name": "your_bucket_name",
             "boto3_log_level": "INFO"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
 
@@ -141,34 +137,32 @@ class TestLogMessageInS3File:
         assert log_message.bucket_name == "your_bucket_name"
 
     #  s3_connection_mode is set to iam_role but no arn provided
-    def test_s3_iam_role_not_provided(self, mocker):
+    def test_s3_iam_role_not_provided(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
         mocker.patch('boto3.Session')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "iam_role",
             "s3_bucket_name": "your_bucket_name",
             "boto3_log_level": "INFO"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         # Create an instance of LogMessageInS3File
         with pytest.raises(ShieldException):
             LogMessageInS3File()
 
     #  s3_bucket_name is provided
-    def test_s3_bucket_name_provided(self, mocker):
+    def test_s3_bucket_name_provided(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "s3_secret_key": "your_secret_key",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -177,18 +171,17 @@ class TestLogMessageInS3File:
         assert log_message.bucket_name == "your_bucket_name"
 
     #  s3_bucket_name is provided with prefix
-    def test_s3_bucket_name_provided_with_prefix(self, mocker):
+    def test_s3_bucket_name_provided_with_prefix(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "s3_secret_key": "your_secret_key",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name/folder"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -197,18 +190,17 @@ class TestLogMessageInS3File:
         assert log_message.bucket_name == "your_bucket_name"
         assert log_message.bucket_prefix == "folder"
 
-    def test_s3_bucket_name_provided_with_prefix_and_slash_at_end(self, mocker):
+    def test_s3_bucket_name_provided_with_prefix_and_slash_at_end(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "s3_secret_key": "your_secret_key",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name/folder/"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -218,15 +210,14 @@ class TestLogMessageInS3File:
         assert log_message.bucket_prefix == "folder"
 
     #  s3_connection_mode is not set to default, keys or iam_role
-    def test_s3_connection_mode_invalid(self, mocker):
+    def test_s3_connection_mode_invalid(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "YOLO",
             "boto3_log_level": "INFO"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         with pytest.raises(ShieldException) as e:
@@ -234,17 +225,16 @@ class TestLogMessageInS3File:
             LogMessageInS3File()
 
     #  s3_bucket_name is not provided
-    def test_s3_bucket_name_not_provided(self, mocker):
+    def test_s3_bucket_name_not_provided(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "s3_secret_key": "your_secret_key",
             "boto3_log_level": "INFO"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         with pytest.raises(ShieldException) as e:
@@ -252,32 +242,30 @@ class TestLogMessageInS3File:
             LogMessageInS3File()
 
     #  s3_access_key or s3_secret_key is not provided
-    def test_s3_access_key_secret_key_not_provided(self, mocker):
+    def test_s3_access_key_secret_key_not_provided(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "keys",
             "s3_access_key": "your_access_key",
             "boto3_log_level": "INFO"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         with pytest.raises(ShieldException):
             LogMessageInS3File()
 
     # s3 error when doing put_object
-    def test_s3_error_put_object(self, mocker):
+    def test_s3_error_put_object(self, mocker, mock_config_snapshot):
         # Mock the dependencies
         mocker.patch('boto3.client')
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
 
         # Create an instance of LogMessageInS3File
         log_message = LogMessageInS3File()
@@ -335,16 +323,15 @@ class TestLogMessageInS3File:
         )
 
     @pytest.mark.asyncio
-    async def test_logs(self, mocker):
+    async def test_logs(self, mocker, mock_config_snapshot):
         mocker.patch('boto3.client')
         # Mock the dependencies
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mock_s3_audit_logger = MagicMock()
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.get_or_create_s3_audit_logger',
                      return_value=mock_s3_audit_logger)
@@ -397,16 +384,15 @@ class TestLogMessageInS3File:
         await log_message.log(mock_audit)
         mock_s3_audit_logger.log.assert_called_once_with(mock_audit)
 
-    def test_get_or_create_s3_audit_logger(self, mocker):
+    def test_get_or_create_s3_audit_logger(self, mocker, mock_config_snapshot):
         mocker.patch('boto3.client')
         # Mock the dependencies
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mocked_s3_audit_logger = mocker.patch('api.shield.logfile.log_message_in_s3.S3AuditLogger')
 
         # Arrange
@@ -430,80 +416,15 @@ class TestLogMessageInS3File:
         assert result == s3_audit_logger_mock
 
     @pytest.mark.asyncio
-    async def test_logs_with_audit_event_queue_full_exception(self, mocker):
+    async def test_logs_with_exception(self, mocker, mock_config_snapshot):
         mocker.patch('boto3.client')
         # Mock the dependencies
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
-        mock_s3_audit_logger = MagicMock()
-        mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.get_or_create_s3_audit_logger',
-                     return_value=mock_s3_audit_logger)
-        mock_s3_audit_logger.log.side_effect = AuditEventQueueFullException()
-
-        # Create an instance of LogMessageInS3File
-        log_message = LogMessageInS3File()
-
-        req_data = {
-            "threadId": "123",
-            "requestId": "456",
-            "sequenceNumber": 1,
-            "requestType": "enriched_prompt",
-            "requestDateTime": 1601002345000,
-            "applicationKey": "app_key",
-            "clientApplicationKey": "client_app_key",
-            "shieldServerKeyId": "server_key_id",
-            "shieldPluginKeyId": "plugin_key_id",
-            "messages": [],
-            "conversationId": "conv_id",
-            "userId": "user_id",
-            "context": {},
-            "clientIp": "127.0.0.1",
-            "clientHostName": "localhost"
-        }
-
-        res_data = {
-            "authorized": 'true',
-            "enforce": 'true',
-            "requestId": "55ee-91c2-9e05a1ebe151",
-            "requestDateTime": "1970-01-01T00:02:03.455+00:00",
-            "userId": "jai.patel",
-            "applicationName": "saitama",
-            "maskedTraits": {
-                "PERSON": "<<PERSON>>",
-                "LOCATION": "<<LOCATION>>"
-            },
-            "statusCode": 0,
-            "statusMessage": "Access is allowed",
-            "rangerAuditIds": ["d5821c40-1ead-4907-94d3-bb6337b746d3-3"],
-            "rangerPolicyIds": [11],
-            "paigPolicyIds": [3]
-        }
-
-        # Create a ShieldAudit object
-        mock_audit = ShieldAudit(AuthorizeRequest(req_data, "123", "OWNER"), AuthzServiceResponse(res_data),
-                                 ["PERSON", "LOCATION"],
-                                 [{"originalMessage": "test_message", "maskedMessage": "test_message"}])
-
-        # Call the log method
-        with pytest.raises(ShieldException):
-            await log_message.log_audit_event(mock_audit)
-
-    @pytest.mark.asyncio
-    async def test_logs_with_exception(self, mocker):
-        mocker.patch('boto3.client')
-        # Mock the dependencies
-        side_effect = lambda prop, default: {
-            "s3_connection_mode": "default",
-            "boto3_log_level": "INFO",
-            "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mock_s3_audit_logger = MagicMock()
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.get_or_create_s3_audit_logger',
                      return_value=mock_s3_audit_logger)
@@ -558,16 +479,15 @@ class TestLogMessageInS3File:
             await log_message.log_audit_event(mock_audit)
 
     @pytest.mark.asyncio
-    async def test_logs_with_disk_full_exception(self, mocker):
+    async def test_logs_with_disk_full_exception(self, mocker, mock_config_snapshot):
         mocker.patch('boto3.client')
         # Mock the dependencies
-        side_effect = lambda prop, default: {
+        mock_config_snapshot({
+            "s3_audit_part_files_enabled": "false",
             "s3_connection_mode": "default",
             "boto3_log_level": "INFO",
             "s3_bucket_name": "your_bucket_name"
-        }.get(prop)
-
-        mocker.patch('api.shield.utils.config_utils.get_property_value', side_effect=side_effect)
+        })
         mock_s3_audit_logger = MagicMock()
         mocker.patch('api.shield.logfile.log_message_in_s3.LogMessageInS3File.get_or_create_s3_audit_logger',
                      return_value=mock_s3_audit_logger)
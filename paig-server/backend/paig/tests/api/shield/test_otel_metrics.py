@@ -0,0 +1,19 @@
+from api.shield.otel import otel_metrics
+
+
+def test_record_authorize_stage_duration(mocker):
+    mock_histogram = mocker.patch.object(otel_metrics, 'authorize_stage_duration_histogram')
+
+    otel_metrics.record_authorize_stage_duration("scanner", "12.500", tenant_id="tenant1",
+                                                 application_key="app_key", scanner="PIIScanner")
+
+    mock_histogram.record.assert_called_once_with(12.5, {"stage": "scanner", "tenant_id": "tenant1",
+                                                         "application_key": "app_key", "scanner": "PIIScanner"})
+
+
+def test_record_authorize_stage_duration_skips_none_attributes(mocker):
+    mock_histogram = mocker.patch.object(otel_metrics, 'authorize_stage_duration_histogram')
+
+    otel_metrics.record_authorize_stage_duration("authz", 3, tenant_id="tenant1")
+
+    mock_histogram.record.assert_called_once_with(3.0, {"stage": "authz", "tenant_id": "tenant1"})
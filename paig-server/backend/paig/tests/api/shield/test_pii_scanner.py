@@ -20,7 +20,54 @@ class TestPIIScanner:
                                                          detect_list=['detect1', 'detect2'], detect_regex=r'',
                                                          detect_list_score=0.77)}
         scanner.init_recognizers()
-        assert scanner.presidio_analyzer.analyzer.registry.add_recognizer.called
+        assert len(scanner.custom_recognizers) == 1
+        assert scanner.custom_recognizers[0].name == 'recognizer1'
+        # custom recognizers must not be registered on the shared analyzer
+        assert not scanner.presidio_analyzer.analyzer.registry.add_recognizer.called
+
+    @patch('api.shield.scanners.PIIScanner.PresidioAnalyzerEngine')
+    def test_init_recognizers_builds_deny_list_and_regex_recognizers(self, mock_presidio_analyzer_engine):
+        scanner = PIIScanner(name='name', model_path='model_path')
+        scanner.recognizers = {
+            'recognizer1': Recognizer(name='recognizer1', enable=True, entity_type='DISEASE', ignore_list=[],
+                                      detect_list=['Asthma', 'Lung cancer'], detect_regex=r'ICD-\d+',
+                                      detect_list_score=0.9),
+            'recognizer2': Recognizer(name='recognizer2', enable=True, entity_type='CODE', ignore_list=[],
+                                      detect_list=[], detect_regex=r'CODE-\d+', detect_list_score=0.8)}
+        scanner.init_recognizers()
+
+        assert [type(recognizer).__name__ for recognizer in scanner.custom_recognizers] == \
+               ['DenyListRecognizer', 'PatternRecognizer', 'PatternRecognizer']
+        assert all(recognizer.name in ('recognizer1', 'recognizer2') for recognizer in scanner.custom_recognizers)
+        results = scanner.custom_recognizers[0].analyze('Diagnosed with lung cancer and asthma.', ['DISEASE'])
+        assert [(result.start, result.end, result.score) for result in results] == [(15, 26, 0.9), (31, 37, 0.9)]
+
+    @patch('api.shield.scanners.PIIScanner.PresidioAnalyzerEngine')
+    def test_init_recognizers_without_detect_list_and_regex(self, mock_presidio_analyzer_engine):
+        scanner = PIIScanner(name='name', model_path='model_path')
+        scanner.recognizers = {'recognizer1': Recognizer(name='recognizer1', enable=True, entity_type='entity_type',
+                                                         ignore_list=[], detect_list=[], detect_regex=None,
+                                                         detect_list_score=0.77)}
+        with pytest.raises(ShieldException):
+            scanner.init_recognizers()
+
+    @patch('api.shield.scanners.PIIScanner.PresidioAnalyzerEngine')
+    def test_scan_passes_custom_recognizers_per_call(self, mock_presidio_analyzer_engine):
+        shared_engine = mock_presidio_analyzer_engine.get_shared_instance.return_value
+        shared_engine.analyze.return_value = []
+        scanner_1 = PIIScanner(name='name', model_path='model_path')
+        scanner_2 = PIIScanner(name='name', model_path='model_path')
+        assert scanner_1.presidio_analyzer is scanner_2.presidio_analyzer
+
+        scanner_1.recognizers = {'recognizer1': Recognizer(name='recognizer1', enable=True, entity_type='entity_type',
+                                                           ignore_list=[], detect_list=['detect1'], detect_regex=r'',
+                                                           detect_list_score=0.77)}
+        scanner_1.init_recognizers()
+
+        scanner_1.scan('detect1')
+        shared_engine.analyze.assert_called_with('detect1', ad_hoc_recognizers=scanner_1.custom_recognizers)
+        scanner_2.scan('detect1')
+        shared_engine.analyze.assert_called_with('detect1', ad_hoc_recognizers=[])
 
     def test_scan(self, mocker):
         recognizer_result_1 = RecognizerResult("PERSON", 3, 7, 0.85)
@@ -44,13 +91,13 @@ class TestPIIScanner:
                                                          detect_list=['detect1', 'detect2'], detect_regex=r'',
                                                          detect_list_score=0.77)}
         result = scanner._load_recognizer_ignore_list()
-        assert result == {'recognizer1': ['ignore1', 'ignore2']}
+        assert result == {'recognizer1': frozenset({'ignore1', 'ignore2'})}
 
     def test_remove_ignore_list_keywords(self):
         scanner = PIIScanner(name='name', request_types=['request_types'], enforce_access_control=True, model_path='model_path', model_threshold=0.5, entity_type='entity_type', enable=True)
         analyzer_result_list = [
             MagicMock(start=0, end=4, entity_type='trait1', recognition_metadata={'recognizer_name': 'recognizer1'})]
-        recognizer_ignore_dict = {'recognizer1': ['word']}
+        recognizer_ignore_dict = {'recognizer1': frozenset({'word'})}
         result = scanner._remove_ignore_list_keywords(analyzer_result_list, recognizer_ignore_dict, 'word')
         assert result == []
 
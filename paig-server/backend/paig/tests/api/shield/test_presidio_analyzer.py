@@ -3,6 +3,28 @@ from api.shield.presidio.presidio_analyzer_engine import PresidioAnalyzerEngine
 
 class TestPresidioAnalyzerEngine:
 
+    def test_get_shared_instance(self, mocker):
+        mocker.patch('api.shield.presidio.presidio_analyzer_engine.NLPHandler')
+        mocker.patch('api.shield.presidio.presidio_analyzer_engine.AnalyzerEngine')
+        mocker.patch.object(PresidioAnalyzerEngine, '_shared_instance', None)
+
+        shared_instance = PresidioAnalyzerEngine.get_shared_instance()
+
+        assert shared_instance is PresidioAnalyzerEngine.get_shared_instance()
+        assert shared_instance is not PresidioAnalyzerEngine()
+
+    def test_analyze_with_ad_hoc_recognizers(self, mocker):
+        mocker.patch('api.shield.presidio.presidio_analyzer_engine.NLPHandler')
+        mock_analyzer_engine = mocker.patch('api.shield.presidio.presidio_analyzer_engine.AnalyzerEngine')
+        presidio_analyzer_engine = PresidioAnalyzerEngine()
+        ad_hoc_recognizers = [mocker.MagicMock()]
+
+        presidio_analyzer_engine.analyze("some text", ad_hoc_recognizers=ad_hoc_recognizers)
+
+        call_kwargs = mock_analyzer_engine.return_value.analyze.call_args.kwargs
+        assert call_kwargs['ad_hoc_recognizers'] == ad_hoc_recognizers
+        mock_analyzer_engine.return_value.registry.add_recognizer.assert_not_called()
+
     def test_analyze_text(self, mocker):
         side_effect = lambda prop: {
             "presidio_analyzer_score_threshold": 0.6,
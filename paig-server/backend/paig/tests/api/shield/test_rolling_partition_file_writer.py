@@ -0,0 +1,106 @@
+import json
+import os
+
+from api.shield.logfile.rolling_partition_file_writer import RollingPartitionFileWriter
+
+PARTITION_PATH = "tenant_id=1/year=2024/month=05/day=01"
+
+
+def list_data_files(directory_path, partition_path=PARTITION_PATH):
+    partition_dir = os.path.join(directory_path, *partition_path.split("/"))
+    return sorted(file_name for file_name in os.listdir(partition_dir) if file_name.endswith(".ndjson"))
+
+
+def create_events(start, end):
+    return [(PARTITION_PATH, event_time, {"eventTime": event_time, "id": event_time}) for event_time in range(start, end)]
+
+
+class TestRollingPartitionFileWriter:
+
+    def test_events_are_appended_to_one_file_per_partition(self, tmp_path):
+        writer = RollingPartitionFileWriter(str(tmp_path))
+        writer.add_events(create_events(0, 5))
+        writer.add_events([("tenant_id=2/year=2024/month=05/day=01", 7, {"eventTime": 7, "id": 7})])
+        writer.add_events(create_events(5, 10))
+
+        assert len(list_data_files(str(tmp_path))) == 1
+        assert [event["id"] for event in writer.iter_events(PARTITION_PATH)] == list(range(10))
+        assert [event["id"] for event in writer.iter_events("tenant_id=2/year=2024/month=05/day=01")] == [7]
+        assert list(writer.iter_events("tenant_id=3/year=2024/month=05/day=01")) == []
+
+    def test_files_are_rotated_by_size(self, tmp_path):
+        writer = RollingPartitionFileWriter(str(tmp_path), file_max_size_bytes=200)
+        writer.add_events(create_events(0, 20))
+
+        data_files = list_data_files(str(tmp_path))
+        assert len(data_files) > 1
+        assert all(os.path.getsize(os.path.join(str(tmp_path), PARTITION_PATH, file_name)) < 250
+                   for file_name in data_files)
+        assert sorted(event["id"] for event in writer.iter_events(PARTITION_PATH)) == list(range(20))
+
+    def test_files_are_rotated_by_age(self, tmp_path):
+        writer = RollingPartitionFileWriter(str(tmp_path), file_max_age_sec=0)
+        writer.add_events(create_events(0, 2))
+        writer.sync(rotate_expired=True)
+        assert writer.open_files == {}
+        writer.add_events(create_events(2, 4))
+
+        assert len(list_data_files(str(tmp_path))) == 2
+        assert sorted(event["id"] for event in writer.iter_events(PARTITION_PATH)) == list(range(4))
+
+    def test_time_range_reads_only_matching_index_blocks(self, tmp_path, mocker):
+        writer = RollingPartitionFileWriter(str(tmp_path), index_block_events=10)
+        writer.add_events(create_events(0, 100))
+        writer.sync(close_all=True)
+
+        index_file_path = RollingPartitionFileWriter.get_index_file_path(
+            os.path.join(str(tmp_path), PARTITION_PATH, list_data_files(str(tmp_path))[0]))
+        with open(index_file_path) as f:
+            blocks = [json.loads(line) for line in f]
+        assert len(blocks) == 10
+        assert blocks[3]["minEventTime"] == 30 and blocks[3]["maxEventTime"] == 39
+
+        filter_events = mocker.spy(RollingPartitionFileWriter, "filter_events")
+        assert [event["id"] for event in writer.iter_events(PARTITION_PATH, 35, 52)] == list(range(35, 53))
+        # the blocks 3 to 5 and the empty tail
+        assert filter_events.call_count == 4
+
+    def test_events_after_last_index_block_are_scanned(self, tmp_path):
+        writer = RollingPartitionFileWriter(str(tmp_path), index_block_events=10)
+        writer.add_events(create_events(0, 15))
+        # the process stopped while writing an event
+        data_file_path = os.path.join(str(tmp_path), PARTITION_PATH, list_data_files(str(tmp_path))[0])
+        writer.open_files[PARTITION_PATH].data_file.write(b'{"eventTime": 15, "id"')
+        writer.open_files[PARTITION_PATH].data_file.flush()
+
+        reader = RollingPartitionFileWriter(str(tmp_path))
+        assert os.path.exists(data_file_path)
+        assert [event["id"] for event in reader.iter_events(PARTITION_PATH, 8, None)] == list(range(8, 15))
+
+    def test_index_blocks_stay_open_across_syncs(self, tmp_path):
+        writer = RollingPartitionFileWriter(str(tmp_path), index_block_events=10)
+        for start in range(0, 25, 5):
+            writer.add_events(create_events(start, start + 5))
+            writer.sync()
+
+        index_file_path = RollingPartitionFileWriter.get_index_file_path(
+            os.path.join(str(tmp_path), PARTITION_PATH, list_data_files(str(tmp_path))[0]))
+        with open(index_file_path) as f:
+            blocks = [json.loads(line) for line in f]
+        assert [block["eventCount"] for block in blocks] == [10, 10]
+        assert [event["id"] for event in writer.iter_events(PARTITION_PATH, 18, None)] == list(range(18, 25))
+
+    def test_index_lines_are_written_after_the_data_is_synced(self, tmp_path, mocker):
+        writer = RollingPartitionFileWriter(str(tmp_path), index_block_events=10)
+        writer.add_events(create_events(0, 25))
+        rolling_file = writer.open_files[PARTITION_PATH]
+        assert len(rolling_file.pending_index_lines) == 2
+        assert os.path.getsize(RollingPartitionFileWriter.get_index_file_path(rolling_file.file_path)) == 0
+
+        synced_file_descriptors = []
+        mocker.patch("os.fsync", side_effect=synced_file_descriptors.append)
+        writer.sync()
+
+        assert synced_file_descriptors == [rolling_file.data_file.fileno(), rolling_file.index_file.fileno()]
+        assert rolling_file.pending_index_lines == []
+        assert len(writer.read_index(rolling_file.file_path)) == 2
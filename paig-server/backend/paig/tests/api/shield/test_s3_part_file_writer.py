@@ -0,0 +1,238 @@
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+import pytest
+
+from api.shield.logfile.s3_part_file_writer import S3PartFileWriter
+from api.shield.utils.custom_exceptions import ShieldException
+
+
+class StubS3Client:
+    """
+    In-memory S3 compatible stub of the boto3 S3 client calls used by the part file writer.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.multipart_uploads = {}
+        self.aborted_upload_ids = []
+        self.put_object_count = 0
+        self.fail_uploads = False
+
+    def put_object(self, Body, Bucket, Key, **kwargs):
+        if self.fail_uploads:
+            raise Exception("S3 unavailable")
+        self.put_object_count += 1
+        self.objects[(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = f"upload-{len(self.multipart_uploads) + 1}"
+        self.multipart_uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Body, Bucket, Key, PartNumber, UploadId):
+        if self.fail_uploads:
+            raise Exception("S3 unavailable")
+        self.multipart_uploads[UploadId][PartNumber] = Body
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        chunks = self.multipart_uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(chunks[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.multipart_uploads.pop(UploadId, None)
+        self.aborted_upload_ids.append(UploadId)
+
+
+def read_ndjson_object(body):
+    return [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+
+
+def list_staged_files(staging_dir):
+    return [os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(staging_dir)
+            for file_name in file_names]
+
+
+@pytest.fixture
+def s3_client():
+    return StubS3Client()
+
+
+@pytest.fixture
+def staging_dir(tmp_path):
+    return str(tmp_path / "s3-audit-staging")
+
+
+def create_writer(s3_client, staging_dir, **kwargs):
+    writer = S3PartFileWriter(s3_client, "audit-bucket", "audits", staging_dir, **kwargs)
+    os.makedirs(staging_dir, exist_ok=True)
+    return writer
+
+
+class TestS3PartFileWriter:
+
+    def test_events_are_uploaded_in_a_part_per_partition(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1}),
+                           ("tenant_id=2/year=2024/month=05/day=01", {"id": 2})])
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 3})])
+        assert s3_client.objects == {}
+
+        writer.flush(force=True)
+
+        assert s3_client.put_object_count == 2
+        objects = {key: read_ndjson_object(body) for (bucket, key), body in s3_client.objects.items()}
+        tenant_1_keys = [key for key in objects if key.startswith("audits/tenant_id=1/year=2024/month=05/day=01/part-")]
+        assert len(tenant_1_keys) == 1
+        assert tenant_1_keys[0].endswith(".ndjson.gz")
+        assert objects[tenant_1_keys[0]] == [{"id": 1}, {"id": 3}]
+        assert sorted(event["id"] for events in objects.values() for event in events) == [1, 2, 3]
+        assert list_staged_files(staging_dir) == []
+
+    def test_parts_are_uploaded_by_age(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir, part_max_age_sec=0)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1})])
+        writer.flush()
+        assert len(s3_client.objects) == 1
+
+    def test_big_parts_are_sealed_and_uploaded_in_multipart_upload(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir, part_max_size_bytes=4096, part_max_age_sec=3600,
+                               multipart_threshold_bytes=2048, multipart_chunk_size_bytes=1024)
+        events = [{"id": i, "message": os.urandom(64).hex()} for i in range(100)]
+        for event in events:
+            writer.add_events([("tenant_id=1/year=2024/month=05/day=01", event)])
+        assert writer.sealed_parts
+        assert writer.flush_event.is_set()
+
+        writer.flush()
+
+        assert s3_client.put_object_count == 0
+        assert s3_client.multipart_uploads == {}
+        uploaded_events = [event for body in s3_client.objects.values() for event in read_ndjson_object(body)]
+        # the open part is below the max size and age, so it is not uploaded yet
+        assert uploaded_events == events[:len(uploaded_events)]
+        writer.flush(force=True)
+        uploaded_events = [event for body in s3_client.objects.values() for event in read_ndjson_object(body)]
+        assert sorted(event["id"] for event in uploaded_events) == list(range(100))
+
+    def test_failed_upload_is_kept_and_retried(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir, multipart_threshold_bytes=1, multipart_chunk_size_bytes=1024)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1})])
+        s3_client.fail_uploads = True
+
+        writer.flush(force=True)
+
+        assert s3_client.aborted_upload_ids == ["upload-1"]
+        assert len(list_staged_files(staging_dir)) == 1
+        assert writer.sealed_parts[0].retry_at > 0
+        # not retried before the backoff delay
+        s3_client.fail_uploads = False
+        writer.flush()
+        assert s3_client.objects == {}
+
+        writer.flush(force=True)
+        assert len(s3_client.objects) == 1
+        assert list_staged_files(staging_dir) == []
+
+    def test_batches_of_a_part_share_one_gzip_stream(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir)
+        events = [{"id": i, "message": "the same audit message"} for i in range(100)]
+        for event in events:
+            writer.add_events([("tenant_id=1/year=2024/month=05/day=01", event)])
+        writer.flush(force=True)
+
+        body = next(iter(s3_client.objects.values()))
+        decompressor = zlib.decompressobj(S3PartFileWriter.GZIP_WBITS)
+        lines = decompressor.decompress(body).decode().splitlines()
+        assert decompressor.eof and decompressor.unused_data == b""
+        assert [json.loads(line) for line in lines] == events
+        assert len(body) < sum(len(gzip.compress(json.dumps(event).encode() + b"\n")) for event in events) / 4
+
+    def test_oldest_staged_parts_are_dropped_when_staging_is_full(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir, part_max_size_bytes=1, staging_max_size_bytes=200)
+        s3_client.fail_uploads = True
+        for i in range(20):
+            writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": i, "message": os.urandom(16).hex()})])
+            writer.flush()
+
+        staged_files = list_staged_files(staging_dir)
+        assert writer.staged_size == sum(os.path.getsize(file_path) for file_path in staged_files)
+        assert writer.staged_size < 200 + max(part.size for part in writer.sealed_parts)
+        s3_client.fail_uploads = False
+        writer.flush(force=True)
+        uploaded_ids = sorted(event["id"] for body in s3_client.objects.values() for event in read_ndjson_object(body))
+        # the newest parts are kept
+        assert uploaded_ids == list(range(20 - len(uploaded_ids), 20))
+        assert writer.staged_size == 0
+
+    def test_new_events_are_rejected_when_staging_is_full(self, s3_client, staging_dir):
+        writer = create_writer(s3_client, staging_dir, part_max_size_bytes=1, staging_max_size_bytes=1,
+                               staging_eviction_policy="reject_new")
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1})])
+
+        with pytest.raises(ShieldException):
+            writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 2})])
+
+        writer.flush(force=True)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 2})])
+        writer.flush(force=True)
+        assert sorted(event["id"] for body in s3_client.objects.values() for event in read_ndjson_object(body)) == [1, 2]
+
+    def test_staged_parts_are_recovered_after_crash(self, s3_client, staging_dir, caplog):
+        writer = create_writer(s3_client, staging_dir)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1}),
+                           ("tenant_id=1/year=2024/month=05/day=01", {"id": 2})])
+        staged_file_path = list_staged_files(staging_dir)[0]
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 3, "message": os.urandom(64).hex()})])
+        # the process stopped while a batch was written, before the part was sealed
+        with open(staged_file_path, 'r+b') as f:
+            f.truncate(os.path.getsize(staged_file_path) - 8)
+
+        recovered_writer = create_writer(s3_client, staging_dir)
+        recovered_writer.start()
+        recovered_writer.flush(force=True)
+
+        assert "dropped an event partially written" in caplog.text
+        assert len(s3_client.objects) == 1
+        (bucket, key), body = next(iter(s3_client.objects.items()))
+        assert key == "audits/" + os.path.relpath(staged_file_path, staging_dir).replace(os.sep, "/")
+        assert read_ndjson_object(body) == [{"id": 1}, {"id": 2}]
+        assert list_staged_files(staging_dir) == []
+
+    def test_sealed_parts_are_recovered_as_they_are(self, s3_client, staging_dir, caplog):
+        writer = create_writer(s3_client, staging_dir)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1})])
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 2})])
+        with writer.lock:
+            writer.seal_part("tenant_id=1/year=2024/month=05/day=01")
+        staged_file_path = list_staged_files(staging_dir)[0]
+        # a part staged as one gzip member per batch
+        with open(staged_file_path, 'ab') as f:
+            f.write(gzip.compress(json.dumps({"id": 3}).encode() + b"\n"))
+        os.utime(staged_file_path, (0, 0))
+
+        recovered_writer = create_writer(s3_client, staging_dir)
+        recovered_writer.recover_staged_parts()
+
+        assert os.stat(staged_file_path).st_mtime == 0
+        assert "Completed" not in caplog.text
+        recovered_writer.flush(force=True)
+        assert read_ndjson_object(next(iter(s3_client.objects.values()))) == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    def test_unsealed_part_is_completed_without_dropping_events(self, s3_client, staging_dir, caplog):
+        writer = create_writer(s3_client, staging_dir)
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 1})])
+        writer.add_events([("tenant_id=1/year=2024/month=05/day=01", {"id": 2})])
+
+        recovered_writer = create_writer(s3_client, staging_dir)
+        with caplog.at_level("INFO"):
+            recovered_writer.recover_staged_parts()
+
+        assert "Completed the staged S3 audit part file" in caplog.text
+        assert "dropped" not in caplog.text
+        recovered_writer.flush(force=True)
+        assert read_ndjson_object(next(iter(s3_client.objects.values()))) == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.shield.services.scanner_executor_service import ScannerExecutor
+from api.shield.utils.custom_exceptions import ShieldException
+
+
+@pytest.fixture
+def scanner_executor():
+    executor = ScannerExecutor()
+    original_limits = (executor.max_queue_size, executor.max_concurrency_per_scanner)
+    yield executor
+    executor.max_queue_size, executor.max_concurrency_per_scanner = original_limits
+    executor._scanner_semaphores.clear()
+
+
+class TestScannerExecutor:
+
+    def test_singleton_instance(self):
+        assert ScannerExecutor() is ScannerExecutor()
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result_from_worker_thread(self, scanner_executor):
+        result = await scanner_executor.run("scanner1", lambda x: (x, threading.current_thread().name), "message")
+
+        assert result[0] == "message"
+        assert result[1].startswith("shield-scanner")
+        assert scanner_executor.get_queue_depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_run_propagates_exception(self, scanner_executor):
+        def failing_scan():
+            raise ValueError("scan failed")
+
+        with pytest.raises(ValueError):
+            await scanner_executor.run("scanner1", failing_scan)
+        assert scanner_executor.get_queue_depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_run_rejects_when_queue_is_full(self, scanner_executor):
+        scanner_executor.max_queue_size = 1
+        scanner_executor._queue_depth = 1
+        try:
+            with pytest.raises(ShieldException) as e:
+                await scanner_executor.run("scanner1", lambda: None)
+            assert "Scanner queue is full" in str(e.value)
+        finally:
+            scanner_executor._queue_depth = 0
+
+    @pytest.mark.asyncio
+    async def test_run_limits_concurrency_per_scanner(self, scanner_executor):
+        scanner_executor.max_concurrency_per_scanner = 1
+        lock = threading.Lock()
+        running = {"current": 0, "max": 0}
+
+        def slow_scan():
+            with lock:
+                running["current"] += 1
+                running["max"] = max(running["max"], running["current"])
+            time.sleep(0.05)
+            with lock:
+                running["current"] -= 1
+
+        await asyncio.gather(*[scanner_executor.run("scanner1", slow_scan) for _ in range(3)])
+
+        assert running["max"] == 1
+
+    @pytest.mark.asyncio
+    async def test_scans_waiting_for_their_scanner_do_not_block_other_scanners(self, scanner_executor):
+        scanner_executor.max_concurrency_per_scanner = 1
+        release = threading.Event()
+
+        slow_scans = [asyncio.ensure_future(scanner_executor.run("slow_scanner", release.wait, 5))
+                      for _ in range(scanner_executor.max_workers + 1)]
+        await asyncio.sleep(0.05)
+        # one slow scan runs, the others wait for the scanner slot without holding a worker
+        assert scanner_executor.get_queue_depth() == scanner_executor.max_workers
+
+        result = await asyncio.wait_for(scanner_executor.run("fast_scanner", lambda: "done"), timeout=2)
+
+        assert result == "done"
+        release.set()
+        await asyncio.gather(*slow_scans)
+        assert scanner_executor.get_queue_depth() == 0
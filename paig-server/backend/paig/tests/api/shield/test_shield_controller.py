@@ -48,6 +48,7 @@ class TestShieldController:
                                                                        "test_plugin_key", "test_application_key")
         assert response.status_code == 200
         assert response.body.decode() == "Initialization completed successfully for tenant test_tenant"
+        assert response.headers["x-paig-encryption-modes"] == "legacy,envelope"
 
     @pytest.mark.asyncio
     async def test_authorize(self, controller, mock_shield_service):
@@ -97,6 +98,25 @@ class TestShieldController:
         assert response.status_code == 200
         assert "Audited the Data Successfully for the tenant: test_tenant" in response.body.decode()
 
+    @pytest.mark.asyncio
+    async def test_audit_batch(self, controller, mock_shield_service):
+        mock_shield_service.audit_batch = AsyncMock(return_value=[MagicMock(), MagicMock()])
+
+        response = await controller.audit_batch([{"key": "value1"}, {"key": "value2"}])
+
+        mock_shield_service.audit_batch.assert_awaited_once_with([{"key": "value1"}, {"key": "value2"}])
+        assert response.status_code == 200
+        assert "Audited 2 records Successfully" in response.body.decode()
+
+    @pytest.mark.asyncio
+    async def test_audit_batch_rejects_records_which_are_not_a_list(self, controller, mock_shield_service):
+        mock_shield_service.audit_batch = AsyncMock()
+
+        for requests in ({"key": "value"}, ["value"]):
+            with pytest.raises(BadRequestException):
+                await controller.audit_batch(requests)
+        mock_shield_service.audit_batch.assert_not_awaited()
+
     @pytest.mark.asyncio
     async def test_init_app_with_exceptions(self, controller, mock_shield_service):
         # Arrange
@@ -2,6 +2,8 @@ from api.shield.model.shield_audit import ShieldAuditViaApi
 from api.shield.services.tenant_data_encryptor_service import ShieldDataEncryptor, EncryptionKeyRefresher,TenantDataEncryptorService
 from paig_common.encryption import DataEncryptor, RSAKeyUtil
 from api.shield.utils.custom_exceptions import ShieldException
+import asyncio
+
 import pytest
 
 
@@ -152,11 +154,15 @@ class TestShieldDataEncryptor:
             ]
         })
 
-        mocker.patch.object(TenantDataEncryptorService, 'decrypt')
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        mocker.patch.object(shield_data_encryptor, 'decrypt', side_effect=lambda value: f"decrypted_{value}")
+        mocker.patch.object(TenantDataEncryptorService, 'get_data_encryptor', return_value=shield_data_encryptor)
         tenant_data_encryptor_service = TenantDataEncryptorService()
         await tenant_data_encryptor_service.decrypt_shield_audit(shield_audit)
 
-        assert TenantDataEncryptorService.decrypt.call_count == 2
+        assert shield_data_encryptor.decrypt.call_count == 2
+        assert shield_audit.messages == [{"key1": "decrypted_encrypted_value1"}, {"key2": "decrypted_encrypted_value4"}]
+        TenantDataEncryptorService.get_data_encryptor.assert_called_once_with("test_tenant", "server_key_id")
 
     #  Raises a 'ShieldException' if the 'decrypt' method of the 'TenantDataEncryptorService' class raises an exception.
     @pytest.mark.asyncio
@@ -203,7 +209,257 @@ class TestShieldDataEncryptor:
         })
 
         tenant_data_encryptor_service = TenantDataEncryptorService()
-        mocker.patch.object(TenantDataEncryptorService, 'decrypt', side_effect=ShieldException)
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        mocker.patch.object(shield_data_encryptor, 'decrypt', side_effect=ShieldException)
+        mocker.patch.object(TenantDataEncryptorService, 'get_data_encryptor', return_value=shield_data_encryptor)
 
         with pytest.raises(ShieldException):
             await tenant_data_encryptor_service.decrypt_shield_audit(shield_audit)
+
+    # Response messages are encrypted in the encryption mode of the request messages
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("request_encryption_mode", [DataEncryptor.ENCRYPTION_MODE_LEGACY,
+                                                         DataEncryptor.ENCRYPTION_MODE_ENVELOPE])
+    async def test_authorize_response_uses_encryption_mode_of_request(self, mocker, request_encryption_mode):
+        from api.shield.model.authorize_request import AuthorizeRequest
+        from api.shield.model.authorize_response import AuthorizeResponse
+
+        shield_key = RSAKeyUtil.generate_key_pair()
+        plugin_key = RSAKeyUtil.generate_key_pair()
+        plugin_data_encryptor = DataEncryptor(public_key=shield_key.public_key_encoded_str,
+                                              private_key=plugin_key.private_key_encoded_str,
+                                              encryption_mode=request_encryption_mode)
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        shield_data_encryptor.data_encryptor = DataEncryptor(public_key=plugin_key.public_key_encoded_str,
+                                                             private_key=shield_key.private_key_encoded_str)
+        mocker.patch.object(TenantDataEncryptorService, 'get_data_encryptor', return_value=shield_data_encryptor)
+
+        auth_request = AuthorizeRequest({"threadId": "1", "requestId": "1", "sequenceNumber": 1,
+                                         "requestType": "prompt", "requestDateTime": 1, "applicationKey": "app",
+                                         "clientApplicationKey": "client_app", "shieldServerKeyId": 1,
+                                         "shieldPluginKeyId": 2, "userId": "user",
+                                         "messages": [plugin_data_encryptor.encrypt("hello")]}, "test_tenant", "OWNER")
+        tenant_data_encryptor_service = TenantDataEncryptorService()
+        await tenant_data_encryptor_service.decrypt_authorize_request(auth_request)
+        assert auth_request.messages == ["hello"]
+        assert auth_request.encryption_mode == request_encryption_mode
+
+        auth_response = mocker.MagicMock(spec=AuthorizeResponse)
+        auth_response.responseMessages = [{"responseText": "hello back"}]
+        await tenant_data_encryptor_service.encrypt_authorize_response(auth_request, auth_response)
+        encrypted_response_text = auth_response.responseMessages[0]["responseText"]
+        assert DataEncryptor.get_encryption_mode_of(encrypted_response_text) == request_encryption_mode
+        assert plugin_data_encryptor.decrypt(encrypted_response_text) == "hello back"
+
+    # All the fields of the audit messages except the analyzer result are encrypted in one worker thread call
+    @pytest.mark.asyncio
+    async def test_encrypt_shield_audit_encrypts_all_fields_in_one_batch(self, mocker):
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        mocker.patch.object(shield_data_encryptor, 'encrypt', side_effect=lambda value, mode=None: f"enc_{value}")
+        mocker.patch.object(TenantDataEncryptorService, 'get_data_encryptor', return_value=shield_data_encryptor)
+        to_thread_spy = mocker.spy(asyncio, 'to_thread')
+        audit_messages = [{"originalMessage": "hello", "maskedMessage": "h***o", "analyzerResult": "[]"},
+                          {"originalMessage": "bye", "maskedMessage": None, "analyzerResult": "[]"}]
+
+        await TenantDataEncryptorService().encrypt_shield_audit(audit_messages, "test_tenant", 1)
+
+        assert audit_messages == [{"originalMessage": "enc_hello", "maskedMessage": "enc_h***o", "analyzerResult": "[]"},
+                                  {"originalMessage": "enc_bye", "maskedMessage": None, "analyzerResult": "[]"}]
+        assert to_thread_spy.call_count == 1
+        TenantDataEncryptorService.get_data_encryptor.assert_called_once_with("test_tenant", 1)
+
+    def test_encrypt_records_only_encrypts_given_fields(self, mocker):
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        mocker.patch.object(shield_data_encryptor, 'encrypt', side_effect=lambda value, mode=None: f"{mode}_{value}")
+        records = [{"responseText": "hi", "analyzerResult": "[]"}]
+
+        assert shield_data_encryptor.encrypt_records(records, fields={"responseText"}, encryption_mode="envelope") == \
+               [{"responseText": "envelope_hi", "analyzerResult": "[]"}]
+
+
+@pytest.fixture
+def tenant_data_encryptor_service(mocker):
+    from collections import OrderedDict
+    service = TenantDataEncryptorService()
+    mocker.patch.object(service, 'tenant_data_encryptors', OrderedDict())
+    mocker.patch.object(service, 'data_encryptors_by_key_pair', OrderedDict())
+    mocker.patch.object(service, 'pending_initializations', {})
+    mocker.patch.object(service, 'data_encryptors_cleanup_thread_started', True)
+    return service
+
+
+def _mock_initialization(mocker, delay=0):
+    initializations = []
+
+    async def initialize_encryption_key_refresher(self, enable_background_key_refresh):
+        initializations.append(self.tenant_id)
+        await asyncio.sleep(delay)
+
+    mocker.patch.object(ShieldDataEncryptor, 'initialize_encryption_key_refresher',
+                        initialize_encryption_key_refresher)
+    mocker.patch.object(ShieldDataEncryptor, 'create_data_encryptor')
+    return initializations
+
+
+class TestTenantDataEncryptorRegistry:
+
+    # Concurrent first requests of a tenant wait for a single initialization
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_initialize_once(self, mocker, tenant_data_encryptor_service):
+        initializations = _mock_initialization(mocker, delay=0.05)
+
+        shield_data_encryptors = await asyncio.gather(
+            *[tenant_data_encryptor_service.get_data_encryptor("tenant_1", 1) for _ in range(5)])
+
+        assert initializations == ["tenant_1"]
+        assert all(encryptor is shield_data_encryptors[0] for encryptor in shield_data_encryptors)
+        assert tenant_data_encryptor_service.pending_initializations == {}
+
+    # The least recently used encryptor is evicted when the registry is full
+    @pytest.mark.asyncio
+    async def test_least_recently_used_encryptor_is_evicted(self, mocker, tenant_data_encryptor_service):
+        _mock_initialization(mocker)
+        mocker.patch.object(tenant_data_encryptor_service, 'max_size', 2)
+        cleanup_spy = mocker.patch.object(ShieldDataEncryptor, 'cleanup')
+
+        await tenant_data_encryptor_service.get_data_encryptor("tenant_1", 1)
+        await tenant_data_encryptor_service.get_data_encryptor("tenant_2", 1)
+        await tenant_data_encryptor_service.get_data_encryptor("tenant_1", 1)
+        await tenant_data_encryptor_service.get_data_encryptor("tenant_3", 1)
+
+        assert list(tenant_data_encryptor_service.tenant_data_encryptors) == ["tenant_1_1", "tenant_3_1"]
+        assert cleanup_spy.call_count == 1
+        assert tenant_data_encryptor_service.get_registry_size(None)[0].value == 2
+
+    # Encryptors of the same key pair share one DataEncryptor
+    def test_encryptors_of_same_key_pair_share_data_encryptor(self, tenant_data_encryptor_service):
+        key_pair = RSAKeyUtil.generate_key_pair()
+        other_key_pair = RSAKeyUtil.generate_key_pair()
+        shield_data_encryptors = []
+        for tenant_id in ["tenant_1", "tenant_2"]:
+            shield_data_encryptor = ShieldDataEncryptor(
+                tenant_id, False, data_encryptor_provider=tenant_data_encryptor_service.get_shared_data_encryptor)
+            shield_data_encryptor.shield_plugin_public_key_map[1] = key_pair.public_key_encoded_str
+            shield_data_encryptor.shield_server_private_key_map[1] = key_pair.private_key_encoded_str
+            shield_data_encryptor.shield_plugin_public_key_map[2] = other_key_pair.public_key_encoded_str
+            shield_data_encryptor.shield_server_private_key_map[2] = other_key_pair.private_key_encoded_str
+            shield_data_encryptor.create_data_encryptor(1)
+            shield_data_encryptors.append(shield_data_encryptor)
+
+        assert shield_data_encryptors[0].data_encryptor is shield_data_encryptors[1].data_encryptor
+        shield_data_encryptors[1].create_data_encryptor(2)
+        assert shield_data_encryptors[0].data_encryptor is not shield_data_encryptors[1].data_encryptor
+        assert len(tenant_data_encryptor_service.data_encryptors_by_key_pair) == 2
+
+    # The encryptors of the active keys in the encryption keys cache dir are created by the pre-warm
+    @pytest.mark.asyncio
+    async def test_prewarm_creates_encryptors_of_active_keys(self, mocker, tmp_path, tenant_data_encryptor_service):
+        import json
+        from api.shield.utils import config_utils
+        initializations = _mock_initialization(mocker)
+        mocker.patch.object(config_utils, 'get_property_value', return_value=str(tmp_path))
+        (tmp_path / "key_tenant_1.json").write_text(json.dumps([
+            {"id": 1, "keyStatus": "ACTIVE", "keyType": "MSG_PROTECT_SHIELD"},
+            {"id": 2, "keyStatus": "DISABLED", "keyType": "MSG_PROTECT_SHIELD"}
+        ]))
+        (tmp_path / "key_tenant_2.json").write_text("not json")
+
+        await tenant_data_encryptor_service.prewarm_data_encryptors()
+
+        assert initializations == ["tenant_1"]
+        assert list(tenant_data_encryptor_service.tenant_data_encryptors) == ["tenant_1_1"]
+
+
+class TestParallelCryptoStage:
+
+    @pytest.fixture
+    def parallel_service(self, mocker):
+        from concurrent.futures import ThreadPoolExecutor
+        service = TenantDataEncryptorService()
+        executor = ThreadPoolExecutor(max_workers=4)
+        mocker.patch.object(service, 'crypto_executor', executor)
+        mocker.patch.object(service, 'parallel_crypto_min_messages', 2)
+        yield service
+        executor.shutdown()
+
+    # The request messages are decrypted in parallel and keep their order
+    @pytest.mark.asyncio
+    async def test_messages_are_decrypted_in_order(self, mocker, parallel_service):
+        import threading
+        import time
+        threads = set()
+
+        def decrypt(value):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+            return f"decrypted_{value}"
+
+        shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+        mocker.patch.object(shield_data_encryptor, 'decrypt', side_effect=decrypt)
+        mocker.patch.object(TenantDataEncryptorService, 'get_data_encryptor', return_value=shield_data_encryptor)
+        auth_request = mocker.MagicMock()
+        auth_request.messages = [f"message_{index}" for index in range(8)]
+
+        await parallel_service.decrypt_authorize_request(auth_request)
+
+        assert auth_request.messages == [f"decrypted_message_{index}" for index in range(8)]
+        assert len(threads) > 1
+
+    # A failing message does not stop the other messages, the error of the first failing message is raised
+    @pytest.mark.asyncio
+    async def test_failing_message_is_isolated(self, parallel_service):
+        processed = []
+
+        def encrypt(value):
+            processed.append(value)
+            if value in (2, 5):
+                raise ShieldException(f"failed {value}")
+            return value
+
+        with pytest.raises(ShieldException, match="failed 2"):
+            await parallel_service.run_crypto_stage(encrypt, list(range(8)))
+        assert sorted(processed) == list(range(8))
+
+    # Requests with few messages are processed in a single worker thread call
+    @pytest.mark.asyncio
+    async def test_few_messages_are_processed_in_one_call(self, mocker, parallel_service):
+        mocker.patch.object(parallel_service, 'parallel_crypto_min_messages', 4)
+        to_thread_spy = mocker.spy(asyncio, 'to_thread')
+
+        assert await parallel_service.run_crypto_stage(lambda value: value * 2, [1, 2, 3]) == [2, 4, 6]
+        assert to_thread_spy.call_count == 1
+
+
+def test_shield_data_encryptor_streams():
+    key_pair = RSAKeyUtil.generate_key_pair()
+    shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+    with pytest.raises(ShieldException):
+        shield_data_encryptor.encrypt_stream(["hello"])
+
+    shield_data_encryptor.data_encryptor = DataEncryptor(public_key=key_pair.public_key_encoded_str,
+                                                         private_key=key_pair.private_key_encoded_str)
+    message_parts = ["a long reply. " * 50, "the end."]
+    encrypted_message = "".join(shield_data_encryptor.encrypt_stream(message_parts,
+                                                                     DataEncryptor.ENCRYPTION_MODE_ENVELOPE))
+    assert shield_data_encryptor.decrypt(encrypted_message) == "".join(message_parts)
+    assert "".join(shield_data_encryptor.decrypt_stream([encrypted_message[:50], encrypted_message[50:]])) == \
+           "".join(message_parts)
+
+
+def test_shield_data_encryptor_reencrypt_records():
+    key_pair = RSAKeyUtil.generate_key_pair()
+    shield_data_encryptor = ShieldDataEncryptor("test_tenant", False)
+    shield_data_encryptor.data_encryptor = DataEncryptor(public_key=key_pair.public_key_encoded_str,
+                                                         private_key=key_pair.private_key_encoded_str)
+    original_message = "a long “reply”. " * 50
+    records = [{"originalMessage": shield_data_encryptor.encrypt(original_message),
+                "maskedMessage": shield_data_encryptor.encrypt(original_message, DataEncryptor.ENCRYPTION_MODE_ENVELOPE),
+                "analyzerResult": "[]"}]
+
+    shield_data_encryptor.reencrypt_records(records, skip_fields=("analyzerResult",),
+                                            encryption_mode=DataEncryptor.ENCRYPTION_MODE_ENVELOPE)
+
+    assert DataEncryptor.is_envelope_encrypted(records[0]["originalMessage"])
+    assert shield_data_encryptor.decrypt(records[0]["originalMessage"]) == original_message
+    assert shield_data_encryptor.decrypt(records[0]["maskedMessage"]) == original_message
+    assert records[0]["analyzerResult"] == "[]"
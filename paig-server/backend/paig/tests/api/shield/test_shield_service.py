@@ -4,6 +4,8 @@ from pathlib import Path
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 
+from core.exceptions import BadRequestException
+
 from api.shield.model.vectordb_authz_response import AuthorizeVectorDBResponse
 from api.shield.model.authorize_request import AuthorizeRequest
 
@@ -104,4 +106,55 @@ async def test_audit():
     await service.audit(request)
 
     # Assert
-    mock_auth_service.audit_stream_data.assert_awaited_once()
\ No newline at end of file
+    mock_auth_service.audit_stream_data.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_audit_batch():
+    mock_auth_service = MagicMock()
+    mock_auth_service.audit_stream_data = AsyncMock()
+    from api.shield.services.shield_service import ShieldService
+    service = ShieldService(mock_auth_service)
+    request = {
+        "applicationKey": "test_app_key",
+        "applicationName": "test_app_name",
+        "clientApplicationKey": "test_client_app_key",
+        "clientApplicationName": "test_client_app_name",
+        "clientHostname": "test_client_hostname",
+        "clientIp": "test_client_ip",
+        "context": "test_context",
+        "eventId": "test_event_id",
+        "maskedTraits": "test_masked_traits",
+        "messages": "test_messages",
+        "numberOfTokens": 1,
+        "paigPolicyIds": "test_paig_policy_ids",
+        "requestId": "test_request_id",
+        "requestType": "test_request_type",
+        "result": "test_result",
+        "tenantId": "test_tenant_id",
+        "threadId": "test_thread_id",
+        "threadSequenceNumber": 1,
+        "traits": "test_traits",
+        "userId": "test_user_id",
+        "encryptionKeyId": "test_encryption_key_id",
+        "eventTime": "test_event_time"
+    }
+
+    stream_shield_audits = await service.audit_batch([request, dict(request, requestId="test_request_id_2")])
+
+    assert [stream_shield_audit.requestId for stream_shield_audit in stream_shield_audits] == \
+           ["test_request_id", "test_request_id_2"]
+    assert mock_auth_service.audit_stream_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_audit_batch_with_malformed_record_logs_nothing():
+    mock_auth_service = MagicMock()
+    mock_auth_service.audit_stream_data = AsyncMock()
+    from api.shield.services.shield_service import ShieldService
+    service = ShieldService(mock_auth_service)
+
+    with pytest.raises(BadRequestException):
+        await service.audit_batch([{"tenantId": "test_tenant_id"}])
+
+    mock_auth_service.audit_stream_data.assert_not_awaited()
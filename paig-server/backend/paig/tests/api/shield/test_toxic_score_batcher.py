@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.shield.scanners.toxic_score_batcher import ToxicScoreBatcher
+
+
+@pytest.fixture
+def toxic_score_batcher():
+    batcher = ToxicScoreBatcher()
+    original_limits = (batcher.max_batch_size, batcher.batch_window_sec)
+    batcher.batch_window_sec = 0.05
+    yield batcher
+    batcher.max_batch_size, batcher.batch_window_sec = original_limits
+
+
+def mock_predict_prob(mocker, side_effect=None):
+    return mocker.patch("api.shield.scanners.toxic_score_batcher.predict_prob",
+                        side_effect=side_effect or (lambda messages: [len(message) / 100 for message in messages]))
+
+
+class TestToxicScoreBatcher:
+
+    def test_singleton_instance(self):
+        assert ToxicScoreBatcher() is ToxicScoreBatcher()
+
+    @pytest.mark.asyncio
+    async def test_score_returns_score_of_message(self, mocker, toxic_score_batcher):
+        mock_predict_prob(mocker)
+
+        assert await toxic_score_batcher.score("a" * 42) == 0.42
+
+    def test_score_blocking_returns_score_of_message(self, mocker, toxic_score_batcher):
+        mock_predict_prob(mocker)
+
+        assert toxic_score_batcher.score_blocking("a" * 42) == 0.42
+
+    def test_lone_message_does_not_wait_for_window(self, mocker, toxic_score_batcher):
+        toxic_score_batcher.batch_window_sec = 5
+        mock_predict_prob(mocker)
+
+        start = time.monotonic()
+        assert toxic_score_batcher.score_blocking("a" * 10) == 0.1
+        assert time.monotonic() - start < 2
+
+    def test_messages_queued_while_a_batch_is_scored_are_scored_in_one_call(self, mocker, toxic_score_batcher):
+        scoring_started, release = threading.Event(), threading.Event()
+
+        def blocking_predict_prob(messages):
+            if messages == ["blocker"]:
+                scoring_started.set()
+                release.wait(5)
+            return [len(message) / 100 for message in messages]
+        predict_prob = mock_predict_prob(mocker, side_effect=blocking_predict_prob)
+
+        blocker = toxic_score_batcher.submit("blocker")
+        assert scoring_started.wait(5)
+        futures = [toxic_score_batcher.submit("a" * length) for length in (10, 20, 30)]
+        release.set()
+
+        assert blocker.result(timeout=5) == 0.07
+        assert [future.result(timeout=5) for future in futures] == [0.1, 0.2, 0.3]
+        assert predict_prob.call_args_list[-1].args[0] == ["a" * 10, "a" * 20, "a" * 30]
+
+    def test_batches_are_limited_to_max_batch_size(self, mocker, toxic_score_batcher):
+        toxic_score_batcher.max_batch_size = 2
+        predict_prob = mock_predict_prob(mocker)
+
+        futures = [toxic_score_batcher.submit("a" * length) for length in (10, 20, 30)]
+
+        assert [future.result(timeout=5) for future in futures] == [0.1, 0.2, 0.3]
+        assert all(len(call.args[0]) <= 2 for call in predict_prob.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scans_share_a_batch(self, mocker, toxic_score_batcher):
+        def slow_predict_prob(messages):
+            time.sleep(0.05)
+            return [len(message) / 100 for message in messages]
+        predict_prob = mock_predict_prob(mocker, side_effect=slow_predict_prob)
+
+        scores = await asyncio.gather(*[toxic_score_batcher.score("a" * length) for length in (10, 20, 30, 40)])
+
+        assert scores == [0.1, 0.2, 0.3, 0.4]
+        assert predict_prob.call_count < 4
+
+    def test_scoring_failure_is_raised_to_every_message_of_the_batch(self, mocker, toxic_score_batcher):
+        def failing_predict_prob(messages):
+            raise ValueError("model failed")
+        mock_predict_prob(mocker, side_effect=failing_predict_prob)
+
+        futures = [toxic_score_batcher.submit("message1"), toxic_score_batcher.submit("message2")]
+
+        for future in futures:
+            with pytest.raises(ValueError, match="model failed"):
+                future.result(timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_scan_does_not_block_the_rest_of_its_batch(self, mocker, toxic_score_batcher):
+        scoring_started, release = threading.Event(), threading.Event()
+
+        def blocking_predict_prob(messages):
+            if messages == ["blocker"]:
+                scoring_started.set()
+                release.wait(5)
+            return [len(message) / 100 for message in messages]
+        predict_prob = mock_predict_prob(mocker, side_effect=blocking_predict_prob)
+
+        blocker = toxic_score_batcher.submit("blocker")
+        assert scoring_started.wait(5)
+        tasks = [asyncio.create_task(toxic_score_batcher.score("a" * length)) for length in (10, 20, 30)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        release.set()
+
+        assert await asyncio.wait_for(asyncio.gather(tasks[0], tasks[2]), timeout=5) == [0.1, 0.3]
+        with pytest.raises(asyncio.CancelledError):
+            await tasks[1]
+        assert blocker.result(timeout=5) == 0.07
+        assert predict_prob.call_args_list[-1].args[0] == ["a" * 10, "a" * 30]
@@ -1,3 +1,5 @@
+import pytest
+
 from api.shield.scanners.ToxicContentScanner import ToxicContentScanner
 
 
@@ -30,3 +32,18 @@ class TestToxicContentScanner:
         assert result is not None
         assert result.get('traits') == ["TOXIC"]
         assert result.get('score') > 0.5
+
+    @pytest.mark.asyncio
+    async def test_scan_async_toxic_text(self):
+        toxic_scanner = ToxicContentScanner(name="toxic_content_scanner",
+                                            request_types=['prompt', 'reply'],
+                                            enforce_access_control=True,
+                                            model_score_threshold=0.5,
+                                            entity_type="TOXIC",
+                                            enable=True)
+
+        result = await toxic_scanner.scan_async("You are a stupid person")
+
+        assert toxic_scanner.is_async is True
+        assert result.get('traits') == ["TOXIC"]
+        assert result.get('score') > 0.5
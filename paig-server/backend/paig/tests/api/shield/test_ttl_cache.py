@@ -0,0 +1,70 @@
+import pytest
+
+from api.shield.cache.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch('api.shield.cache.ttl_cache.time.monotonic', side_effect=lambda: now[0])
+    return now
+
+
+def test_put_and_get(clock):
+    cache = TTLCache("test_ttl", 5, 10)
+    cache.put("key1", "value1")
+    assert cache.get("key1") == "value1"
+    assert cache.get("key2") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_item_expires_after_ttl_even_when_read(clock):
+    cache = TTLCache("test_ttl", 5, 10)
+    cache.put("key1", "value1")
+    clock[0] += 9
+    assert cache.get("key1") == "value1"
+    clock[0] += 1
+    assert cache.get("key1") is None
+    assert "key1" not in cache.cache
+
+
+def test_put_refreshes_ttl(clock):
+    cache = TTLCache("test_ttl", 5, 10)
+    cache.put("key1", "value1")
+    clock[0] += 8
+    cache.put("key1", "value2")
+    clock[0] += 8
+    assert cache.get("key1") == "value2"
+
+
+def test_full_cache_evicts_least_recently_used(clock):
+    cache = TTLCache("test_ttl", 3, 10)
+    for i in range(3):
+        cache.put(f"key{i}", i)
+    cache.get("key0")
+    cache.put("key3", 3)
+    assert list(cache.cache.keys()) == ["key2", "key0", "key3"]
+    assert cache.evictions == 1
+
+
+def test_full_cache_evicts_expired_items_first(clock):
+    cache = TTLCache("test_ttl", 3, 10)
+    cache.put("key0", 0)
+    cache.put("key1", 1)
+    clock[0] += 5
+    cache.put("key2", 2)
+    clock[0] += 5
+    cache.put("key3", 3)
+    assert list(cache.cache.keys()) == ["key2", "key3"]
+    assert cache.evictions == 2
+
+
+def test_clear_and_metrics(clock):
+    cache = TTLCache("test_ttl", 3, 10)
+    cache.put("key0", 0)
+    cache.get("key0")
+    cache.get("missing")
+    assert cache.get_cache_size(None)[0].value == 1
+    assert cache.get_cache_hit_ratio(None)[0].value == 0.5
+    cache.clear()
+    assert cache.get_cache_size(None)[0].value == 0
@@ -0,0 +1,104 @@
+import configparser
+import random
+
+import pytest
+
+from benchmarks.shield.environment import resolve_scanner_mix, write_scanner_properties
+from benchmarks.shield.runner import build_message, parse_args
+from benchmarks.shield.stats import percentile, summarize, format_results
+
+
+def read_properties(properties_file):
+    config = configparser.ConfigParser(interpolation=None)
+    config.optionxform = str
+    config.read(properties_file)
+    return config
+
+
+class TestShieldBenchmarkStats:
+
+    def test_percentile_nearest_rank(self):
+        latencies = [float(value) for value in range(1, 101)]
+        assert percentile(latencies, 50) == 50.0
+        assert percentile(latencies, 95) == 95.0
+        assert percentile(latencies, 99) == 99.0
+        assert percentile(latencies, 100) == 100.0
+        assert percentile([], 99) == 0.0
+
+    def test_summarize(self):
+        result = summarize("inproc", "authorize", "none", 64, 1, 4, [30.0, 10.0, 20.0, 40.0], 1, 2.0)
+
+        assert result.requests == 4
+        assert result.errors == 1
+        assert result.throughput_rps == 2.0
+        assert result.mean_ms == 25.0
+        assert result.p50_ms == 20.0
+        assert result.p99_ms == 40.0
+        assert result.max_ms == 40.0
+
+    def test_summarize_without_successful_requests(self):
+        result = summarize("http", "authorize", "pii", 64, 1, 4, [], 3, 1.0)
+
+        assert result.requests == 0
+        assert result.throughput_rps == 0.0
+        assert result.p95_ms == 0.0
+
+    def test_format_results(self):
+        results = [summarize("inproc", "authorize", "pii+toxic", 1024, 4, 8, [12.5], 0, 1.0)]
+
+        lines = format_results(results).splitlines()
+
+        assert len(lines) == 3
+        assert lines[0].split()[0] == "mode"
+        assert "pii+toxic" in lines[2]
+
+
+class TestShieldBenchmarkEnvironment:
+
+    def test_resolve_scanner_mix(self):
+        assert resolve_scanner_mix("none") == []
+        assert resolve_scanner_mix("pii+toxic") == ["PIIScanner", "ToxicContentScanner"]
+        assert resolve_scanner_mix("PIIScanner") == ["PIIScanner"]
+
+    def test_write_scanner_properties_keeps_only_mix_scanners(self, tmp_path):
+        properties_file = write_scanner_properties(str(tmp_path), "toxic")
+
+        config = read_properties(properties_file)
+        assert config.sections() == ["scanner[0]"]
+        assert config.get("scanner[0]", "name") == "ToxicContentScanner"
+
+    def test_write_scanner_properties_renumbers_scanners_and_recognizers(self, tmp_path):
+        properties_file = write_scanner_properties(str(tmp_path), "toxic+pii")
+
+        config = read_properties(properties_file)
+        assert config.get("scanner[0]", "name") == "PIIScanner"
+        assert config.get("scanner[1]", "name") == "ToxicContentScanner"
+        assert config.get("scanner[0].recognizer[0]", "name") == "DiseaseRecognizer"
+
+    def test_write_scanner_properties_without_scanners(self, tmp_path):
+        properties_file = write_scanner_properties(str(tmp_path), "none")
+
+        assert read_properties(properties_file).sections() == []
+
+    def test_write_scanner_properties_unknown_scanner(self, tmp_path):
+        with pytest.raises(ValueError, match="UnknownScanner"):
+            write_scanner_properties(str(tmp_path), "pii+UnknownScanner")
+
+
+class TestShieldBenchmarkRunner:
+
+    def test_build_message_is_reproducible(self):
+        message = build_message(random.Random("42-1024"), 1024)
+
+        assert len(message) == 1024
+        assert message == build_message(random.Random("42-1024"), 1024)
+
+    def test_parse_args(self, tmp_path):
+        args = parse_args(["--mode", "inproc", "--scanner-mixes", "none,pii+toxic", "--message-sizes", "64,512",
+                           "--work-dir", str(tmp_path)])
+
+        assert args.mode == "inproc"
+        assert args.scanner_mixes == ["none", "pii+toxic"]
+        assert args.message_sizes == [64, 512]
+        assert args.message_counts == [1, 4]
+        assert args.work_dir == str(tmp_path)